@@ -1,76 +1,308 @@
 """
 Apache Beam / Dataflow pipeline for blockchain data processing
 Handles data normalization, entity resolution, and BigQuery loading
+
+Transactions are validated into typed rows and all rows are written as
+schema'd Beam rows through the BigQuery Storage Write API instead of
+per-row JSON streaming inserts.
 """
 
 import apache_beam as beam
 from apache_beam.options.pipeline_options import PipelineOptions, StandardOptions
+from apache_beam.io.filesystems import FileSystems
 from apache_beam.io.gcp.bigquery import WriteToBigQuery, BigQueryDisposition
 from apache_beam.io.gcp.pubsub import ReadFromPubSub
+from apache_beam.transforms.periodicsequence import PeriodicImpulse
+from apache_beam.transforms.window import FixedWindows, GlobalWindows
+from apache_beam.utils import shared
+from apache_beam.utils.timestamp import MAX_TIMESTAMP, Timestamp
+from apache_beam.utils.windowed_value import WindowedValue
+import gzip
+import io
 import json
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# orjson parses bytes directly and is several times faster than json on
+# transaction payloads; json.loads also accepts UTF-8 bytes as a fallback
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+class BlockRow(NamedTuple):
+    """btc.blocks row"""
+    block_hash: str
+    height: int
+    timestamp: int
+    size: int
+    tx_count: int
+    fees_total: int
+
+
+class EntityRow(NamedTuple):
+    """Known entity matched on a transaction address"""
+    address: str
+    type: str
+    name: str
+    direction: str
+
+
+class TransactionRow(NamedTuple):
+    """btc.transactions row"""
+    tx_hash: str
+    block_height: int
+    input_count: int
+    output_count: int
+    fee: int
+    size: int
+    entities: Sequence[EntityRow] = []
+
+
+# Rows are encoded positionally by schema instead of as pickled dicts
+beam.coders.registry.register_coder(BlockRow, beam.coders.RowCoder)
+beam.coders.registry.register_coder(EntityRow, beam.coders.RowCoder)
+beam.coders.registry.register_coder(TransactionRow, beam.coders.RowCoder)
+
 
 class ParsePubSubMessage(beam.DoFn):
-    """Parse Pub/Sub message JSON"""
+    """Parse Pub/Sub message JSON (gzip transaction envelopes are unpacked)"""
     
     def process(self, element):
         try:
-            data = json.loads(element.decode('utf-8'))
-            yield data
+            if element[:2] == b'\x1f\x8b':
+                # Envelope published by PubSubStreamer: gzip JSON array
+                yield from _loads(gzip.decompress(element))
+                return
+            yield _loads(element)
         except Exception as e:
             logger.error(f"Failed to parse message: {str(e)}")
 
 
+class EntityIndex:
+    """
+    Compact address -> entity lookup table.
+    
+    Addresses map to a small integer into a de-duplicated entity table, so
+    the thousands of addresses owned by one exchange share a single
+    (type, name) tuple.
+    """
+    
+    def __init__(self, address_ids: Dict[str, int], entities: List[Tuple[str, str]], version: Optional[str] = None):
+        self._address_ids = address_ids
+        self._entities = entities
+        self.version = version
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], version: Optional[str] = None) -> 'EntityIndex':
+        """Build an index from {'address', 'type', 'name'} records"""
+        address_ids: Dict[str, int] = {}
+        entity_ids: Dict[Tuple[str, str], int] = {}
+        for record in records:
+            address = record.get('address')
+            if not address:
+                continue
+            entity = (record.get('type'), record.get('name'))
+            address_ids[address] = entity_ids.setdefault(entity, len(entity_ids))
+        return cls(address_ids, list(entity_ids), version)
+    
+    @classmethod
+    def load(cls, path: str, version: Optional[str] = None) -> 'EntityIndex':
+        """
+        Load an index from a newline-delimited JSON file.
+        
+        Each line is {"address": ..., "type": ..., "name": ...}. The path may be
+        local or gs://; .gz files are decompressed automatically.
+        """
+        with FileSystems.open(path) as f:
+            lines = io.TextIOWrapper(f, encoding='utf-8')
+            index = cls.from_records((json.loads(line) for line in lines if line.strip()), version)
+        logger.info(f"Loaded entity index {path} ({len(index)} addresses, {len(index._entities)} entities)")
+        return index
+    
+    def __len__(self) -> int:
+        return len(self._address_ids)
+    
+    def match(self, addresses: Set[str]) -> Dict[str, Tuple[str, str]]:
+        """Look up a batch of unique addresses, returning only the known ones"""
+        address_ids = self._address_ids
+        entities = self._entities
+        return {address: entities[address_ids[address]] for address in addresses if address in address_ids}
+
+
+def entity_index_version(path: str) -> str:
+    """
+    Version token for the entity index file.
+    
+    Changes whenever the file is rewritten, so workers only reload the index
+    when the slowly-updating side input reports a new version.
+    """
+    try:
+        metadata = FileSystems.match([path])[0].metadata_list[0]
+        return f"{path}@{metadata.last_updated_in_seconds}:{metadata.size_in_bytes}"
+    except Exception as e:
+        logger.warning(f"Could not stat entity index {path}: {str(e)}")
+        return path
+
+
+def _transaction_addresses(transaction: Dict) -> Iterable[Tuple[str, str]]:
+    """Yield (address, direction) for every input and output with an address"""
+    for vin in transaction.get('inputs', []):
+        address = vin.get('address')
+        if address:
+            yield address, 'input'
+    for vout in transaction.get('outputs', []):
+        address = vout.get('address')
+        if address:
+            yield address, 'output'
+
+
 class EnrichWithEntityData(beam.DoFn):
-    """Enrich transaction data with entity information"""
+    """
+    Enrich transaction data with entity information.
+    
+    The entity index is loaded once per worker (shared between DoFn
+    instances) and reloaded only when the optional index_version side input
+    changes. Transactions are buffered per bundle so each unique address is
+    looked up once; only transactions that match a known entity are copied
+    and get an 'entities' list, the rest are passed through unchanged.
+    """
+    
+    def __init__(self, entity_index_path: Optional[str] = None, max_batch_size: int = 500):
+        self.entity_index_path = entity_index_path
+        self.max_batch_size = max_batch_size
+        self._shared_handle = shared.Shared()
+        self._index: Optional[EntityIndex] = None
+        self._batch: List[Tuple[Dict, Any, Any]] = []
     
-    def __init__(self, entity_mapping_path: str = None):
-        self.entity_mapping = {}
-        self.entity_mapping_path = entity_mapping_path
+    def _acquire_index(self, version: Optional[str]) -> EntityIndex:
+        """Get the worker-wide index for a version, loading it if needed"""
+        if not self.entity_index_path:
+            return EntityIndex({}, [], version)
+        
+        def load():
+            return EntityIndex.load(self.entity_index_path, version)
+        
+        return self._shared_handle.acquire(load, tag=version)
     
     def setup(self):
         """Load entity mapping data"""
-        # In production, load from Cloud Storage or BigQuery
-        # For now, use a simple in-memory mapping
-        self.entity_mapping = {
-            # Example entity mappings (address -> entity info)
-            # This would be loaded from a maintained database
-        }
+        if self.entity_index_path:
+            self._index = self._acquire_index(entity_index_version(self.entity_index_path))
+        else:
+            self._index = self._acquire_index(None)
     
-    def process(self, transaction: Dict):
-        """Add entity tags to transaction"""
-        enriched = transaction.copy()
-        enriched['entities'] = []
+    def start_bundle(self):
+        self._batch = []
+    
+    def process(
+        self,
+        transaction: Dict,
+        timestamp=beam.DoFn.TimestampParam,
+        window=beam.DoFn.WindowParam,
+        index_version: Optional[str] = None
+    ):
+        """Buffer a transaction for batched entity lookup"""
+        if index_version is not None and index_version != self._index.version:
+            self._index = self._acquire_index(index_version)
         
-        # Check inputs for known entities
-        for vin in transaction.get('inputs', []):
-            address = vin.get('address')
-            if address and address in self.entity_mapping:
-                entity_info = self.entity_mapping[address]
-                enriched['entities'].append({
-                    'address': address,
-                    'type': entity_info.get('type'),
-                    'name': entity_info.get('name'),
-                    'direction': 'input'
-                })
+        if not len(self._index):
+            yield transaction
+            return
         
-        # Check outputs for known entities
-        for vout in transaction.get('outputs', []):
-            address = vout.get('address')
-            if address and address in self.entity_mapping:
-                entity_info = self.entity_mapping[address]
-                enriched['entities'].append({
-                    'address': address,
-                    'type': entity_info.get('type'),
-                    'name': entity_info.get('name'),
-                    'direction': 'output'
-                })
+        self._batch.append((transaction, timestamp, window))
+        if len(self._batch) >= self.max_batch_size:
+            yield from self._enrich_batch()
+    
+    def finish_bundle(self):
+        yield from self._enrich_batch()
+    
+    def _enrich_batch(self):
+        """Look up all addresses of the buffered transactions at once"""
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        
+        addresses = set()
+        for transaction, _, _ in batch:
+            addresses.update(address for address, _ in _transaction_addresses(transaction))
+        matches = self._index.match(addresses)
         
-        yield enriched
+        for transaction, timestamp, window in batch:
+            if matches:
+                entities = [
+                    {
+                        'address': address,
+                        'type': matches[address][0],
+                        'name': matches[address][1],
+                        'direction': direction
+                    }
+                    for address, direction in _transaction_addresses(transaction)
+                    if address in matches
+                ]
+                if entities:
+                    transaction = dict(transaction, entities=entities)
+            yield WindowedValue(transaction, timestamp, [window])
+
+
+def enrich_transactions(
+    transactions,
+    entity_index_path: Optional[str] = None,
+    refresh_seconds: int = 3600,
+    start_timestamp: Optional[float] = None,
+    stop_timestamp: Optional[float] = None
+):
+    """
+    Apply entity enrichment with a slowly-updating index side input.
+    
+    A PeriodicImpulse emits the index file's version every refresh_seconds;
+    transactions are windowed to match so each window sees the version
+    current at its start, then returned to the global window for the
+    BigQuery writes. Windows before the first impulse (backlog or replayed
+    messages) get no version and keep the index loaded at setup.
+    
+    Args:
+        transactions: PCollection of parsed transactions
+        entity_index_path: Newline-delimited JSON entity index (None to skip)
+        refresh_seconds: How often workers check for a new index
+        start_timestamp: First impulse time (default: start of current window)
+        stop_timestamp: Last impulse time (default: never stop)
+    """
+    enrich = EnrichWithEntityData(entity_index_path)
+    if not entity_index_path:
+        return transactions | 'Enrich with Entities' >> beam.ParDo(enrich)
+    
+    if start_timestamp is None:
+        # Align impulses with window starts so no window waits for its side input
+        start_timestamp = int(time.time()) // refresh_seconds * refresh_seconds
+    
+    index_version = (
+        transactions.pipeline
+        | 'Entity Index Refresh' >> PeriodicImpulse(
+            start_timestamp=Timestamp(start_timestamp),
+            stop_timestamp=Timestamp(stop_timestamp) if stop_timestamp is not None else MAX_TIMESTAMP,
+            fire_interval=refresh_seconds,
+            apply_windowing=True
+        )
+        | 'Entity Index Version' >> beam.Map(lambda _: entity_index_version(entity_index_path))
+    )
+    
+    return (
+        transactions
+        | 'Window for Entity Index' >> beam.WindowInto(FixedWindows(refresh_seconds))
+        | 'Enrich with Entities' >> beam.ParDo(
+            enrich,
+            index_version=beam.pvalue.AsSingleton(index_version, default_value=None)
+        )
+        | 'Restore Global Window' >> beam.WindowInto(GlobalWindows())
+    )
 
 
 class ValidateBlockData(beam.DoFn):
@@ -83,15 +315,14 @@ class ValidateBlockData(beam.DoFn):
         if all(field in block for field in required_fields):
             # Ensure correct types
             try:
-                validated = {
-                    'block_hash': str(block['block_hash']),
-                    'height': int(block['height']),
-                    'timestamp': int(block['timestamp']),
-                    'size': int(block['size']),
-                    'tx_count': int(block['tx_count']),
-                    'fees_total': int(block['fees_total'])
-                }
-                yield validated
+                yield BlockRow(
+                    block_hash=str(block['block_hash']),
+                    height=int(block['height']),
+                    timestamp=int(block['timestamp']),
+                    size=int(block['size']),
+                    tx_count=int(block['tx_count']),
+                    fees_total=int(block['fees_total'])
+                )
             except (ValueError, TypeError) as e:
                 logger.error(f"Invalid block data types: {str(e)}")
         else:
@@ -101,28 +332,126 @@ class ValidateBlockData(beam.DoFn):
 class ValidateTransactionData(beam.DoFn):
     """Validate transaction data before loading to BigQuery"""
     
+    REQUIRED_FIELDS = ('tx_hash', 'block_height', 'input_count', 'output_count', 'fee', 'size')
+    
+    def to_row(self, transaction: Dict) -> Optional[TransactionRow]:
+        """Validate required fields and convert to a typed row"""
+        if not all(field in transaction for field in self.REQUIRED_FIELDS):
+            logger.error(f"Missing required fields in transaction data")
+            return None
+        
+        try:
+            return TransactionRow(
+                tx_hash=str(transaction['tx_hash']),
+                block_height=int(transaction['block_height']),
+                input_count=int(transaction['input_count']),
+                output_count=int(transaction['output_count']),
+                fee=int(transaction['fee']),
+                size=int(transaction['size']),
+                entities=[
+                    EntityRow(
+                        address=str(entity['address']),
+                        type=str(entity['type']),
+                        name=str(entity['name']),
+                        direction=str(entity['direction'])
+                    )
+                    for entity in transaction.get('entities', [])
+                ]
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            logger.error(f"Invalid transaction data types: {str(e)}")
+            return None
+    
     def process(self, transaction: Dict):
         """Validate required fields"""
-        required_fields = ['tx_hash', 'block_height', 'input_count', 'output_count', 'fee', 'size']
-        
-        if all(field in transaction for field in required_fields):
-            try:
-                validated = {
-                    'tx_hash': str(transaction['tx_hash']),
-                    'block_height': int(transaction['block_height']),
-                    'input_count': int(transaction['input_count']),
-                    'output_count': int(transaction['output_count']),
-                    'fee': int(transaction['fee']),
-                    'size': int(transaction['size'])
-                }
-                yield validated
-            except (ValueError, TypeError) as e:
-                logger.error(f"Invalid transaction data types: {str(e)}")
-        else:
-            logger.error(f"Missing required fields in transaction data")
+        row = self.to_row(transaction)
+        if row is not None:
+            yield row
+
+
+# BigQuery table schemas
+BLOCK_SCHEMA = {
+    'fields': [
+        {'name': 'block_hash', 'type': 'STRING', 'mode': 'REQUIRED'},
+        {'name': 'height', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'timestamp', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'size', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'tx_count', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'fees_total', 'type': 'INTEGER', 'mode': 'REQUIRED'}
+    ]
+}
+
+TRANSACTION_SCHEMA = {
+    'fields': [
+        {'name': 'tx_hash', 'type': 'STRING', 'mode': 'REQUIRED'},
+        {'name': 'block_height', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'input_count', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'output_count', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'fee', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {'name': 'size', 'type': 'INTEGER', 'mode': 'REQUIRED'},
+        {
+            'name': 'entities',
+            'type': 'RECORD',
+            'mode': 'REPEATED',
+            'fields': [
+                {'name': 'address', 'type': 'STRING', 'mode': 'REQUIRED'},
+                {'name': 'type', 'type': 'STRING', 'mode': 'REQUIRED'},
+                {'name': 'name', 'type': 'STRING', 'mode': 'REQUIRED'},
+                {'name': 'direction', 'type': 'STRING', 'mode': 'REQUIRED'}
+            ]
+        }
+    ]
+}
+
+
+def process_blocks(messages):
+    """Parse and validate block messages into BlockRows"""
+    return (
+        messages
+        | 'Parse Block Messages' >> beam.ParDo(ParsePubSubMessage())
+        | 'Validate Blocks' >> beam.ParDo(ValidateBlockData()).with_output_types(BlockRow)
+    )
+
+
+def process_transactions(
+    messages,
+    entity_index_path: Optional[str] = None,
+    entity_refresh_seconds: int = 3600
+):
+    """Parse, enrich and validate transaction messages into TransactionRows"""
+    parsed_transactions = messages | 'Parse Transaction Messages' >> beam.ParDo(ParsePubSubMessage())
+    
+    return (
+        enrich_transactions(parsed_transactions, entity_index_path, entity_refresh_seconds)
+        | 'Validate Transactions' >> beam.ParDo(ValidateTransactionData()).with_output_types(TransactionRow)
+    )
 
 
-def run_pipeline(project_id: str, region: str = 'us-central1'):
+def write_rows_to_bigquery(table: str, schema: Dict, triggering_frequency: int = 5):
+    """
+    Storage Write API sink for schema'd rows.
+    
+    Rows are appended in binary form per triggering_frequency seconds rather
+    than as one JSON streaming insert per element, so a full-block burst of
+    transactions is committed in a few appends without a grouping stage.
+    """
+    return WriteToBigQuery(
+        table=table,
+        schema=schema,
+        method=WriteToBigQuery.Method.STORAGE_WRITE_API,
+        triggering_frequency=triggering_frequency,
+        write_disposition=BigQueryDisposition.WRITE_APPEND,
+        create_disposition=BigQueryDisposition.CREATE_NEVER
+    )
+
+
+def run_pipeline(
+    project_id: str,
+    region: str = 'us-central1',
+    entity_index_path: Optional[str] = None,
+    entity_refresh_seconds: int = 3600,
+    triggering_frequency: int = 5
+):
     """Run the Dataflow pipeline"""
     
     # Pipeline options
@@ -134,60 +463,32 @@ def run_pipeline(project_id: str, region: str = 'us-central1'):
         save_main_session=True
     )
     
-    # BigQuery table schemas
-    block_schema = {
-        'fields': [
-            {'name': 'block_hash', 'type': 'STRING', 'mode': 'REQUIRED'},
-            {'name': 'height', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'timestamp', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'size', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'tx_count', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'fees_total', 'type': 'INTEGER', 'mode': 'REQUIRED'}
-        ]
-    }
-    
-    transaction_schema = {
-        'fields': [
-            {'name': 'tx_hash', 'type': 'STRING', 'mode': 'REQUIRED'},
-            {'name': 'block_height', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'input_count', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'output_count', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'fee', 'type': 'INTEGER', 'mode': 'REQUIRED'},
-            {'name': 'size', 'type': 'INTEGER', 'mode': 'REQUIRED'}
-        ]
-    }
-    
     with beam.Pipeline(options=options) as pipeline:
         # Process blocks
         blocks = (
-            pipeline
-            | 'Read Blocks from Pub/Sub' >> ReadFromPubSub(
-                subscription=f'projects/{project_id}/subscriptions/btc-blocks-sub'
+            process_blocks(
+                pipeline
+                | 'Read Blocks from Pub/Sub' >> ReadFromPubSub(
+                    subscription=f'projects/{project_id}/subscriptions/btc-blocks-sub'
+                )
             )
-            | 'Parse Block Messages' >> beam.ParDo(ParsePubSubMessage())
-            | 'Validate Blocks' >> beam.ParDo(ValidateBlockData())
-            | 'Write Blocks to BigQuery' >> WriteToBigQuery(
-                table=f'{project_id}:btc.blocks',
-                schema=block_schema,
-                write_disposition=BigQueryDisposition.WRITE_APPEND,
-                create_disposition=BigQueryDisposition.CREATE_NEVER
+            | 'Write Blocks to BigQuery' >> write_rows_to_bigquery(
+                f'{project_id}:btc.blocks', BLOCK_SCHEMA, triggering_frequency
             )
         )
         
         # Process transactions
         transactions = (
-            pipeline
-            | 'Read Transactions from Pub/Sub' >> ReadFromPubSub(
-                subscription=f'projects/{project_id}/subscriptions/btc-transactions-sub'
+            process_transactions(
+                pipeline
+                | 'Read Transactions from Pub/Sub' >> ReadFromPubSub(
+                    subscription=f'projects/{project_id}/subscriptions/btc-transactions-sub'
+                ),
+                entity_index_path,
+                entity_refresh_seconds
             )
-            | 'Parse Transaction Messages' >> beam.ParDo(ParsePubSubMessage())
-            | 'Enrich with Entities' >> beam.ParDo(EnrichWithEntityData())
-            | 'Validate Transactions' >> beam.ParDo(ValidateTransactionData())
-            | 'Write Transactions to BigQuery' >> WriteToBigQuery(
-                table=f'{project_id}:btc.transactions',
-                schema=transaction_schema,
-                write_disposition=BigQueryDisposition.WRITE_APPEND,
-                create_disposition=BigQueryDisposition.CREATE_NEVER
+            | 'Write Transactions to BigQuery' >> write_rows_to_bigquery(
+                f'{project_id}:btc.transactions', TRANSACTION_SCHEMA, triggering_frequency
             )
         )
 
@@ -198,8 +499,17 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--project', required=True, help='GCP project ID')
     parser.add_argument('--region', default='us-central1', help='GCP region')
+    parser.add_argument('--entity-index', help='Entity index file (newline-delimited JSON, local or gs://)')
+    parser.add_argument('--entity-refresh-seconds', type=int, default=3600, help='Entity index refresh interval')
+    parser.add_argument('--triggering-frequency', type=int, default=5, help='Storage Write API commit interval (seconds)')
     
     args = parser.parse_args()
     
     logging.basicConfig(level=logging.INFO)
-    run_pipeline(args.project, args.region)
+    run_pipeline(
+        args.project,
+        args.region,
+        args.entity_index,
+        args.entity_refresh_seconds,
+        args.triggering_frequency
+    )
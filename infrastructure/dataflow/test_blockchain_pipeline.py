@@ -0,0 +1,245 @@
+"""
+DirectRunner tests for the blockchain pipeline: parsing, entity enrichment
+and validation into typed rows.
+
+Run with: pytest infrastructure/dataflow/test_blockchain_pipeline.py
+"""
+import gzip
+import json
+import time
+
+import apache_beam as beam
+from apache_beam.testing.test_pipeline import TestPipeline
+from apache_beam.testing.util import assert_that, equal_to
+from apache_beam.transforms.window import TimestampedValue
+
+from blockchain_pipeline import (
+    BlockRow,
+    EnrichWithEntityData,
+    EntityIndex,
+    EntityRow,
+    ParsePubSubMessage,
+    TransactionRow,
+    ValidateTransactionData,
+    entity_index_version,
+    enrich_transactions,
+    process_blocks,
+    process_transactions
+)
+
+
+ENTITY_RECORDS = [
+    {'address': 'bc1qexchange1', 'type': 'exchange', 'name': 'Binance'},
+    {'address': 'bc1qexchange2', 'type': 'exchange', 'name': 'Binance'},
+    {'address': 'bc1qminer', 'type': 'mining_pool', 'name': 'Foundry'},
+]
+
+MATCHING_TX = {
+    'tx_hash': 'a' * 64,
+    'inputs': [{'address': 'bc1qexchange1'}, {'address': 'bc1qunknown'}],
+    'outputs': [{'address': 'bc1qminer'}, {}],
+}
+
+PLAIN_TX = {
+    'tx_hash': 'b' * 64,
+    'inputs': [{'address': 'bc1qunknown'}],
+    'outputs': [{'address': 'bc1qother'}],
+}
+
+EXPECTED_ENTITIES = [
+    {'address': 'bc1qexchange1', 'type': 'exchange', 'name': 'Binance', 'direction': 'input'},
+    {'address': 'bc1qminer', 'type': 'mining_pool', 'name': 'Foundry', 'direction': 'output'},
+]
+
+
+def write_index(tmp_path, records=ENTITY_RECORDS):
+    path = tmp_path / 'entities.jsonl'
+    path.write_text('\n'.join(json.dumps(record) for record in records) + '\n')
+    return str(path)
+
+
+def test_entity_index_shares_entities(tmp_path):
+    """Addresses of the same entity share one table entry"""
+    index = EntityIndex.load(write_index(tmp_path))
+
+    assert len(index) == 3
+    assert len(index._entities) == 2
+    assert index.match({'bc1qexchange2', 'bc1qminer', 'bc1qunknown'}) == {
+        'bc1qexchange2': ('exchange', 'Binance'),
+        'bc1qminer': ('mining_pool', 'Foundry'),
+    }
+
+
+def test_entity_index_version_changes_with_file(tmp_path):
+    """Rewriting the index file produces a new version"""
+    path = write_index(tmp_path)
+    before = entity_index_version(path)
+
+    write_index(tmp_path, ENTITY_RECORDS[:1])
+
+    assert entity_index_version(path) != before
+
+
+def test_enrich_only_copies_matching_transactions(tmp_path):
+    """Matching transactions get entities, others pass through unchanged"""
+    path = write_index(tmp_path)
+
+    with TestPipeline() as pipeline:
+        enriched = (
+            pipeline
+            | beam.Create([MATCHING_TX, PLAIN_TX])
+            | beam.ParDo(EnrichWithEntityData(path, max_batch_size=1))
+        )
+
+        assert_that(enriched, equal_to([dict(MATCHING_TX, entities=EXPECTED_ENTITIES), PLAIN_TX]))
+
+
+def test_enrich_without_index_passes_through():
+    """Without an index path transactions are not modified"""
+    with TestPipeline() as pipeline:
+        enriched = enrich_transactions(pipeline | beam.Create([MATCHING_TX, PLAIN_TX]))
+
+        assert_that(enriched, equal_to([MATCHING_TX, PLAIN_TX]))
+
+
+def test_enrich_with_version_side_input(tmp_path):
+    """The index is loaded for the version delivered by the side input"""
+    path = write_index(tmp_path)
+
+    with TestPipeline() as pipeline:
+        version = pipeline | 'Version' >> beam.Create([entity_index_version(path)])
+        enriched = (
+            pipeline
+            | 'Transactions' >> beam.Create([MATCHING_TX, PLAIN_TX])
+            | beam.ParDo(EnrichWithEntityData(path), index_version=beam.pvalue.AsSingleton(version))
+        )
+
+        assert_that(enriched, equal_to([dict(MATCHING_TX, entities=EXPECTED_ENTITIES), PLAIN_TX]))
+
+
+def test_enrich_before_first_impulse(tmp_path, monkeypatch):
+    """Transactions older than the first index refresh use the index loaded at setup"""
+    path = write_index(tmp_path)
+    first_impulse = int(time.time()) // 60 * 60 - 60
+    load = EntityIndex.load
+
+    def load_version(path, version=None):
+        # An empty side input must arrive as None, not as a version
+        assert version is None or isinstance(version, str)
+        return load(path, version)
+
+    monkeypatch.setattr(EntityIndex, 'load', load_version)
+
+    with TestPipeline() as pipeline:
+        transactions = (
+            pipeline
+            | beam.Create([(MATCHING_TX, first_impulse - 3600), (PLAIN_TX, first_impulse + 1)])
+            | beam.MapTuple(TimestampedValue)
+        )
+        enriched = enrich_transactions(
+            transactions,
+            path,
+            refresh_seconds=60,
+            start_timestamp=first_impulse,
+            stop_timestamp=first_impulse + 1
+        )
+
+        assert_that(enriched, equal_to([dict(MATCHING_TX, entities=EXPECTED_ENTITIES), PLAIN_TX]))
+
+
+def make_transaction(index, block_height=800000, **overrides):
+    transaction = {
+        'tx_hash': f'{index:064x}',
+        'block_height': block_height,
+        'input_count': 1,
+        'output_count': 2,
+        'fee': 1000 + index,
+        'size': 250,
+    }
+    transaction.update(overrides)
+    return transaction
+
+
+def test_enriched_entities_reach_rows(tmp_path):
+    """Entities added by enrichment are kept in the typed rows written to BigQuery"""
+    path = write_index(tmp_path)
+    matching = make_transaction(1, **{key: MATCHING_TX[key] for key in ('inputs', 'outputs')})
+    plain = make_transaction(2, **{key: PLAIN_TX[key] for key in ('inputs', 'outputs')})
+
+    with TestPipeline() as pipeline:
+        rows = (
+            pipeline
+            | beam.Create([matching, plain])
+            | beam.ParDo(EnrichWithEntityData(path))
+            | beam.ParDo(ValidateTransactionData()).with_output_types(TransactionRow)
+        )
+
+        assert_that(rows, equal_to([
+            TransactionRow(**make_transaction(1), entities=[EntityRow(**entity) for entity in EXPECTED_ENTITIES]),
+            TransactionRow(**make_transaction(2)),
+        ]))
+
+
+def test_parse_plain_and_gzip_envelope():
+    """Plain JSON messages and gzip envelopes decode to the same dicts"""
+    transactions = [make_transaction(i) for i in range(3)]
+    parse = ParsePubSubMessage()
+
+    envelope = gzip.compress(json.dumps(transactions).encode('utf-8'))
+
+    assert list(parse.process(json.dumps(transactions[0]).encode('utf-8'))) == transactions[:1]
+    assert list(parse.process(envelope)) == transactions
+    assert list(parse.process(b'not json')) == []
+
+
+def test_validation_normalizes_height():
+    """String heights become integers and transactions without a height are dropped"""
+    transactions = [
+        make_transaction(1, block_height='800000'),
+        make_transaction(2, block_height=800000),
+        make_transaction(3, block_height=None),
+    ]
+
+    with TestPipeline() as pipeline:
+        heights = (
+            pipeline
+            | beam.Create(transactions)
+            | beam.ParDo(ValidateTransactionData()).with_output_types(TransactionRow)
+            | beam.Map(lambda row: (row.block_height, row.fee))
+        )
+
+        assert_that(heights, equal_to([(800000, 1001), (800000, 1002)]))
+
+
+def test_process_transactions_to_rows():
+    """Envelopes become typed rows, invalid transactions are dropped"""
+    transactions = [make_transaction(i) for i in range(4)]
+    invalid = make_transaction(5, fee='free')
+    incomplete = {'tx_hash': 'c' * 64}
+    messages = [
+        gzip.compress(json.dumps(transactions[:3] + [invalid]).encode('utf-8')),
+        json.dumps(transactions[3]).encode('utf-8'),
+        json.dumps(incomplete).encode('utf-8'),
+    ]
+
+    with TestPipeline() as pipeline:
+        rows = process_transactions(pipeline | beam.Create(messages))
+
+        assert_that(rows, equal_to([TransactionRow(**transaction) for transaction in transactions]))
+
+
+def test_process_blocks_to_rows():
+    """Block messages become typed rows"""
+    block = {
+        'block_hash': '0' * 64,
+        'height': 800000,
+        'timestamp': 1700000000,
+        'size': 1500000,
+        'tx_count': 4000,
+        'fees_total': '25000000',
+    }
+
+    with TestPipeline() as pipeline:
+        rows = process_blocks(pipeline | beam.Create([json.dumps(block).encode('utf-8')]))
+
+        assert_that(rows, equal_to([BlockRow(**dict(block, fees_total=25000000))]))
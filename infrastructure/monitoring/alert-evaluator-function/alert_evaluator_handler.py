@@ -29,6 +29,9 @@ class AlertEvaluatorHandler:
         self.database_url = os.environ.get('DATABASE_URL')
         self.redis_url = os.environ.get('REDIS_URL')
         self.gcp_project_id = os.environ.get('GCP_PROJECT_ID')
+        self.max_concurrent_fetches = int(
+            os.environ.get('ALERT_MAX_CONCURRENT_FETCHES', '8')
+        )
         
         # Validate configuration
         if not self.database_url:
@@ -99,6 +102,7 @@ class AlertEvaluatorHandler:
                 # Import services here to avoid import issues
                 from metrics_service_wrapper import MetricsServiceWrapper
                 from notification_service_wrapper import NotificationServiceWrapper
+                from notification_dispatcher_wrapper import NotificationDispatcherWrapper
                 from alert_evaluator_wrapper import AlertEvaluatorWrapper
                 
                 # Initialize services
@@ -108,16 +112,27 @@ class AlertEvaluatorHandler:
                 )
                 
                 notification_service = NotificationServiceWrapper()
+                notification_dispatcher = NotificationDispatcherWrapper(
+                    notification_service
+                )
                 
                 evaluator = AlertEvaluatorWrapper(
                     metrics_service=metrics_service,
                     db=session,
-                    notification_service=notification_service
+                    notification_service=notification_service,
+                    max_concurrent_fetches=self.max_concurrent_fetches,
+                    metric_writer=metrics_service,
+                    notification_dispatcher=notification_dispatcher
                 )
                 
                 # Evaluate all alerts
-                result = await evaluator.evaluate_all_alerts()
+                try:
+                    result = await evaluator.evaluate_all_alerts()
+                finally:
+                    # Deliver this cycle's notifications, one message per recipient
+                    notification_stats = await notification_dispatcher.flush()
                 
+                result["notifications"] = notification_stats
                 return result
                 
         finally:
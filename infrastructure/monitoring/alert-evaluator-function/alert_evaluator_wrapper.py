@@ -4,9 +4,11 @@ Alert evaluator wrapper for Cloud Function.
 This module provides a simplified wrapper around the AlertEvaluator
 that can be used in the Cloud Function context.
 """
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -20,7 +22,10 @@ class AlertEvaluatorWrapper:
         self,
         metrics_service: Any,
         db: AsyncSession,
-        notification_service: Optional[Any] = None
+        notification_service: Optional[Any] = None,
+        max_concurrent_fetches: int = 8,
+        metric_writer: Optional[Any] = None,
+        notification_dispatcher: Optional[Any] = None
     ):
         """
         Initialize alert evaluator wrapper.
@@ -29,10 +34,19 @@ class AlertEvaluatorWrapper:
             metrics_service: Service for querying metrics
             db: Database session
             notification_service: Optional service for sending notifications
+            max_concurrent_fetches: Max metric series fetched concurrently per cycle
+            metric_writer: Optional object with ``write_metric(metric_type, value, labels)``
+                used to emit per-cycle timing and API call counts
+            notification_dispatcher: Optional NotificationDispatcherWrapper; when
+                set, notifications are queued for delivery at the end of the cycle
+                instead of sent inline
         """
         self.metrics = metrics_service
         self.db = db
         self.notifications = notification_service
+        self.max_concurrent_fetches = max(1, max_concurrent_fetches)
+        self.metric_writer = metric_writer
+        self.dispatcher = notification_dispatcher
         
         logger.info("AlertEvaluatorWrapper initialized")
     
@@ -40,6 +54,10 @@ class AlertEvaluatorWrapper:
         """
         Evaluate all enabled alert configurations.
         
+        Each distinct (service, metric, window) series is fetched once per
+        cycle, concurrently up to ``max_concurrent_fetches``; database writes
+        stay sequential since the session is not safe for concurrent use.
+        
         Returns:
             Dictionary with evaluation summary
         """
@@ -47,13 +65,18 @@ class AlertEvaluatorWrapper:
         from models import AlertConfiguration, AlertHistory
         
         logger.info("Starting evaluation of all enabled alerts")
+        cycle_start = time.monotonic()
         
         summary = {
             "total_evaluated": 0,
             "triggered": 0,
             "resolved": 0,
             "suppressed": 0,
-            "errors": 0
+            "errors": 0,
+            "metric_fetches": 0,
+            "metric_fetch_errors": 0,
+            "fetch_duration_seconds": 0.0,
+            "duration_seconds": 0.0
         }
         
         # Get all enabled alerts
@@ -66,14 +89,38 @@ class AlertEvaluatorWrapper:
         summary["total_evaluated"] = len(configs)
         logger.info(f"Found {len(configs)} enabled alert configurations")
         
-        # Evaluate each alert
+        # Suppressed alerts need no metric data
+        to_evaluate = []
         for config in configs:
+            if self._is_suppressed(config):
+                logger.debug(f"Alert {config.id} is suppressed")
+                summary["suppressed"] += 1
+            else:
+                to_evaluate.append(config)
+        
+        # Fetch each distinct series once
+        series_keys = {self._series_key(config) for config in to_evaluate}
+        fetch_start = time.monotonic()
+        metric_values = await self._fetch_metric_values(series_keys)
+        summary["fetch_duration_seconds"] = time.monotonic() - fetch_start
+        summary["metric_fetches"] = len(series_keys)
+        summary["metric_fetch_errors"] = sum(
+            1 for value in metric_values.values() if isinstance(value, Exception)
+        )
+        
+        # Evaluate each alert against the shared results
+        for config in to_evaluate:
             try:
-                result = await self._evaluate_alert(config, AlertHistory)
+                metric_value = metric_values[self._series_key(config)]
+                if isinstance(metric_value, Exception):
+                    logger.warning(f"Metric not found for alert {config.id}: {metric_value}")
+                    continue
                 
-                if result["suppressed"]:
-                    summary["suppressed"] += 1
-                elif result["triggered"]:
+                result = await self._evaluate_metric_value(
+                    config, metric_value, AlertHistory
+                )
+                
+                if result["triggered"]:
                     summary["triggered"] += 1
                 elif result["resolved"]:
                     summary["resolved"] += 1
@@ -85,48 +132,80 @@ class AlertEvaluatorWrapper:
                     exc_info=True
                 )
         
+        summary["duration_seconds"] = time.monotonic() - cycle_start
+        self._emit_cycle_metrics(summary)
+        
         logger.info(
             f"Alert evaluation complete: {summary['triggered']} triggered, "
             f"{summary['resolved']} resolved, {summary['suppressed']} suppressed, "
-            f"{summary['errors']} errors"
+            f"{summary['errors']} errors, {summary['metric_fetches']} metric fetches "
+            f"for {len(to_evaluate)} alerts in {summary['duration_seconds']:.2f}s"
         )
         
         return summary
     
-    async def _evaluate_alert(
+    @staticmethod
+    def _series_key(config: Any) -> Tuple[str, str, int]:
+        """Key identifying the metric series an alert reads."""
+        return (
+            config.service_name,
+            config.metric_type,
+            config.evaluation_window_seconds
+        )
+    
+    async def _fetch_metric_values(
+        self,
+        series_keys: "set[Tuple[str, str, int]]"
+    ) -> Dict[Tuple[str, str, int], Union[float, Exception]]:
+        """Fetch the current value (or the lookup error) of each series concurrently."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        
+        async def fetch(key: Tuple[str, str, int]) -> Union[float, Exception]:
+            async with semaphore:
+                try:
+                    return await self._get_current_metric_value(*key)
+                except Exception as e:
+                    return e
+        
+        keys = list(series_keys)
+        values = await asyncio.gather(*(fetch(key) for key in keys))
+        return dict(zip(keys, values))
+    
+    def _emit_cycle_metrics(self, summary: Dict[str, Any]) -> None:
+        """Emit per-cycle timing and API call counts."""
+        if self.metric_writer is None:
+            return
+        
+        labels = {"component": "alert_evaluator"}
+        for name in (
+            "duration_seconds",
+            "fetch_duration_seconds",
+            "metric_fetches",
+            "metric_fetch_errors",
+            "total_evaluated",
+            "errors",
+        ):
+            try:
+                self.metric_writer.write_metric(
+                    f"alert_evaluation_{name}", float(summary[name]), labels
+                )
+            except Exception as e:
+                logger.warning(f"Failed to emit alert evaluation metric {name}: {e}")
+    
+    async def _evaluate_metric_value(
         self,
         config: Any,
+        metric_value: float,
         AlertHistory: Any
     ) -> Dict[str, Any]:
-        """Evaluate a single alert configuration."""
-        logger.debug(f"Evaluating alert {config.id} ({config.name})")
-        
+        """Evaluate an alert against an already fetched metric value."""
         result = {
             "suppressed": False,
             "triggered": False,
             "resolved": False,
-            "metric_value": None
+            "metric_value": metric_value
         }
         
-        # Check if suppressed
-        if self._is_suppressed(config):
-            logger.debug(f"Alert {config.id} is suppressed")
-            result["suppressed"] = True
-            return result
-        
-        # Get current metric value
-        try:
-            metric_value = await self._get_current_metric_value(
-                config.service_name,
-                config.metric_type,
-                config.evaluation_window_seconds
-            )
-            result["metric_value"] = metric_value
-            
-        except Exception as e:
-            logger.warning(f"Metric not found for alert {config.id}: {e}")
-            return result
-        
         # Evaluate threshold
         triggered = self._evaluate_threshold(
             metric_value,
@@ -213,7 +292,7 @@ class AlertEvaluatorWrapper:
         )
         
         # Send notifications
-        if self.notifications:
+        if self.notifications or self.dispatcher:
             await self._send_notifications(config, alert)
         
         return True
@@ -243,7 +322,7 @@ class AlertEvaluatorWrapper:
         logger.info(f"Alert resolved: {config.name} (id={config.id})")
         
         # Send resolution notification
-        if self.notifications:
+        if self.notifications or self.dispatcher:
             await self._send_resolution_notification(config, active_alert)
         
         return True
@@ -304,6 +383,16 @@ class AlertEvaluatorWrapper:
         if not config.notification_channels:
             return
         
+        if self.dispatcher:
+            queued = [
+                channel for channel in config.notification_channels
+                if self.dispatcher.enqueue(channel, config, alert)
+            ]
+            if queued:
+                alert.notification_sent = True
+                await self.db.commit()
+            return
+        
         notification_success = False
         
         for channel in config.notification_channels:
@@ -329,6 +418,11 @@ class AlertEvaluatorWrapper:
         if not config.notification_channels:
             return
         
+        if self.dispatcher:
+            for channel in config.notification_channels:
+                self.dispatcher.enqueue(channel, config, alert, resolved=True)
+            return
+        
         for channel in config.notification_channels:
             try:
                 if channel == 'email':
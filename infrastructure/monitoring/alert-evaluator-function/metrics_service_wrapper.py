@@ -4,7 +4,9 @@ Metrics service wrapper for Cloud Function.
 This module provides a simplified wrapper around the MetricsService
 that can be used in the Cloud Function context.
 """
+import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from google.cloud import monitoring_v3
@@ -15,7 +17,12 @@ logger = logging.getLogger(__name__)
 
 
 class MetricsServiceWrapper:
-    """Wrapper for MetricsService compatible with Cloud Function."""
+    """
+    Wrapper for MetricsService compatible with Cloud Function.
+    
+    The Monitoring client is synchronous, so queries run in worker threads
+    and concurrent ``get_time_series`` calls do not serialize on the event loop.
+    """
     
     def __init__(self, project_id: str, redis_client: Optional[redis.Redis] = None):
         """
@@ -77,9 +84,10 @@ class MetricsServiceWrapper:
                 for key, value in resource_labels.items():
                     filter_str += f' AND resource.labels.{key} = "{value}"'
             
-            # Query time series
-            results = self.client.list_time_series(
-                request={
+            # Query time series off the event loop
+            formatted_results = await asyncio.to_thread(
+                self._list_time_series,
+                {
                     "name": self.project_name,
                     "filter": filter_str,
                     "interval": interval,
@@ -87,33 +95,6 @@ class MetricsServiceWrapper:
                 }
             )
             
-            # Format results
-            formatted_results = []
-            for ts in results:
-                points = []
-                for point in ts.points:
-                    # Extract value based on type
-                    if point.value.HasField('double_value'):
-                        value = point.value.double_value
-                    elif point.value.HasField('int64_value'):
-                        value = float(point.value.int64_value)
-                    elif point.value.HasField('bool_value'):
-                        value = 1.0 if point.value.bool_value else 0.0
-                    else:
-                        value = 0.0
-                    
-                    points.append({
-                        'timestamp': point.interval.end_time.isoformat(),
-                        'value': value
-                    })
-                
-                formatted_results.append({
-                    'metric_type': ts.metric.type,
-                    'resource_type': ts.resource.type,
-                    'labels': dict(ts.metric.labels),
-                    'points': points
-                })
-            
             logger.debug(
                 f"Retrieved {len(formatted_results)} time series for {metric_type}"
             )
@@ -123,3 +104,81 @@ class MetricsServiceWrapper:
         except Exception as e:
             logger.error(f"Error querying time series for {metric_type}: {e}")
             raise
+    
+    def _list_time_series(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run ``list_time_series`` and drain its pager (blocking)."""
+        results = self.client.list_time_series(request=request)
+        
+        # Format results
+        formatted_results = []
+        for ts in results:
+            points = []
+            for point in ts.points:
+                # Extract value based on type
+                if point.value.HasField('double_value'):
+                    value = point.value.double_value
+                elif point.value.HasField('int64_value'):
+                    value = float(point.value.int64_value)
+                elif point.value.HasField('bool_value'):
+                    value = 1.0 if point.value.bool_value else 0.0
+                else:
+                    value = 0.0
+                
+                points.append({
+                    'timestamp': point.interval.end_time.isoformat(),
+                    'value': value
+                })
+            
+            formatted_results.append({
+                'metric_type': ts.metric.type,
+                'resource_type': ts.resource.type,
+                'labels': dict(ts.metric.labels),
+                'points': points
+            })
+        
+        return formatted_results
+    
+    def write_metric(
+        self,
+        metric_type: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Write a custom metric to Cloud Monitoring.
+        
+        Args:
+            metric_type: Metric type (e.g., 'alert_evaluation_duration_seconds')
+            value: Metric value
+            labels: Optional metric labels
+        """
+        try:
+            series = monitoring_v3.TimeSeries()
+            series.metric.type = f"custom.googleapis.com/alert_evaluator/{metric_type}"
+            
+            if labels:
+                for key, val in labels.items():
+                    series.metric.labels[key] = val
+            
+            series.resource.type = "global"
+            series.resource.labels["project_id"] = self.project_id
+            
+            now = time.time()
+            seconds = int(now)
+            nanos = int((now - seconds) * 10 ** 9)
+            interval = monitoring_v3.TimeInterval(
+                {"end_time": {"seconds": seconds, "nanos": nanos}}
+            )
+            point = monitoring_v3.Point(
+                {"interval": interval, "value": {"double_value": value}}
+            )
+            series.points = [point]
+            
+            self.client.create_time_series(
+                name=self.project_name,
+                time_series=[series]
+            )
+            
+            logger.debug(f"Wrote metric {metric_type}={value}")
+        except Exception as e:
+            logger.error(f"Error writing metric to Cloud Monitoring: {e}")
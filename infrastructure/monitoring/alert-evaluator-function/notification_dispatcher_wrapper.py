@@ -0,0 +1,330 @@
+"""
+Notification dispatcher wrapper for Cloud Function.
+
+This module provides a simplified version of the NotificationDispatcher
+that can be used in the Cloud Function context.
+
+A background worker would not outlive the function invocation, so the
+evaluation cycle itself is the coalescing window: the evaluator queues
+notifications while it runs and the handler calls ``flush()`` once at the
+end, which sends one message per (channel, recipient) - a digest when
+several alerts share it - over a single pooled HTTP client with
+per-channel concurrency limits.
+"""
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_API_URL = "https://api.sendgrid.com/v3/mail/send"
+TWILIO_API_URL = "https://api.twilio.com/2010-04-01"
+
+DEFAULT_CHANNEL_CONCURRENCY = {
+    "email": 4,
+    "slack": 2,
+    "sms": 2
+}
+
+SEVERITY_ORDER = {"info": 0, "warning": 1, "critical": 2}
+
+# Slack rejects messages with more than 100 attachments
+MAX_DIGEST_ATTACHMENTS = 20
+
+# (channel, recipient)
+DigestKey = Tuple[str, str]
+
+
+@dataclass
+class QueuedNotification:
+    """Alert (or resolution) waiting to be delivered on one channel."""
+    channel: str
+    config: Any
+    alert: Any
+    resolved: bool = False
+
+
+class NotificationDispatcherWrapper:
+    """Cycle-scoped notification dispatcher compatible with Cloud Function."""
+    
+    def __init__(
+        self,
+        notification_service: Any,
+        channel_concurrency: Optional[Dict[str, int]] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        sendgrid_api_url: str = SENDGRID_API_URL,
+        twilio_api_url: str = TWILIO_API_URL
+    ):
+        """
+        Initialize notification dispatcher wrapper.
+        
+        Args:
+            notification_service: NotificationServiceWrapper providing credentials,
+                recipients and message formatting
+            channel_concurrency: Maximum concurrent sends per channel
+            http_client: Shared HTTP client (created with connection pooling if omitted)
+            max_retries: Attempts per message on 429, 5xx and network errors
+            retry_base_delay: Base delay in seconds for retry backoff
+            sendgrid_api_url: SendGrid mail/send endpoint
+            twilio_api_url: Twilio API base URL
+        """
+        self.service = notification_service
+        self.max_retries = max(1, max_retries)
+        self.retry_base_delay = retry_base_delay
+        self.sendgrid_api_url = sendgrid_api_url
+        self.twilio_api_url = twilio_api_url.rstrip('/')
+        
+        concurrency = {**DEFAULT_CHANNEL_CONCURRENCY, **(channel_concurrency or {})}
+        self._semaphores = {
+            channel: asyncio.Semaphore(max(1, limit))
+            for channel, limit in concurrency.items()
+        }
+        
+        self._client = http_client
+        self._owns_client = http_client is None
+        self._pending: Dict[DigestKey, List[QueuedNotification]] = {}
+        
+        self.stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "coalesced": 0
+        }
+        
+        logger.info("NotificationDispatcherWrapper initialized")
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by all channels."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+        return self._client
+    
+    def enqueue(
+        self,
+        channel: str,
+        config: Any,
+        alert: Any,
+        resolved: bool = False
+    ) -> bool:
+        """
+        Queue an alert or resolution for delivery at the end of the cycle.
+        
+        SMS is only queued for critical alerts, and never for resolutions.
+        
+        Args:
+            channel: 'email', 'slack' or 'sms'
+            config: Alert configuration
+            alert: Alert history record
+            resolved: Whether this is a resolution notification
+        
+        Returns:
+            True if queued, False if the channel is not configured
+        """
+        if channel == 'sms' and (resolved or alert.severity != 'critical'):
+            return False
+        
+        recipients = self._recipients(channel, config)
+        if not recipients:
+            logger.debug(f"Notification channel {channel} not configured, skipping alert {config.id}")
+            return False
+        
+        for recipient in recipients:
+            batch = self._pending.setdefault((channel, recipient), [])
+            batch.append(QueuedNotification(channel, config, alert, resolved))
+            if len(batch) > 1:
+                self.stats["coalesced"] += 1
+        
+        self.stats["enqueued"] += 1
+        return True
+    
+    async def flush(self) -> Dict[str, int]:
+        """
+        Send every queued notification and close the pooled client.
+        
+        Returns:
+            Delivery counters for the cycle
+        """
+        pending, self._pending = self._pending, {}
+        
+        try:
+            if pending:
+                await asyncio.gather(
+                    *(self._deliver(key, batch) for key, batch in pending.items())
+                )
+        finally:
+            if self._owns_client and self._client is not None:
+                await self._client.aclose()
+                self._client = None
+        
+        return dict(self.stats)
+    
+    def _recipients(self, channel: str, config: Any) -> List[str]:
+        """Recipients configured for a channel."""
+        if channel == 'email':
+            return self.service._get_alert_recipients(config) if self.service.sendgrid_api_key else []
+        if channel == 'slack':
+            return [self.service.slack_webhook_url] if self.service.slack_webhook_url else []
+        if channel == 'sms':
+            if not all([
+                self.service.twilio_account_sid,
+                self.service.twilio_auth_token,
+                self.service.twilio_from_number
+            ]):
+                return []
+            return self.service._get_sms_recipients(config)
+        return []
+    
+    async def _deliver(self, key: DigestKey, batch: List[QueuedNotification]) -> bool:
+        """Send one message (single alert or digest) to one recipient."""
+        channel, recipient = key
+        
+        async with self._semaphores[channel]:
+            try:
+                if channel == 'email':
+                    delivered = await self._send_email(recipient, batch)
+                elif channel == 'slack':
+                    delivered = await self._send_slack(recipient, batch)
+                else:
+                    delivered = await self._send_sms(recipient, batch)
+            except Exception as e:
+                logger.error(f"Failed to deliver {channel} notification: {e}", exc_info=True)
+                delivered = False
+        
+        if delivered:
+            self.stats["sent"] += 1
+            logger.info(f"Delivered {channel} notification with {len(batch)} alert(s)")
+        else:
+            self.stats["failed"] += 1
+        return delivered
+    
+    async def _post(self, channel: str, url: str, **kwargs) -> bool:
+        """POST with retries on 429, 5xx and network errors."""
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.client.post(url, **kwargs)
+                if response.status_code < 300:
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    logger.error(
+                        f"{channel} notification rejected with status {response.status_code}: "
+                        f"{response.text[:200]}"
+                    )
+                    return False
+                logger.warning(
+                    f"{channel} notification returned status {response.status_code} "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+            except httpx.HTTPError as e:
+                logger.warning(
+                    f"{channel} notification failed (attempt {attempt + 1}/{self.max_retries}): {e}"
+                )
+            
+            if attempt < self.max_retries - 1:
+                # Exponential backoff with jitter so retries from a burst spread out
+                await asyncio.sleep(self.retry_base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+        
+        return False
+    
+    async def _send_email(self, recipient: str, batch: List[QueuedNotification]) -> bool:
+        if len(batch) == 1:
+            item = batch[0]
+            status = 'RESOLVED' if item.resolved else item.alert.severity.upper()
+            subject = f"[{status}] {item.config.name}"
+            html_content = self.service._format_email_body(item.config, item.alert, item.resolved)
+        else:
+            subject = f"[{self._highest_severity(batch).upper()}] {len(batch)} alert notifications"
+            html_content = self._format_email_digest(batch)
+        
+        payload = {
+            "personalizations": [{"to": [{"email": recipient}]}],
+            "from": {"email": "alerts@utxoiq.com"},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}]
+        }
+        return await self._post(
+            'email',
+            self.sendgrid_api_url,
+            json=payload,
+            headers={"Authorization": f"Bearer {self.service.sendgrid_api_key}"}
+        )
+    
+    async def _send_slack(self, webhook_url: str, batch: List[QueuedNotification]) -> bool:
+        if len(batch) == 1:
+            item = batch[0]
+            payload = self.service._build_slack_payload(item.config, item.alert, item.resolved)
+        else:
+            attachments = [
+                attachment
+                for item in batch[:MAX_DIGEST_ATTACHMENTS]
+                for attachment in self.service._build_slack_payload(
+                    item.config, item.alert, item.resolved
+                )["attachments"]
+            ]
+            text = f"{len(batch)} alert notifications this evaluation cycle"
+            if len(batch) > MAX_DIGEST_ATTACHMENTS:
+                text += f" (showing {MAX_DIGEST_ATTACHMENTS})"
+            payload = {"text": text, "attachments": attachments}
+        
+        return await self._post('slack', webhook_url, json=payload)
+    
+    async def _send_sms(self, phone: str, batch: List[QueuedNotification]) -> bool:
+        if len(batch) == 1:
+            body = self.service._format_sms_message(batch[0].config, batch[0].alert)
+        else:
+            body = self._format_sms_digest(batch)
+        
+        return await self._post(
+            'sms',
+            f"{self.twilio_api_url}/Accounts/{self.service.twilio_account_sid}/Messages.json",
+            data={"To": phone, "From": self.service.twilio_from_number, "Body": body},
+            auth=(self.service.twilio_account_sid, self.service.twilio_auth_token)
+        )
+    
+    @staticmethod
+    def _highest_severity(batch: List[QueuedNotification]) -> str:
+        return max(
+            (item.alert.severity for item in batch if not item.resolved),
+            key=lambda severity: SEVERITY_ORDER.get(severity, 0),
+            default='resolved'
+        )
+    
+    def _format_email_digest(self, batch: List[QueuedNotification]) -> str:
+        """Format one HTML email listing every alert in the digest."""
+        rows = []
+        for item in batch:
+            status = 'RESOLVED' if item.resolved else item.alert.severity.upper()
+            rows.append(f"""
+            <tr>
+                <td><strong>{status}</strong></td>
+                <td>{item.config.name}</td>
+                <td>{item.alert.message}</td>
+                <td>{item.alert.triggered_at}</td>
+            </tr>""")
+        
+        return f"""
+        <html>
+        <body>
+            <h2>{len(batch)} alert notifications</h2>
+            <table>{''.join(rows)}
+            </table>
+        </body>
+        </html>
+        """
+    
+    def _format_sms_digest(self, batch: List[QueuedNotification]) -> str:
+        """Format a digest SMS within the 160 character limit."""
+        services = sorted({item.config.service_name for item in batch})
+        message = f"[CRITICAL] {len(batch)} alerts: {', '.join(services)}"
+        if len(message) > 160:
+            message = message[:157] + "..."
+        return message
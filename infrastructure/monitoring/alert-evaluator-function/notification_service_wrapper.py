@@ -89,29 +89,7 @@ class NotificationServiceWrapper:
         try:
             import httpx
             
-            # Color code by severity
-            color = {
-                'info': '#36a64f',
-                'warning': '#ff9900',
-                'critical': '#ff0000'
-            }.get(alert.severity, '#808080')
-            
-            # Format Slack message
-            payload = {
-                "attachments": [{
-                    "color": color,
-                    "title": f"{alert.severity.upper()}: {config.name}",
-                    "text": alert.message,
-                    "fields": [
-                        {"title": "Service", "value": config.service_name, "short": True},
-                        {"title": "Metric", "value": config.metric_type, "short": True},
-                        {"title": "Current Value", "value": str(alert.metric_value), "short": True},
-                        {"title": "Threshold", "value": str(alert.threshold_value), "short": True},
-                    ],
-                    "footer": "utxoIQ Monitoring",
-                    "ts": int(alert.triggered_at.timestamp())
-                }]
-            }
+            payload = self._build_slack_payload(config, alert)
             
             # Send to Slack
             async with httpx.AsyncClient() as client:
@@ -155,7 +133,7 @@ class NotificationServiceWrapper:
             client = Client(self.twilio_account_sid, self.twilio_auth_token)
             
             # Format SMS message (max 160 chars)
-            message_body = f"[CRITICAL] {config.service_name}: {alert.message[:100]}"
+            message_body = self._format_sms_message(config, alert)
             
             # Get phone numbers
             phone_numbers = self._get_sms_recipients(config)
@@ -192,12 +170,43 @@ class NotificationServiceWrapper:
         logger.info(f"Slack resolution notification for alert {config.id}")
         return True
     
-    def _format_email_body(self, config: Any, alert: Any) -> str:
+    def _build_slack_payload(self, config: Any, alert: Any, resolved: bool = False) -> dict:
+        """Build Slack webhook payload for an alert or its resolution."""
+        # Color code by severity
+        color = '#36a64f' if resolved else {
+            'info': '#36a64f',
+            'warning': '#ff9900',
+            'critical': '#ff0000'
+        }.get(alert.severity, '#808080')
+        status = 'RESOLVED' if resolved else alert.severity.upper()
+        
+        return {
+            "attachments": [{
+                "color": color,
+                "title": f"{status}: {config.name}",
+                "text": alert.message,
+                "fields": [
+                    {"title": "Service", "value": config.service_name, "short": True},
+                    {"title": "Metric", "value": config.metric_type, "short": True},
+                    {"title": "Current Value", "value": str(alert.metric_value), "short": True},
+                    {"title": "Threshold", "value": str(alert.threshold_value), "short": True},
+                ],
+                "footer": "utxoIQ Monitoring",
+                "ts": int(alert.triggered_at.timestamp())
+            }]
+        }
+    
+    def _format_sms_message(self, config: Any, alert: Any) -> str:
+        """Format SMS body (max 160 chars)."""
+        return f"[CRITICAL] {config.service_name}: {alert.message[:100]}"
+    
+    def _format_email_body(self, config: Any, alert: Any, resolved: bool = False) -> str:
         """Format HTML email body."""
+        heading = 'Resolved' if resolved else 'Alert'
         return f"""
         <html>
         <body>
-            <h2>Alert: {config.name}</h2>
+            <h2>{heading}: {config.name}</h2>
             <p><strong>Severity:</strong> {alert.severity.upper()}</p>
             <p><strong>Service:</strong> {config.service_name}</p>
             <p><strong>Metric:</strong> {config.metric_type}</p>
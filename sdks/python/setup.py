@@ -33,8 +33,12 @@ setup(
         "python-dateutil>=2.8.2",
     ],
     extras_require={
+        "async": [
+            "httpx[http2]>=0.25.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
+            "pytest-asyncio>=0.21.0",
             "pytest-cov>=4.1.0",
             "black>=23.0.0",
             "flake8>=6.0.0",
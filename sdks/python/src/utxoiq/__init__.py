@@ -12,6 +12,7 @@ from .exceptions import (
 __version__ = "1.0.0"
 __all__ = [
     "UtxoIQClient",
+    "AsyncUtxoIQClient",
     "UtxoIQError",
     "AuthenticationError",
     "RateLimitError",
@@ -19,3 +20,11 @@ __all__ = [
     "NotFoundError",
     "SubscriptionRequiredError",
 ]
+
+
+def __getattr__(name):
+    # The async client needs the optional httpx dependency
+    if name == "AsyncUtxoIQClient":
+        from .async_client import AsyncUtxoIQClient
+        return AsyncUtxoIQClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,220 @@
+"""Async client for utxoIQ API."""
+import asyncio
+import hashlib
+from typing import Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    raise ImportError(
+        "AsyncUtxoIQClient requires httpx. Install it with: pip install utxoiq[async]"
+    )
+
+from .cache import CachedResponse, HTTPCache
+from .exceptions import UtxoIQError, raise_for_status
+from .resources.insights import AsyncInsightsResource
+from .resources.daily_brief import AsyncDailyBriefResource
+
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncUtxoIQClient:
+    """
+    Async client for interacting with utxoIQ API.
+    
+    All requests share one pooled HTTP/2 connection set, so hundreds of
+    concurrent queries from one event loop are multiplexed over a handful of
+    TCP connections. With ``cache_dir`` set, GET responses carrying an ETag or
+    Last-Modified header are kept on disk and revalidated on the next request.
+    """
+    
+    def __init__(
+        self,
+        firebase_token: Optional[str] = None,
+        api_key: Optional[str] = None,
+        base_url: str = "https://api.utxoiq.com",
+        timeout: int = 30,
+        max_retries: int = 3,
+        retry_backoff_factor: float = 2.0,
+        max_connections: int = 20,
+        http2: bool = True,
+        cache_dir: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Initialize async utxoIQ client.
+        
+        Args:
+            firebase_token: Firebase Auth JWT token for authentication
+            api_key: API key for programmatic access
+            base_url: Base URL for API endpoints
+            timeout: Request timeout in seconds
+            max_retries: Maximum number of retry attempts
+            retry_backoff_factor: Backoff factor for exponential retry
+            max_connections: Maximum pooled connections
+            http2: Negotiate HTTP/2 when the server supports it
+            cache_dir: Directory for the conditional request cache (disabled if None)
+            transport: Custom httpx transport (mainly for testing)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff_factor = retry_backoff_factor
+        self.firebase_token = firebase_token
+        self.api_key = api_key
+        
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "utxoiq-python-sdk/1.0.0"
+        }
+        if firebase_token:
+            headers["Authorization"] = f"Bearer {firebase_token}"
+        elif api_key:
+            headers["X-API-Key"] = api_key
+        
+        # Cache entries are scoped to the credential that fetched them
+        credential = firebase_token or api_key or ""
+        self._identity = hashlib.sha256(credential.encode()).hexdigest()
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+        
+        self.session = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=timeout,
+            http2=http2 and transport is None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            transport=transport
+        )
+        
+        # Initialize resource endpoints
+        self.insights = AsyncInsightsResource(self)
+        self.daily_brief = AsyncDailyBriefResource(self)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.session.aclose()
+    
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Make HTTP request with retries, revalidation and error handling.
+        
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE)
+            endpoint: API endpoint path
+            **kwargs: Additional arguments for httpx
+        
+        Returns:
+            Response object
+        
+        Raises:
+            UtxoIQError: On API errors
+        """
+        cache_key = None
+        cached = None
+        if self.cache is not None and method == "GET":
+            cache_key = self.cache.key(
+                f"{self.base_url}{endpoint}", kwargs.get("params"), self._identity
+            )
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                kwargs["headers"] = {**cached.conditional_headers(), **kwargs.get("headers", {})}
+        
+        response = await self._send(method, endpoint, **kwargs)
+        
+        if cached is not None and response.status_code == 304:
+            self.cache.hits += 1
+            return httpx.Response(
+                200,
+                headers=cached.headers,
+                content=cached.body,
+                request=response.request
+            )
+        
+        raise_for_status(response)
+        
+        if cache_key is not None:
+            self.cache.misses += 1
+            await self._store(cache_key, response)
+        
+        return response
+    
+    async def _send(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            retries_left = attempt < self.max_retries
+            try:
+                response = await self.session.request(method, endpoint, **kwargs)
+            except httpx.TimeoutException:
+                if retries_left:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                raise UtxoIQError("Request timeout")
+            except httpx.TransportError:
+                if retries_left:
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                raise UtxoIQError("Connection error")
+            except httpx.HTTPError as e:
+                raise UtxoIQError(f"Request failed: {str(e)}")
+            
+            if response.status_code not in RETRY_STATUS_CODES or not retries_left:
+                return response
+            
+            await asyncio.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+        
+        return response  # pragma: no cover
+    
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the next attempt."""
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        return self.retry_backoff_factor * (2 ** attempt)
+    
+    async def _store(self, cache_key: str, response: httpx.Response) -> None:
+        """Cache a response that can be revalidated."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        
+        entry = CachedResponse(
+            body=response.content,
+            etag=etag,
+            last_modified=last_modified,
+            headers={"Content-Type": response.headers.get("Content-Type", "application/json")}
+        )
+        await asyncio.to_thread(self.cache.set, cache_key, entry)
+    
+    async def get(self, endpoint: str, **kwargs):
+        """Make GET request."""
+        return await self._request("GET", endpoint, **kwargs)
+    
+    async def post(self, endpoint: str, **kwargs):
+        """Make POST request."""
+        return await self._request("POST", endpoint, **kwargs)
+    
+    async def put(self, endpoint: str, **kwargs):
+        """Make PUT request."""
+        return await self._request("PUT", endpoint, **kwargs)
+    
+    async def delete(self, endpoint: str, **kwargs):
+        """Make DELETE request."""
+        return await self._request("DELETE", endpoint, **kwargs)
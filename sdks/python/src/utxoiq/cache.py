@@ -0,0 +1,155 @@
+"""On-disk HTTP cache for conditional revalidation."""
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Tuple
+
+
+@dataclass
+class CachedResponse:
+    """A stored response body and the validators needed to revalidate it."""
+    
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that ask the server to answer 304 if nothing changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    Store GET responses on disk, keyed by URL, query and credentials.
+    
+    Only responses carrying an ``ETag`` or ``Last-Modified`` header are kept.
+    The client sends those validators back on the next request for the same
+    key, and a ``304 Not Modified`` reply is served from disk instead of
+    transferring the body again. Entries are written atomically so several
+    processes can share one directory.
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Initialize HTTP cache.
+        
+        Args:
+            directory: Directory holding cached responses
+        """
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+    
+    @staticmethod
+    def key(
+        url: str,
+        params: Optional[Mapping] = None,
+        identity: Optional[str] = None
+    ) -> str:
+        """
+        Build the cache key for a request.
+        
+        Args:
+            url: Absolute request URL
+            params: Query parameters
+            identity: Credential the response was fetched with
+        
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        query = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        material = json.dumps([url, query, identity or ""])
+        return hashlib.sha256(material.encode()).hexdigest()
+    
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.body"
+    
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Load a cached response.
+        
+        Args:
+            key: Cache key from ``key()``
+        
+        Returns:
+            Cached response, or None if absent or unreadable
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        
+        if meta.get("size") != len(body):
+            # Body and metadata from different writes
+            return None
+        
+        return CachedResponse(
+            body=body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            headers=meta.get("headers", {})
+        )
+    
+    def set(self, key: str, entry: CachedResponse) -> None:
+        """
+        Store a response.
+        
+        Args:
+            key: Cache key from ``key()``
+            entry: Response body and validators
+        """
+        meta_path, body_path = self._paths(key)
+        meta = {
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "headers": entry.headers,
+            "size": len(entry.body),
+        }
+        self._write(body_path, entry.body)
+        self._write(meta_path, json.dumps(meta).encode())
+        self.stores += 1
+    
+    def delete(self, key: str) -> None:
+        """Remove a cached response."""
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+        }
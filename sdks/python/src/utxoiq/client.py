@@ -5,16 +5,7 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from .exceptions import (
-    UtxoIQError,
-    AuthenticationError,
-    RateLimitError,
-    ValidationError,
-    NotFoundError,
-    SubscriptionRequiredError,
-    DataUnavailableError,
-    ConfidenceTooLowError
-)
+from .exceptions import UtxoIQError, raise_for_status
 from .resources.insights import InsightsResource
 from .resources.alerts import AlertsResource
 from .resources.feedback import FeedbackResource
@@ -121,89 +112,7 @@ class UtxoIQClient:
     
     def _handle_error_response(self, response: requests.Response):
         """Handle error responses from API."""
-        if response.status_code < 400:
-            return
-        
-        try:
-            error_data = response.json()
-            error_info = error_data.get("error", {})
-            message = error_info.get("message", "Unknown error")
-            error_code = error_info.get("code")
-            details = error_info.get("details", {})
-            request_id = error_data.get("request_id")
-        except Exception:
-            message = response.text or f"HTTP {response.status_code}"
-            error_code = None
-            details = {}
-            request_id = None
-        
-        # Map status codes to exception types
-        if response.status_code == 401:
-            raise AuthenticationError(
-                message,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
-        elif response.status_code == 429:
-            retry_after = details.get("retry_after")
-            raise RateLimitError(
-                message,
-                retry_after=retry_after,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
-        elif response.status_code == 400:
-            raise ValidationError(
-                message,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
-        elif response.status_code == 404:
-            raise NotFoundError(
-                message,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
-        elif response.status_code == 402:
-            raise SubscriptionRequiredError(
-                message,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
-        elif response.status_code == 503 and error_code == "DATA_UNAVAILABLE":
-            raise DataUnavailableError(
-                message,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
-        elif response.status_code == 422 and error_code == "CONFIDENCE_TOO_LOW":
-            raise ConfidenceTooLowError(
-                message,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
-        else:
-            raise UtxoIQError(
-                message,
-                status_code=response.status_code,
-                error_code=error_code,
-                details=details,
-                request_id=request_id
-            )
+        raise_for_status(response)
     
     def get(self, endpoint: str, **kwargs):
         """Make GET request."""
@@ -57,3 +57,101 @@ class DataUnavailableError(UtxoIQError):
 class ConfidenceTooLowError(UtxoIQError):
     """Raised when insight confidence is below publication threshold."""
     pass
+
+
+def raise_for_status(response) -> None:
+    """
+    Raise the SDK exception matching an API error response.
+    
+    Works with any response object exposing ``status_code``, ``json()`` and
+    ``text`` (requests and httpx responses).
+    
+    Args:
+        response: HTTP response
+    
+    Raises:
+        UtxoIQError: Or a subclass, when the status code is 400 or above
+    """
+    if response.status_code < 400:
+        return
+    
+    try:
+        error_data = response.json()
+        error_info = error_data.get("error", {})
+        message = error_info.get("message", "Unknown error")
+        error_code = error_info.get("code")
+        details = error_info.get("details", {})
+        request_id = error_data.get("request_id")
+    except Exception:
+        message = response.text or f"HTTP {response.status_code}"
+        error_code = None
+        details = {}
+        request_id = None
+    
+    # Map status codes to exception types
+    if response.status_code == 401:
+        raise AuthenticationError(
+            message,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
+    elif response.status_code == 429:
+        retry_after = details.get("retry_after")
+        raise RateLimitError(
+            message,
+            retry_after=retry_after,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
+    elif response.status_code == 400:
+        raise ValidationError(
+            message,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
+    elif response.status_code == 404:
+        raise NotFoundError(
+            message,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
+    elif response.status_code == 402:
+        raise SubscriptionRequiredError(
+            message,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
+    elif response.status_code == 503 and error_code == "DATA_UNAVAILABLE":
+        raise DataUnavailableError(
+            message,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
+    elif response.status_code == 422 and error_code == "CONFIDENCE_TOO_LOW":
+        raise ConfidenceTooLowError(
+            message,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
+    else:
+        raise UtxoIQError(
+            message,
+            status_code=response.status_code,
+            error_code=error_code,
+            details=details,
+            request_id=request_id
+        )
@@ -32,3 +32,34 @@ class DailyBriefResource:
         """
         response = self.client.get("/daily-brief/latest")
         return DailyBrief(**response.json())
+
+
+class AsyncDailyBriefResource:
+    """Async resource for accessing daily briefs."""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    async def get_by_date(self, brief_date: date) -> DailyBrief:
+        """
+        Get daily brief for specific date.
+        
+        Args:
+            brief_date: Date for the brief
+        
+        Returns:
+            DailyBrief object
+        """
+        date_str = brief_date.isoformat()
+        response = await self.client.get(f"/daily-brief/{date_str}")
+        return DailyBrief(**response.json())
+    
+    async def get_latest(self) -> DailyBrief:
+        """
+        Get the latest daily brief.
+        
+        Returns:
+            DailyBrief object
+        """
+        response = await self.client.get("/daily-brief/latest")
+        return DailyBrief(**response.json())
@@ -1,5 +1,6 @@
 """Insights resource for utxoIQ API."""
-from typing import List, Optional
+import asyncio
+from typing import AsyncIterator, List, Optional
 from ..models import Insight
 
 
@@ -87,3 +88,151 @@ class InsightsResource:
         response = self.client.get("/insights/search", params=params)
         data = response.json()
         return [Insight(**item) for item in data.get("insights", [])]
+
+
+class AsyncInsightsResource:
+    """Async resource for managing insights."""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    async def get_latest(
+        self,
+        limit: int = 20,
+        category: Optional[str] = None,
+        min_confidence: Optional[float] = None
+    ) -> List[Insight]:
+        """
+        Get latest insights.
+        
+        Args:
+            limit: Maximum number of insights to return
+            category: Filter by signal category (mempool, exchange, miner, whale)
+            min_confidence: Minimum confidence score filter
+        
+        Returns:
+            List of Insight objects
+        """
+        data = await self._get_latest_page(1, limit, category, min_confidence)
+        return [Insight(**item) for item in data.get("insights", [])]
+    
+    async def iter_latest(
+        self,
+        page_size: int = 100,
+        category: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        max_items: Optional[int] = None
+    ) -> AsyncIterator[Insight]:
+        """
+        Iterate over all latest insights page by page.
+        
+        The next page is requested as soon as the current one arrives, so it
+        downloads while the caller processes the current page.
+        
+        Args:
+            page_size: Insights per request (max 100)
+            category: Filter by signal category
+            min_confidence: Minimum confidence score filter
+            max_items: Stop after this many insights
+        
+        Yields:
+            Insight objects
+        """
+        page_size = min(page_size, 100)
+        page = 1
+        yielded = 0
+        pending = asyncio.ensure_future(
+            self._get_latest_page(page, page_size, category, min_confidence)
+        )
+        try:
+            while pending is not None:
+                data = await pending
+                pending = None
+                items = data.get("insights", [])
+                
+                more = bool(items) and data.get("has_more", len(items) == page_size)
+                if more and (max_items is None or yielded + len(items) < max_items):
+                    page += 1
+                    pending = asyncio.ensure_future(
+                        self._get_latest_page(page, page_size, category, min_confidence)
+                    )
+                
+                for item in items:
+                    if max_items is not None and yielded >= max_items:
+                        return
+                    yield Insight(**item)
+                    yielded += 1
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+    
+    async def _get_latest_page(
+        self,
+        page: int,
+        limit: int,
+        category: Optional[str],
+        min_confidence: Optional[float]
+    ) -> dict:
+        """Fetch one page of latest insights."""
+        params = {"limit": limit}
+        if page > 1:
+            params["page"] = page
+        if category:
+            params["category"] = category
+        if min_confidence is not None:
+            params["min_confidence"] = min_confidence
+        
+        response = await self.client.get("/insights/latest", params=params)
+        return response.json()
+    
+    async def get_public(self, limit: int = 20) -> List[Insight]:
+        """
+        Get public insights (Guest Mode - no authentication required).
+        
+        Args:
+            limit: Maximum number of insights to return (max 20)
+        
+        Returns:
+            List of Insight objects
+        """
+        response = await self.client.get("/insights/public", params={"limit": min(limit, 20)})
+        data = response.json()
+        return [Insight(**item) for item in data.get("insights", [])]
+    
+    async def get_by_id(self, insight_id: str) -> Insight:
+        """
+        Get specific insight by ID.
+        
+        Args:
+            insight_id: Unique insight identifier
+        
+        Returns:
+            Insight object
+        """
+        response = await self.client.get(f"/insight/{insight_id}")
+        return Insight(**response.json())
+    
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        category: Optional[str] = None
+    ) -> List[Insight]:
+        """
+        Search insights by query.
+        
+        Args:
+            query: Search query string
+            limit: Maximum number of results
+            category: Filter by signal category
+        
+        Returns:
+            List of Insight objects
+        """
+        params = {"q": query, "limit": limit}
+        if category:
+            params["category"] = category
+        
+        response = await self.client.get("/insights/search", params=params)
+        data = response.json()
+        return [Insight(**item) for item in data.get("insights", [])]
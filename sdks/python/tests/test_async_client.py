@@ -0,0 +1,188 @@
+"""Tests for the async client."""
+import asyncio
+import pytest
+import httpx
+from utxoiq import AsyncUtxoIQClient
+from utxoiq.exceptions import NotFoundError, RateLimitError
+from utxoiq.models import Insight
+
+
+def make_insight(index):
+    """Build an insight payload."""
+    return {
+        "id": f"insight-{index}",
+        "signal_type": "mempool",
+        "headline": f"Insight {index}",
+        "summary": "Test summary",
+        "confidence": 0.85,
+        "timestamp": "2025-11-07T10:00:00Z",
+        "block_height": 800000 + index,
+        "evidence": [],
+        "tags": [],
+        "is_predictive": False
+    }
+
+
+def make_client(handler, **kwargs):
+    """Create an async client served by an in-process handler."""
+    kwargs.setdefault("retry_backoff_factor", 0)
+    return AsyncUtxoIQClient(
+        api_key="test-key",
+        base_url="https://api.test",
+        transport=httpx.MockTransport(handler),
+        **kwargs
+    )
+
+
+class TestAsyncClient:
+    """Test cases for AsyncUtxoIQClient."""
+    
+    @pytest.mark.asyncio
+    async def test_get_latest_insights(self):
+        """Test getting latest insights with auth headers."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"insights": [make_insight(1)]})
+        
+        async with make_client(handler) as client:
+            insights = await client.insights.get_latest(limit=10, category="mempool")
+        
+        assert isinstance(insights[0], Insight)
+        assert requests[0].headers["X-API-Key"] == "test-key"
+        assert requests[0].url.params["limit"] == "10"
+        assert requests[0].url.params["category"] == "mempool"
+    
+    @pytest.mark.asyncio
+    async def test_error_mapping(self):
+        """Test API errors raise the same exceptions as the sync client."""
+        def handler(request):
+            return httpx.Response(404, json={"error": {"code": "NOT_FOUND", "message": "missing"}})
+        
+        async with make_client(handler) as client:
+            with pytest.raises(NotFoundError) as exc_info:
+                await client.insights.get_by_id("nope")
+        
+        assert exc_info.value.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        """Test 503 responses are retried before succeeding."""
+        attempts = []
+        
+        def handler(request):
+            attempts.append(request)
+            if len(attempts) < 3:
+                return httpx.Response(503, json={})
+            return httpx.Response(200, json={"insights": []})
+        
+        async with make_client(handler) as client:
+            assert await client.insights.get_latest() == []
+        
+        assert len(attempts) == 3
+    
+    @pytest.mark.asyncio
+    async def test_rate_limit_raised_after_retries(self):
+        """Test a persistent 429 surfaces as RateLimitError."""
+        def handler(request):
+            return httpx.Response(
+                429,
+                headers={"Retry-After": "0"},
+                json={"error": {
+                    "code": "RATE_LIMIT_EXCEEDED",
+                    "message": "slow down",
+                    "details": {"retry_after": 0}
+                }}
+            )
+        
+        async with make_client(handler, max_retries=2) as client:
+            with pytest.raises(RateLimitError) as exc_info:
+                await client.get("/insights/latest")
+        
+        assert exc_info.value.retry_after == 0
+    
+    @pytest.mark.asyncio
+    async def test_iter_latest_prefetches_next_page(self):
+        """Test the next page is requested before the current one is consumed."""
+        pages = {1: [make_insight(i) for i in range(3)], 2: [make_insight(i) for i in range(3, 5)]}
+        requested = []
+        
+        def handler(request):
+            page = int(request.url.params.get("page", 1))
+            requested.append(page)
+            return httpx.Response(200, json={"insights": pages[page], "has_more": page == 1})
+        
+        async with make_client(handler) as client:
+            ids = []
+            async for insight in client.insights.iter_latest(page_size=3):
+                if not ids:
+                    # Let the prefetch task run while the first item is processed
+                    await asyncio.sleep(0)
+                    assert requested == [1, 2]
+                ids.append(insight.id)
+        
+        assert ids == [f"insight-{i}" for i in range(5)]
+    
+    @pytest.mark.asyncio
+    async def test_iter_latest_respects_max_items(self):
+        """Test iteration stops at max_items without fetching further pages."""
+        requested = []
+        
+        def handler(request):
+            page = int(request.url.params.get("page", 1))
+            requested.append(page)
+            items = [make_insight(i) for i in range((page - 1) * 2, page * 2)]
+            return httpx.Response(200, json={"insights": items, "has_more": True})
+        
+        async with make_client(handler) as client:
+            ids = [insight.id async for insight in client.insights.iter_latest(page_size=2, max_items=3)]
+        
+        assert ids == ["insight-0", "insight-1", "insight-2"]
+        assert requested == [1, 2]
+    
+    @pytest.mark.asyncio
+    async def test_conditional_cache_revalidates(self, tmp_path):
+        """Test cached responses are revalidated and reused on 304."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, headers={"ETag": '"v1"'}, json=make_insight(7))
+        
+        async with make_client(handler, cache_dir=str(tmp_path)) as client:
+            first = await client.insights.get_by_id("insight-7")
+        
+        # A new client reuses the on-disk entry
+        async with make_client(handler, cache_dir=str(tmp_path)) as client:
+            second = await client.insights.get_by_id("insight-7")
+            assert client.cache.get_stats()["hits"] == 1
+        
+        assert "If-None-Match" not in requests[0].headers
+        assert requests[1].headers["If-None-Match"] == '"v1"'
+        assert first == second
+    
+    @pytest.mark.asyncio
+    async def test_cache_is_scoped_to_credentials(self, tmp_path):
+        """Test a response cached for one key is not revalidated for another."""
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, headers={"Last-Modified": "Fri, 07 Nov 2025 10:00:00 GMT"},
+                                  json={"insights": []})
+        
+        async with make_client(handler, cache_dir=str(tmp_path)) as client:
+            await client.insights.get_latest()
+        
+        async with AsyncUtxoIQClient(
+            api_key="other-key",
+            base_url="https://api.test",
+            transport=httpx.MockTransport(handler),
+            cache_dir=str(tmp_path)
+        ) as client:
+            await client.insights.get_latest()
+        
+        assert "If-Modified-Since" not in requests[1].headers
@@ -18,6 +18,9 @@ class Settings(BaseSettings):
     chart_mobile_width: int = 800
     chart_desktop_width: int = 1200
     chart_height_ratio: float = 0.375  # 16:6 aspect ratio
+    chart_output_format: str = "png"  # png, webp or svg
+    chart_png_compress_level: int = 3  # zlib level 0-9; higher is smaller but slower
+    chart_webp_quality: int = 90
     
     # Brand Colors (hex without #)
     brand_color: str = "FF5A21"
@@ -30,6 +33,12 @@ class Settings(BaseSettings):
     text_color: str = "F4F4F5"
     grid_color: str = "2A2A2E"
     
+    # Render Pool
+    render_workers: int = 2  # Renderer processes
+    render_max_queue: int = 32  # Renders queued or running before rejecting
+    render_cache_size: int = 1024  # Rendered charts remembered in memory
+    render_cache_ttl_seconds: int = 86400  # Well inside the 7 day signed URL validity
+    
     # Service Configuration
     port: int = 8080
     log_level: str = "INFO"
@@ -2,16 +2,22 @@
 Chart Renderer Service - FastAPI Application
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import logging
+from pydantic import ValidationError
 from .models import (
+    SignalType,
     MempoolChartRequest,
     ExchangeChartRequest,
     MinerChartRequest,
     WhaleChartRequest,
     PredictiveChartRequest,
-    ChartResponse
+    ChartResponse,
+    BatchRenderRequest,
+    BatchRenderResponse,
+    BatchChartResult
 )
 from .renderers import (
     MempoolRenderer,
@@ -21,6 +27,7 @@ from .renderers import (
     PredictiveRenderer
 )
 from .storage import chart_storage
+from .render_pool import RenderPool, RenderQueueFull, RenderedChart, REQUEST_MODELS
 from .config import settings
 
 # Configure logging
@@ -30,11 +37,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Render worker pool (processes start on first render)
+render_pool = RenderPool(chart_storage)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stop render workers on shutdown"""
+    yield
+    render_pool.shutdown()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="utxoIQ Chart Renderer",
     description="AI-powered chart generation service for Bitcoin blockchain insights",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -53,6 +72,29 @@ miner_renderer = MinerRenderer()
 whale_renderer = WhaleRenderer()
 predictive_renderer = PredictiveRenderer()
 
+renderers_by_type = {
+    SignalType.MEMPOOL: mempool_renderer,
+    SignalType.EXCHANGE: exchange_renderer,
+    SignalType.MINER: miner_renderer,
+    SignalType.WHALE: whale_renderer,
+    SignalType.PREDICTIVE: predictive_renderer,
+}
+
+
+def build_chart_response(signal_type: SignalType, request, chart: RenderedChart) -> ChartResponse:
+    """Build the API response for an uploaded chart"""
+    renderer = renderers_by_type[signal_type]
+    width, height = renderer.get_figure_size(request.size)
+    
+    return ChartResponse(
+        chart_url=chart.chart_url,
+        chart_path=chart.chart_path,
+        width=width,
+        height=int(height * renderer.height_scale),  # Dual-panel charts are taller
+        size_bytes=chart.size_bytes,
+        format=chart.format
+    )
+
 
 @app.get("/health")
 async def health_check():
@@ -64,6 +106,12 @@ async def health_check():
     }
 
 
+@app.get("/stats")
+async def render_stats():
+    """Render pool and cache statistics"""
+    return render_pool.get_stats()
+
+
 @app.post("/render/mempool", response_model=ChartResponse)
 async def render_mempool_chart(request: MempoolChartRequest):
     """
@@ -78,24 +126,14 @@ async def render_mempool_chart(request: MempoolChartRequest):
     try:
         logger.info(f"Rendering mempool chart for block {request.block_height}")
         
-        # Render chart
-        chart_bytes = mempool_renderer.render(request)
-        
-        # Upload to GCS
-        signed_url, chart_path, size_bytes = chart_storage.upload_chart(
-            chart_bytes, "mempool"
-        )
+        # Render in the worker pool (or reuse an identical chart) and upload
+        chart = await render_pool.render_chart(SignalType.MEMPOOL, request)
         
-        width, height = mempool_renderer.get_figure_size(request.size)
-        
-        return ChartResponse(
-            chart_url=signed_url,
-            chart_path=chart_path,
-            width=width,
-            height=height,
-            size_bytes=size_bytes
-        )
+        return build_chart_response(SignalType.MEMPOOL, request, chart)
         
+    except RenderQueueFull as e:
+        logger.warning(f"Rejected mempool chart render: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Failed to render mempool chart: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -115,24 +153,14 @@ async def render_exchange_chart(request: ExchangeChartRequest):
     try:
         logger.info(f"Rendering exchange chart for {request.entity_name}")
         
-        # Render chart
-        chart_bytes = exchange_renderer.render(request)
-        
-        # Upload to GCS
-        signed_url, chart_path, size_bytes = chart_storage.upload_chart(
-            chart_bytes, "exchange"
-        )
+        # Render in the worker pool (or reuse an identical chart) and upload
+        chart = await render_pool.render_chart(SignalType.EXCHANGE, request)
         
-        width, height = exchange_renderer.get_figure_size(request.size)
-        
-        return ChartResponse(
-            chart_url=signed_url,
-            chart_path=chart_path,
-            width=width,
-            height=height,
-            size_bytes=size_bytes
-        )
+        return build_chart_response(SignalType.EXCHANGE, request, chart)
         
+    except RenderQueueFull as e:
+        logger.warning(f"Rejected exchange chart render: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Failed to render exchange chart: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -152,24 +180,14 @@ async def render_miner_chart(request: MinerChartRequest):
     try:
         logger.info(f"Rendering miner chart for {request.entity_name}")
         
-        # Render chart
-        chart_bytes = miner_renderer.render(request)
-        
-        # Upload to GCS
-        signed_url, chart_path, size_bytes = chart_storage.upload_chart(
-            chart_bytes, "miner"
-        )
+        # Render in the worker pool (or reuse an identical chart) and upload
+        chart = await render_pool.render_chart(SignalType.MINER, request)
         
-        width, height = miner_renderer.get_figure_size(request.size)
-        
-        return ChartResponse(
-            chart_url=signed_url,
-            chart_path=chart_path,
-            width=width,
-            height=int(height * 1.5),  # Adjusted for dual-panel layout
-            size_bytes=size_bytes
-        )
+        return build_chart_response(SignalType.MINER, request, chart)
         
+    except RenderQueueFull as e:
+        logger.warning(f"Rejected miner chart render: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Failed to render miner chart: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -189,24 +207,14 @@ async def render_whale_chart(request: WhaleChartRequest):
     try:
         logger.info(f"Rendering whale chart for {request.address[:8]}...")
         
-        # Render chart
-        chart_bytes = whale_renderer.render(request)
-        
-        # Upload to GCS
-        signed_url, chart_path, size_bytes = chart_storage.upload_chart(
-            chart_bytes, "whale"
-        )
+        # Render in the worker pool (or reuse an identical chart) and upload
+        chart = await render_pool.render_chart(SignalType.WHALE, request)
         
-        width, height = whale_renderer.get_figure_size(request.size)
-        
-        return ChartResponse(
-            chart_url=signed_url,
-            chart_path=chart_path,
-            width=width,
-            height=int(height * 1.5),  # Adjusted for dual-panel layout
-            size_bytes=size_bytes
-        )
+        return build_chart_response(SignalType.WHALE, request, chart)
         
+    except RenderQueueFull as e:
+        logger.warning(f"Rejected whale chart render: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Failed to render whale chart: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -226,29 +234,71 @@ async def render_predictive_chart(request: PredictiveChartRequest):
     try:
         logger.info(f"Rendering predictive chart for {request.signal_type}")
         
-        # Render chart
-        chart_bytes = predictive_renderer.render(request)
-        
-        # Upload to GCS
-        signed_url, chart_path, size_bytes = chart_storage.upload_chart(
-            chart_bytes, "predictive"
-        )
-        
-        width, height = predictive_renderer.get_figure_size(request.size)
+        # Render in the worker pool (or reuse an identical chart) and upload
+        chart = await render_pool.render_chart(SignalType.PREDICTIVE, request)
         
-        return ChartResponse(
-            chart_url=signed_url,
-            chart_path=chart_path,
-            width=width,
-            height=height,
-            size_bytes=size_bytes
-        )
+        return build_chart_response(SignalType.PREDICTIVE, request, chart)
         
+    except RenderQueueFull as e:
+        logger.warning(f"Rejected predictive chart render: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Failed to render predictive chart: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/render/batch", response_model=BatchRenderResponse)
+async def render_batch(batch: BatchRenderRequest):
+    """
+    Generate several charts of any type in one call
+    
+    Charts render in parallel across the worker pool and upload
+    concurrently. Each item gets its own result, so one invalid or failed
+    chart does not fail the rest of the batch.
+    
+    Args:
+        batch: Chart requests, each with its chart type
+        
+    Returns:
+        Per-item results in request order
+    """
+    logger.info(f"Rendering batch of {len(batch.charts)} charts")
+    
+    results = [
+        BatchChartResult(id=item.id, chart_type=item.chart_type, status="error")
+        for item in batch.charts
+    ]
+    
+    # Validate every item first; only valid items are rendered
+    pending = []
+    for index, item in enumerate(batch.charts):
+        try:
+            request = REQUEST_MODELS[item.chart_type].model_validate(item.request)
+        except ValidationError as e:
+            results[index].error = f"Invalid {item.chart_type.value} request: {e.error_count()} validation errors"
+            continue
+        pending.append((index, item.chart_type, request))
+    
+    rendered = await render_pool.render_batch(
+        [(signal_type, request) for _, signal_type, request in pending]
+    )
+    
+    for (index, signal_type, request), outcome in zip(pending, rendered):
+        if isinstance(outcome, Exception):
+            logger.error(f"Failed to render {signal_type.value} chart in batch: {outcome}")
+            results[index].error = str(outcome) or type(outcome).__name__
+        else:
+            results[index].status = "ok"
+            results[index].chart = build_chart_response(signal_type, request, outcome)
+    
+    succeeded = sum(1 for result in results if result.status == "ok")
+    return BatchRenderResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=settings.port)
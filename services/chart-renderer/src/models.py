@@ -3,7 +3,7 @@ Pydantic models for Chart Renderer Service
 """
 
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -23,6 +23,13 @@ class ChartSize(str, Enum):
     DESKTOP = "desktop"
 
 
+class ChartFormat(str, Enum):
+    """Chart image format enumeration"""
+    PNG = "png"
+    WEBP = "webp"
+    SVG = "svg"
+
+
 class MempoolChartRequest(BaseModel):
     """Request model for mempool chart generation"""
     block_height: int = Field(gt=0)
@@ -33,6 +40,7 @@ class MempoolChartRequest(BaseModel):
     avg_fee_rate: float = Field(gt=0)
     transaction_count: int = Field(gt=0)
     size: ChartSize = ChartSize.DESKTOP
+    format: Optional[ChartFormat] = None  # Defaults to the service output format
 
 
 class ExchangeChartRequest(BaseModel):
@@ -44,6 +52,7 @@ class ExchangeChartRequest(BaseModel):
     net_flows: List[float] = Field(min_length=1)
     spike_threshold: Optional[float] = None
     size: ChartSize = ChartSize.DESKTOP
+    format: Optional[ChartFormat] = None  # Defaults to the service output format
 
 
 class MinerChartRequest(BaseModel):
@@ -53,6 +62,7 @@ class MinerChartRequest(BaseModel):
     balances: List[float] = Field(min_length=1)
     daily_changes: List[float] = Field(min_length=1)
     size: ChartSize = ChartSize.DESKTOP
+    format: Optional[ChartFormat] = None  # Defaults to the service output format
 
 
 class WhaleChartRequest(BaseModel):
@@ -63,6 +73,7 @@ class WhaleChartRequest(BaseModel):
     seven_day_changes: List[float] = Field(min_length=1)
     accumulation_streak_days: int = Field(ge=0)
     size: ChartSize = ChartSize.DESKTOP
+    format: Optional[ChartFormat] = None  # Defaults to the service output format
 
 
 class PredictiveChartRequest(BaseModel):
@@ -74,6 +85,7 @@ class PredictiveChartRequest(BaseModel):
     confidence_intervals: List[Tuple[float, float]] = Field(min_length=1)
     forecast_horizon: str
     size: ChartSize = ChartSize.DESKTOP
+    format: Optional[ChartFormat] = None  # Defaults to the service output format
 
 
 class ChartResponse(BaseModel):
@@ -83,3 +95,34 @@ class ChartResponse(BaseModel):
     width: int
     height: int
     size_bytes: int
+    format: ChartFormat = ChartFormat.PNG
+
+
+class BatchChartItem(BaseModel):
+    """One chart in a batch render request"""
+    id: Optional[str] = Field(default=None, description="Caller reference echoed in the result")
+    chart_type: SignalType
+    request: Dict[str, Any] = Field(
+        description="Chart request body, as sent to /render/{chart_type}"
+    )
+
+
+class BatchRenderRequest(BaseModel):
+    """Request model for rendering several charts in one call"""
+    charts: List[BatchChartItem] = Field(min_length=1, max_length=50)
+
+
+class BatchChartResult(BaseModel):
+    """Per-item result of a batch render"""
+    id: Optional[str] = None
+    chart_type: SignalType
+    status: str = Field(description="ok or error")
+    chart: Optional[ChartResponse] = None
+    error: Optional[str] = None
+
+
+class BatchRenderResponse(BaseModel):
+    """Response model for batch chart generation"""
+    results: List[BatchChartResult]
+    succeeded: int
+    failed: int
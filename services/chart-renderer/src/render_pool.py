@@ -0,0 +1,350 @@
+"""
+Process-pool chart rendering with a content-addressed result cache
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from .config import settings
+from .models import (
+    SignalType,
+    ChartFormat,
+    MempoolChartRequest,
+    ExchangeChartRequest,
+    MinerChartRequest,
+    WhaleChartRequest,
+    PredictiveChartRequest
+)
+from .renderers import (
+    MempoolRenderer,
+    ExchangeRenderer,
+    MinerRenderer,
+    WhaleRenderer,
+    PredictiveRenderer
+)
+from .renderers.base_renderer import BaseRenderer
+from .storage import ChartStorage
+
+logger = logging.getLogger(__name__)
+
+
+RENDERERS = {
+    SignalType.MEMPOOL: MempoolRenderer,
+    SignalType.EXCHANGE: ExchangeRenderer,
+    SignalType.MINER: MinerRenderer,
+    SignalType.WHALE: WhaleRenderer,
+    SignalType.PREDICTIVE: PredictiveRenderer,
+}
+
+REQUEST_MODELS = {
+    SignalType.MEMPOOL: MempoolChartRequest,
+    SignalType.EXCHANGE: ExchangeChartRequest,
+    SignalType.MINER: MinerChartRequest,
+    SignalType.WHALE: WhaleChartRequest,
+    SignalType.PREDICTIVE: PredictiveChartRequest,
+}
+
+# Renderers owned by the current worker process, created on first use
+_worker_renderers: Dict[SignalType, BaseRenderer] = {}
+
+
+def _render_in_worker(signal_type: str, canonical_request: str) -> bytes:
+    """Render a chart inside a pool worker process"""
+    signal_type = SignalType(signal_type)
+    renderer = _worker_renderers.get(signal_type)
+    if renderer is None:
+        renderer = _worker_renderers[signal_type] = RENDERERS[signal_type]()
+    
+    request = REQUEST_MODELS[signal_type].model_validate_json(canonical_request)
+    return renderer.render(request)
+
+
+def canonicalize_request(request: BaseModel) -> str:
+    """
+    Serialize a request model to canonical JSON
+    
+    Keys are sorted and whitespace removed so equal requests always produce
+    the same string, regardless of the field order the client sent.
+    
+    Args:
+        request: Chart request model
+    
+    Returns:
+        Canonical JSON string
+    """
+    return json.dumps(
+        request.model_dump(mode="json"),
+        sort_keys=True,
+        separators=(",", ":")
+    )
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render queue is at capacity"""
+    pass
+
+
+@dataclass
+class RenderedChart:
+    """Uploaded chart location"""
+    chart_url: str
+    chart_path: str
+    size_bytes: int
+    format: ChartFormat = ChartFormat.PNG
+    cached: bool = False
+
+
+class RenderPool:
+    """
+    Render charts in worker processes, keyed by request content
+    
+    The cache key is the hash of the canonicalized request, computed before
+    rendering. A request whose chart is already known (in memory or in GCS)
+    returns the stored chart; concurrent identical requests share one render.
+    """
+    
+    def __init__(
+        self,
+        storage: ChartStorage,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        cache_ttl_seconds: Optional[int] = None
+    ):
+        """
+        Initialize render pool
+        
+        Args:
+            storage: Chart storage used for lookups and uploads
+            max_workers: Renderer processes (defaults to config)
+            max_queue: Renders queued or running before rejecting (defaults to config)
+            cache_size: Charts remembered in memory (defaults to config)
+            cache_ttl_seconds: Lifetime of in-memory entries (defaults to config)
+        """
+        self.storage = storage
+        self.max_workers = max_workers or settings.render_workers
+        self.max_queue = max_queue or settings.render_max_queue
+        self.cache_size = cache_size or settings.render_cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds or settings.render_cache_ttl_seconds
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, Tuple[RenderedChart, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._queued = 0
+        
+        self.renders = 0
+        self.cache_hits = 0
+        self.storage_hits = 0
+        self.coalesced_requests = 0
+        self.rejected_requests = 0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            # Spawned workers avoid inheriting the server's threads and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started render pool with {self.max_workers} workers")
+        return self._executor
+    
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+    
+    async def render_chart(self, signal_type: SignalType, request: BaseModel) -> RenderedChart:
+        """
+        Return the chart for a request, rendering and uploading it if needed
+        
+        Args:
+            signal_type: Chart type
+            request: Chart request model
+        
+        Returns:
+            Uploaded chart location
+        
+        Raises:
+            RenderQueueFull: If too many renders are already pending
+        """
+        signal_type = SignalType(signal_type)
+        
+        # Resolve the default format so it is part of the cache key
+        chart_format = ChartFormat(request.format or settings.chart_output_format)
+        request = request.model_copy(update={"format": chart_format})
+        canonical_request = canonicalize_request(request)
+        cache_key = self.storage.hash_request(signal_type.value, canonical_request)
+        
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self.coalesced_requests += 1
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            chart = await self._produce(signal_type, chart_format, cache_key, canonical_request)
+            self._cache_put(cache_key, chart)
+            future.set_result(chart)
+            return chart
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            # Cancellation is not an Exception; release waiters rather than leave them hanging
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(cache_key, None)
+    
+    async def render_batch(
+        self,
+        charts: List[Tuple[SignalType, BaseModel]]
+    ) -> List[Union[RenderedChart, Exception]]:
+        """
+        Render and upload several charts concurrently
+        
+        Items are fed to the pool at most ``max_workers * 2`` at a time so a
+        large batch keeps every worker busy without filling the shared queue.
+        Duplicate items are coalesced like concurrent single requests.
+        
+        Args:
+            charts: (chart type, request model) pairs
+            
+        Returns:
+            Uploaded chart or the raised exception for each item, in order
+        """
+        semaphore = asyncio.Semaphore(self.max_workers * 2)
+        
+        async def render_one(signal_type: SignalType, request: BaseModel) -> RenderedChart:
+            async with semaphore:
+                return await self.render_chart(signal_type, request)
+        
+        return await asyncio.gather(
+            *(render_one(signal_type, request) for signal_type, request in charts),
+            return_exceptions=True
+        )
+    
+    async def _produce(
+        self,
+        signal_type: SignalType,
+        chart_format: ChartFormat,
+        cache_key: str,
+        canonical_request: str
+    ) -> RenderedChart:
+        """Reuse a stored chart or render and upload a new one"""
+        loop = asyncio.get_running_loop()
+        
+        existing = await loop.run_in_executor(
+            None, self.storage.get_chart, signal_type.value, cache_key, chart_format.value
+        )
+        if existing is not None:
+            self.storage_hits += 1
+            signed_url, chart_path, size_bytes = existing
+            return RenderedChart(signed_url, chart_path, size_bytes, chart_format, cached=True)
+        
+        chart_bytes = await self.render_bytes(signal_type, canonical_request)
+        
+        signed_url, chart_path, size_bytes = await loop.run_in_executor(
+            None,
+            partial(
+                self.storage.upload_chart,
+                chart_bytes,
+                signal_type.value,
+                data_hash=cache_key,
+                chart_format=chart_format.value
+            )
+        )
+        return RenderedChart(signed_url, chart_path, size_bytes, chart_format)
+    
+    async def render_bytes(self, signal_type: SignalType, canonical_request: str) -> bytes:
+        """
+        Render a chart in the worker pool without caching or uploading
+        
+        Args:
+            signal_type: Chart type
+            canonical_request: Canonical request JSON
+        
+        Returns:
+            PNG image as bytes
+        """
+        if self._queued >= self.max_queue:
+            self.rejected_requests += 1
+            raise RenderQueueFull(f"Render queue full ({self.max_queue} pending)")
+        
+        self._queued += 1
+        start = time.perf_counter()
+        try:
+            chart_bytes = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(),
+                _render_in_worker,
+                SignalType(signal_type).value,
+                canonical_request
+            )
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next request
+            logger.error("Render pool broken, restarting workers")
+            self._executor = None
+            raise
+        finally:
+            self._queued -= 1
+        
+        self.renders += 1
+        logger.debug(f"Rendered {signal_type} chart in {time.perf_counter() - start:.3f}s")
+        return chart_bytes
+    
+    def _cache_get(self, cache_key: str) -> Optional[RenderedChart]:
+        """Return a fresh cached chart, evicting it if expired"""
+        entry = self._cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        chart, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[cache_key]
+            return None
+        
+        self._cache.move_to_end(cache_key)
+        return RenderedChart(
+            chart.chart_url, chart.chart_path, chart.size_bytes, chart.format, cached=True
+        )
+    
+    def _cache_put(self, cache_key: str, chart: RenderedChart):
+        """Remember a chart, evicting the least recently used entry"""
+        self._cache[cache_key] = (chart, time.monotonic() + self.cache_ttl_seconds)
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def get_stats(self) -> dict:
+        """Get render pool statistics"""
+        return {
+            "workers": self.max_workers,
+            "queued": self._queued,
+            "max_queue": self.max_queue,
+            "inflight": len(self._inflight),
+            "cached_charts": len(self._cache),
+            "renders": self.renders,
+            "cache_hits": self.cache_hits,
+            "storage_hits": self.storage_hits,
+            "coalesced_requests": self.coalesced_requests,
+            "rejected_requests": self.rejected_requests,
+        }
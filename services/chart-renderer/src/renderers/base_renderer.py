@@ -4,17 +4,36 @@ Base chart renderer with common styling and utilities
 
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from dataclasses import dataclass, field
 from io import BytesIO
-from typing import Tuple
+from PIL import Image
+from typing import Any, Dict, List, Optional, Tuple
 from ..config import settings
-from ..models import ChartSize
+from ..models import ChartSize, ChartFormat
+
+
+@dataclass
+class FigureTemplate:
+    """Pre-styled figure reused across renders of one chart type and size"""
+    figure: Figure
+    canvas: FigureCanvasAgg
+    axes: List[Axes]
+    artists: Dict[str, Any] = field(default_factory=dict)  # Data artists updated in place
+    dynamic: list = field(default_factory=list)  # Artists rebuilt on every render
+    layout_key: Optional[tuple] = None  # Tick label shape the current layout was fitted to
 
 
 class BaseRenderer:
     """Base class for chart renderers with common styling"""
     
+    # Layout of the template figure: number of stacked panels and height scale
+    panels = 1
+    height_scale = 1.0
+    
     def __init__(self):
         """Initialize renderer with brand styling"""
         self.bg_color = settings.get_color("background")
@@ -23,6 +42,10 @@ class BaseRenderer:
         self.grid_color = settings.get_color("grid")
         self.brand_color = settings.get_color("brand")
         
+        # Templates are built lazily per chart size; a renderer instance must
+        # not be shared between threads
+        self._templates: Dict[ChartSize, FigureTemplate] = {}
+    
     def get_figure_size(self, size: ChartSize) -> Tuple[int, int]:
         """Calculate figure size based on chart size"""
         if size == ChartSize.MOBILE:
@@ -33,18 +56,35 @@ class BaseRenderer:
         height = int(width * settings.chart_height_ratio)
         return width, height
     
-    def create_figure(self, size: ChartSize) -> Tuple[plt.Figure, plt.Axes]:
-        """Create figure with brand styling"""
+    def create_figure(
+        self,
+        size: ChartSize,
+        rows: int = 1,
+        height_scale: float = 1.0
+    ) -> Tuple[Figure, Any]:
+        """Create figure with brand styling on an Agg canvas (no pyplot state)"""
         width_px, height_px = self.get_figure_size(size)
         
         # Convert pixels to inches for matplotlib (at specified DPI)
         width_in = width_px / settings.chart_dpi
-        height_in = height_px / settings.chart_dpi
+        height_in = height_px / settings.chart_dpi * height_scale
         
-        fig, ax = plt.subplots(figsize=(width_in, height_in), dpi=settings.chart_dpi)
-        
-        # Apply dark theme styling
+        fig = Figure(figsize=(width_in, height_in), dpi=settings.chart_dpi)
+        FigureCanvasAgg(fig)
         fig.patch.set_facecolor(self.bg_color)
+        
+        if rows == 1:
+            axes = fig.subplots()
+            self.style_axes(axes)
+        else:
+            axes = fig.subplots(rows, 1, sharex=True)
+            for ax in axes:
+                self.style_axes(ax)
+        
+        return fig, axes
+    
+    def style_axes(self, ax: Axes):
+        """Apply dark theme styling to an axes"""
         ax.set_facecolor(self.surface_color)
         
         # Style axes
@@ -63,10 +103,72 @@ class BaseRenderer:
         # Grid styling
         ax.grid(True, alpha=0.15, color=self.grid_color, linewidth=0.5)
         ax.set_axisbelow(True)
+    
+    def get_template(self, size: ChartSize) -> FigureTemplate:
+        """Return the cached figure template for a size, building it once"""
+        template = self._templates.get(size)
+        if template is None:
+            fig, axes = self.create_figure(size, self.panels, self.height_scale)
+            template = FigureTemplate(
+                figure=fig,
+                canvas=fig.canvas,
+                axes=list(axes) if self.panels > 1 else [axes]
+            )
+            self.build_template(template)
+            self._templates[size] = template
+        return template
+    
+    def build_template(self, template: FigureTemplate):
+        """Create static artists and empty data artists (override in subclasses)"""
+        pass
+    
+    def begin_render(self, template: FigureTemplate):
+        """
+        Drop the previous render's dynamic artists and reset data limits
+        
+        Call after updating in-place data artists and before adding new
+        dynamic ones, which extend the data limits as they are created.
+        """
+        for artist in template.dynamic:
+            artist.remove()
+        template.dynamic.clear()
         
-        return fig, ax
+        for ax in template.axes:
+            ax.relim()
     
-    def format_datetime_axis(self, ax: plt.Axes, timestamps: list):
+    def finish_render(self, template: FigureTemplate, chart_format: Optional[ChartFormat] = None) -> bytes:
+        """Rescale axes, lay out and encode the template figure"""
+        for ax in template.axes:
+            ax.autoscale_view()
+        
+        # Tight layout measures every tick label, so only refit when the
+        # labels can have changed width
+        layout_key = tuple(self._tick_label_shape(ax) for ax in template.axes)
+        if layout_key != template.layout_key:
+            template.figure.tight_layout()
+            template.layout_key = layout_key
+        
+        return self.render_to_bytes(template.figure, chart_format)
+    
+    def _tick_label_shape(self, ax: Axes) -> tuple:
+        """Summarize what determines tick label extents on an axes"""
+        y_low, y_high = ax.get_ylim()
+        x_formatter = ax.xaxis.get_major_formatter()
+        return (
+            len(f"{max(abs(y_low), abs(y_high)):,.0f}"),
+            y_low < 0,
+            getattr(x_formatter, 'fmt', None)
+        )
+    
+    def date_values(self, timestamps: list):
+        """Convert datetimes to matplotlib date numbers for in-place updates"""
+        return mdates.date2num(timestamps)
+    
+    def setup_datetime_axis(self, ax: Axes):
+        """Configure a template axis to show dates"""
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+    
+    def format_datetime_axis(self, ax: Axes, timestamps: list):
         """Format datetime axis with appropriate date formatting"""
         if len(timestamps) > 0:
             # Determine appropriate date format based on time range
@@ -80,25 +182,55 @@ class BaseRenderer:
                 ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
             
             # Rotate labels for better readability
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+            for label in ax.xaxis.get_majorticklabels():
+                label.set(rotation=45, ha='right')
     
-    def add_title(self, ax: plt.Axes, title: str, subtitle: str = None):
+    def add_title(self, ax: Axes, title: str, subtitle: str = None):
         """Add title and optional subtitle to chart"""
-        ax.set_title(title, color=self.text_color, fontsize=12, 
+        ax.set_title(title, color=self.text_color, fontsize=12,
                     fontweight='semibold', pad=10, loc='left')
         
         if subtitle:
-            ax.text(0, 1.05, subtitle, transform=ax.transAxes,
-                   color=self.text_color, fontsize=9, alpha=0.7)
+            return ax.text(0, 1.05, subtitle, transform=ax.transAxes,
+                          color=self.text_color, fontsize=9, alpha=0.7)
+    
+    def update_title(self, template: FigureTemplate, ax: Axes, title: str, subtitle: str = ''):
+        """Replace the title and subtitle text of a template axes"""
+        ax.set_title(title, color=self.text_color, fontsize=12,
+                    fontweight='semibold', pad=10, loc='left')
+        template.artists['subtitle'].set_text(subtitle)
     
-    def render_to_bytes(self, fig: plt.Figure) -> bytes:
-        """Render figure to PNG bytes"""
+    def add_legend(self, ax: Axes, handles: list = None):
+        """Add brand-styled legend"""
+        kwargs = {'handles': handles} if handles is not None else {}
+        return ax.legend(loc='upper left', frameon=False,
+                         labelcolor=self.text_color, fontsize=9, **kwargs)
+    
+    def render_to_bytes(self, fig: Figure, chart_format: Optional[ChartFormat] = None) -> bytes:
+        """
+        Rasterize figure and encode it in the requested format
+        
+        PNG and WebP are encoded by Pillow straight from the Agg buffer, which
+        skips savefig's layout pass and makes PNG compression tunable. SVG is
+        written by matplotlib's vector backend.
+        """
+        chart_format = ChartFormat(chart_format or settings.chart_output_format)
         buf = BytesIO()
-        fig.savefig(buf, format='png', dpi=settings.chart_dpi,
-                   bbox_inches='tight', facecolor=self.bg_color,
-                   edgecolor='none', pad_inches=0.1)
-        plt.close(fig)
-        buf.seek(0)
+        
+        if chart_format == ChartFormat.SVG:
+            fig.savefig(buf, format='svg', facecolor=self.bg_color, edgecolor='none')
+            return buf.getvalue()
+        
+        canvas = fig.canvas
+        canvas.draw()
+        image = Image.frombuffer(
+            'RGBA', canvas.get_width_height(), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1
+        ).convert('RGB')  # Background is opaque, alpha channel only adds bytes
+        
+        if chart_format == ChartFormat.WEBP:
+            image.save(buf, format='WEBP', quality=settings.chart_webp_quality, method=4)
+        else:
+            image.save(buf, format='PNG', compress_level=settings.chart_png_compress_level)
         return buf.getvalue()
     
     def format_btc(self, value: float) -> str:
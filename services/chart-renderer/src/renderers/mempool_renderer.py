@@ -2,9 +2,8 @@
 Mempool fee distribution chart renderer
 """
 
-import matplotlib.pyplot as plt
 import numpy as np
-from .base_renderer import BaseRenderer
+from .base_renderer import BaseRenderer, FigureTemplate
 from ..models import MempoolChartRequest
 from ..config import settings
 
@@ -12,59 +11,79 @@ from ..config import settings
 class MempoolRenderer(BaseRenderer):
     """Renderer for mempool fee distribution charts"""
     
-    def render(self, request: MempoolChartRequest) -> bytes:
-        """
-        Render mempool fee distribution chart with quantile visualization
-        
-        Args:
-            request: Mempool chart request data
-            
-        Returns:
-            PNG image as bytes
-        """
-        fig, ax = self.create_figure(request.size)
-        
-        # Extract quantile data
-        quantiles = ['p10', 'p25', 'p50', 'p75', 'p90']
-        quantile_labels = ['10th', '25th', '50th', '75th', '90th']
-        values = [request.fee_quantiles.get(q, 0) for q in quantiles]
-        
-        # Create bar chart with gradient effect
+    quantiles = ['p10', 'p25', 'p50', 'p75', 'p90']
+    quantile_labels = ['10th', '25th', '50th', '75th', '90th']
+    
+    def build_template(self, template: FigureTemplate):
+        """Create the quantile bars, value labels and average line once"""
+        ax = template.axes[0]
         mempool_color = settings.get_color("mempool")
-        x_pos = np.arange(len(quantiles))
+        x_pos = np.arange(len(self.quantiles))
         
-        bars = ax.bar(x_pos, values, color=mempool_color, alpha=0.8, 
+        # Bars start empty; heights are set per render
+        bars = ax.bar(x_pos, np.zeros(len(x_pos)), color=mempool_color, alpha=0.8,
                      edgecolor=mempool_color, linewidth=1.5)
         
-        # Add value labels on top of bars
-        for i, (bar, value) in enumerate(zip(bars, values)):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{self.format_sats_per_vbyte(value)}',
+        # Value labels on top of bars
+        value_labels = [
+            ax.text(bar.get_x() + bar.get_width()/2., 0, '',
                    ha='center', va='bottom', color=self.text_color,
                    fontsize=9, fontweight='medium')
+            for bar in bars
+        ]
         
-        # Add average fee line
-        ax.axhline(y=request.avg_fee_rate, color=self.brand_color, 
-                  linestyle='--', linewidth=2, alpha=0.7, 
-                  label=f'Avg: {self.format_sats_per_vbyte(request.avg_fee_rate)} sat/vB')
+        # Average fee line
+        avg_line = ax.axhline(y=0, color=self.brand_color,
+                             linestyle='--', linewidth=2, alpha=0.7, label='Avg')
         
         # Styling
         ax.set_xticks(x_pos)
-        ax.set_xticklabels(quantile_labels)
+        ax.set_xticklabels(self.quantile_labels)
         ax.set_xlabel('Fee Percentile', fontsize=10, color=self.text_color)
         ax.set_ylabel('Fee Rate (sat/vByte)', fontsize=10, color=self.text_color)
         
         # Title with context
-        title = f'Mempool Fee Distribution'
-        subtitle = f'Block {request.block_height:,} • {request.transaction_count:,} txs'
-        self.add_title(ax, title, subtitle)
+        subtitle = self.add_title(ax, 'Mempool Fee Distribution', ' ')
         
         # Legend
-        ax.legend(loc='upper left', frameon=False, 
-                 labelcolor=self.text_color, fontsize=9)
+        legend = self.add_legend(ax)
+        
+        template.artists.update(
+            bars=bars,
+            value_labels=value_labels,
+            avg_line=avg_line,
+            subtitle=subtitle,
+            legend=legend
+        )
+    
+    def render(self, request: MempoolChartRequest) -> bytes:
+        """
+        Render mempool fee distribution chart with quantile visualization
+        
+        Args:
+            request: Mempool chart request data
+            
+        Returns:
+            Chart image as bytes
+        """
+        template = self.get_template(request.size)
+        artists = template.artists
+        
+        # Extract quantile data
+        values = [request.fee_quantiles.get(q, 0) for q in self.quantiles]
+        
+        for bar, label, value in zip(artists['bars'], artists['value_labels'], values):
+            bar.set_height(value)
+            label.set_y(value)
+            label.set_text(self.format_sats_per_vbyte(value))
         
-        # Tight layout
-        fig.tight_layout()
+        artists['avg_line'].set_ydata([request.avg_fee_rate, request.avg_fee_rate])
+        artists['legend'].get_texts()[0].set_text(
+            f'Avg: {self.format_sats_per_vbyte(request.avg_fee_rate)} sat/vB'
+        )
+        artists['subtitle'].set_text(
+            f'Block {request.block_height:,} • {request.transaction_count:,} txs'
+        )
         
-        return self.render_to_bytes(fig)
+        self.begin_render(template)
+        return self.finish_render(template, request.format)
@@ -2,9 +2,7 @@
 Miner treasury chart renderer
 """
 
-import matplotlib.pyplot as plt
-import numpy as np
-from .base_renderer import BaseRenderer
+from .base_renderer import BaseRenderer, FigureTemplate
 from ..models import MinerChartRequest
 from ..config import settings
 
@@ -12,6 +10,28 @@ from ..config import settings
 class MinerRenderer(BaseRenderer):
     """Renderer for miner treasury charts"""
     
+    panels = 2
+    height_scale = 1.5
+    
+    def build_template(self, template: FigureTemplate):
+        """Create the balance line, zero line and panel labels once"""
+        ax1, ax2 = template.axes
+        miner_color = settings.get_color("miner")
+        self.setup_datetime_axis(ax2)
+        
+        # Top panel: Balance over time; data is set per render
+        balance_line, = ax1.plot([], [], color=miner_color, linewidth=2.5, alpha=0.9)
+        ax1.set_ylabel('Balance (BTC)', fontsize=10, color=self.text_color)
+        subtitle = self.add_title(ax1, 'Treasury', ' ')
+        
+        # Bottom panel: zero line under the daily change bars
+        ax2.axhline(y=0, color=self.grid_color, linestyle='-',
+                   linewidth=1, alpha=0.5)
+        ax2.set_ylabel('Daily Change (BTC)', fontsize=10, color=self.text_color)
+        ax2.set_xlabel('Time', fontsize=10, color=self.text_color)
+        
+        template.artists.update(balance_line=balance_line, subtitle=subtitle)
+    
     def render(self, request: MinerChartRequest) -> bytes:
         """
         Render miner treasury chart with balance change visualization
@@ -20,64 +40,35 @@ class MinerRenderer(BaseRenderer):
             request: Miner chart request data
             
         Returns:
-            PNG image as bytes
+            Chart image as bytes
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(
-            self.get_figure_size(request.size)[0] / settings.chart_dpi,
-            self.get_figure_size(request.size)[1] / settings.chart_dpi * 1.5
-        ), dpi=settings.chart_dpi, sharex=True)
-        
-        # Apply styling to both axes
-        for ax in [ax1, ax2]:
-            fig.patch.set_facecolor(self.bg_color)
-            ax.set_facecolor(self.surface_color)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_color(self.grid_color)
-            ax.spines['bottom'].set_color(self.grid_color)
-            ax.tick_params(colors=self.text_color, which='both', labelsize=9)
-            ax.grid(True, alpha=0.15, color=self.grid_color, linewidth=0.5)
-            ax.set_axisbelow(True)
-        
+        template = self.get_template(request.size)
+        ax1, ax2 = template.axes
         miner_color = settings.get_color("miner")
+        times = self.date_values(request.timestamps)
         
         # Top panel: Balance over time
-        ax1.plot(request.timestamps, request.balances,
-                color=miner_color, linewidth=2.5, alpha=0.9)
-        ax1.fill_between(request.timestamps, 0, request.balances,
-                        color=miner_color, alpha=0.2)
+        template.artists['balance_line'].set_data(times, request.balances)
         
-        ax1.set_ylabel('Balance (BTC)', fontsize=10, color=self.text_color)
-        ax1.yaxis.label.set_color(self.text_color)
+        self.begin_render(template)
+        
+        template.dynamic.append(
+            ax1.fill_between(times, 0, request.balances, color=miner_color, alpha=0.2)
+        )
         
         # Bottom panel: Daily changes as bar chart
         colors = [miner_color if x >= 0 else self.brand_color 
                  for x in request.daily_changes]
-        ax2.bar(request.timestamps, request.daily_changes,
-               color=colors, alpha=0.7, width=0.8)
-        
-        # Add zero line
-        ax2.axhline(y=0, color=self.grid_color, linestyle='-',
-                   linewidth=1, alpha=0.5)
-        
-        ax2.set_ylabel('Daily Change (BTC)', fontsize=10, color=self.text_color)
-        ax2.yaxis.label.set_color(self.text_color)
+        template.dynamic.append(
+            ax2.bar(times, request.daily_changes, color=colors, alpha=0.7, width=0.8)
+        )
         
         # Format datetime axis
         self.format_datetime_axis(ax2, request.timestamps)
-        ax2.set_xlabel('Time', fontsize=10, color=self.text_color)
-        ax2.xaxis.label.set_color(self.text_color)
         
         # Title on top panel
-        title = f'{request.entity_name} Treasury'
         current_balance = request.balances[-1] if request.balances else 0
-        subtitle = f'Current: {self.format_btc(current_balance)} BTC'
-        ax1.set_title(title, color=self.text_color, fontsize=12,
-                     fontweight='semibold', pad=10, loc='left')
-        ax1.text(0, 1.05, subtitle, transform=ax1.transAxes,
-                color=self.text_color, fontsize=9, alpha=0.7)
-        
-        # Tight layout
-        fig.tight_layout()
+        self.update_title(template, ax1, f'{request.entity_name} Treasury',
+                         f'Current: {self.format_btc(current_balance)} BTC')
         
-        return self.render_to_bytes(fig)
+        return self.finish_render(template, request.format)
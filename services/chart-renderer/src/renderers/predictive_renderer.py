@@ -2,9 +2,7 @@
 Predictive signal chart renderer
 """
 
-import matplotlib.pyplot as plt
-import numpy as np
-from .base_renderer import BaseRenderer
+from .base_renderer import BaseRenderer, FigureTemplate
 from ..models import PredictiveChartRequest
 from ..config import settings
 
@@ -12,6 +10,33 @@ from ..config import settings
 class PredictiveRenderer(BaseRenderer):
     """Renderer for predictive signal charts"""
     
+    def build_template(self, template: FigureTemplate):
+        """Create the historical and forecast lines and boundary marker once"""
+        ax = template.axes[0]
+        self.setup_datetime_axis(ax)
+        
+        # Lines start empty; data is set per render
+        historical_line, = ax.plot([], [], color=self.text_color, linewidth=2.5, alpha=0.9,
+                                   label='Historical', marker='o', markersize=4)
+        forecast_line, = ax.plot([], [], color=self.brand_color, linewidth=2.5, alpha=0.9,
+                                 linestyle='--', label='Forecast', marker='s', markersize=4)
+        
+        # Vertical line at prediction boundary
+        boundary_line = ax.axvline(x=0, color=self.grid_color,
+                                  linestyle=':', linewidth=2, alpha=0.5)
+        
+        # Styling
+        ax.set_xlabel('Time', fontsize=10, color=self.text_color)
+        ax.set_ylabel('Value', fontsize=10, color=self.text_color)
+        subtitle = self.add_title(ax, 'Forecast', ' ')
+        
+        template.artists.update(
+            historical_line=historical_line,
+            forecast_line=forecast_line,
+            boundary_line=boundary_line,
+            subtitle=subtitle
+        )
+    
     def render(self, request: PredictiveChartRequest) -> bytes:
         """
         Render predictive signal chart with confidence intervals
@@ -20,25 +45,33 @@ class PredictiveRenderer(BaseRenderer):
             request: Predictive chart request data
             
         Returns:
-            PNG image as bytes
+            Chart image as bytes
         """
-        fig, ax = self.create_figure(request.size)
+        template = self.get_template(request.size)
+        ax = template.axes[0]
+        artists = template.artists
+        times = self.date_values(request.timestamps)
         
         # Split timestamps into historical and predicted
         split_idx = len(request.historical_values)
-        historical_times = request.timestamps[:split_idx]
-        predicted_times = request.timestamps[split_idx-1:]  # Overlap last point
+        historical_times = times[:split_idx]
+        predicted_times = times[split_idx-1:]  # Overlap last point
         
         # Plot historical data
-        ax.plot(historical_times, request.historical_values,
-               color=self.text_color, linewidth=2.5, alpha=0.9,
-               label='Historical', marker='o', markersize=4)
+        artists['historical_line'].set_data(historical_times, request.historical_values)
         
         # Plot predicted data
         predicted_values_with_overlap = [request.historical_values[-1]] + request.predicted_values
-        ax.plot(predicted_times, predicted_values_with_overlap,
-               color=self.brand_color, linewidth=2.5, alpha=0.9,
-               linestyle='--', label='Forecast', marker='s', markersize=4)
+        artists['forecast_line'].set_data(predicted_times, predicted_values_with_overlap)
+        
+        # Vertical line at prediction boundary
+        boundary_line = artists['boundary_line']
+        boundary_line.set_visible(len(historical_times) > 0)
+        if len(historical_times) > 0:
+            boundary_line.set_xdata([historical_times[-1], historical_times[-1]])
+        
+        self.begin_render(template)
+        handles = [artists['historical_line'], artists['forecast_line']]
         
         # Plot confidence intervals
         if request.confidence_intervals:
@@ -49,32 +82,20 @@ class PredictiveRenderer(BaseRenderer):
             lower_with_overlap = [request.historical_values[-1]] + lower_bounds
             upper_with_overlap = [request.historical_values[-1]] + upper_bounds
             
-            ax.fill_between(predicted_times, lower_with_overlap, upper_with_overlap,
-                           color=self.brand_color, alpha=0.2,
-                           label='Confidence Interval')
-        
-        # Add vertical line at prediction boundary
-        if len(historical_times) > 0:
-            ax.axvline(x=historical_times[-1], color=self.grid_color,
-                      linestyle=':', linewidth=2, alpha=0.5)
+            interval = ax.fill_between(predicted_times, lower_with_overlap, upper_with_overlap,
+                                      color=self.brand_color, alpha=0.2,
+                                      label='Confidence Interval')
+            template.dynamic.append(interval)
+            handles.append(interval)
         
         # Format datetime axis
         self.format_datetime_axis(ax, request.timestamps)
         
-        # Styling
-        ax.set_xlabel('Time', fontsize=10, color=self.text_color)
-        ax.set_ylabel('Value', fontsize=10, color=self.text_color)
-        
         # Title
-        title = f'{request.signal_type.replace("_", " ").title()} Forecast'
-        subtitle = f'Horizon: {request.forecast_horizon}'
-        self.add_title(ax, title, subtitle)
+        self.update_title(template, ax, f'{request.signal_type.replace("_", " ").title()} Forecast',
+                         f'Horizon: {request.forecast_horizon}')
         
         # Legend
-        ax.legend(loc='upper left', frameon=False,
-                 labelcolor=self.text_color, fontsize=9)
-        
-        # Tight layout
-        fig.tight_layout()
+        self.add_legend(ax, handles)
         
-        return self.render_to_bytes(fig)
+        return self.finish_render(template, request.format)
@@ -2,9 +2,7 @@
 Whale accumulation chart renderer
 """
 
-import matplotlib.pyplot as plt
-import numpy as np
-from .base_renderer import BaseRenderer
+from .base_renderer import BaseRenderer, FigureTemplate
 from ..models import WhaleChartRequest
 from ..config import settings
 
@@ -12,6 +10,28 @@ from ..config import settings
 class WhaleRenderer(BaseRenderer):
     """Renderer for whale accumulation charts"""
     
+    panels = 2
+    height_scale = 1.5
+    
+    def build_template(self, template: FigureTemplate):
+        """Create the balance line, zero line and panel labels once"""
+        ax1, ax2 = template.axes
+        whale_color = settings.get_color("whale")
+        self.setup_datetime_axis(ax2)
+        
+        # Top panel: Balance over time; data is set per render
+        balance_line, = ax1.plot([], [], color=whale_color, linewidth=2.5, alpha=0.9)
+        ax1.set_ylabel('Balance (BTC)', fontsize=10, color=self.text_color)
+        subtitle = self.add_title(ax1, 'Whale Accumulation', ' ')
+        
+        # Bottom panel: zero line under the 7-day change bars
+        ax2.axhline(y=0, color=self.grid_color, linestyle='-',
+                   linewidth=1, alpha=0.5)
+        ax2.set_ylabel('7-Day Change (BTC)', fontsize=10, color=self.text_color)
+        ax2.set_xlabel('Time', fontsize=10, color=self.text_color)
+        
+        template.artists.update(balance_line=balance_line, subtitle=subtitle)
+    
     def render(self, request: WhaleChartRequest) -> bytes:
         """
         Render whale accumulation chart with streak highlighting
@@ -20,32 +40,21 @@ class WhaleRenderer(BaseRenderer):
             request: Whale chart request data
             
         Returns:
-            PNG image as bytes
+            Chart image as bytes
         """
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(
-            self.get_figure_size(request.size)[0] / settings.chart_dpi,
-            self.get_figure_size(request.size)[1] / settings.chart_dpi * 1.5
-        ), dpi=settings.chart_dpi, sharex=True)
-        
-        # Apply styling to both axes
-        for ax in [ax1, ax2]:
-            fig.patch.set_facecolor(self.bg_color)
-            ax.set_facecolor(self.surface_color)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_color(self.grid_color)
-            ax.spines['bottom'].set_color(self.grid_color)
-            ax.tick_params(colors=self.text_color, which='both', labelsize=9)
-            ax.grid(True, alpha=0.15, color=self.grid_color, linewidth=0.5)
-            ax.set_axisbelow(True)
-        
+        template = self.get_template(request.size)
+        ax1, ax2 = template.axes
         whale_color = settings.get_color("whale")
+        times = self.date_values(request.timestamps)
         
         # Top panel: Balance over time with accumulation highlighting
-        ax1.plot(request.timestamps, request.balances,
-                color=whale_color, linewidth=2.5, alpha=0.9)
-        ax1.fill_between(request.timestamps, 0, request.balances,
-                        color=whale_color, alpha=0.2)
+        template.artists['balance_line'].set_data(times, request.balances)
+        
+        self.begin_render(template)
+        
+        template.dynamic.append(
+            ax1.fill_between(times, 0, request.balances, color=whale_color, alpha=0.2)
+        )
         
         # Highlight accumulation periods (positive 7-day changes)
         accumulation_periods = []
@@ -69,47 +78,30 @@ class WhaleRenderer(BaseRenderer):
             for group in groups:
                 start_idx = group[0]
                 end_idx = group[-1]
-                ax1.axvspan(request.timestamps[start_idx],
-                           request.timestamps[end_idx],
-                           alpha=0.15, color=self.brand_color,
-                           label='Accumulation' if group == groups[0] else '')
-        
-        ax1.set_ylabel('Balance (BTC)', fontsize=10, color=self.text_color)
-        ax1.yaxis.label.set_color(self.text_color)
+                template.dynamic.append(
+                    ax1.axvspan(times[start_idx],
+                               times[end_idx],
+                               alpha=0.15, color=self.brand_color,
+                               label='Accumulation' if group == groups[0] else '')
+                )
         
         # Bottom panel: 7-day changes
         colors = [whale_color if x >= 0 else self.brand_color 
                  for x in request.seven_day_changes]
-        ax2.bar(request.timestamps, request.seven_day_changes,
-               color=colors, alpha=0.7, width=0.8)
-        
-        # Add zero line
-        ax2.axhline(y=0, color=self.grid_color, linestyle='-',
-                   linewidth=1, alpha=0.5)
-        
-        ax2.set_ylabel('7-Day Change (BTC)', fontsize=10, color=self.text_color)
-        ax2.yaxis.label.set_color(self.text_color)
+        template.dynamic.append(
+            ax2.bar(times, request.seven_day_changes, color=colors, alpha=0.7, width=0.8)
+        )
         
         # Format datetime axis
         self.format_datetime_axis(ax2, request.timestamps)
-        ax2.set_xlabel('Time', fontsize=10, color=self.text_color)
-        ax2.xaxis.label.set_color(self.text_color)
         
         # Title on top panel
-        title = f'Whale Accumulation'
         address_short = f'{request.address[:8]}...{request.address[-6:]}'
-        subtitle = f'{address_short} • {request.accumulation_streak_days} day streak'
-        ax1.set_title(title, color=self.text_color, fontsize=12,
-                     fontweight='semibold', pad=10, loc='left')
-        ax1.text(0, 1.05, subtitle, transform=ax1.transAxes,
-                color=self.text_color, fontsize=9, alpha=0.7)
+        self.update_title(template, ax1, 'Whale Accumulation',
+                         f'{address_short} • {request.accumulation_streak_days} day streak')
         
         # Legend
         if accumulation_periods:
-            ax1.legend(loc='upper left', frameon=False,
-                      labelcolor=self.text_color, fontsize=9)
-        
-        # Tight layout
-        fig.tight_layout()
+            template.dynamic.append(self.add_legend(ax1))
         
-        return self.render_to_bytes(fig)
+        return self.finish_render(template, request.format)
@@ -6,11 +6,17 @@ from google.cloud import storage
 from datetime import timedelta
 import hashlib
 import logging
-from typing import Tuple
+from typing import Optional, Tuple
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'svg': 'image/svg+xml',
+}
+
 
 class ChartStorage:
     """Handle chart uploads to Google Cloud Storage"""
@@ -25,18 +31,19 @@ class ChartStorage:
             self.client = None
             self.bucket = None
     
-    def generate_chart_path(self, signal_type: str, data_hash: str) -> str:
+    def generate_chart_path(self, signal_type: str, data_hash: str, chart_format: str = "png") -> str:
         """
         Generate unique chart path based on signal type and data hash
         
         Args:
             signal_type: Type of signal (mempool, exchange, etc.)
             data_hash: Hash of chart data for uniqueness
+            chart_format: Image format used as the file extension
             
         Returns:
             GCS path for the chart
         """
-        return f"charts/{signal_type}/{data_hash}.png"
+        return f"charts/{signal_type}/{data_hash}.{chart_format}"
     
     def hash_data(self, data: bytes) -> str:
         """
@@ -50,13 +57,74 @@ class ChartStorage:
         """
         return hashlib.sha256(data).hexdigest()[:16]
     
-    def upload_chart(self, chart_data: bytes, signal_type: str) -> Tuple[str, str, int]:
+    def hash_request(self, signal_type: str, canonical_request: str) -> str:
+        """
+        Generate hash of a canonicalized chart request
+        
+        Identical requests render identical charts, so this hash addresses
+        the chart before it has been rendered.
+        
+        Args:
+            signal_type: Type of signal (mempool, exchange, etc.)
+            canonical_request: Request JSON with sorted keys
+            
+        Returns:
+            SHA256 hash string
+        """
+        return self.hash_data(f"{signal_type}:{canonical_request}".encode('utf-8'))
+    
+    def get_chart(
+        self,
+        signal_type: str,
+        data_hash: str,
+        chart_format: str = "png"
+    ) -> Optional[Tuple[str, str, int]]:
+        """
+        Look up a previously uploaded chart
+        
+        Args:
+            signal_type: Type of signal for path organization
+            data_hash: Hash the chart was uploaded under
+            chart_format: Image format of the chart
+            
+        Returns:
+            Tuple of (signed_url, gcs_path, size_bytes), or None if not stored
+        """
+        if not self.bucket:
+            return None
+        
+        chart_path = self.generate_chart_path(signal_type, data_hash, chart_format)
+        try:
+            blob = self.bucket.get_blob(chart_path)
+            if blob is None:
+                return None
+            
+            signed_url = blob.generate_signed_url(
+                version='v4',
+                expiration=timedelta(days=7),
+                method='GET'
+            )
+            return signed_url, chart_path, blob.size
+            
+        except Exception as e:
+            logger.warning(f"Failed to look up chart {chart_path}: {e}")
+            return None
+    
+    def upload_chart(
+        self,
+        chart_data: bytes,
+        signal_type: str,
+        data_hash: Optional[str] = None,
+        chart_format: str = "png"
+    ) -> Tuple[str, str, int]:
         """
         Upload chart to GCS and return signed URL
         
         Args:
-            chart_data: PNG image bytes
+            chart_data: Image bytes
             signal_type: Type of signal for path organization
+            data_hash: Hash to store the chart under (defaults to hash of chart_data)
+            chart_format: Image format (png, webp or svg)
             
         Returns:
             Tuple of (signed_url, gcs_path, size_bytes)
@@ -64,8 +132,8 @@ class ChartStorage:
         if not self.bucket:
             # Fallback for local development without GCS
             logger.warning("GCS not configured, returning mock URL")
-            data_hash = self.hash_data(chart_data)
-            mock_path = self.generate_chart_path(signal_type, data_hash)
+            data_hash = data_hash or self.hash_data(chart_data)
+            mock_path = self.generate_chart_path(signal_type, data_hash, chart_format)
             return (
                 f"http://localhost:8080/mock/{mock_path}",
                 mock_path,
@@ -74,14 +142,14 @@ class ChartStorage:
         
         try:
             # Generate unique path
-            data_hash = self.hash_data(chart_data)
-            chart_path = self.generate_chart_path(signal_type, data_hash)
+            data_hash = data_hash or self.hash_data(chart_data)
+            chart_path = self.generate_chart_path(signal_type, data_hash, chart_format)
             
             # Upload to GCS
             blob = self.bucket.blob(chart_path)
             blob.upload_from_string(
                 chart_data,
-                content_type='image/png',
+                content_type=CONTENT_TYPES.get(chart_format, 'application/octet-stream'),
                 timeout=30
             )
             
@@ -190,6 +190,75 @@ class TestPredictiveEndpoint:
         assert "chart_url" in data
 
 
+class TestBatchEndpoint:
+    """Tests for batch chart endpoint"""
+    
+    def mempool_request(self, block_height: int = 800000) -> dict:
+        return {
+            "block_height": block_height,
+            "timestamp": datetime(2025, 11, 7, 10, 30).isoformat(),
+            "fee_quantiles": {"p10": 5.0, "p25": 10.0, "p50": 20.0, "p75": 35.0, "p90": 50.0},
+            "avg_fee_rate": 25.0,
+            "transaction_count": 2500
+        }
+    
+    def test_render_mixed_batch(self):
+        """Test heterogeneous charts are rendered with per-item results"""
+        now = datetime.now()
+        whale_request = {
+            "address": "bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh",
+            "timestamps": [(now - timedelta(days=i)).isoformat() for i in range(10, 0, -1)],
+            "balances": [1000.0 + i * 5 for i in range(10)],
+            "seven_day_changes": [5.0 if i % 3 else -2.0 for i in range(10)],
+            "accumulation_streak_days": 4,
+            "size": "mobile"
+        }
+        
+        response = client.post("/render/batch", json={"charts": [
+            {"id": "fees", "chart_type": "mempool", "request": self.mempool_request()},
+            {"id": "whale", "chart_type": "whale", "request": whale_request},
+        ]})
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["succeeded"] == 2
+        assert data["failed"] == 0
+        assert [r["id"] for r in data["results"]] == ["fees", "whale"]
+        assert data["results"][0]["chart"]["chart_path"].startswith("charts/mempool/")
+        assert data["results"][1]["chart"]["width"] == 800
+        assert data["results"][1]["chart"]["height"] == int(800 * 0.375 * 1.5)
+    
+    def test_invalid_item_does_not_fail_batch(self):
+        """Test a bad item reports an error while others succeed"""
+        response = client.post("/render/batch", json={"charts": [
+            {"chart_type": "mempool", "request": self.mempool_request(800002)},
+            {"chart_type": "mempool", "request": {"block_height": -1}},
+        ]})
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["succeeded"] == 1
+        assert data["failed"] == 1
+        assert data["results"][0]["status"] == "ok"
+        assert data["results"][1]["status"] == "error"
+        assert "Invalid mempool request" in data["results"][1]["error"]
+    
+    def test_duplicate_items_share_chart(self):
+        """Test identical items in one batch return the same chart"""
+        item = {"chart_type": "mempool", "request": self.mempool_request(800003)}
+        
+        response = client.post("/render/batch", json={"charts": [item, item, item]})
+        assert response.status_code == 200
+        
+        paths = {r["chart"]["chart_path"] for r in response.json()["results"]}
+        assert len(paths) == 1
+    
+    def test_empty_batch_rejected(self):
+        """Test a batch must contain at least one chart"""
+        response = client.post("/render/batch", json={"charts": []})
+        assert response.status_code == 422
+
+
 class TestErrorHandling:
     """Tests for error handling"""
     
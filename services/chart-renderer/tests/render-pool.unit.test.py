@@ -0,0 +1,160 @@
+"""
+Tests for the render worker pool and content-addressed chart cache
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from src.models import MempoolChartRequest, SignalType
+from src.render_pool import RenderPool, RenderQueueFull, canonicalize_request
+from src.storage import ChartStorage
+
+
+def make_request(**overrides) -> MempoolChartRequest:
+    """Build a mempool chart request"""
+    data = {
+        "block_height": 800000,
+        "timestamp": datetime(2025, 11, 7, 10, 30),
+        "fee_quantiles": {"p10": 5.0, "p25": 10.0, "p50": 20.0, "p75": 35.0, "p90": 50.0},
+        "avg_fee_rate": 25.0,
+        "transaction_count": 2500,
+    }
+    data.update(overrides)
+    return MempoolChartRequest(**data)
+
+
+@pytest.fixture
+def storage():
+    """Chart storage without GCS"""
+    storage = ChartStorage()
+    storage.bucket = None
+    return storage
+
+
+@pytest.fixture
+def pool(storage):
+    """Render pool whose worker renders are replaced by a counter"""
+    pool = RenderPool(storage, max_workers=1, max_queue=4)
+    pool.render_calls = 0
+    
+    async def fake_render(signal_type, canonical_request):
+        pool.render_calls += 1
+        await asyncio.sleep(0.01)
+        return b"png"
+    
+    pool.render_bytes = fake_render
+    yield pool
+    pool.shutdown()
+
+
+class TestCacheKey:
+    """Tests for request canonicalization"""
+    
+    def test_field_order_does_not_change_key(self, storage):
+        """Test equal requests hash the same regardless of key order"""
+        first = make_request(fee_quantiles={"p10": 5.0, "p50": 20.0})
+        second = make_request(fee_quantiles={"p50": 20.0, "p10": 5})
+        
+        assert canonicalize_request(first) == canonicalize_request(second)
+        assert storage.hash_request("mempool", canonicalize_request(first)) == \
+            storage.hash_request("mempool", canonicalize_request(second))
+    
+    def test_different_requests_have_different_keys(self, storage):
+        """Test changed data or chart type changes the key"""
+        canonical = canonicalize_request(make_request())
+        other = canonicalize_request(make_request(block_height=800001))
+        
+        assert storage.hash_request("mempool", canonical) != storage.hash_request("mempool", other)
+        assert storage.hash_request("mempool", canonical) != storage.hash_request("whale", canonical)
+
+
+class TestRenderPool:
+    """Tests for render pool caching and coalescing"""
+    
+    async def test_identical_request_is_not_rendered_twice(self, pool):
+        """Test cached chart path is returned without rendering"""
+        first = await pool.render_chart(SignalType.MEMPOOL, make_request())
+        second = await pool.render_chart(SignalType.MEMPOOL, make_request())
+        
+        assert pool.render_calls == 1
+        assert second.chart_path == first.chart_path
+        assert second.cached and not first.cached
+        assert pool.get_stats()["cache_hits"] == 1
+    
+    async def test_concurrent_duplicates_are_coalesced(self, pool):
+        """Test concurrent identical requests share one render"""
+        charts = await asyncio.gather(*[
+            pool.render_chart(SignalType.MEMPOOL, make_request()) for _ in range(5)
+        ])
+        
+        assert pool.render_calls == 1
+        assert len({chart.chart_path for chart in charts}) == 1
+        assert pool.coalesced_requests == 4
+    
+    async def test_stored_chart_skips_render(self, pool, storage):
+        """Test a chart already in storage is reused"""
+        storage.get_chart = MagicMock(return_value=("https://signed", "charts/mempool/abc.png", 42))
+        
+        chart = await pool.render_chart(SignalType.MEMPOOL, make_request())
+        
+        assert pool.render_calls == 0
+        assert chart.chart_url == "https://signed"
+        assert pool.storage_hits == 1
+    
+    async def test_failure_propagates_to_coalesced_waiters(self, pool):
+        """Test a failed render fails every waiter and is not cached"""
+        async def failing_render(signal_type, canonical_request):
+            await asyncio.sleep(0.01)
+            raise ValueError("bad data")
+        
+        pool.render_bytes = failing_render
+        results = await asyncio.gather(*[
+            pool.render_chart(SignalType.MEMPOOL, make_request()) for _ in range(2)
+        ], return_exceptions=True)
+        
+        assert all(isinstance(result, ValueError) for result in results)
+        assert pool.get_stats()["cached_charts"] == 0
+    
+    async def test_cancelled_leader_releases_waiters(self, pool):
+        """Test cancelling the rendering request does not leave waiters hanging"""
+        async def slow_render(signal_type, canonical_request):
+            await asyncio.sleep(10)
+            return b"png"
+        
+        pool.render_bytes = slow_render
+        leader = asyncio.create_task(pool.render_chart(SignalType.MEMPOOL, make_request()))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(pool.render_chart(SignalType.MEMPOOL, make_request()))
+        await asyncio.sleep(0.01)
+        
+        leader.cancel()
+        results = await asyncio.wait_for(
+            asyncio.gather(leader, waiter, return_exceptions=True), timeout=1
+        )
+        
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        assert pool.coalesced_requests == 1
+        assert pool.get_stats()["inflight"] == 0
+    
+    async def test_queue_full_rejects(self, storage):
+        """Test renders beyond the queue bound are rejected"""
+        pool = RenderPool(storage, max_workers=1, max_queue=1)
+        pool._queued = 1
+        
+        with pytest.raises(RenderQueueFull):
+            await pool.render_bytes(SignalType.MEMPOOL, canonicalize_request(make_request()))
+        assert pool.rejected_requests == 1
+    
+    async def test_renders_in_worker_process(self, storage):
+        """Test a real render in the process pool produces a PNG"""
+        pool = RenderPool(storage, max_workers=1)
+        try:
+            chart_bytes = await pool.render_bytes(
+                SignalType.MEMPOOL, canonicalize_request(make_request())
+            )
+        finally:
+            pool.shutdown()
+        
+        assert chart_bytes[:8] == b"\x89PNG\r\n\x1a\n"
+        assert pool.renders == 1
@@ -12,7 +12,8 @@ from src.models import (
     MinerChartRequest,
     WhaleChartRequest,
     PredictiveChartRequest,
-    ChartSize
+    ChartSize,
+    ChartFormat
 )
 from src.renderers import (
     MempoolRenderer,
@@ -249,3 +250,110 @@ class TestChartStyling:
         aspect_ratio = img.width / img.height
         expected_ratio = 16 / 6
         assert abs(aspect_ratio - expected_ratio) < 0.5  # Allow some variance
+
+
+class TestFigureTemplates:
+    """Tests for figure template reuse and output formats"""
+    
+    def make_request(self, **overrides):
+        """Build a mempool chart request"""
+        data = dict(
+            block_height=800000,
+            timestamp=datetime.now(),
+            fee_quantiles={"p10": 5.0, "p25": 10.0, "p50": 20.0, "p75": 35.0, "p90": 50.0},
+            avg_fee_rate=25.0,
+            transaction_count=2500,
+            size=ChartSize.DESKTOP
+        )
+        data.update(overrides)
+        return MempoolChartRequest(**data)
+    
+    def test_template_reused_per_size(self):
+        """Test one figure is built per chart size and reused"""
+        renderer = MempoolRenderer()
+        
+        renderer.render(self.make_request())
+        template = renderer.get_template(ChartSize.DESKTOP)
+        renderer.render(self.make_request(block_height=800001))
+        renderer.render(self.make_request(size=ChartSize.MOBILE))
+        
+        assert renderer.get_template(ChartSize.DESKTOP) is template
+        assert len(renderer._templates) == 2
+    
+    def test_template_updates_data(self):
+        """Test reused template reflects the latest request"""
+        renderer = MempoolRenderer()
+        
+        renderer.render(self.make_request())
+        renderer.render(self.make_request(block_height=812345, avg_fee_rate=80.0))
+        artists = renderer.get_template(ChartSize.DESKTOP).artists
+        
+        assert artists['subtitle'].get_text().startswith('Block 812,345')
+        assert artists['avg_line'].get_ydata()[0] == 80.0
+        assert artists['legend'].get_texts()[0].get_text() == 'Avg: 80.0 sat/vB'
+    
+    def test_dynamic_artists_replaced(self):
+        """Test per-render artists do not accumulate across renders"""
+        renderer = ExchangeRenderer()
+        now = datetime.now()
+        request = ExchangeChartRequest(
+            entity_name="Binance",
+            timestamps=[now - timedelta(hours=i) for i in range(24, 0, -1)],
+            inflows=[100.0 + i * 10 for i in range(24)],
+            outflows=[80.0 + i * 8 for i in range(24)],
+            net_flows=[20.0 + i * 2 for i in range(24)],
+            spike_threshold=300.0
+        )
+        
+        renderer.render(request)
+        ax = renderer.get_template(ChartSize.DESKTOP).axes[0]
+        collections = len(ax.collections)
+        renderer.render(request)
+        
+        assert len(ax.collections) == collections
+    
+    def test_exact_pixel_size(self):
+        """Test output matches the configured pixel size"""
+        renderer = MinerRenderer()
+        now = datetime.now()
+        request = MinerChartRequest(
+            entity_name="Foundry USA",
+            timestamps=[now - timedelta(days=i) for i in range(30, 0, -1)],
+            balances=[1000.0 + i * 5 for i in range(30)],
+            daily_changes=[5.0 if i % 2 else -3.0 for i in range(30)],
+            size=ChartSize.MOBILE
+        )
+        
+        img = Image.open(BytesIO(renderer.render(request)))
+        
+        width, height = renderer.get_figure_size(ChartSize.MOBILE)
+        assert img.size == (width, int(height * 1.5))
+    
+    def test_webp_output(self):
+        """Test WebP output mode"""
+        renderer = MempoolRenderer()
+        
+        chart_bytes = renderer.render(self.make_request(format=ChartFormat.WEBP))
+        
+        assert Image.open(BytesIO(chart_bytes)).format == 'WEBP'
+    
+    def test_svg_output(self):
+        """Test SVG output mode"""
+        renderer = MempoolRenderer()
+        
+        chart_bytes = renderer.render(self.make_request(format=ChartFormat.SVG))
+        
+        assert b'<svg' in chart_bytes[:500]
+    
+    def test_png_compression_level(self, monkeypatch):
+        """Test PNG compression level is tunable"""
+        renderer = MempoolRenderer()
+        request = self.make_request()
+        
+        monkeypatch.setattr('src.renderers.base_renderer.settings.chart_png_compress_level', 0)
+        uncompressed = renderer.render(request)
+        monkeypatch.setattr('src.renderers.base_renderer.settings.chart_png_compress_level', 9)
+        compressed = renderer.render(request)
+        
+        assert len(compressed) < len(uncompressed)
+        assert Image.open(BytesIO(compressed)).format == 'PNG'
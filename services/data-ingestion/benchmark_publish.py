@@ -0,0 +1,91 @@
+"""
+Benchmark Pub/Sub transaction publishing against the local emulator
+
+Usage:
+    docker compose up -d pubsub-emulator
+    PUBSUB_EMULATOR_HOST=localhost:8085 python benchmark_publish.py --transactions 4000
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from pubsub_streamer import PubSubStreamer
+
+
+def make_transactions(count: int, block_height: int) -> list:
+    """Build synthetic normalized transactions of realistic size"""
+    return [
+        {
+            'tx_hash': f'{block_height:08x}{i:056x}',
+            'block_height': block_height,
+            'size': 250,
+            'vsize': 141,
+            'weight': 561,
+            'fee': 2820,
+            'inputs': [{'txid': f'{i:064x}', 'vout': 0, 'value': 0.015}],
+            'outputs': [
+                {'value': 0.01, 'address': f'bc1q{i:038x}', 'script_type': 'witness_v0_keyhash'},
+                {'value': 0.00497180, 'address': f'bc1q{i + 1:038x}', 'script_type': 'witness_v0_keyhash'}
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def run_mode(label: str, streamer: PubSubStreamer, transactions: list, block_height: int):
+    """Publish one block worth of transactions and print timings"""
+    start = time.perf_counter()
+    if streamer.pipelined:
+        result = streamer.publish_transactions_pipelined(transactions, block_height)
+        published, messages, failures = (
+            len(transactions) - len(result.failures), result.messages, len(result.failures)
+        )
+    else:
+        published = len(streamer.publish_transactions(transactions, block_height))
+        messages, failures = published, len(transactions) - published
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<24} {elapsed:8.3f}s  {published / elapsed:10,.0f} tx/s  "
+          f"{messages:6d} msgs  {failures} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pub/Sub publish benchmark')
+    parser.add_argument('--transactions', type=int, default=4000, help='Transactions per block')
+    parser.add_argument('--envelope-size', type=int, default=500, help='Transactions per envelope')
+    parser.add_argument('--skip-sequential', action='store_true', help='Skip the sequential baseline')
+    args = parser.parse_args()
+
+    if not os.getenv('PUBSUB_EMULATOR_HOST'):
+        print("PUBSUB_EMULATOR_HOST is not set; refusing to publish to a real project")
+        return 1
+
+    project_id = os.getenv('PUBSUB_PROJECT_ID', 'utxoiq-local')
+    transactions = make_transactions(args.transactions, 820000)
+    print(f"Publishing {len(transactions)} transactions to {os.getenv('PUBSUB_EMULATOR_HOST')}")
+    print("-" * 70)
+
+    modes = [
+        ('pipelined', dict(pipelined=True, envelope_size=0)),
+        (f'envelope x{args.envelope_size}', dict(pipelined=True, envelope_size=args.envelope_size)),
+    ]
+    if not args.skip_sequential:
+        modes.insert(0, ('sequential', dict(pipelined=False)))
+
+    for label, options in modes:
+        streamer = PubSubStreamer(project_id=project_id, **options)
+        try:
+            run_mode(label, streamer, transactions, 820000)
+        finally:
+            streamer.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -83,6 +83,8 @@ class BlockchainIngestionService:
         except Exception as e:
             logger.error(f"Failed to start ingestion service: {str(e)}", exc_info=True)
             raise
+        finally:
+            self.pubsub_streamer.close()
     
     def _process_new_blocks(self):
         """Check for and process new blocks"""
@@ -106,7 +108,7 @@ class BlockchainIngestionService:
                     
                     # Normalize and publish block data
                     normalized_block = self.normalizer.normalize_block(raw_block)
-                    self.pubsub_streamer.publish_block(normalized_block)
+                    block_future = self.pubsub_streamer.publish_block(normalized_block, wait=False)
                     
                     # Process transactions
                     transactions = []
@@ -117,6 +119,9 @@ class BlockchainIngestionService:
                     if transactions:
                         self.pubsub_streamer.publish_transactions(transactions, next_height)
                     
+                    # Block message was batched alongside the transactions
+                    block_future.result(timeout=self.pubsub_streamer.publish_timeout)
+                    
                     self.last_processed_height = next_height
                     logger.info(f"Processed block {next_height} ({len(transactions)} transactions)")
                     
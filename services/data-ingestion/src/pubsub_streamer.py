@@ -4,21 +4,77 @@ Publishes normalized blockchain data to Pub/Sub topics
 """
 
 import os
+import gzip
 import json
+import time
 import logging
-from typing import Dict, Any
+from concurrent import futures as concurrent_futures
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 from google.cloud import pubsub_v1
 from google.api_core import retry
 
 logger = logging.getLogger(__name__)
 
+# Pub/Sub rejects messages larger than 10 MB; stay well below it
+MAX_ENVELOPE_BYTES = 8 * 1024 * 1024
+
+
+@dataclass
+class PublishResult:
+    """Outcome of a pipelined publish"""
+    message_ids: List[str] = field(default_factory=list)
+    failures: List[Tuple[str, str]] = field(default_factory=list)  # (tx_hash, error)
+    messages: int = 0
+    bytes_published: int = 0
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
 
 class PubSubStreamer:
     """Streams blockchain data to Cloud Pub/Sub topics"""
     
-    def __init__(self, project_id: str = None):
+    def __init__(
+        self,
+        project_id: str = None,
+        pipelined: bool = None,
+        envelope_size: int = None,
+        publish_timeout: float = None
+    ):
         self.project_id = project_id or os.getenv('GCP_PROJECT_ID')
-        self.publisher = pubsub_v1.PublisherClient()
+        
+        # Pipelined mode resolves all transaction futures together instead of
+        # waiting for each round trip; envelope_size > 1 additionally packs that
+        # many transactions into one gzip-compressed message
+        if pipelined is None:
+            pipelined = os.getenv('PUBSUB_PUBLISH_MODE', 'pipelined') == 'pipelined'
+        self.pipelined = pipelined
+        self.envelope_size = envelope_size if envelope_size is not None else int(
+            os.getenv('PUBSUB_TX_ENVELOPE_SIZE', '0')
+        )
+        self.publish_timeout = publish_timeout or float(os.getenv('PUBSUB_PUBLISH_TIMEOUT', '30'))
+        
+        # Client-side batching bounds how many messages share one publish RPC;
+        # flow control blocks publish() instead of buffering without limit
+        batch_settings = pubsub_v1.types.BatchSettings(
+            max_messages=int(os.getenv('PUBSUB_BATCH_MAX_MESSAGES', '1000')),
+            max_bytes=int(os.getenv('PUBSUB_BATCH_MAX_BYTES', str(4 * 1024 * 1024))),
+            max_latency=float(os.getenv('PUBSUB_BATCH_MAX_LATENCY', '0.05')),
+        )
+        publisher_options = pubsub_v1.types.PublisherOptions(
+            flow_control=pubsub_v1.types.PublishFlowControl(
+                message_limit=int(os.getenv('PUBSUB_FLOW_MAX_MESSAGES', '10000')),
+                byte_limit=int(os.getenv('PUBSUB_FLOW_MAX_BYTES', str(64 * 1024 * 1024))),
+                limit_exceeded_behavior=pubsub_v1.types.LimitExceededBehavior.BLOCK,
+            )
+        )
+        self.publisher = pubsub_v1.PublisherClient(
+            batch_settings=batch_settings,
+            publisher_options=publisher_options
+        )
         
         # Topic paths
         self.blocks_topic = self.publisher.topic_path(
@@ -56,8 +112,8 @@ class PubSubStreamer:
                 except Exception as e:
                     logger.error(f"Failed to create topic {topic_path}: {str(e)}")
     
-    def publish_block(self, block_data: Dict) -> str:
-        """Publish block data to Pub/Sub"""
+    def publish_block(self, block_data: Dict, wait: bool = True):
+        """Publish block data to Pub/Sub (returns the future if wait is False)"""
         try:
             message_data = json.dumps(block_data).encode('utf-8')
             
@@ -73,6 +129,8 @@ class PubSubStreamer:
                 message_data,
                 **attributes
             )
+            if not wait:
+                return future
             
             message_id = future.result(timeout=10)
             logger.info(f"Published block {block_data.get('height')} to Pub/Sub: {message_id}")
@@ -84,6 +142,9 @@ class PubSubStreamer:
     
     def publish_transactions(self, transactions: list, block_height: int) -> list:
         """Publish multiple transactions to Pub/Sub"""
+        if self.pipelined:
+            return self.publish_transactions_pipelined(transactions, block_height).message_ids
+        
         message_ids = []
         
         for tx in transactions:
@@ -111,8 +172,84 @@ class PubSubStreamer:
         logger.info(f"Published {len(message_ids)} transactions for block {block_height}")
         return message_ids
     
-    def publish_mempool_snapshot(self, mempool_data: Dict) -> str:
-        """Publish mempool snapshot to Pub/Sub"""
+    def publish_transactions_pipelined(self, transactions: list, block_height: int) -> PublishResult:
+        """Publish all transactions, then wait for every future together"""
+        result = PublishResult()
+        start = time.perf_counter()
+        pending = []  # (future, tx hashes covered by the message)
+        
+        for message_data, attributes, tx_hashes in self._transaction_messages(transactions, block_height):
+            try:
+                future = self.publisher.publish(
+                    self.transactions_topic,
+                    message_data,
+                    **attributes
+                )
+                pending.append((future, tx_hashes))
+                result.messages += 1
+                result.bytes_published += len(message_data)
+            except Exception as e:
+                result.failures.extend((tx_hash, str(e)) for tx_hash in tx_hashes)
+        
+        concurrent_futures.wait([future for future, _ in pending], timeout=self.publish_timeout)
+        
+        for future, tx_hashes in pending:
+            try:
+                result.message_ids.append(future.result(timeout=0))
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                result.failures.extend((tx_hash, error) for tx_hash in tx_hashes)
+        
+        result.elapsed_seconds = time.perf_counter() - start
+        
+        if result.failures:
+            logger.error(
+                f"Failed to publish {len(result.failures)} of {len(transactions)} transactions "
+                f"for block {block_height}: {result.failures[0][1]}"
+            )
+        logger.info(
+            f"Published {len(transactions) - len(result.failures)} transactions for block "
+            f"{block_height} in {result.messages} messages ({result.bytes_published} bytes, "
+            f"{result.elapsed_seconds:.3f}s)"
+        )
+        return result
+    
+    def _transaction_messages(self, transactions: list, block_height: int):
+        """Yield (data, attributes, tx_hashes) for each transaction message"""
+        if self.envelope_size <= 1:
+            for tx in transactions:
+                tx_hash = tx.get('tx_hash', '')
+                attributes = {
+                    'block_height': str(block_height),
+                    'tx_hash': tx_hash,
+                    'data_type': 'transaction'
+                }
+                yield json.dumps(tx).encode('utf-8'), attributes, [tx_hash]
+            return
+        
+        for offset in range(0, len(transactions), self.envelope_size):
+            chunk = transactions[offset:offset + self.envelope_size]
+            for message_data, tx_hashes in self._pack_envelope(chunk):
+                attributes = {
+                    'block_height': str(block_height),
+                    'data_type': 'transaction_batch',
+                    'encoding': 'gzip',
+                    'tx_count': str(len(tx_hashes))
+                }
+                yield message_data, attributes, tx_hashes
+    
+    def _pack_envelope(self, transactions: list):
+        """Gzip a JSON array of transactions, splitting if it exceeds the size limit"""
+        message_data = gzip.compress(json.dumps(transactions).encode('utf-8'), compresslevel=6)
+        if len(message_data) > MAX_ENVELOPE_BYTES and len(transactions) > 1:
+            middle = len(transactions) // 2
+            yield from self._pack_envelope(transactions[:middle])
+            yield from self._pack_envelope(transactions[middle:])
+            return
+        yield message_data, [tx.get('tx_hash', '') for tx in transactions]
+    
+    def publish_mempool_snapshot(self, mempool_data: Dict, wait: bool = True):
+        """Publish mempool snapshot to Pub/Sub (returns the future if wait is False)"""
         try:
             message_data = json.dumps(mempool_data).encode('utf-8')
             
@@ -126,6 +263,8 @@ class PubSubStreamer:
                 message_data,
                 **attributes
             )
+            if not wait:
+                return future
             
             message_id = future.result(timeout=10)
             logger.info(f"Published mempool snapshot to Pub/Sub: {message_id}")
@@ -161,3 +300,7 @@ class PubSubStreamer:
         except Exception as e:
             logger.error(f"Failed to publish anomaly alert: {str(e)}")
             raise
+    
+    def close(self):
+        """Flush messages still held in client-side batches and stop the publisher"""
+        self.publisher.stop()
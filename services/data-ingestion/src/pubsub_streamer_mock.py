@@ -6,6 +6,7 @@ Logs data instead of publishing to Pub/Sub
 import os
 import json
 import logging
+from concurrent.futures import Future
 from typing import Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -16,29 +17,42 @@ class PubSubStreamer:
     
     def __init__(self, project_id: str = None):
         self.project_id = project_id or os.getenv('GCP_PROJECT_ID', 'utxoiq-local')
+        self.publish_timeout = float(os.getenv('PUBSUB_PUBLISH_TIMEOUT', '30'))
         logger.info("Using MOCK Pub/Sub streamer (local development mode)")
         logger.info("Data will be logged instead of published to Pub/Sub")
     
-    def publish_block(self, block_data: Dict) -> str:
+    def publish_block(self, block_data: Dict, wait: bool = True):
         """Log block data instead of publishing"""
         logger.info(f"[MOCK] Would publish block {block_data.get('height')} "
                    f"(hash: {block_data.get('block_hash', '')[:16]}...)")
-        return f"mock_msg_{block_data.get('height')}"
+        return self._result(f"mock_msg_{block_data.get('height')}", wait)
     
     def publish_transactions(self, transactions: list, block_height: int) -> list:
         """Log transaction data instead of publishing"""
         logger.info(f"[MOCK] Would publish {len(transactions)} transactions for block {block_height}")
         return [f"mock_tx_{i}" for i in range(len(transactions))]
     
-    def publish_mempool_snapshot(self, mempool_data: Dict) -> str:
+    def publish_mempool_snapshot(self, mempool_data: Dict, wait: bool = True):
         """Log mempool snapshot instead of publishing"""
         logger.info(f"[MOCK] Would publish mempool snapshot: "
                    f"{mempool_data.get('size', 0)} txs, "
                    f"{mempool_data.get('avg_fee_rate', 0):.2f} sat/byte")
-        return "mock_mempool_msg"
+        return self._result("mock_mempool_msg", wait)
     
     def publish_anomaly_alert(self, anomaly_data: Dict) -> str:
         """Log anomaly alert instead of publishing"""
         logger.warning(f"[MOCK] Would publish anomaly: {anomaly_data.get('type')} - "
                       f"{anomaly_data.get('description', '')}")
         return "mock_anomaly_msg"
+    
+    def close(self):
+        """Nothing to flush in mock mode"""
+        pass
+    
+    def _result(self, message_id: str, wait: bool):
+        """Return the message ID, or a completed future when not waiting"""
+        if wait:
+            return message_id
+        future = Future()
+        future.set_result(message_id)
+        return future
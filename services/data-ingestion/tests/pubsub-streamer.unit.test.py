@@ -0,0 +1,127 @@
+"""
+Unit tests for Pub/Sub streamer publishing modes
+"""
+
+import gzip
+import json
+import unittest
+from concurrent.futures import Future
+from unittest.mock import Mock, patch
+
+from src.pubsub_streamer import PubSubStreamer
+
+
+def _future(message_id: str = None, error: Exception = None) -> Future:
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(message_id)
+    return future
+
+
+def _transactions(count: int) -> list:
+    return [{'tx_hash': f'tx{i}', 'fee': i} for i in range(count)]
+
+
+class TestPubSubStreamer(unittest.TestCase):
+    """Test PubSubStreamer publishing"""
+
+    def setUp(self):
+        patcher = patch('src.pubsub_streamer.pubsub_v1.PublisherClient')
+        self.client_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.publisher = self.client_cls.return_value
+        self.publisher.topic_path.side_effect = lambda project, topic: f'projects/{project}/topics/{topic}'
+        self.published = []
+
+        def publish(topic, data, **attributes):
+            self.published.append((topic, data, attributes))
+            return _future(f'msg{len(self.published)}')
+
+        self.publisher.publish.side_effect = publish
+
+    def test_publisher_uses_batching_and_flow_control(self):
+        """Test client is created with batch settings and blocking flow control"""
+        PubSubStreamer(project_id='test')
+
+        kwargs = self.client_cls.call_args.kwargs
+        self.assertGreater(kwargs['batch_settings'].max_messages, 1)
+        flow_control = kwargs['publisher_options'].flow_control
+        self.assertEqual(flow_control.limit_exceeded_behavior.name, 'BLOCK')
+
+    def test_pipelined_publishes_before_waiting(self):
+        """Test all messages are handed to the client before any result is awaited"""
+        streamer = PubSubStreamer(project_id='test', pipelined=True)
+        pending = [Mock(spec=Future) for _ in range(3)]
+        for i, future in enumerate(pending):
+            future.result.return_value = f'msg{i}'
+            future.done.return_value = True
+        self.publisher.publish.side_effect = pending
+
+        with patch('src.pubsub_streamer.concurrent_futures.wait') as wait:
+            message_ids = streamer.publish_transactions(_transactions(3), 820000)
+
+        self.assertEqual(message_ids, ['msg0', 'msg1', 'msg2'])
+        wait.assert_called_once()
+        self.assertEqual(len(wait.call_args.args[0]), 3)
+
+    def test_pipelined_reports_failures(self):
+        """Test failed messages are reported per transaction"""
+        streamer = PubSubStreamer(project_id='test', pipelined=True)
+        self.publisher.publish.side_effect = [
+            _future('msg0'),
+            _future(error=RuntimeError('deadline exceeded')),
+            _future('msg2'),
+        ]
+
+        result = streamer.publish_transactions_pipelined(_transactions(3), 820000)
+
+        self.assertEqual(result.message_ids, ['msg0', 'msg2'])
+        self.assertEqual(result.failures, [('tx1', 'deadline exceeded')])
+        self.assertFalse(result.ok)
+
+    def test_sequential_mode(self):
+        """Test legacy mode publishes one message per transaction"""
+        streamer = PubSubStreamer(project_id='test', pipelined=False)
+
+        message_ids = streamer.publish_transactions(_transactions(2), 820000)
+
+        self.assertEqual(message_ids, ['msg1', 'msg2'])
+        self.assertEqual(self.published[0][2]['data_type'], 'transaction')
+
+    def test_envelope_packs_transactions(self):
+        """Test transactions are packed into gzip envelopes"""
+        streamer = PubSubStreamer(project_id='test', envelope_size=4)
+
+        result = streamer.publish_transactions_pipelined(_transactions(10), 820000)
+
+        self.assertEqual(result.messages, 3)
+        _, data, attributes = self.published[0]
+        self.assertEqual(attributes['data_type'], 'transaction_batch')
+        self.assertEqual(attributes['encoding'], 'gzip')
+        self.assertEqual(attributes['tx_count'], '4')
+        self.assertEqual(json.loads(gzip.decompress(data)), _transactions(4))
+        self.assertEqual(self.published[-1][2]['tx_count'], '2')
+
+    def test_envelope_failure_covers_all_transactions(self):
+        """Test a failed envelope reports every transaction it carried"""
+        streamer = PubSubStreamer(project_id='test', envelope_size=5)
+        self.publisher.publish.side_effect = [_future(error=RuntimeError('unavailable'))]
+
+        result = streamer.publish_transactions_pipelined(_transactions(5), 820000)
+
+        self.assertEqual([tx_hash for tx_hash, _ in result.failures], [f'tx{i}' for i in range(5)])
+
+    def test_publish_block_without_waiting(self):
+        """Test block publish returns the future when wait is False"""
+        streamer = PubSubStreamer(project_id='test')
+
+        future = streamer.publish_block({'height': 820000, 'block_hash': 'abc'}, wait=False)
+
+        self.assertIsInstance(future, Future)
+        self.assertEqual(future.result(), 'msg1')
+
+
+if __name__ == '__main__':
+    unittest.main()
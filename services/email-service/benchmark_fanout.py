@@ -0,0 +1,166 @@
+"""
+Benchmark daily brief fan-out against a local SendGrid stub
+
+A stub of the SendGrid v3 mail send endpoint runs in-process and answers
+202 after a fixed latency. BigQuery is replaced by an in-memory sink so only
+rendering and sending are measured.
+
+Usage:
+    python benchmark_fanout.py --users 5000 --latency 0.05
+    python benchmark_fanout.py --host http://localhost:3030  # external stub
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+
+class SendGridStub(BaseHTTPRequestHandler):
+    """Accept mail send requests and count recipients"""
+
+    latency = 0.05
+    requests = 0
+    recipients = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.latency)
+        with self.lock:
+            SendGridStub.requests += 1
+            SendGridStub.recipients += len(body.get('personalizations', []))
+        self.send_response(202)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class EngagementSink:
+    """In-memory stand-in for BigQueryClient"""
+
+    def __init__(self):
+        self.rows = 0
+
+    def track_engagement(self, engagement):
+        self.rows += 1
+
+    def track_engagements(self, engagements):
+        self.rows += len(engagements)
+
+
+def make_brief(insight_count: int):
+    """Build a synthetic daily brief with insights of every signal type"""
+    from src.models import DailyBrief, Insight, SignalType
+
+    signal_types = [signal_type.value for signal_type in SignalType]
+    return DailyBrief(
+        date='2025-11-06',
+        summary="Today's top blockchain events",
+        insights=[
+            Insight(
+                id=f'insight_{i}',
+                signal_type=signal_types[i % len(signal_types)],
+                headline=f'Signal {i} headline',
+                summary='Synthetic insight used for fan-out benchmarking.',
+                confidence=0.9,
+                timestamp=datetime(2025, 11, 6, 10, 30),
+                block_height=800000 + i
+            )
+            for i in range(insight_count)
+        ]
+    )
+
+
+def make_users(count: int):
+    """Build subscribers spread over a few common filter combinations"""
+    from src.models import EmailPreferences, SignalType
+
+    filter_sets = [[], [SignalType.MEMPOOL], [SignalType.EXCHANGE, SignalType.WHALE], [SignalType.MINER]]
+    return [
+        EmailPreferences(
+            user_id=f'user_{i}',
+            email=f'user{i}@example.com',
+            signal_filters=filter_sets[i % len(filter_sets)]
+        )
+        for i in range(count)
+    ]
+
+
+async def run_serial(service, users, brief):
+    """Send one email per user, one at a time"""
+    for preferences in users:
+        await service.send_daily_brief_to_user(preferences, brief)
+
+
+def report(label: str, elapsed: float, recipients: int, requests: int):
+    print(f"{label:<12} {elapsed:8.2f}s  {recipients / elapsed:8,.0f} emails/s  {requests:6d} requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Daily brief fan-out benchmark')
+    parser.add_argument('--users', type=int, default=2000, help='Subscribed users')
+    parser.add_argument('--insights', type=int, default=10, help='Insights in the brief')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub response latency (s)')
+    parser.add_argument('--host', help='Use an external SendGrid stub instead of the built-in one')
+    parser.add_argument('--skip-serial', action='store_true', help='Skip the serial baseline')
+    args = parser.parse_args()
+
+    server = None
+    host = args.host
+    if not host:
+        SendGridStub.latency = args.latency
+        server = ThreadingHTTPServer(('127.0.0.1', 0), SendGridStub)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host = f'http://127.0.0.1:{server.server_port}'
+
+    os.environ['SENDGRID_API_HOST'] = host
+    os.environ.setdefault('SENDGRID_API_KEY', 'benchmark')
+    os.environ.setdefault('GCP_PROJECT_ID', 'utxoiq-local')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    with patch('src.email_service.BigQueryClient', EngagementSink), \
+         patch('src.sendgrid_client.BigQueryClient', EngagementSink):
+        from src.config import settings
+        from src.email_service import EmailService
+
+        service = EmailService()
+        brief = make_brief(args.insights)
+        users = make_users(args.users)
+
+        async def get_daily_brief(date=None):
+            return brief
+
+        service.api_client.get_daily_brief = get_daily_brief
+        service.bq_client.get_users_for_daily_brief = lambda: users
+
+        print(f"Sending to {len(users)} users via {host}")
+        print(f"concurrency={settings.brief_send_concurrency} batch={settings.brief_batch_size} "
+              f"rate={settings.brief_send_rate}/s burst={settings.brief_send_burst}")
+        print("-" * 60)
+
+        if not args.skip_serial:
+            start = time.perf_counter()
+            asyncio.run(run_serial(service, users, brief))
+            report('serial', time.perf_counter() - start, len(users), len(users))
+
+        start = time.perf_counter()
+        result = asyncio.run(service.send_daily_briefs())
+        report('fan-out', time.perf_counter() - start, result['sent'], result['requests'])
+        print(f"{result['groups']} groups, {result['failed']} failed, {result['skipped']} skipped")
+
+    if server:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
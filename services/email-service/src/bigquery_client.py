@@ -176,18 +176,29 @@ class BigQueryClient:
         
         return users
     
-    def track_engagement(self, engagement: EmailEngagement) -> None:
-        """Track email engagement event."""
+    def _engagement_row(self, engagement: EmailEngagement) -> dict:
+        """Convert engagement event to BigQuery row."""
         metadata_json = json.dumps(engagement.metadata) if engagement.metadata else None
         
-        table_id = f"{settings.gcp_project_id}.{self.dataset_id}.email_engagement"
-        rows_to_insert = [{
+        return {
             "email_id": engagement.email_id,
             "user_id": engagement.user_id,
             "event": engagement.event.value,
             "timestamp": engagement.timestamp.isoformat(),
             "metadata_json": metadata_json
-        }]
+        }
+    
+    def track_engagement(self, engagement: EmailEngagement) -> None:
+        """Track email engagement event."""
+        self.track_engagements([engagement])
+    
+    def track_engagements(self, engagements: List[EmailEngagement]) -> None:
+        """Track several email engagement events in one insert."""
+        if not engagements:
+            return
+        
+        table_id = f"{settings.gcp_project_id}.{self.dataset_id}.email_engagement"
+        rows_to_insert = [self._engagement_row(engagement) for engagement in engagements]
         
         errors = self.client.insert_rows_json(table_id, rows_to_insert)
         if errors:
@@ -0,0 +1,130 @@
+"""Rate limiting, grouping and checkpointing for daily brief fan-out."""
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, List, Set
+
+from .models import DailyBrief, EmailPreferences
+
+logger = logging.getLogger(__name__)
+
+# Rendered once per group; SendGrid substitutes each recipient's user ID
+USER_ID_PLACEHOLDER = "-user_id-"
+
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
+
+class TokenBucket:
+    """Async token bucket for the email provider's send quota."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize token bucket.
+        
+        Args:
+            rate: Tokens added per second (0 disables limiting)
+            capacity: Maximum tokens that can accumulate
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens, waiting until the bucket can cover them.
+        
+        Requests larger than the capacity are allowed and leave the bucket in
+        debt, so a full SendGrid batch is throttled rather than rejected.
+        Waiters are served in arrival order.
+        
+        Args:
+            tokens: Tokens to take (recipients to send)
+        
+        Returns:
+            Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            
+            if self._tokens >= 0:
+                return 0.0
+            
+            # Hold the lock while waiting so later callers queue behind us
+            wait = -self._tokens / self.rate
+            await asyncio.sleep(wait)
+            return wait
+
+
+class BriefCheckpoint:
+    """
+    Append-only record of users who already received a brief.
+    
+    One JSON list of user IDs is appended per delivered batch, so a run that
+    crashes part way can be restarted and skip everyone already sent. The
+    directory must survive restarts (e.g. a mounted Cloud Storage volume).
+    """
+    
+    def __init__(self, directory: str, date: str):
+        """
+        Initialize checkpoint for one brief date.
+        
+        Args:
+            directory: Directory holding checkpoint files
+            date: Brief date in YYYY-MM-DD format
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"daily-brief-{date}.jsonl")
+    
+    def load(self) -> Set[str]:
+        """Return user IDs recorded by previous runs."""
+        completed: Set[str] = set()
+        if not os.path.exists(self.path):
+            return completed
+        
+        with open(self.path) as f:
+            content = f.read()
+        
+        for line in content.splitlines():
+            try:
+                completed.update(json.loads(line))
+            except json.JSONDecodeError:
+                # Partial last line from a crash mid-write
+                logger.warning(f"Ignoring truncated checkpoint line in {self.path}")
+        
+        if content and not content.endswith("\n"):
+            # Start the next record on a fresh line
+            with open(self.path, "a") as f:
+                f.write("\n")
+        return completed
+    
+    def record(self, user_ids: List[str]) -> None:
+        """Durably record a delivered batch."""
+        with open(self.path, "a") as f:
+            f.write(json.dumps(user_ids) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+@dataclass
+class RecipientGroup:
+    """Users whose filtered brief is identical."""
+    brief: DailyBrief
+    recipients: List[EmailPreferences] = field(default_factory=list)
+    
+    def batches(self, size: int) -> Iterator[List[EmailPreferences]]:
+        """Split recipients into SendGrid-sized batches."""
+        size = max(1, min(size, MAX_PERSONALIZATIONS))
+        for start in range(0, len(self.recipients), size):
+            yield self.recipients[start:start + size]
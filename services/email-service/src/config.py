@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     sendgrid_api_key: str
     sendgrid_from_email: str = "noreply@utxoiq.com"
     sendgrid_from_name: str = "utxoIQ"
+    sendgrid_api_host: str = "https://api.sendgrid.com"
     
     # BigQuery Configuration
     gcp_project_id: str
@@ -23,6 +24,19 @@ class Settings(BaseSettings):
     service_port: int = 8080
     log_level: str = "INFO"
     
+    # Daily brief fan-out
+    brief_send_concurrency: int = 8  # SendGrid requests in flight
+    brief_send_rate: float = 1000.0  # Recipients per second allowed by the provider quota
+    brief_send_burst: int = 1000  # Recipients that may be sent at once before throttling
+    brief_batch_size: int = 500  # Personalizations per SendGrid request (max 1000)
+    brief_checkpoint_dir: Optional[str] = None  # Persistent directory for resumable runs
+    
+    # Engagement event buffering
+    engagement_flush_size: int = 500  # Events per BigQuery insert
+    engagement_flush_interval: float = 2.0  # Maximum seconds an event is buffered
+    engagement_buffer_capacity: int = 50000  # Events held in memory before spilling to disk
+    engagement_spool_dir: str = "/tmp/email-engagement-spool"
+    
     # Frontend URL
     frontend_url: str = "https://utxoiq.com"
     
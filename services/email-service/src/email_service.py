@@ -1,9 +1,13 @@
 """Core email service for sending daily briefs."""
+import asyncio
 import logging
-from typing import List, Optional
+import time as timer
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, time
 
+from .config import settings
 from .models import EmailPreferences, DailyBrief, SignalType
+from .brief_fanout import TokenBucket, BriefCheckpoint, RecipientGroup, USER_ID_PLACEHOLDER
 from .bigquery_client import BigQueryClient
 from .sendgrid_client import SendGridClient
 from .email_templates import EmailTemplates
@@ -21,6 +25,12 @@ class EmailService:
         self.sendgrid_client = SendGridClient()
         self.templates = EmailTemplates()
         self.api_client = APIClient()
+        
+        # Fan-out tuning for send_daily_briefs
+        self.send_concurrency = settings.brief_send_concurrency
+        self.batch_size = settings.brief_batch_size
+        self.rate_limiter = TokenBucket(settings.brief_send_rate, settings.brief_send_burst)
+        self.checkpoint_dir = settings.brief_checkpoint_dir
     
     def _is_in_quiet_hours(self, preferences: EmailPreferences) -> bool:
         """Check if current time is within user's quiet hours."""
@@ -114,10 +124,97 @@ class EmailService:
             logger.error(f"Error sending daily brief to {preferences.email}: {str(e)}")
             return False
     
+    def _group_recipients(
+        self,
+        users: List[EmailPreferences],
+        brief: DailyBrief
+    ) -> Tuple[List[RecipientGroup], int]:
+        """
+        Group users by the insights their filters select.
+        
+        Users in quiet hours or whose filters match nothing are skipped.
+        
+        Returns:
+            Recipient groups and the number of skipped users
+        """
+        groups: Dict[Tuple[str, ...], RecipientGroup] = {}
+        skipped = 0
+        
+        for preferences in users:
+            if self._is_in_quiet_hours(preferences):
+                skipped += 1
+                continue
+            
+            filtered_insights = self._filter_insights(brief.insights, preferences.signal_filters)
+            if not filtered_insights:
+                skipped += 1
+                continue
+            
+            key = tuple(insight.id for insight in filtered_insights)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = RecipientGroup(brief=DailyBrief(
+                    date=brief.date,
+                    insights=filtered_insights,
+                    summary=brief.summary
+                ))
+            group.recipients.append(preferences)
+        
+        return list(groups.values()), skipped
+    
+    async def _send_group(
+        self,
+        group: RecipientGroup,
+        semaphore: asyncio.Semaphore,
+        checkpoint: Optional[BriefCheckpoint]
+    ) -> Tuple[int, int, int]:
+        """
+        Render a group's brief once and send it in personalization batches.
+        
+        Returns:
+            Recipients sent, recipients failed and SendGrid requests made
+        """
+        html_content = self.templates.render_daily_brief(group.brief, USER_ID_PLACEHOLDER)
+        plain_text = self.templates.render_plain_text(group.brief, USER_ID_PLACEHOLDER)
+        subject = f"utxoIQ Daily Brief — {group.brief.date}"
+        
+        async def send_batch(batch: List[EmailPreferences]) -> bool:
+            async with semaphore:
+                await self.rate_limiter.acquire(len(batch))
+                try:
+                    await asyncio.to_thread(
+                        self.sendgrid_client.send_batch,
+                        [(preferences.email, preferences.user_id) for preferences in batch],
+                        subject,
+                        html_content,
+                        plain_text,
+                        user_id_placeholder=USER_ID_PLACEHOLDER
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to send daily brief batch of {len(batch)}: {str(e)}")
+                    return False
+            
+            if checkpoint:
+                checkpoint.record([preferences.user_id for preferences in batch])
+            return True
+        
+        batches = list(group.batches(self.batch_size))
+        results = await asyncio.gather(*(send_batch(batch) for batch in batches))
+        
+        sent = sum(len(batch) for batch, ok in zip(batches, results) if ok)
+        failed = sum(len(batch) for batch, ok in zip(batches, results) if not ok)
+        return sent, failed, len(batches)
+    
     async def send_daily_briefs(self, date: Optional[str] = None) -> dict:
         """
         Send daily briefs to all subscribed users.
         
+        Users whose filters select the same insights share one rendered
+        email, sent as SendGrid personalization batches. Batches run
+        concurrently within the provider rate limit. When a checkpoint
+        directory is configured, users already sent for the date are skipped,
+        so a crashed run can be restarted safely.
+        
         Args:
             date: Date in YYYY-MM-DD format. Defaults to yesterday.
         
@@ -137,27 +234,40 @@ class EmailService:
                     "skipped": 0
                 }
             
+            start = timer.perf_counter()
+            
             # Get users who should receive daily brief
             users = self.bq_client.get_users_for_daily_brief()
             logger.info(f"Found {len(users)} users subscribed to daily briefs")
             
-            # Send to each user
-            sent = 0
-            failed = 0
-            skipped = 0
+            # Skip users a previous run already reached
+            checkpoint = None
+            resumed = 0
+            if self.checkpoint_dir:
+                checkpoint = BriefCheckpoint(self.checkpoint_dir, brief.date)
+                completed = checkpoint.load()
+                if completed:
+                    pending = [u for u in users if u.user_id not in completed]
+                    resumed = len(users) - len(pending)
+                    users = pending
+                    logger.info(f"Resuming daily brief {brief.date}: {resumed} users already sent")
             
-            for user_prefs in users:
-                try:
-                    result = await self.send_daily_brief_to_user(user_prefs, brief)
-                    if result:
-                        sent += 1
-                    else:
-                        skipped += 1
-                except Exception as e:
-                    logger.error(f"Failed to send to {user_prefs.email}: {str(e)}")
-                    failed += 1
+            groups, skipped = self._group_recipients(users, brief)
+            
+            semaphore = asyncio.Semaphore(self.send_concurrency)
+            results = await asyncio.gather(*(
+                self._send_group(group, semaphore, checkpoint) for group in groups
+            ))
             
-            logger.info(f"Daily brief send complete: {sent} sent, {failed} failed, {skipped} skipped")
+            sent = sum(result[0] for result in results)
+            failed = sum(result[1] for result in results)
+            requests = sum(result[2] for result in results)
+            elapsed = timer.perf_counter() - start
+            
+            logger.info(
+                f"Daily brief send complete: {sent} sent, {failed} failed, {skipped} skipped "
+                f"({len(groups)} groups, {requests} requests, {elapsed:.1f}s)"
+            )
             
             return {
                 "success": True,
@@ -165,7 +275,11 @@ class EmailService:
                 "sent": sent,
                 "failed": failed,
                 "skipped": skipped,
-                "total_users": len(users)
+                "resumed": resumed,
+                "total_users": len(users) + resumed,
+                "groups": len(groups),
+                "requests": requests,
+                "elapsed_seconds": round(elapsed, 3)
             }
             
         except Exception as e:
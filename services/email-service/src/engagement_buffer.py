@@ -0,0 +1,256 @@
+"""Buffered engagement event ingestion with an on-disk spool."""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+from .config import settings
+from .models import EmailEngagement
+from .bigquery_client import BigQueryClient
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between flush attempts while BigQuery rejects inserts
+MAX_RETRY_BACKOFF = 60.0
+
+
+class EngagementBuffer:
+    """
+    Collect engagement events in memory and insert them in batches.
+    
+    ``track_engagement`` only appends to a bounded ring buffer, so webhook
+    requests return without waiting on BigQuery. A background thread flushes
+    the buffer as one insert when it reaches ``flush_size`` events or every
+    ``flush_interval`` seconds. Events that cannot be inserted (insert
+    failure, full buffer, shutdown with BigQuery unavailable) are appended to
+    a local JSONL spool and replayed on the next start. After a failed insert
+    the flush thread backs off exponentially instead of retrying at once.
+    """
+    
+    def __init__(
+        self,
+        bq_client: BigQueryClient,
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        capacity: Optional[int] = None,
+        spool_dir: Optional[str] = None
+    ):
+        """
+        Initialize engagement buffer.
+        
+        Args:
+            bq_client: BigQuery client used for batched inserts
+            flush_size: Events that trigger a flush (defaults to config)
+            flush_interval: Maximum seconds an event waits (defaults to config)
+            capacity: Events held in memory before spilling (defaults to config)
+            spool_dir: Directory for the on-disk spool (defaults to config)
+        """
+        self.bq_client = bq_client
+        self.flush_size = flush_size or settings.engagement_flush_size
+        self.flush_interval = flush_interval or settings.engagement_flush_interval
+        self.capacity = capacity or settings.engagement_buffer_capacity
+        spool_dir = spool_dir or settings.engagement_spool_dir
+        os.makedirs(spool_dir, exist_ok=True)
+        self.spool_path = os.path.join(spool_dir, "engagement.jsonl")
+        
+        self._buffer: Deque[EmailEngagement] = deque()
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        
+        self.buffered = 0
+        self.inserted = 0
+        self.inserts = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.failed_inserts = 0
+    
+    def start(self) -> None:
+        """Replay spooled events and start the flush thread."""
+        if self._running:
+            return
+        
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="engagement-flush", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Engagement buffer started (flush at {self.flush_size} events "
+            f"or {self.flush_interval}s)"
+        )
+    
+    def close(self) -> None:
+        """Stop the flush thread and write out remaining events."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+        
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 30)
+            self._thread = None
+        
+        # Anything the final flush could not insert ends up in the spool
+        self.flush()
+        logger.info(f"Engagement buffer closed ({self.spooled} events spooled in total)")
+    
+    def track_engagement(self, engagement: EmailEngagement) -> None:
+        """Queue an engagement event for the next batch."""
+        self.track_engagements([engagement])
+    
+    def track_engagements(self, engagements: List[EmailEngagement]) -> None:
+        """Queue several engagement events for the next batch."""
+        overflow: List[EmailEngagement] = []
+        
+        with self._lock:
+            for engagement in engagements:
+                if len(self._buffer) >= self.capacity:
+                    # Flushing cannot keep up; keep the oldest events on disk
+                    overflow.append(self._buffer.popleft())
+                self._buffer.append(engagement)
+            self.buffered += len(engagements)
+            
+            if len(self._buffer) >= self.flush_size:
+                self._wakeup.notify()
+        
+        if overflow:
+            logger.warning(f"Engagement buffer full, spooling {len(overflow)} events")
+            self._spool(overflow)
+    
+    def flush(self) -> int:
+        """
+        Insert all buffered events now.
+        
+        If an insert fails, the failed batch and everything still buffered
+        are spooled, so nothing is left in memory while BigQuery is down.
+        
+        Returns:
+            Number of events inserted
+        """
+        inserted = 0
+        while True:
+            with self._lock:
+                count = min(len(self._buffer), self.flush_size)
+                batch = [self._buffer.popleft() for _ in range(count)]
+            
+            if not batch:
+                return inserted
+            if not self._insert(batch):
+                with self._lock:
+                    batch.extend(self._buffer)
+                    self._buffer.clear()
+                self._spool(batch)
+                return inserted
+            inserted += len(batch)
+    
+    def _run(self) -> None:
+        """Flush on size or time threshold until closed."""
+        self.replay_spool()
+        backoff = 0.0
+        
+        while True:
+            with self._lock:
+                deadline = time.monotonic() + max(self.flush_interval, backoff)
+                while self._running and (backoff or len(self._buffer) < self.flush_size):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                
+                if not self._running:
+                    return
+            
+            failed_before = self.failed_inserts
+            inserted = self.flush()
+            if self.failed_inserts > failed_before:
+                backoff = min(max(backoff * 2, self.flush_interval), MAX_RETRY_BACKOFF)
+                continue
+            backoff = 0.0
+            
+            if inserted and os.path.exists(self.spool_path):
+                # BigQuery is accepting inserts again
+                self.replay_spool()
+    
+    def _insert(self, batch: List[EmailEngagement]) -> bool:
+        """Insert one batch, returning False on failure."""
+        try:
+            self.bq_client.track_engagements(batch)
+        except Exception as e:
+            logger.error(f"Failed to insert {len(batch)} engagement events: {str(e)}")
+            self.failed_inserts += 1
+            return False
+        
+        self.inserts += 1
+        self.inserted += len(batch)
+        return True
+    
+    def _spool(self, engagements: List[EmailEngagement]) -> None:
+        """Append events to the on-disk spool."""
+        lines = "".join(engagement.model_dump_json() + "\n" for engagement in engagements)
+        with self._spool_lock:
+            with open(self.spool_path, "a") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        self.spooled += len(engagements)
+    
+    def replay_spool(self) -> int:
+        """
+        Insert events left in the spool by earlier failures or shutdowns.
+        
+        Returns:
+            Number of events replayed
+        """
+        replay_path = f"{self.spool_path}.replay"
+        with self._spool_lock:
+            # Take ownership of the current spool; new failures start a fresh
+            # file. A replay file left by a crash is retried along with it.
+            if os.path.exists(self.spool_path):
+                if os.path.exists(replay_path):
+                    with open(self.spool_path) as src, open(replay_path, "a") as dst:
+                        dst.write(src.read())
+                    os.remove(self.spool_path)
+                else:
+                    os.replace(self.spool_path, replay_path)
+            
+            if not os.path.exists(replay_path):
+                return 0
+        
+        engagements = []
+        with open(replay_path) as f:
+            for line in f:
+                try:
+                    engagements.append(EmailEngagement.model_validate_json(line))
+                except ValueError:
+                    logger.warning(f"Skipping unreadable spooled engagement event: {line[:200]}")
+        
+        replayed = 0
+        for start in range(0, len(engagements), self.flush_size):
+            batch = engagements[start:start + self.flush_size]
+            if not self._insert(batch):
+                self._spool(engagements[start:])
+                break
+            replayed += len(batch)
+        
+        os.remove(replay_path)
+        self.replayed += replayed
+        if replayed:
+            logger.info(f"Replayed {replayed} spooled engagement events")
+        return replayed
+    
+    def get_stats(self) -> dict:
+        """Get engagement buffer statistics."""
+        with self._lock:
+            pending = len(self._buffer)
+        
+        return {
+            "pending": pending,
+            "buffered": self.buffered,
+            "inserted": self.inserted,
+            "inserts": self.inserts,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "failed_inserts": self.failed_inserts,
+        }
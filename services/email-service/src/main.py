@@ -1,6 +1,7 @@
 """Main FastAPI application for email service."""
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 import logging
 from datetime import datetime
 from typing import Optional
@@ -15,6 +16,7 @@ from .models import (
 from .bigquery_client import BigQueryClient
 from .sendgrid_client import SendGridClient
 from .email_service import EmailService
+from .engagement_buffer import EngagementBuffer
 
 # Configure logging
 logging.basicConfig(
@@ -23,18 +25,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Initialize clients
+bq_client = BigQueryClient()
+engagement_buffer = EngagementBuffer(bq_client)
+sendgrid_client = SendGridClient(engagement_tracker=engagement_buffer)
+email_service = EmailService()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the engagement flusher and drain it on shutdown."""
+    engagement_buffer.start()
+    yield
+    engagement_buffer.close()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="utxoIQ Email Service",
     description="Email service for Daily Brief delivery and preference management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Initialize clients
-bq_client = BigQueryClient()
-sendgrid_client = SendGridClient()
-email_service = EmailService()
-
 
 @app.get("/health")
 async def health_check():
@@ -42,7 +55,8 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "email-service",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "engagement_buffer": engagement_buffer.get_stats()
     }
 
 
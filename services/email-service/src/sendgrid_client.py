@@ -1,8 +1,12 @@
 """SendGrid client for sending emails."""
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content, Attachment, FileContent, FileName, FileType, Disposition
+from sendgrid.helpers.mail import (
+    Mail, Email, To, Content, Attachment, FileContent, FileName, FileType, Disposition,
+    Personalization, Substitution, CustomArg
+)
 import base64
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 import logging
 
 from .config import settings
@@ -15,11 +19,17 @@ logger = logging.getLogger(__name__)
 class SendGridClient:
     """Client for SendGrid email operations."""
     
-    def __init__(self):
-        """Initialize SendGrid client."""
-        self.client = SendGridAPIClient(settings.sendgrid_api_key)
+    def __init__(self, engagement_tracker=None):
+        """
+        Initialize SendGrid client.
+        
+        Args:
+            engagement_tracker: Destination for engagement events, such as an
+                EngagementBuffer. Defaults to direct BigQuery inserts.
+        """
+        self.client = SendGridAPIClient(settings.sendgrid_api_key, host=settings.sendgrid_api_host)
         self.from_email = Email(settings.sendgrid_from_email, settings.sendgrid_from_name)
-        self.bq_client = BigQueryClient()
+        self.bq_client = engagement_tracker or BigQueryClient()
     
     def send_email(
         self,
@@ -47,7 +57,6 @@ class SendGridClient:
         try:
             # Generate email ID if not provided
             if not email_id:
-                from datetime import datetime
                 email_id = f"email_{user_id}_{int(datetime.utcnow().timestamp())}"
             
             # Create message
@@ -61,8 +70,8 @@ class SendGridClient:
             
             # Add custom args for tracking
             message.custom_arg = [
-                {"key": "user_id", "value": user_id},
-                {"key": "email_id", "value": email_id}
+                CustomArg("user_id", user_id),
+                CustomArg("email_id", email_id)
             ]
             
             # Send email
@@ -85,6 +94,69 @@ class SendGridClient:
             logger.error(f"Error sending email to {to_email}: {str(e)}")
             raise
     
+    def send_batch(
+        self,
+        recipients: List[Tuple[str, str]],
+        subject: str,
+        html_content: str,
+        plain_text_content: str,
+        user_id_placeholder: Optional[str] = None
+    ) -> List[str]:
+        """
+        Send one message to many recipients in a single SendGrid request.
+        
+        Each recipient gets its own personalization, so addresses are not
+        disclosed to each other and tracking args stay per user. SendGrid
+        replaces ``user_id_placeholder`` in the content with each
+        recipient's user ID.
+        
+        Args:
+            recipients: (email, user_id) pairs, at most 1000
+            subject: Email subject
+            html_content: HTML email content
+            plain_text_content: Plain text email content
+            user_id_placeholder: Placeholder to substitute with the user ID
+        
+        Returns:
+            Email IDs for tracking, in recipient order
+        """
+        timestamp = int(datetime.utcnow().timestamp())
+        email_ids = [f"email_{user_id}_{timestamp}" for _, user_id in recipients]
+        
+        message = Mail(
+            from_email=self.from_email,
+            subject=subject,
+            plain_text_content=Content("text/plain", plain_text_content),
+            html_content=Content("text/html", html_content)
+        )
+        
+        for (to_email, user_id), email_id in zip(recipients, email_ids):
+            personalization = Personalization()
+            personalization.add_to(To(to_email))
+            if user_id_placeholder:
+                personalization.add_substitution(Substitution(user_id_placeholder, user_id))
+            personalization.add_custom_arg(CustomArg("user_id", user_id))
+            personalization.add_custom_arg(CustomArg("email_id", email_id))
+            message.add_personalization(personalization, index=len(message.personalizations))
+        
+        response = self.client.send(message)
+        if response.status_code not in [200, 202]:
+            raise Exception(f"Failed to send batch: {response.status_code} - {response.body}")
+        
+        logger.info(f"Batch email sent to {len(recipients)} recipients")
+        
+        # The batch is already accepted; a tracking failure must not make the
+        # caller treat it as unsent and send it again
+        try:
+            self.bq_client.track_engagements([
+                EmailEngagement(email_id=email_id, user_id=user_id, event=EmailEvent.DELIVERED)
+                for (_, user_id), email_id in zip(recipients, email_ids)
+            ])
+        except Exception as e:
+            logger.error(f"Failed to track delivery of {len(recipients)} batch emails: {str(e)}")
+        
+        return email_ids
+    
     def handle_webhook_event(self, event_data: dict) -> None:
         """
         Handle SendGrid webhook events for engagement tracking.
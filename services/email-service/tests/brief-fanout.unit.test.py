@@ -0,0 +1,231 @@
+"""Tests for concurrent daily brief fan-out."""
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from src.brief_fanout import TokenBucket, BriefCheckpoint, USER_ID_PLACEHOLDER
+from src.email_service import EmailService
+from src.models import SignalType
+
+
+def make_users(base, count, prefix="user", signal_filters=None):
+    """Build subscribed users from a preferences template."""
+    users = []
+    for i in range(count):
+        user = base.model_copy()
+        user.user_id = f"{prefix}_{i}"
+        user.email = f"{prefix}{i}@example.com"
+        if signal_filters is not None:
+            user.signal_filters = signal_filters
+        users.append(user)
+    return users
+
+
+@pytest.fixture
+def service(
+    sample_daily_brief,
+    mock_bigquery_client,
+    mock_sendgrid_client,
+    mock_email_templates,
+    mock_api_client
+):
+    """Email service with mocked dependencies and no rate limit."""
+    service = EmailService()
+    service.bq_client = mock_bigquery_client
+    service.sendgrid_client = mock_sendgrid_client
+    service.templates = mock_email_templates
+    service.api_client = mock_api_client
+    service.rate_limiter = TokenBucket(rate=0, capacity=0)
+    service.checkpoint_dir = None
+    
+    mock_api_client.get_daily_brief.return_value = sample_daily_brief
+    mock_sendgrid_client.send_batch = Mock(side_effect=lambda recipients, *args, **kwargs: [
+        f"email_{user_id}" for _, user_id in recipients
+    ])
+    return service
+
+
+@pytest.mark.asyncio
+async def test_identical_filters_render_once(service, sample_email_preferences, mock_email_templates):
+    """Test users with the same filtered brief share one render and request."""
+    service.bq_client.get_users_for_daily_brief.return_value = make_users(sample_email_preferences, 5)
+    
+    result = await service.send_daily_briefs()
+    
+    assert result["sent"] == 5
+    assert result["groups"] == 1
+    assert result["requests"] == 1
+    assert mock_email_templates.render_daily_brief.call_count == 1
+    
+    # Footer links are personalized by SendGrid substitution
+    assert mock_email_templates.render_daily_brief.call_args[0][1] == USER_ID_PLACEHOLDER
+    recipients = service.sendgrid_client.send_batch.call_args[0][0]
+    assert recipients[0] == ("user0@example.com", "user_0")
+    assert service.sendgrid_client.send_batch.call_args.kwargs["user_id_placeholder"] == USER_ID_PLACEHOLDER
+
+
+@pytest.mark.asyncio
+async def test_groups_by_filtered_insights(service, sample_email_preferences, sample_daily_brief):
+    """Test users are grouped by the insights their filters select."""
+    sample_daily_brief.insights.append(sample_daily_brief.insights[0].model_copy(
+        update={"id": "insight_456", "signal_type": "whale"}
+    ))
+    users = (
+        make_users(sample_email_preferences, 2, "mempool", [SignalType.MEMPOOL]) +
+        make_users(sample_email_preferences, 2, "all", []) +
+        make_users(sample_email_preferences, 1, "miner", [SignalType.MINER])
+    )
+    service.bq_client.get_users_for_daily_brief.return_value = users
+    
+    result = await service.send_daily_briefs()
+    
+    assert result["groups"] == 2
+    assert result["sent"] == 4
+    assert result["skipped"] == 1  # No miner insights today
+    assert result["total_users"] == 5
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_batch_size(service, sample_email_preferences):
+    """Test a large group is split into personalization batches."""
+    service.batch_size = 4
+    service.bq_client.get_users_for_daily_brief.return_value = make_users(sample_email_preferences, 10)
+    
+    result = await service.send_daily_briefs()
+    
+    assert result["requests"] == 3
+    batch_sizes = [len(call[0][0]) for call in service.sendgrid_client.send_batch.call_args_list]
+    assert sorted(batch_sizes) == [2, 4, 4]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded(service, sample_email_preferences):
+    """Test no more than send_concurrency requests are in flight."""
+    service.batch_size = 1
+    service.send_concurrency = 3
+    service.bq_client.get_users_for_daily_brief.return_value = make_users(sample_email_preferences, 12)
+    
+    in_flight = 0
+    peak = 0
+    
+    def slow_send(recipients, *args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        time.sleep(0.02)
+        in_flight -= 1
+        return ["email"]
+    
+    service.sendgrid_client.send_batch.side_effect = slow_send
+    
+    result = await service.send_daily_briefs()
+    
+    assert result["sent"] == 12
+    assert 1 < peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_resume_from_checkpoint(service, sample_email_preferences, tmp_path):
+    """Test a restarted run only sends to users missed by the crashed run."""
+    service.checkpoint_dir = str(tmp_path)
+    service.batch_size = 2
+    service.send_concurrency = 1
+    service.bq_client.get_users_for_daily_brief.return_value = make_users(sample_email_preferences, 6)
+    
+    # First run crashes after two batches
+    service.sendgrid_client.send_batch.side_effect = [
+        ["email_0", "email_1"],
+        ["email_2", "email_3"],
+        Exception("connection reset")
+    ]
+    first = await service.send_daily_briefs()
+    assert first["sent"] == 4
+    assert first["failed"] == 2
+    
+    service.sendgrid_client.send_batch.reset_mock(side_effect=True)
+    service.sendgrid_client.send_batch.return_value = ["email_4", "email_5"]
+    second = await service.send_daily_briefs()
+    
+    assert second["resumed"] == 4
+    assert second["sent"] == 2
+    assert second["total_users"] == 6
+    assert service.sendgrid_client.send_batch.call_args[0][0] == [
+        ("user4@example.com", "user_4"),
+        ("user5@example.com", "user_5")
+    ]
+
+
+def test_checkpoint_ignores_truncated_line(tmp_path):
+    """Test a partial write from a crash does not corrupt later records."""
+    checkpoint = BriefCheckpoint(str(tmp_path), "2025-11-06")
+    checkpoint.record(["user_1", "user_2"])
+    with open(checkpoint.path, "a") as f:
+        f.write('["user_3", "us')
+    
+    assert checkpoint.load() == {"user_1", "user_2"}
+    
+    checkpoint.record(["user_4"])
+    assert checkpoint.load() == {"user_1", "user_2", "user_4"}
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles_to_rate():
+    """Test sends beyond the burst wait for tokens to refill."""
+    bucket = TokenBucket(rate=1000, capacity=10)
+    
+    start = time.monotonic()
+    assert await bucket.acquire(10) == 0
+    await bucket.acquire(50)
+    elapsed = time.monotonic() - start
+    
+    assert elapsed >= 0.045
+
+
+def test_send_batch_personalizes_each_recipient():
+    """Test SendGrid batch request has one personalization per recipient."""
+    from src.sendgrid_client import SendGridClient
+    
+    with patch('src.sendgrid_client.SendGridAPIClient') as api_client, \
+         patch('src.sendgrid_client.BigQueryClient') as bq_client:
+        api_client.return_value.send.return_value = Mock(status_code=202)
+        client = SendGridClient()
+        
+        email_ids = client.send_batch(
+            [("a@example.com", "user_a"), ("b@example.com", "user_b")],
+            "Daily Brief",
+            f"<a href='/unsubscribe?user_id={USER_ID_PLACEHOLDER}'>",
+            "Plain",
+            user_id_placeholder=USER_ID_PLACEHOLDER
+        )
+    
+    message = api_client.return_value.send.call_args[0][0].get()
+    personalizations = message["personalizations"]
+    assert len(personalizations) == 2
+    assert personalizations[1]["to"] == [{"email": "b@example.com"}]
+    assert personalizations[1]["substitutions"] == {USER_ID_PLACEHOLDER: "user_b"}
+    assert personalizations[1]["custom_args"]["email_id"] == email_ids[1]
+    
+    delivered = bq_client.return_value.track_engagements.call_args[0][0]
+    assert [engagement.user_id for engagement in delivered] == ["user_a", "user_b"]
+
+
+@pytest.mark.asyncio
+async def test_tracking_failure_does_not_resend(service, sample_email_preferences, tmp_path):
+    """Test a batch accepted by SendGrid is checkpointed even if tracking fails."""
+    from src.sendgrid_client import SendGridClient
+    
+    with patch('src.sendgrid_client.SendGridAPIClient') as api_client:
+        api_client.return_value.send.return_value = Mock(status_code=202)
+        tracker = Mock()
+        tracker.track_engagements.side_effect = Exception("BigQuery unavailable")
+        service.sendgrid_client = SendGridClient(engagement_tracker=tracker)
+        service.checkpoint_dir = str(tmp_path)
+        service.bq_client.get_users_for_daily_brief.return_value = make_users(sample_email_preferences, 3)
+        
+        first = await service.send_daily_briefs()
+        second = await service.send_daily_briefs()
+    
+    assert first["sent"] == 3
+    assert first["failed"] == 0
+    assert second["resumed"] == 3
+    assert api_client.return_value.send.call_count == 1
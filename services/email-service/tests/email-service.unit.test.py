@@ -221,13 +221,19 @@ async def test_send_daily_briefs_with_failures(
     user2 = sample_email_preferences.model_copy()
     user2.user_id = "user_2"
     user2.email = "user2@example.com"
+    user2.signal_filters = [SignalType.EXCHANGE]
+    
+    # Second user only follows exchange flows, so gets a separate email
+    sample_daily_brief.insights.append(sample_daily_brief.insights[0].model_copy(
+        update={"id": "insight_456", "signal_type": "exchange"}
+    ))
     
     mock_bigquery_client.get_users_for_daily_brief.return_value = [user1, user2]
     
-    # Make sendgrid fail for second user
-    mock_sendgrid_client.send_email.side_effect = [
-        "email_1",  # Success for first user
-        Exception("SendGrid error")  # Failure for second user
+    # Make sendgrid fail for the second batch
+    mock_sendgrid_client.send_batch.side_effect = [
+        ["email_1"],  # Success for first batch
+        Exception("SendGrid error")  # Failure for second batch
     ]
     
     result = await service.send_daily_briefs()
@@ -0,0 +1,175 @@
+"""Tests for buffered engagement event ingestion."""
+import os
+import time
+import pytest
+from unittest.mock import Mock
+
+from src.engagement_buffer import EngagementBuffer
+from src.models import EmailEngagement, EmailEvent
+
+
+def make_events(count, event=EmailEvent.OPENED):
+    """Build engagement events."""
+    return [
+        EmailEngagement(email_id=f"email_{i}", user_id=f"user_{i}", event=event)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def bq_client():
+    """BigQuery client recording batched inserts."""
+    mock = Mock()
+    mock.batches = []
+    mock.track_engagements = Mock(side_effect=lambda batch: mock.batches.append(list(batch)))
+    return mock
+
+
+@pytest.fixture
+def buffer(bq_client, tmp_path):
+    """Engagement buffer with small thresholds."""
+    buffer = EngagementBuffer(
+        bq_client,
+        flush_size=10,
+        flush_interval=0.05,
+        capacity=100,
+        spool_dir=str(tmp_path)
+    )
+    yield buffer
+    buffer.close()
+
+
+def wait_for(condition, timeout=2.0):
+    """Poll until a condition holds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_track_does_not_insert(buffer, bq_client):
+    """Test events are queued without touching BigQuery."""
+    buffer.track_engagement(make_events(1)[0])
+    
+    assert not bq_client.track_engagements.called
+    assert buffer.get_stats()["pending"] == 1
+
+
+def test_flush_on_size_threshold(buffer, bq_client):
+    """Test reaching the batch size flushes without waiting for the interval."""
+    buffer.flush_interval = 60
+    buffer.start()
+    
+    buffer.track_engagements(make_events(9))
+    time.sleep(0.1)
+    assert not bq_client.track_engagements.called
+    
+    buffer.track_engagements(make_events(16))
+    
+    assert wait_for(lambda: buffer.get_stats()["inserted"] == 25)
+    assert [len(batch) for batch in bq_client.batches] == [10, 10, 5]
+
+
+def test_flush_on_time_threshold(buffer, bq_client):
+    """Test a partial batch is inserted after the flush interval."""
+    buffer.start()
+    
+    buffer.track_engagements(make_events(3))
+    
+    assert wait_for(lambda: buffer.get_stats()["inserted"] == 3)
+    assert bq_client.track_engagements.call_count == 1
+
+
+def test_failed_insert_spools_and_replays(buffer, bq_client, tmp_path):
+    """Test events from a failed insert go to disk and are replayed later."""
+    bq_client.track_engagements.side_effect = Exception("503 Service Unavailable")
+    buffer.track_engagements(make_events(4))
+    
+    assert buffer.flush() == 0
+    assert os.path.exists(buffer.spool_path)
+    assert buffer.get_stats()["spooled"] == 4
+    
+    bq_client.track_engagements.side_effect = lambda batch: bq_client.batches.append(list(batch))
+    assert buffer.replay_spool() == 4
+    assert bq_client.batches[0][0].email_id == "email_0"
+    assert not os.path.exists(buffer.spool_path)
+
+
+def test_close_spools_when_bigquery_unavailable(bq_client, tmp_path):
+    """Test shutdown writes unflushed events to the spool for the next start."""
+    bq_client.track_engagements.side_effect = Exception("connection refused")
+    first = EngagementBuffer(bq_client, flush_size=10, flush_interval=60, spool_dir=str(tmp_path))
+    first.start()
+    first.track_engagements(make_events(3, EmailEvent.CLICKED))
+    first.close()
+    
+    bq_client.track_engagements.side_effect = lambda batch: bq_client.batches.append(list(batch))
+    second = EngagementBuffer(bq_client, flush_size=10, flush_interval=60, spool_dir=str(tmp_path))
+    second.start()
+    try:
+        assert wait_for(lambda: second.get_stats()["replayed"] == 3)
+    finally:
+        second.close()
+    assert all(event.event == EmailEvent.CLICKED for event in bq_client.batches[0])
+
+
+def test_close_during_outage_spools_everything(bq_client, tmp_path):
+    """Test a failed shutdown flush spools the whole buffer, not just one batch."""
+    bq_client.track_engagements.side_effect = Exception("503 Service Unavailable")
+    buffer = EngagementBuffer(
+        bq_client, flush_size=500, flush_interval=60, capacity=5000, spool_dir=str(tmp_path)
+    )
+    buffer.track_engagements(make_events(1200))
+    
+    buffer.close()
+    
+    assert buffer.get_stats()["pending"] == 0
+    assert buffer.get_stats()["spooled"] == 1200
+    with open(buffer.spool_path) as f:
+        assert sum(1 for _ in f) == 1200
+
+
+def test_flush_thread_backs_off_during_outage(buffer, bq_client):
+    """Test the flush thread waits between failed inserts instead of retrying at once."""
+    bq_client.track_engagements.side_effect = Exception("503 Service Unavailable")
+    buffer.flush_interval = 0.02
+    buffer.start()
+    
+    for _ in range(20):
+        buffer.track_engagements(make_events(10))
+        time.sleep(0.02)
+    
+    # Without backoff every burst would be retried as soon as it arrived
+    assert buffer.get_stats()["failed_inserts"] < 10
+    assert buffer.get_stats()["spooled"] + buffer.get_stats()["pending"] == 200
+
+
+def test_overflow_spills_oldest_events(bq_client, tmp_path):
+    """Test events beyond capacity are spooled instead of dropped."""
+    buffer = EngagementBuffer(bq_client, flush_size=100, capacity=5, spool_dir=str(tmp_path))
+    
+    buffer.track_engagements(make_events(8))
+    
+    assert buffer.get_stats()["pending"] == 5
+    assert buffer.get_stats()["spooled"] == 3
+    assert buffer.replay_spool() == 3
+    assert [event.email_id for event in bq_client.batches[0]] == ["email_0", "email_1", "email_2"]
+
+
+def test_webhook_events_are_buffered(bq_client, tmp_path):
+    """Test SendGrid webhook events go through the buffer."""
+    from unittest.mock import patch
+    from src.sendgrid_client import SendGridClient
+    
+    buffer = EngagementBuffer(bq_client, flush_size=10, spool_dir=str(tmp_path))
+    with patch('src.sendgrid_client.SendGridAPIClient'):
+        client = SendGridClient(engagement_tracker=buffer)
+    
+    for event_type in ["open", "click"]:
+        client.handle_webhook_event({"event": event_type, "user_id": "user_1", "email_id": "email_1"})
+    
+    assert not bq_client.track_engagements.called
+    assert buffer.flush() == 2
+    assert [event.event for event in bq_client.batches[0]] == [EmailEvent.OPENED, EmailEvent.CLICKED]
@@ -12,6 +12,7 @@ Main responsibilities:
 Requirements: 3.1, 3.2, 3.5, 5.2
 """
 import os
+import time
 import asyncio
 import logging
 from contextlib import asynccontextmanager
@@ -26,6 +27,7 @@ from .signal_polling import SignalPollingModule
 from .insight_generation import InsightGenerationModule
 from .insight_persistence import InsightPersistenceModule
 from .ai_provider import get_configured_provider, AIProviderError
+from .pipeline_latency import PipelineLatencyTracker
 
 
 # Configuration from environment
@@ -33,6 +35,7 @@ PROJECT_ID = os.getenv("GCP_PROJECT_ID", "utxoiq-dev")
 DATASET_INTEL = os.getenv("DATASET_INTEL", "intel")
 POLL_INTERVAL_SECONDS = int(os.getenv("POLL_INTERVAL_SECONDS", "10"))
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.7"))
+PIPELINE_LATENCY_WINDOW = int(os.getenv("PIPELINE_LATENCY_WINDOW", "900"))
 
 # Logging configuration
 logging.basicConfig(
@@ -137,6 +140,9 @@ class InsightGeneratorService:
         )
         logger.info("Insight Persistence Module initialized")
         
+        # Signal pickup and block-to-insight latency
+        self.latency_tracker = PipelineLatencyTracker(window_seconds=PIPELINE_LATENCY_WINDOW)
+        
         logger.info("InsightGeneratorService initialization complete")
     
     async def process_signal_group(
@@ -171,6 +177,10 @@ class InsightGeneratorService:
         insights_generated = 0
         
         for signal in signal_group.signals:
+            # Continue the ingestion trace carried in the signal's metadata
+            trace = self.latency_tracker.record_pickup(signal, correlation_id)
+            start_time = time.perf_counter()
+            
             try:
                 # Generate insight from signal
                 insight = await self.insight_generation.generate_insight(signal)
@@ -197,6 +207,11 @@ class InsightGeneratorService:
                         signal['signal_id']
                     )
                     insights_generated += 1
+                    self.latency_tracker.record_insight(
+                        trace,
+                        (time.perf_counter() - start_time) * 1000,
+                        correlation_id
+                    )
                     
                     logger.info(
                         f"Successfully generated and persisted insight "
@@ -415,6 +430,19 @@ async def trigger_cycle():
         )
 
 
+@app.get("/metrics/pipeline-latency")
+async def pipeline_latency():
+    """
+    Get rolling latency of this service's part of the block pipeline.
+    
+    Stages: signal_pickup (signal written to picked up), insight_generation
+    and block_to_insight (ingestion pipeline start to insight persisted).
+    Upstream stages are served by the ingestion service's endpoint of the
+    same name.
+    """
+    return get_service().latency_tracker.snapshot()
+
+
 @app.get("/stats")
 async def get_stats():
     """Get service statistics."""
@@ -428,7 +456,8 @@ async def get_stats():
             "unprocessed_signals": unprocessed_count,
             "stale_signals": len(stale_signals),
             "polling_active": is_running,
-            "poll_interval_seconds": POLL_INTERVAL_SECONDS
+            "poll_interval_seconds": POLL_INTERVAL_SECONDS,
+            "pipeline_latency": svc.latency_tracker.snapshot()
         }
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
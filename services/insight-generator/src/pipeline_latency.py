@@ -0,0 +1,307 @@
+"""
+Pipeline latency tracking for the insight-generator side of the block pipeline.
+
+The ingestion service stores its trace context (correlation ID, block height
+and pipeline start time) in each signal's metadata under "trace". This module
+reads it back so signal pickup and block-to-insight latency can be reported
+per block and correlated with the ingestion service's stage timings.
+
+StageHistogram is a copy of the ingestion service's rolling histogram (the
+services are deployed separately) and must keep the same bucket layout so
+percentiles from both services are comparable.
+"""
+
+import json
+import time
+import bisect
+import logging
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _log_buckets(low_ms: float, high_ms: float, per_decade: int) -> Tuple[float, ...]:
+    """Logarithmically spaced bucket upper bounds from low_ms to high_ms."""
+    bounds = []
+    factor = 10 ** (1 / per_decade)
+    value = low_ms
+    while value < high_ms:
+        bounds.append(round(value, 6))
+        value *= factor
+    bounds.append(high_ms)
+    return tuple(bounds)
+
+
+# Bucket upper bounds: 10 µs to 10 minutes, ~12% wide; last bucket is overflow
+BUCKET_BOUNDS_MS = _log_buckets(0.01, 600_000.0, per_decade=20)
+
+
+class StageHistogram:
+    """
+    Rolling latency histogram for one stage.
+    
+    The window is split into slots, each with a preallocated bucket array.
+    Recording a sample increments one counter; slots older than the window
+    are cleared lazily when their index is reused.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: float = 900,
+        slots: int = 15,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize histogram.
+        
+        Args:
+            window_seconds: Length of the rolling window
+            slots: Number of sub-windows the window is divided into
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.slot_seconds = window_seconds / slots
+        self._clock = clock
+        self._lock = threading.Lock()
+        
+        size = len(BUCKET_BOUNDS_MS) + 1
+        self._counts = [array('L', [0]) * size for _ in range(slots)]
+        self._epochs = array('q', [-1]) * slots
+        self._sums = array('d', [0.0]) * slots
+        self._maxes = array('d', [0.0]) * slots
+    
+    def _epoch(self) -> int:
+        return int(self._clock() / self.slot_seconds)
+    
+    def record(self, duration_ms: float) -> None:
+        """Record one latency sample in milliseconds."""
+        bucket = bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)
+        epoch = self._epoch()
+        index = epoch % self.slots
+        
+        with self._lock:
+            if self._epochs[index] != epoch:
+                counts = self._counts[index]
+                for i in range(len(counts)):
+                    counts[i] = 0
+                self._epochs[index] = epoch
+                self._sums[index] = 0.0
+                self._maxes[index] = 0.0
+            
+            self._counts[index][bucket] += 1
+            self._sums[index] += duration_ms
+            if duration_ms > self._maxes[index]:
+                self._maxes[index] = duration_ms
+    
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Summarize samples inside the rolling window.
+        
+        Returns:
+            Count, mean, p50/p95/p99 and max in milliseconds
+        """
+        oldest = self._epoch() - self.slots + 1
+        merged = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        total = 0.0
+        maximum = 0.0
+        
+        with self._lock:
+            for index in range(self.slots):
+                if self._epochs[index] < oldest:
+                    continue
+                for bucket, count in enumerate(self._counts[index]):
+                    if count:
+                        merged[bucket] += count
+                total += self._sums[index]
+                maximum = max(maximum, self._maxes[index])
+        
+        count = sum(merged)
+        if count == 0:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        
+        return {
+            "count": count,
+            "mean_ms": round(total / count, 3),
+            "p50_ms": round(self._percentile(merged, count, 50, maximum), 3),
+            "p95_ms": round(self._percentile(merged, count, 95, maximum), 3),
+            "p99_ms": round(self._percentile(merged, count, 99, maximum), 3),
+            "max_ms": round(maximum, 3)
+        }
+    
+    @staticmethod
+    def _percentile(counts: List[int], total: int, q: float, maximum: float) -> float:
+        """Estimate a percentile by interpolating inside its bucket."""
+        rank = q / 100 * total
+        seen = 0
+        for bucket, count in enumerate(counts):
+            if not count:
+                continue
+            if seen + count >= rank:
+                lower = BUCKET_BOUNDS_MS[bucket - 1] if bucket > 0 else 0.0
+                upper = BUCKET_BOUNDS_MS[bucket] if bucket < len(BUCKET_BOUNDS_MS) else maximum
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(estimate, maximum)
+            seen += count
+        return maximum
+
+
+def trace_context(signal: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extract the upstream trace context from a signal row.
+    
+    Args:
+        signal: Signal row from intel.signals
+    
+    Returns:
+        Trace context dict, or None if the signal has none
+    """
+    metadata = signal.get("metadata")
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            return None
+    if not isinstance(metadata, dict):
+        return None
+    trace = metadata.get("trace")
+    return trace if isinstance(trace, dict) else None
+
+
+def milliseconds_since(timestamp: Any, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Wall-clock milliseconds between a timestamp and now.
+    
+    Accepts datetimes (naive values are treated as UTC) and ISO strings.
+    
+    Returns:
+        Elapsed milliseconds, or None if the timestamp cannot be parsed
+    """
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(timestamp, datetime):
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return (now - timestamp).total_seconds() * 1000
+
+
+class PipelineLatencyTracker:
+    """
+    Rolling p50/p95/p99 for the insight-generator stages.
+    
+    Stages:
+    - signal_pickup: signal created_at to polled by this service
+    - insight_generation: AI generation plus persistence of one insight
+    - block_to_insight: ingestion trace start to insight persisted
+    
+    Each stage has a StageHistogram with preallocated buckets, so recording
+    a sample never allocates.
+    """
+    
+    def __init__(self, window_seconds: float = 900, slots: int = 15):
+        """
+        Initialize tracker.
+        
+        Args:
+            window_seconds: Rolling window for percentiles (default: 15 minutes)
+            slots: Number of sub-windows per histogram
+        """
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self._histograms: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+    
+    def _histogram(self, stage: str) -> StageHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    stage,
+                    StageHistogram(self.window_seconds, self.slots)
+                )
+        return histogram
+    
+    def record(self, stage: str, duration_ms: float) -> None:
+        """Record one latency sample in milliseconds."""
+        self._histogram(stage).record(duration_ms)
+    
+    def record_pickup(self, signal: Dict[str, Any], correlation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Record how long a signal waited in BigQuery before being picked up.
+        
+        Args:
+            signal: Signal row from intel.signals
+            correlation_id: Correlation ID of the current polling cycle
+        
+        Returns:
+            Upstream trace context of the signal, if any
+        """
+        pickup_ms = milliseconds_since(signal.get("created_at"))
+        if pickup_ms is not None:
+            self.record("signal_pickup", pickup_ms)
+        
+        trace = trace_context(signal)
+        if trace:
+            logger.info(
+                f"Picked up signal {signal.get('signal_id')} for block {trace.get('block_height')}",
+                extra={
+                    "correlation_id": correlation_id,
+                    "upstream_correlation_id": trace.get("correlation_id"),
+                    "block_height": trace.get("block_height"),
+                    "pickup_ms": pickup_ms
+                }
+            )
+        return trace
+    
+    def record_insight(
+        self,
+        trace: Optional[Dict[str, Any]],
+        generation_ms: float,
+        correlation_id: str
+    ) -> None:
+        """
+        Record a persisted insight's generation time and block-to-insight latency.
+        
+        Args:
+            trace: Upstream trace context from record_pickup
+            generation_ms: Time spent generating and persisting the insight
+            correlation_id: Correlation ID of the current polling cycle
+        """
+        self.record("insight_generation", generation_ms)
+        if not trace:
+            return
+        
+        block_to_insight_ms = milliseconds_since(trace.get("pipeline_started_at"))
+        if block_to_insight_ms is None:
+            return
+        
+        self.record("block_to_insight", block_to_insight_ms)
+        logger.info(
+            f"Block {trace.get('block_height')} reached insight in {block_to_insight_ms:.0f}ms",
+            extra={
+                "correlation_id": correlation_id,
+                "upstream_correlation_id": trace.get("correlation_id"),
+                "block_height": trace.get("block_height"),
+                "block_to_insight_ms": block_to_insight_ms
+            }
+        )
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summarize samples inside the rolling window.
+        
+        Returns:
+            Count, mean, p50/p95/p99 and max in milliseconds per stage
+        """
+        return {
+            "window_seconds": self.window_seconds,
+            "stages": {stage: histogram.snapshot() for stage, histogram in list(self._histograms.items())}
+        }
@@ -0,0 +1,123 @@
+"""
+Unit tests for pipeline latency tracking
+
+Tests trace context extraction from signal metadata, pickup and
+block-to-insight latency recording, and rolling percentiles.
+"""
+
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline_latency import (
+    BUCKET_BOUNDS_MS,
+    PipelineLatencyTracker,
+    StageHistogram,
+    trace_context,
+    milliseconds_since
+)
+
+
+def make_trace(started_seconds_ago=30):
+    """Build a trace context whose block was fetched the given time ago"""
+    return {
+        "correlation_id": "ingestion-corr-1",
+        "block_height": 870000,
+        "pipeline_started_at": (datetime.utcnow() - timedelta(seconds=started_seconds_ago)).isoformat()
+    }
+
+
+TRACE = make_trace()
+
+
+class TestTraceContext:
+    """Tests for trace context extraction"""
+    
+    def test_dict_metadata(self):
+        """Test trace is read from dict metadata"""
+        assert trace_context({"metadata": {"trace": TRACE}}) == TRACE
+    
+    def test_json_metadata(self):
+        """Test trace is read from JSON string metadata"""
+        assert trace_context({"metadata": json.dumps({"trace": TRACE})}) == TRACE
+    
+    @pytest.mark.parametrize("metadata", [None, {}, "not json", {"trace": "x"}])
+    def test_missing_trace(self, metadata):
+        """Test signals without a trace return None"""
+        assert trace_context({"metadata": metadata}) is None
+    
+    def test_milliseconds_since(self):
+        """Test naive, aware and ISO timestamps"""
+        now = datetime(2025, 1, 1, 12, 0, 1, tzinfo=timezone.utc)
+        
+        assert milliseconds_since(datetime(2025, 1, 1, 12), now) == 1000
+        assert milliseconds_since("2025-01-01T12:00:00Z", now) == 1000
+        assert milliseconds_since(datetime(2025, 1, 1, 12, tzinfo=timezone.utc), now) == 1000
+        assert milliseconds_since("yesterday", now) is None
+        assert milliseconds_since(None, now) is None
+
+
+class TestPipelineLatencyTracker:
+    """Tests for PipelineLatencyTracker"""
+    
+    def test_pickup_and_insight(self):
+        """Test a traced signal records all three stages"""
+        tracker = PipelineLatencyTracker()
+        expected = make_trace()
+        signal = {
+            "signal_id": "signal-1",
+            "created_at": datetime.now(timezone.utc) - timedelta(seconds=5),
+            "metadata": {"trace": expected}
+        }
+        
+        trace = tracker.record_pickup(signal, "cycle-1")
+        tracker.record_insight(trace, 1200.0, "cycle-1")
+        
+        stages = tracker.snapshot()["stages"]
+        assert trace == expected
+        assert stages["signal_pickup"]["p50_ms"] == pytest.approx(5000, rel=0.1)
+        assert stages["insight_generation"]["max_ms"] == 1200.0
+        assert stages["block_to_insight"]["p50_ms"] == pytest.approx(30000, rel=0.1)
+    
+    def test_untraced_signal(self):
+        """Test signals written before tracing only record pickup and generation"""
+        tracker = PipelineLatencyTracker()
+        
+        trace = tracker.record_pickup({"signal_id": "signal-1", "created_at": datetime.utcnow()}, "cycle-1")
+        tracker.record_insight(trace, 10.0, "cycle-1")
+        
+        assert set(tracker.snapshot()["stages"]) == {"signal_pickup", "insight_generation"}
+    
+    def test_percentiles(self):
+        """Test percentiles are estimated within bucket resolution"""
+        tracker = PipelineLatencyTracker()
+        for value in range(1, 201):
+            tracker.record("stage", float(value))
+        
+        summary = tracker.snapshot()["stages"]["stage"]
+        assert summary["count"] == 200
+        assert summary["p50_ms"] == pytest.approx(100, rel=0.13)
+        assert summary["p95_ms"] == pytest.approx(190, rel=0.13)
+        assert summary["p99_ms"] == pytest.approx(198, rel=0.13)
+        assert summary["max_ms"] == 200.0
+    
+    def test_window_expiry(self):
+        """Test samples older than the window are excluded"""
+        now = [1000.0]
+        histogram = StageHistogram(window_seconds=60, slots=6, clock=lambda: now[0])
+        histogram.record(1.0)
+        
+        now[0] += 70
+        
+        assert histogram.snapshot()["count"] == 0
+    
+    def test_bucket_layout_matches_ingestion(self):
+        """Test buckets span 10 µs to 10 minutes like the ingestion service's histograms"""
+        assert BUCKET_BOUNDS_MS[0] == 0.01
+        assert BUCKET_BOUNDS_MS[-1] == 600_000.0
+        assert len(BUCKET_BOUNDS_MS) == 157
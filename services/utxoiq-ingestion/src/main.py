@@ -2,6 +2,7 @@
 utxoIQ Ingestion Service - Bitcoin blockchain data ingestion and processing.
 """
 
+import asyncio
 from fastapi import FastAPI, HTTPException
 from datetime import datetime
 import logging
@@ -36,6 +37,9 @@ async def startup_event():
     # Start entity cache background reload
     entity_module.start_background_reload()
     
+    # Start periodic export of aggregated metrics
+    monitoring_module.start()
+    
     logger.info("Application startup complete")
 
 
@@ -47,6 +51,9 @@ async def shutdown_event():
     # Stop entity cache background reload
     await entity_module.stop_background_reload()
     
+    # Stop metric export and flush what is left
+    await asyncio.to_thread(monitoring_module.close)
+    
     logger.info("Application shutdown complete")
 
 # Initialize adapters
@@ -70,6 +77,7 @@ from src.processors.base_processor import ProcessorConfig
 from src.pipeline_orchestrator import PipelineOrchestrator
 from src.signal_persistence import SignalPersistenceModule
 from src.monitoring import MonitoringModule
+from src.pipeline_tracing import PipelineLatencyTracker
 
 # Create processor configuration
 processor_config = ProcessorConfig(
@@ -99,11 +107,17 @@ signal_persistence = SignalPersistenceModule(
     project_id=os.getenv('GCP_PROJECT_ID', 'utxoiq-dev')
 )
 
+# Rolling per-stage latency statistics (served by /metrics/pipeline-latency)
+latency_tracker = PipelineLatencyTracker(
+    window_seconds=int(os.getenv('PIPELINE_LATENCY_WINDOW', '900'))
+)
+
 # Initialize pipeline orchestrator
 pipeline_orchestrator = PipelineOrchestrator(
     signal_processors=signal_processors,
     signal_persistence=signal_persistence,
-    monitoring_module=monitoring_module
+    monitoring_module=monitoring_module,
+    latency_tracker=latency_tracker
 )
 
 logger.info(f"Pipeline orchestrator initialized with {len(signal_processors)} processors")
@@ -292,6 +306,24 @@ async def process_signals(block_data: Dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics/pipeline-latency")
+async def pipeline_latency(include_traces: bool = False):
+    """
+    Get rolling per-stage latency of the block pipeline.
+    
+    Stages: rpc_fetch, block_transform, bigquery_insert, signal_generation,
+    processor.<ProcessorName>, signal_persistence and total (block detection
+    to signals persisted). Stages are ordered by p95, slowest first.
+    
+    Args:
+        include_traces: Include the most recent block traces with their spans
+    
+    Returns:
+        p50/p95/p99 per stage over the rolling window
+    """
+    return latency_tracker.snapshot(include_traces=include_traces)
+
+
 @app.get("/status")
 async def get_status():
     """
@@ -0,0 +1,355 @@
+"""
+Metric Aggregator
+
+Accumulates counters, gauges and distributions in memory and exports them in
+batches from a background thread, keeping Cloud Monitoring I/O off the
+block processing path.
+"""
+
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from google.cloud import monitoring_v3
+    from google.api import distribution_pb2
+    MONITORING_AVAILABLE = True
+except ImportError:
+    MONITORING_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Cloud Monitoring accepts at most 200 time series per create_time_series call
+MAX_SERIES_PER_REQUEST = 200
+
+COUNTER = "counter"
+GAUGE = "gauge"
+DISTRIBUTION = "distribution"
+
+# Exponential bucket layout for distributions: 1, 2, 4, ... ~ 4.4 hours in ms
+DISTRIBUTION_BUCKETS = 24
+DISTRIBUTION_GROWTH_FACTOR = 2.0
+DISTRIBUTION_SCALE = 1.0
+
+# Cloud Monitoring rejects points whose kind differs from the existing
+# descriptor, and the duration metrics were first written as GAUGE, so
+# distributions are exported under their own metric type
+DISTRIBUTION_METRIC_SUFFIX = "_distribution"
+
+LabelSet = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, str, LabelSet]
+
+
+@dataclass
+class DistributionValue:
+    """Count, mean, sum of squared deviations and bucket counts of samples."""
+    
+    count: int = 0
+    mean: float = 0.0
+    sum_of_squared_deviation: float = 0.0
+    bucket_counts: List[int] = field(
+        default_factory=lambda: [0] * (DISTRIBUTION_BUCKETS + 2)
+    )
+    
+    def add(self, value: float) -> None:
+        """Add a sample (Welford's online update)."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.sum_of_squared_deviation += delta * (value - self.mean)
+        self.bucket_counts[self._bucket(value)] += 1
+    
+    @staticmethod
+    def _bucket(value: float) -> int:
+        # Bucket 0 is underflow (< scale), the last bucket is overflow
+        if value < DISTRIBUTION_SCALE:
+            return 0
+        index = int(math.log(value / DISTRIBUTION_SCALE, DISTRIBUTION_GROWTH_FACTOR)) + 1
+        return min(index, DISTRIBUTION_BUCKETS + 1)
+
+
+@dataclass
+class MetricSeries:
+    """One aggregated time series ready for export."""
+    
+    name: str
+    kind: str
+    labels: Dict[str, str]
+    value: object  # float for counters and gauges, DistributionValue otherwise
+    start_time: datetime
+    end_time: datetime
+
+
+class InMemoryMetricExporter:
+    """Exporter that keeps exported batches in memory (for tests and local runs)."""
+    
+    def __init__(self):
+        self.batches: List[List[MetricSeries]] = []
+    
+    def export(self, series: List[MetricSeries]) -> None:
+        """Store one batch of series."""
+        self.batches.append(list(series))
+    
+    @property
+    def series(self) -> List[MetricSeries]:
+        """All exported series in export order."""
+        return [s for batch in self.batches for s in batch]
+    
+    def find(self, name: str, **labels: str) -> List[MetricSeries]:
+        """Exported series with a metric name and matching labels."""
+        return [
+            s for s in self.series
+            if s.name == name and all(s.labels.get(k) == v for k, v in labels.items())
+        ]
+
+
+class CloudMonitoringExporter:
+    """
+    Exporter that writes series to Cloud Monitoring custom metrics.
+    
+    Distributions are written as ``custom.googleapis.com/utxoiq/<name>_distribution``;
+    counters and gauges keep ``custom.googleapis.com/utxoiq/<name>``.
+    """
+    
+    def __init__(self, client, project_id: str):
+        """
+        Initialize Cloud Monitoring exporter.
+        
+        Args:
+            client: monitoring_v3.MetricServiceClient
+            project_id: GCP project ID
+        """
+        self.client = client
+        self.project_id = project_id
+        self.project_name = f"projects/{project_id}"
+    
+    def export(self, series: List[MetricSeries]) -> None:
+        """Write one batch of series with a single create_time_series call."""
+        self.client.create_time_series(
+            name=self.project_name,
+            time_series=[self._to_time_series(s) for s in series]
+        )
+    
+    @staticmethod
+    def metric_type(series: MetricSeries) -> str:
+        """Cloud Monitoring metric type for a series."""
+        name = series.name
+        if series.kind == DISTRIBUTION:
+            name += DISTRIBUTION_METRIC_SUFFIX
+        return f"custom.googleapis.com/utxoiq/{name}"
+    
+    def _to_time_series(self, series: MetricSeries):
+        time_series = monitoring_v3.TimeSeries()
+        time_series.metric.type = self.metric_type(series)
+        for key, val in series.labels.items():
+            time_series.metric.labels[key] = val
+        
+        time_series.resource.type = "global"
+        time_series.resource.labels["project_id"] = self.project_id
+        
+        if series.kind == DISTRIBUTION:
+            dist = series.value
+            value = {
+                "distribution_value": distribution_pb2.Distribution(
+                    count=dist.count,
+                    mean=dist.mean,
+                    sum_of_squared_deviation=dist.sum_of_squared_deviation,
+                    bucket_options=distribution_pb2.Distribution.BucketOptions(
+                        exponential_buckets=distribution_pb2.Distribution.BucketOptions.Exponential(
+                            num_finite_buckets=DISTRIBUTION_BUCKETS,
+                            growth_factor=DISTRIBUTION_GROWTH_FACTOR,
+                            scale=DISTRIBUTION_SCALE
+                        )
+                    ),
+                    bucket_counts=dist.bucket_counts
+                )
+            }
+        else:
+            value = {"double_value": float(series.value)}
+        
+        # Counters are written as the total for the flush window, which keeps
+        # them compatible with the existing GAUGE metric descriptors
+        time_series.points = [
+            monitoring_v3.Point({
+                "interval": {"end_time": _timestamp(series.end_time)},
+                "value": value
+            })
+        ]
+        return time_series
+
+
+def _timestamp(moment: datetime) -> Dict[str, int]:
+    epoch = moment.timestamp()
+    seconds = int(epoch)
+    return {"seconds": seconds, "nanos": int((epoch - seconds) * 10**9)}
+
+
+class MetricAggregator:
+    """
+    In-process aggregator for metrics.
+    
+    Recording a metric only updates an in-memory value for its
+    (name, labels) series under a lock, so it is cheap and safe to call from
+    any thread or event loop. A daemon thread flushes all series every
+    ``flush_interval`` seconds as batches of at most
+    ``MAX_SERIES_PER_REQUEST`` series:
+    
+    - counters: sum of increments during the window
+    - gauges: last value recorded during the window
+    - distributions: count, mean and histogram of samples during the window
+    """
+    
+    def __init__(
+        self,
+        exporter=None,
+        flush_interval: float = 60.0,
+        max_series_per_request: int = MAX_SERIES_PER_REQUEST
+    ):
+        """
+        Initialize metric aggregator.
+        
+        Args:
+            exporter: Object with an ``export(series)`` method (None drops metrics)
+            flush_interval: Seconds between background flushes
+            max_series_per_request: Series per export call
+        """
+        self.exporter = exporter
+        self.flush_interval = flush_interval
+        self.max_series_per_request = min(max_series_per_request, MAX_SERIES_PER_REQUEST)
+        
+        self._lock = threading.Lock()
+        self._values: Dict[SeriesKey, object] = {}
+        self._window_start = datetime.utcnow()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.recorded = 0
+        self.exported_series = 0
+        self.export_requests = 0
+        self.export_failures = 0
+    
+    @staticmethod
+    def _key(name: str, kind: str, labels: Optional[Dict[str, str]]) -> SeriesKey:
+        return (name, kind, tuple(sorted((k, str(v)) for k, v in (labels or {}).items())))
+    
+    def record_counter(
+        self,
+        name: str,
+        value: float = 1,
+        labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Add to a counter."""
+        key = self._key(name, COUNTER, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+            self.recorded += 1
+    
+    def record_gauge(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Set a gauge to its latest value."""
+        key = self._key(name, GAUGE, labels)
+        with self._lock:
+            self._values[key] = value
+            self.recorded += 1
+    
+    def record_distribution(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Add a sample to a distribution."""
+        key = self._key(name, DISTRIBUTION, labels)
+        with self._lock:
+            distribution = self._values.get(key)
+            if distribution is None:
+                distribution = self._values[key] = DistributionValue()
+            distribution.add(value)
+            self.recorded += 1
+    
+    def start(self) -> None:
+        """Start the background flush thread."""
+        if self._thread is not None:
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metric-flush", daemon=True)
+        self._thread.start()
+        logger.info(f"Metric aggregator started (flush every {self.flush_interval}s)")
+    
+    def close(self) -> None:
+        """Stop the flush thread and export what is left."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 30)
+            self._thread = None
+        self.flush()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Export all series accumulated since the last flush.
+        
+        Returns:
+            Number of series exported
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            values, self._values = self._values, {}
+            window_start, self._window_start = self._window_start, now
+        
+        if not values or self.exporter is None:
+            return 0
+        
+        series = [
+            MetricSeries(
+                name=name,
+                kind=kind,
+                labels=dict(labels),
+                value=value,
+                start_time=window_start,
+                end_time=now
+            )
+            for (name, kind, labels), value in values.items()
+        ]
+        
+        exported = 0
+        for start in range(0, len(series), self.max_series_per_request):
+            batch = series[start:start + self.max_series_per_request]
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                self.export_failures += 1
+                logger.warning(
+                    f"Failed to export {len(batch)} metric series: {e}",
+                    extra={"series": len(batch), "error": str(e)}
+                )
+                continue
+            self.export_requests += 1
+            exported += len(batch)
+        
+        self.exported_series += exported
+        logger.debug(f"Flushed {exported} metric series")
+        return exported
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get aggregator statistics."""
+        with self._lock:
+            pending = len(self._values)
+        return {
+            "pending_series": pending,
+            "recorded": self.recorded,
+            "exported_series": self.exported_series,
+            "export_requests": self.export_requests,
+            "export_failures": self.export_failures,
+        }
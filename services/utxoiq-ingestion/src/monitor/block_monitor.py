@@ -11,6 +11,8 @@ from datetime import datetime
 from threading import Thread
 from typing import Optional
 
+from src.pipeline_tracing import PipelineTrace
+
 logger = logging.getLogger(__name__)
 
 
@@ -134,19 +136,23 @@ class BlockMonitor:
             else:
                 raise
     
-    def process_and_ingest_block(self, block_data: dict) -> bool:
+    def process_and_ingest_block(self, block_data: dict, trace: Optional[PipelineTrace] = None) -> bool:
         """
         Process and ingest block data, then trigger signal generation.
         
         Args:
             block_data: Raw block data from Bitcoin Core
+            trace: Trace started when the block was fetched (created if omitted)
             
         Returns:
             True if successful, False otherwise
         """
+        if trace is None:
+            trace = PipelineTrace(block_height=block_data.get('height'))
+        
         try:
             # Process block
-            processed_block = self.block_processor.process_block(block_data)
+            processed_block = trace.timed('block_transform', self.block_processor.process_block, block_data)
             
             # Check if block should be ingested
             if not self.bq_adapter.should_ingest_block(processed_block['timestamp']):
@@ -157,12 +163,13 @@ class BlockMonitor:
                 return True  # Not an error, just skipped
             
             # Insert block
-            self.bq_adapter.insert_block(processed_block)
+            trace.timed('bigquery_insert', self.bq_adapter.insert_block, processed_block)
             
             # Process and insert transactions if present
             if 'tx' in block_data:
                 transactions = []
                 
+                transform_start = time.perf_counter()
                 for tx_data in block_data['tx']:
                     tx = self.block_processor.process_transaction(
                         tx_data,
@@ -171,10 +178,11 @@ class BlockMonitor:
                         processed_block['timestamp']
                     )
                     transactions.append(tx)
+                trace.record('block_transform', (time.perf_counter() - transform_start) * 1000)
                 
                 # Batch insert transactions
                 if transactions:
-                    self.bq_adapter.insert_transactions(transactions)
+                    trace.timed('bigquery_insert', self.bq_adapter.insert_transactions, transactions)
             
             logger.info(
                 f"✅ Block {processed_block['number']} ingested "
@@ -183,7 +191,7 @@ class BlockMonitor:
             
             # Trigger signal generation pipeline if orchestrator is available
             if self.pipeline_orchestrator:
-                self._trigger_signal_generation(processed_block, block_data)
+                self._trigger_signal_generation(processed_block, block_data, trace)
             
             return True
             
@@ -191,7 +199,12 @@ class BlockMonitor:
             logger.error(f"Failed to process block: {e}", exc_info=True)
             return False
     
-    def _trigger_signal_generation(self, processed_block: dict, raw_block_data: dict) -> None:
+    def _trigger_signal_generation(
+        self,
+        processed_block: dict,
+        raw_block_data: dict,
+        trace: Optional[PipelineTrace] = None
+    ) -> None:
         """
         Trigger signal generation pipeline for the processed block.
         
@@ -202,6 +215,7 @@ class BlockMonitor:
         Args:
             processed_block: Processed block data from block processor
             raw_block_data: Raw block data from Bitcoin Core (for historical context)
+            trace: Trace of the block so far, continued by the orchestrator
             
         Requirements: 5.1
         """
@@ -250,7 +264,8 @@ class BlockMonitor:
             result = loop.run_until_complete(
                 self.pipeline_orchestrator.process_new_block(
                     block=block,
-                    historical_data=historical_data
+                    historical_data=historical_data,
+                    trace=trace
                 )
             )
             
@@ -319,11 +334,12 @@ class BlockMonitor:
                         
                         logger.info(f"📦 New block detected: {next_height}")
                         
-                        # Get block data
-                        block_data = self.get_block_data(next_height)
+                        # Get block data (the block's trace starts here)
+                        trace = PipelineTrace(block_height=next_height)
+                        block_data = trace.timed('rpc_fetch', self.get_block_data, next_height)
                         
                         # Process and ingest
-                        success = self.process_and_ingest_block(block_data)
+                        success = self.process_and_ingest_block(block_data, trace)
                         
                         if success:
                             self.last_processed_height = next_height
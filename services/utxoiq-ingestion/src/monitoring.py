@@ -4,17 +4,21 @@ Monitoring Module
 Handles emission of metrics to Cloud Monitoring for observability.
 Tracks pipeline performance, signal generation, errors, and entity identification.
 
+Metrics are aggregated in memory by MetricAggregator and exported in batches
+from a background thread, so emitting a metric never waits on the
+Monitoring API.
+
 Requirements: 12.1, 12.2, 12.3, 12.4, 12.5, 12.6, 12.7, 12.8
 """
 
 import os
 import logging
 from typing import Dict, Any, Optional
-from datetime import datetime
+
+from .metric_aggregator import MetricAggregator, CloudMonitoringExporter
 
 try:
     from google.cloud import monitoring_v3
-    from google.api import metric_pb2 as ga_metric
     MONITORING_AVAILABLE = True
 except ImportError:
     MONITORING_AVAILABLE = False
@@ -41,7 +45,9 @@ class MonitoringModule:
     def __init__(
         self,
         project_id: Optional[str] = None,
-        enabled: bool = True
+        enabled: bool = True,
+        flush_interval: Optional[float] = None,
+        exporter: Optional[Any] = None
     ):
         """
         Initialize Monitoring Module.
@@ -49,15 +55,21 @@ class MonitoringModule:
         Args:
             project_id: GCP project ID (defaults to PROJECT_ID env var)
             enabled: Whether monitoring is enabled (default: True)
+            flush_interval: Seconds between metric exports
+                (defaults to MONITORING_FLUSH_INTERVAL env var or 60)
+            exporter: Metric exporter to use instead of Cloud Monitoring
+                (e.g. InMemoryMetricExporter in tests)
         """
         self.project_id = project_id or os.getenv("PROJECT_ID", "utxoiq-dev")
         self.enabled = enabled and MONITORING_AVAILABLE
         self.client = None
+        flush_interval = flush_interval or float(os.getenv("MONITORING_FLUSH_INTERVAL", "60"))
         
-        if self.enabled:
+        if self.enabled and exporter is None:
             try:
                 self.client = monitoring_v3.MetricServiceClient()
                 self.project_name = f"projects/{self.project_id}"
+                exporter = CloudMonitoringExporter(self.client, self.project_id)
                 logger.info(
                     f"MonitoringModule initialized for project: {self.project_id}"
                 )
@@ -67,11 +79,30 @@ class MonitoringModule:
                     "Metrics will be logged only."
                 )
                 self.enabled = False
-        else:
+        elif exporter is None:
             logger.info(
                 "MonitoringModule initialized in logging-only mode "
                 "(Cloud Monitoring not available)"
             )
+        
+        self.aggregator = MetricAggregator(exporter=exporter, flush_interval=flush_interval)
+    
+    def start(self) -> None:
+        """Start exporting aggregated metrics in the background."""
+        self.aggregator.start()
+    
+    def close(self) -> None:
+        """Stop the background exporter and flush remaining metrics."""
+        self.aggregator.close()
+    
+    def flush(self) -> int:
+        """
+        Export aggregated metrics now.
+        
+        Returns:
+            Number of time series exported
+        """
+        return self.aggregator.flush()
     
     async def emit_pipeline_metrics(
         self,
@@ -97,24 +128,18 @@ class MonitoringModule:
             
         Requirements: 12.1
         """
-        metrics = {
+        # Correlation ID and block height are unique per block; they stay in
+        # the log entry below so the time series can aggregate across blocks
+        durations = {
             "signal_generation_duration_ms": signal_generation_ms,
             "signal_persistence_duration_ms": signal_persistence_ms,
-            "total_pipeline_duration_ms": total_duration_ms,
-            "signals_generated": signal_count
+            "total_pipeline_duration_ms": total_duration_ms
         }
         
-        labels = {
-            "correlation_id": correlation_id,
-            "block_height": str(block_height)
-        }
+        for metric_name, value in durations.items():
+            self.aggregator.record_distribution(metric_name, value)
         
-        for metric_name, value in metrics.items():
-            await self._write_metric(
-                metric_name,
-                value,
-                labels=labels
-            )
+        self.aggregator.record_counter("signals_generated", signal_count)
         
         logger.info(
             "Pipeline metrics emitted",
@@ -144,7 +169,7 @@ class MonitoringModule:
         """
         confidence_bucket = self._get_confidence_bucket(confidence)
         
-        await self._write_metric(
+        self.aggregator.record_counter(
             "signals_by_type",
             1,
             labels={
@@ -181,14 +206,14 @@ class MonitoringModule:
         confidence_bucket = self._get_confidence_bucket(confidence)
         
         # Emit duration metric
-        await self._write_metric(
+        self.aggregator.record_distribution(
             "insight_generation_duration_ms",
             generation_ms,
             labels={"category": category}
         )
         
         # Emit count metric
-        await self._write_metric(
+        self.aggregator.record_counter(
             "insights_by_category",
             1,
             labels={
@@ -221,7 +246,7 @@ class MonitoringModule:
             
         Requirements: 12.4
         """
-        await self._write_metric(
+        self.aggregator.record_counter(
             "entity_identifications",
             1,
             labels={
@@ -264,7 +289,7 @@ class MonitoringModule:
         if processor:
             labels["processor"] = processor
         
-        await self._write_metric(
+        self.aggregator.record_counter(
             "error_count",
             1,
             labels=labels
@@ -296,7 +321,7 @@ class MonitoringModule:
             
         Requirements: 12.6
         """
-        await self._write_metric(
+        self.aggregator.record_distribution(
             "ai_provider_latency_ms",
             latency_ms,
             labels={
@@ -330,12 +355,12 @@ class MonitoringModule:
             
         Requirements: 12.8
         """
-        await self._write_metric(
+        self.aggregator.record_gauge(
             "backfill_blocks_processed",
             blocks_processed
         )
         
-        await self._write_metric(
+        self.aggregator.record_gauge(
             "backfill_signals_generated",
             signals_generated
         )
@@ -365,7 +390,7 @@ class MonitoringModule:
             
         Requirements: 12.7
         """
-        await self._write_metric(
+        self.aggregator.record_counter(
             counter_name,
             value,
             labels=labels or {}
@@ -400,7 +425,7 @@ class MonitoringModule:
         labels: Optional[Dict[str, str]] = None
     ) -> None:
         """
-        Write a metric to Cloud Monitoring.
+        Record a gauge metric for the next export.
         
         If Cloud Monitoring is not available or disabled, metrics are logged only.
         
@@ -417,49 +442,4 @@ class MonitoringModule:
             extra={"metric": metric_name, "value": value, "labels": labels}
         )
         
-        # Write to Cloud Monitoring if enabled
-        if not self.enabled or not self.client:
-            return
-        
-        try:
-            # Create time series
-            series = monitoring_v3.TimeSeries()
-            series.metric.type = f"custom.googleapis.com/utxoiq/{metric_name}"
-            
-            # Add labels
-            for key, val in labels.items():
-                series.metric.labels[key] = str(val)
-            
-            # Set resource
-            series.resource.type = "global"
-            series.resource.labels["project_id"] = self.project_id
-            
-            # Create data point
-            now = datetime.utcnow()
-            seconds = int(now.timestamp())
-            nanos = int((now.timestamp() - seconds) * 10**9)
-            
-            interval = monitoring_v3.TimeInterval(
-                {"end_time": {"seconds": seconds, "nanos": nanos}}
-            )
-            
-            point = monitoring_v3.Point(
-                {
-                    "interval": interval,
-                    "value": {"double_value": float(value)}
-                }
-            )
-            
-            series.points = [point]
-            
-            # Write time series
-            self.client.create_time_series(
-                name=self.project_name,
-                time_series=[series]
-            )
-            
-        except Exception as e:
-            logger.warning(
-                f"Failed to write metric {metric_name} to Cloud Monitoring: {e}",
-                extra={"metric": metric_name, "value": value, "error": str(e)}
-            )
+        self.aggregator.record_gauge(metric_name, value, labels=labels)
@@ -8,7 +8,6 @@ metrics, and ensures graceful error handling.
 Requirements: 5.1, 5.3, 5.4, 6.1
 """
 
-import uuid
 import time
 import asyncio
 import logging
@@ -18,6 +17,7 @@ from datetime import datetime
 from .models import BlockData, Signal
 from .processors.base_processor import SignalProcessor, ProcessingContext
 from .signal_persistence import SignalPersistenceModule, PersistenceResult
+from .pipeline_tracing import PipelineTrace, PipelineLatencyTracker
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +59,7 @@ class PipelineOrchestrator:
     - Run all enabled processors in parallel
     - Persist signals to BigQuery
     - Log timing metrics for each stage with correlation IDs
+    - Record per-stage latencies in a rolling PipelineLatencyTracker
     - Handle failures without blocking subsequent blocks
     - Emit success metrics to Cloud Monitoring
     
@@ -69,7 +70,8 @@ class PipelineOrchestrator:
         self,
         signal_processors: List[SignalProcessor],
         signal_persistence: SignalPersistenceModule,
-        monitoring_module: Optional[Any] = None
+        monitoring_module: Optional[Any] = None,
+        latency_tracker: Optional[PipelineLatencyTracker] = None
     ):
         """
         Initialize Pipeline Orchestrator.
@@ -78,10 +80,12 @@ class PipelineOrchestrator:
             signal_processors: List of signal processor instances
             signal_persistence: Signal persistence module for BigQuery writes
             monitoring_module: Optional monitoring module for metrics emission
+            latency_tracker: Rolling per-stage latency statistics (created if omitted)
         """
         self.processors = signal_processors
         self.persistence = signal_persistence
         self.monitoring = monitoring_module
+        self.latency_tracker = latency_tracker or PipelineLatencyTracker()
         
         # Count enabled processors
         enabled_count = sum(1 for p in self.processors if p.enabled)
@@ -94,13 +98,14 @@ class PipelineOrchestrator:
     async def process_new_block(
         self,
         block: BlockData,
-        historical_data: Optional[Dict[str, Any]] = None
+        historical_data: Optional[Dict[str, Any]] = None,
+        trace: Optional[PipelineTrace] = None
     ) -> PipelineResult:
         """
         Execute complete pipeline for new block.
         
         This method orchestrates the entire signal generation workflow:
-        1. Generate unique correlation ID for tracing
+        1. Start (or continue) the block's trace and take its correlation ID
         2. Run all enabled signal processors in parallel
         3. Persist generated signals to BigQuery
         4. Log timing metrics for each stage
@@ -112,15 +117,19 @@ class PipelineOrchestrator:
         Args:
             block: Block data to process
             historical_data: Optional historical context for processors
+            trace: Trace started upstream (e.g. by BlockMonitor at RPC fetch)
             
         Returns:
             PipelineResult with timing metrics and success/failure status
             
         Requirements: 5.1, 5.3
         """
-        # Generate correlation ID for request tracing
-        correlation_id = str(uuid.uuid4())
-        start_time = time.time()
+        # Continue the upstream trace so its correlation ID covers the whole block
+        if trace is None:
+            trace = PipelineTrace(block_height=block.height)
+        trace.block_height = block.height
+        correlation_id = trace.correlation_id
+        start_time = time.perf_counter()
         
         logger.info(
             f"Starting pipeline for block {block.height}",
@@ -134,9 +143,10 @@ class PipelineOrchestrator:
         
         try:
             # Stage 1: Signal Generation (run processors in parallel)
-            signal_gen_start = time.time()
-            signals = await self._generate_signals(block, historical_data, correlation_id)
-            signal_gen_duration = (time.time() - signal_gen_start) * 1000  # Convert to ms
+            signal_gen_start = time.perf_counter()
+            signals = await self._generate_signals(block, historical_data, trace)
+            signal_gen_duration = (time.perf_counter() - signal_gen_start) * 1000  # Convert to ms
+            trace.record("signal_generation", signal_gen_duration)
             
             logger.info(
                 f"Signal generation completed for block {block.height}",
@@ -149,12 +159,14 @@ class PipelineOrchestrator:
             )
             
             # Stage 2: Signal Persistence
-            persist_start = time.time()
+            persist_start = time.perf_counter()
             persistence_result = await self.persistence.persist_signals(
                 signals,
-                correlation_id
+                correlation_id,
+                trace_context=trace.propagation_context()
             )
-            persist_duration = (time.time() - persist_start) * 1000  # Convert to ms
+            persist_duration = (time.perf_counter() - persist_start) * 1000  # Convert to ms
+            trace.record("signal_persistence", persist_duration)
             
             if not persistence_result.success:
                 logger.error(
@@ -168,7 +180,8 @@ class PipelineOrchestrator:
                 # Continue processing - don't block on persistence failures
             
             # Calculate total duration
-            total_duration = (time.time() - start_time) * 1000  # Convert to ms
+            total_duration = (time.perf_counter() - start_time) * 1000  # Convert to ms
+            self.latency_tracker.finish(trace)
             
             # Collect timing metrics
             timing_metrics = {
@@ -217,7 +230,8 @@ class PipelineOrchestrator:
             
         except Exception as e:
             # Log pipeline failure with full context
-            total_duration = (time.time() - start_time) * 1000
+            total_duration = (time.perf_counter() - start_time) * 1000
+            self.latency_tracker.finish(trace)
             error_msg = f"Pipeline failed for block {block.height}: {str(e)}"
             
             logger.error(
@@ -258,7 +272,7 @@ class PipelineOrchestrator:
         self,
         block: BlockData,
         historical_data: Optional[Dict[str, Any]],
-        correlation_id: str
+        trace: PipelineTrace
     ) -> List[Signal]:
         """
         Run all enabled signal processors in parallel.
@@ -270,7 +284,7 @@ class PipelineOrchestrator:
         Args:
             block: Block data to process
             historical_data: Optional historical context
-            correlation_id: Correlation ID for tracing
+            trace: Trace of the block; each processor's duration is recorded on it
             
         Returns:
             List of all signals generated by enabled processors
@@ -278,12 +292,14 @@ class PipelineOrchestrator:
         Requirements: 5.1, 6.1
         """
         signals = []
+        correlation_id = trace.correlation_id
         
         # Create processing context
         context = ProcessingContext(
             block=block,
             historical_data=historical_data,
-            correlation_id=correlation_id
+            correlation_id=correlation_id,
+            trace=trace
         )
         
         # Create tasks for all enabled processors
@@ -391,13 +407,15 @@ class PipelineOrchestrator:
         processor_name = processor.__class__.__name__
         correlation_id = context.correlation_id
         
+        start_time = time.perf_counter()
+        
         try:
-            start_time = time.time()
-            
             # Run processor
             signals = await processor.process_block(block, context)
             
-            duration = (time.time() - start_time) * 1000  # Convert to ms
+            duration = (time.perf_counter() - start_time) * 1000  # Convert to ms
+            if context.trace:
+                context.trace.record(f"processor.{processor_name}", duration)
             
             logger.debug(
                 f"Processor {processor_name} completed",
@@ -415,6 +433,11 @@ class PipelineOrchestrator:
         except Exception as e:
             # Log processor failure with context
             error_type = type(e).__name__
+            if context.trace:
+                context.trace.record(
+                    f"processor.{processor_name}",
+                    (time.perf_counter() - start_time) * 1000
+                )
             
             logger.error(
                 f"Signal processor failed: {processor_name}",
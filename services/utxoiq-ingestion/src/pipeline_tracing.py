@@ -0,0 +1,314 @@
+"""
+Pipeline Tracing Module
+
+Per-stage latency instrumentation for the block-to-insight pipeline.
+
+A PipelineTrace follows one block from RPC fetch through transformation,
+BigQuery insert, each signal processor and signal persistence, timing every
+stage with the monotonic clock. Finished traces feed PipelineLatencyTracker,
+which keeps rolling per-stage histograms with preallocated buckets so that
+recording a sample never allocates.
+
+The trace's correlation ID, block height and start time are written into each
+persisted signal's metadata so the insight-generator can measure its pickup
+latency for the same block.
+"""
+
+import time
+import uuid
+import bisect
+import logging
+import threading
+from array import array
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _log_buckets(low_ms: float, high_ms: float, per_decade: int) -> Tuple[float, ...]:
+    """Logarithmically spaced bucket upper bounds from low_ms to high_ms."""
+    bounds = []
+    factor = 10 ** (1 / per_decade)
+    value = low_ms
+    while value < high_ms:
+        bounds.append(round(value, 6))
+        value *= factor
+    bounds.append(high_ms)
+    return tuple(bounds)
+
+
+# Bucket upper bounds: 10 µs to 10 minutes, ~12% wide; last bucket is overflow
+BUCKET_BOUNDS_MS = _log_buckets(0.01, 600_000.0, per_decade=20)
+
+
+class StageHistogram:
+    """
+    Rolling latency histogram for one stage.
+    
+    The window is split into slots, each with a preallocated bucket array.
+    Recording a sample increments one counter; slots older than the window
+    are cleared lazily when their index is reused.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: float = 900,
+        slots: int = 15,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize histogram.
+        
+        Args:
+            window_seconds: Length of the rolling window
+            slots: Number of sub-windows the window is divided into
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.slot_seconds = window_seconds / slots
+        self._clock = clock
+        self._lock = threading.Lock()
+        
+        size = len(BUCKET_BOUNDS_MS) + 1
+        self._counts = [array('L', [0]) * size for _ in range(slots)]
+        self._epochs = array('q', [-1]) * slots
+        self._sums = array('d', [0.0]) * slots
+        self._maxes = array('d', [0.0]) * slots
+    
+    def _epoch(self) -> int:
+        return int(self._clock() / self.slot_seconds)
+    
+    def record(self, duration_ms: float) -> None:
+        """Record one latency sample in milliseconds."""
+        bucket = bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)
+        epoch = self._epoch()
+        index = epoch % self.slots
+        
+        with self._lock:
+            if self._epochs[index] != epoch:
+                counts = self._counts[index]
+                for i in range(len(counts)):
+                    counts[i] = 0
+                self._epochs[index] = epoch
+                self._sums[index] = 0.0
+                self._maxes[index] = 0.0
+            
+            self._counts[index][bucket] += 1
+            self._sums[index] += duration_ms
+            if duration_ms > self._maxes[index]:
+                self._maxes[index] = duration_ms
+    
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Summarize samples inside the rolling window.
+        
+        Returns:
+            Count, mean, p50/p95/p99 and max in milliseconds
+        """
+        oldest = self._epoch() - self.slots + 1
+        merged = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        total = 0.0
+        maximum = 0.0
+        
+        with self._lock:
+            for index in range(self.slots):
+                if self._epochs[index] < oldest:
+                    continue
+                for bucket, count in enumerate(self._counts[index]):
+                    if count:
+                        merged[bucket] += count
+                total += self._sums[index]
+                maximum = max(maximum, self._maxes[index])
+        
+        count = sum(merged)
+        if count == 0:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        
+        return {
+            "count": count,
+            "mean_ms": round(total / count, 3),
+            "p50_ms": round(self._percentile(merged, count, 50, maximum), 3),
+            "p95_ms": round(self._percentile(merged, count, 95, maximum), 3),
+            "p99_ms": round(self._percentile(merged, count, 99, maximum), 3),
+            "max_ms": round(maximum, 3)
+        }
+    
+    @staticmethod
+    def _percentile(counts: List[int], total: int, q: float, maximum: float) -> float:
+        """Estimate a percentile by interpolating inside its bucket."""
+        rank = q / 100 * total
+        seen = 0
+        for bucket, count in enumerate(counts):
+            if not count:
+                continue
+            if seen + count >= rank:
+                lower = BUCKET_BOUNDS_MS[bucket - 1] if bucket > 0 else 0.0
+                upper = BUCKET_BOUNDS_MS[bucket] if bucket < len(BUCKET_BOUNDS_MS) else maximum
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(estimate, maximum)
+            seen += count
+        return maximum
+
+
+class PipelineTrace:
+    """
+    Stage timings for one block's pass through the pipeline.
+    
+    Created when a block is detected and carried through BlockMonitor,
+    PipelineOrchestrator and ProcessingContext. Spans are timed with
+    time.perf_counter; wall-clock time is only kept for the start so it can
+    be propagated to other services.
+    """
+    
+    def __init__(
+        self,
+        block_height: Optional[int] = None,
+        correlation_id: Optional[str] = None
+    ):
+        self.block_height = block_height
+        self.correlation_id = correlation_id or str(uuid.uuid4())
+        self.started_at = datetime.utcnow()
+        self._start = time.perf_counter()
+        # (stage, offset from trace start in ms, duration in ms)
+        self.spans: List[Tuple[str, float, float]] = []
+    
+    @contextmanager
+    def span(self, stage: str):
+        """Time the enclosed block as a span of ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((stage, (start - self._start) * 1000, (end - start) * 1000))
+    
+    def timed(self, stage: str, func: Callable, *args, **kwargs) -> Any:
+        """Call ``func`` and record the call as a span of ``stage``."""
+        with self.span(stage):
+            return func(*args, **kwargs)
+    
+    def record(self, stage: str, duration_ms: float) -> None:
+        """Record a span that ended now and lasted ``duration_ms``."""
+        offset = self.elapsed_ms() - duration_ms
+        self.spans.append((stage, max(0.0, offset), duration_ms))
+    
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the trace started."""
+        return (time.perf_counter() - self._start) * 1000
+    
+    def stage_durations(self) -> Dict[str, float]:
+        """Total duration per stage (stages may have several spans)."""
+        durations: Dict[str, float] = {}
+        for stage, _, duration in self.spans:
+            durations[stage] = durations.get(stage, 0.0) + duration
+        return durations
+    
+    def propagation_context(self) -> Dict[str, Any]:
+        """Fields carried to downstream services with the block's signals."""
+        return {
+            "correlation_id": self.correlation_id,
+            "block_height": self.block_height,
+            "pipeline_started_at": self.started_at.isoformat()
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.propagation_context(),
+            "total_ms": round(self.elapsed_ms(), 3),
+            "spans": [
+                {"stage": stage, "offset_ms": round(offset, 3), "duration_ms": round(duration, 3)}
+                for stage, offset, duration in self.spans
+            ]
+        }
+
+
+class PipelineLatencyTracker:
+    """
+    Rolling per-stage latency statistics for finished pipeline traces.
+    
+    Backs the /metrics/pipeline-latency endpoint. Histograms are created the
+    first time a stage is seen and reused afterwards.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: float = 900,
+        slots: int = 15,
+        recent_traces: int = 20
+    ):
+        """
+        Initialize tracker.
+        
+        Args:
+            window_seconds: Rolling window for percentiles (default: 15 minutes)
+            slots: Number of sub-windows per histogram
+            recent_traces: Number of finished traces kept for inspection
+        """
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self._histograms: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=recent_traces)
+        self.traces_finished = 0
+    
+    def _histogram(self, stage: str) -> StageHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    stage,
+                    StageHistogram(self.window_seconds, self.slots)
+                )
+        return histogram
+    
+    def record(self, stage: str, duration_ms: float) -> None:
+        """Record a single stage sample outside of a trace."""
+        self._histogram(stage).record(duration_ms)
+    
+    def finish(self, trace: PipelineTrace) -> None:
+        """
+        Record every stage of a finished trace plus its end-to-end total.
+        
+        Args:
+            trace: Trace whose block has completed the pipeline
+        """
+        for stage, duration in trace.stage_durations().items():
+            self.record(stage, duration)
+        
+        total = trace.elapsed_ms()
+        self.record("total", total)
+        self._recent.append(trace.to_dict())
+        self.traces_finished += 1
+        
+        logger.debug(
+            f"Pipeline trace finished for block {trace.block_height} in {total:.1f}ms",
+            extra={
+                "correlation_id": trace.correlation_id,
+                "block_height": trace.block_height,
+                "stage_durations_ms": trace.stage_durations()
+            }
+        )
+    
+    def snapshot(self, include_traces: bool = True) -> Dict[str, Any]:
+        """
+        Rolling percentiles per stage.
+        
+        Args:
+            include_traces: Include the most recent traces with their spans
+        
+        Returns:
+            Window configuration, per-stage statistics and recent traces
+        """
+        stages = {stage: histogram.snapshot() for stage, histogram in list(self._histograms.items())}
+        snapshot = {
+            "window_seconds": self.window_seconds,
+            "traces_finished": self.traces_finished,
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["p95_ms"]))
+        }
+        if include_traces:
+            snapshot["recent_traces"] = list(self._recent)
+        return snapshot
@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from ..models import Signal, BlockData
+from ..pipeline_tracing import PipelineTrace
 
 
 class ProcessorConfig:
@@ -34,11 +35,14 @@ class ProcessingContext:
         self,
         block: BlockData,
         historical_data: Optional[Dict[str, Any]] = None,
-        correlation_id: Optional[str] = None
+        correlation_id: Optional[str] = None,
+        trace: Optional[PipelineTrace] = None
     ):
         self.block = block
         self.historical_data = historical_data or {}
         self.correlation_id = correlation_id
+        # Per-stage timings for this block, shared with the orchestrator
+        self.trace = trace
         self.timestamp = datetime.utcnow()
 
 
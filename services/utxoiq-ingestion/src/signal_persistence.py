@@ -111,7 +111,8 @@ class SignalPersistenceModule:
     async def persist_signals(
         self,
         signals: List[Signal],
-        correlation_id: str
+        correlation_id: str,
+        trace_context: Optional[Dict[str, Any]] = None
     ) -> PersistenceResult:
         """
         Batch insert signals to BigQuery intel.signals table with retry logic.
@@ -125,6 +126,9 @@ class SignalPersistenceModule:
         Args:
             signals: List of Signal objects to persist
             correlation_id: Correlation ID for request tracing
+            trace_context: Pipeline trace fields (correlation ID, block height,
+                start time) stored under metadata["trace"] so the
+                insight-generator can continue the block's trace
             
         Returns:
             PersistenceResult with success status and error details
@@ -146,6 +150,8 @@ class SignalPersistenceModule:
         rows_to_insert = []
         for signal in signals:
             row = self._signal_to_bigquery_row(signal)
+            if trace_context:
+                row["metadata"] = {**(row["metadata"] or {}), "trace": trace_context}
             rows_to_insert.append(row)
         
         # Retry loop with exponential backoff
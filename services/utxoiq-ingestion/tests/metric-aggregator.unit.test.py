@@ -0,0 +1,198 @@
+"""
+Tests for the in-process metric aggregator.
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock
+
+from src.metric_aggregator import (
+    MetricAggregator,
+    InMemoryMetricExporter,
+    CloudMonitoringExporter,
+    DistributionValue,
+    DISTRIBUTION_BUCKETS,
+    MAX_SERIES_PER_REQUEST,
+)
+from src.monitoring import MonitoringModule
+
+
+class TestMetricAggregator:
+    """Test suite for MetricAggregator."""
+    
+    @pytest.fixture
+    def exporter(self):
+        """Create in-memory exporter."""
+        return InMemoryMetricExporter()
+    
+    @pytest.fixture
+    def aggregator(self, exporter):
+        """Create aggregator without a background thread."""
+        return MetricAggregator(exporter=exporter, flush_interval=3600)
+    
+    def test_counters_are_summed_per_label_set(self, aggregator, exporter):
+        """Test counter increments with the same labels collapse into one series."""
+        for _ in range(3):
+            aggregator.record_counter("signals_by_type", labels={"signal_type": "mempool"})
+        aggregator.record_counter("signals_by_type", 5, labels={"signal_type": "exchange"})
+        
+        assert aggregator.flush() == 2
+        
+        assert exporter.find("signals_by_type", signal_type="mempool")[0].value == 3
+        assert exporter.find("signals_by_type", signal_type="exchange")[0].value == 5
+    
+    def test_label_order_does_not_split_series(self, aggregator, exporter):
+        """Test labels are keyed independently of dict order."""
+        aggregator.record_counter("error_count", labels={"a": "1", "b": "2"})
+        aggregator.record_counter("error_count", labels={"b": "2", "a": "1"})
+        
+        aggregator.flush()
+        
+        assert len(exporter.series) == 1
+        assert exporter.series[0].value == 2
+    
+    def test_gauge_keeps_last_value(self, aggregator, exporter):
+        """Test gauges export the most recent value of the window."""
+        aggregator.record_gauge("backfill_blocks_processed", 100)
+        aggregator.record_gauge("backfill_blocks_processed", 250)
+        
+        aggregator.flush()
+        
+        assert exporter.find("backfill_blocks_processed")[0].value == 250
+    
+    def test_distribution_statistics(self, aggregator, exporter):
+        """Test distributions track count, mean, deviation and buckets."""
+        for value in (0.5, 1.0, 3.0, 1000.0):
+            aggregator.record_distribution("total_pipeline_duration_ms", value)
+        
+        aggregator.flush()
+        
+        dist = exporter.find("total_pipeline_duration_ms")[0].value
+        assert dist.count == 4
+        assert dist.mean == pytest.approx(1004.5 / 4)
+        assert dist.sum_of_squared_deviation == pytest.approx(
+            sum((v - 1004.5 / 4) ** 2 for v in (0.5, 1.0, 3.0, 1000.0))
+        )
+        assert len(dist.bucket_counts) == DISTRIBUTION_BUCKETS + 2
+        assert dist.bucket_counts[0] == 1   # 0.5 underflow
+        assert dist.bucket_counts[1] == 1   # [1, 2)
+        assert dist.bucket_counts[2] == 1   # [2, 4)
+        assert dist.bucket_counts[10] == 1  # [512, 1024)
+    
+    def test_distributions_use_their_own_metric_type(self, aggregator, exporter):
+        """Test distributions do not reuse the GAUGE descriptors of the same name."""
+        aggregator.record_distribution("total_pipeline_duration_ms", 5.0)
+        aggregator.record_gauge("backfill_blocks_processed", 250)
+        aggregator.flush()
+        client = Mock()
+        
+        CloudMonitoringExporter(client, "utxoiq-test").export(exporter.series)
+        
+        written = client.create_time_series.call_args.kwargs["time_series"]
+        types = {ts.metric.type: ts.points[0].value for ts in written}
+        distribution = types["custom.googleapis.com/utxoiq/total_pipeline_duration_ms_distribution"]
+        assert distribution.distribution_value.count == 1
+        assert types["custom.googleapis.com/utxoiq/backfill_blocks_processed"].double_value == 250
+    
+    def test_distribution_overflow_bucket(self):
+        """Test very large samples land in the overflow bucket."""
+        dist = DistributionValue()
+        dist.add(1e12)
+        
+        assert dist.bucket_counts[-1] == 1
+    
+    def test_flush_batches_series(self, aggregator, exporter):
+        """Test series are exported in requests of at most 200 series."""
+        for i in range(450):
+            aggregator.record_counter("entity_identifications", labels={"entity_name": f"e{i}"})
+        
+        assert aggregator.flush() == 450
+        
+        assert [len(batch) for batch in exporter.batches] == [MAX_SERIES_PER_REQUEST, MAX_SERIES_PER_REQUEST, 50]
+        assert aggregator.get_stats()["export_requests"] == 3
+    
+    def test_flush_resets_window(self, aggregator, exporter):
+        """Test each flush only exports values recorded since the previous one."""
+        aggregator.record_counter("error_count")
+        aggregator.flush()
+        
+        assert aggregator.flush() == 0
+        
+        aggregator.record_counter("error_count")
+        aggregator.flush()
+        
+        assert [s.value for s in exporter.find("error_count")] == [1, 1]
+        first, second = exporter.series
+        assert second.start_time >= first.end_time
+    
+    def test_export_failure_is_counted(self, aggregator):
+        """Test a failing batch is dropped without raising."""
+        aggregator.exporter = Mock()
+        aggregator.exporter.export.side_effect = RuntimeError("quota exceeded")
+        aggregator.record_counter("error_count")
+        
+        assert aggregator.flush() == 0
+        
+        stats = aggregator.get_stats()
+        assert stats["export_failures"] == 1
+        assert stats["pending_series"] == 0
+    
+    def test_concurrent_recording(self, aggregator, exporter):
+        """Test counters stay exact when recorded from several threads."""
+        def record():
+            for _ in range(1000):
+                aggregator.record_counter("signals_generated")
+        
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        aggregator.flush()
+        
+        assert exporter.find("signals_generated")[0].value == 4000
+    
+    def test_background_flush(self, exporter):
+        """Test the background thread exports periodically and on close."""
+        aggregator = MetricAggregator(exporter=exporter, flush_interval=0.05)
+        aggregator.start()
+        aggregator.record_counter("error_count")
+        
+        for _ in range(100):
+            if exporter.batches:
+                break
+            threading.Event().wait(0.01)
+        
+        aggregator.record_gauge("backfill_blocks_processed", 1)
+        aggregator.close()
+        
+        assert exporter.find("error_count")[0].value == 1
+        assert exporter.find("backfill_blocks_processed")[0].value == 1
+
+
+class TestMonitoringModuleAggregation:
+    """Test MonitoringModule with an in-memory exporter."""
+    
+    @pytest.mark.asyncio
+    async def test_pipeline_metrics_drop_per_block_labels(self):
+        """Test per-block metrics aggregate across blocks."""
+        exporter = InMemoryMetricExporter()
+        module = MonitoringModule(project_id="test-project", exporter=exporter)
+        
+        for height in (800000, 800001):
+            await module.emit_pipeline_metrics(
+                correlation_id=f"corr-{height}",
+                block_height=height,
+                signal_count=3,
+                signal_generation_ms=100.0,
+                signal_persistence_ms=50.0,
+                total_duration_ms=150.0
+            )
+        
+        module.flush()
+        
+        assert exporter.find("signals_generated")[0].value == 6
+        duration = exporter.find("total_pipeline_duration_ms")[0]
+        assert duration.labels == {}
+        assert duration.value.count == 2
@@ -0,0 +1,255 @@
+"""
+Tests for per-stage pipeline tracing and rolling latency histograms.
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+from google.cloud import bigquery
+
+from src.models import BlockData, Signal, SignalType
+from src.pipeline_orchestrator import PipelineOrchestrator
+from src.pipeline_tracing import PipelineTrace, PipelineLatencyTracker, StageHistogram
+from src.processors.base_processor import SignalProcessor, ProcessorConfig
+from src.signal_persistence import PersistenceResult, SignalPersistenceModule
+from shared.types import Signal as PersistedSignal
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestStageHistogram:
+    """Test suite for StageHistogram."""
+    
+    def test_percentiles_within_bucket_resolution(self):
+        """Test estimated percentiles are close to the exact values."""
+        histogram = StageHistogram()
+        for value in range(1, 1001):
+            histogram.record(float(value))
+        
+        snapshot = histogram.snapshot()
+        
+        assert snapshot["count"] == 1000
+        assert snapshot["max_ms"] == 1000.0
+        assert snapshot["mean_ms"] == pytest.approx(500.5)
+        assert snapshot["p50_ms"] == pytest.approx(500, rel=0.13)
+        assert snapshot["p95_ms"] == pytest.approx(950, rel=0.13)
+        assert snapshot["p99_ms"] == pytest.approx(990, rel=0.13)
+        assert snapshot["p99_ms"] <= snapshot["max_ms"]
+    
+    def test_empty_snapshot(self):
+        """Test snapshot without samples."""
+        assert StageHistogram().snapshot()["count"] == 0
+    
+    def test_samples_expire_after_window(self):
+        """Test samples older than the window are dropped."""
+        clock = FakeClock()
+        histogram = StageHistogram(window_seconds=60, slots=6, clock=clock)
+        
+        histogram.record(100.0)
+        clock.now += 30
+        histogram.record(5.0)
+        assert histogram.snapshot()["count"] == 2
+        
+        clock.now += 40
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 1
+        assert snapshot["max_ms"] == 5.0
+    
+    def test_reused_slot_is_cleared(self):
+        """Test a slot reused after a full window starts empty."""
+        clock = FakeClock()
+        histogram = StageHistogram(window_seconds=60, slots=6, clock=clock)
+        
+        histogram.record(100.0)
+        clock.now += 60
+        histogram.record(1.0)
+        
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 1
+        assert snapshot["max_ms"] == 1.0
+    
+    def test_overflow_bucket(self):
+        """Test samples above the last bound are kept."""
+        histogram = StageHistogram()
+        histogram.record(10_000_000.0)
+        
+        snapshot = histogram.snapshot()
+        assert snapshot["max_ms"] == 10_000_000.0
+        assert 600_000.0 < snapshot["p99_ms"] <= snapshot["max_ms"]
+
+
+class TestPipelineTrace:
+    """Test suite for PipelineTrace."""
+    
+    def test_spans_are_summed_per_stage(self):
+        """Test repeated stages add up."""
+        trace = PipelineTrace(block_height=800000)
+        with trace.span("block_transform"):
+            pass
+        trace.record("bigquery_insert", 2.0)
+        trace.record("bigquery_insert", 3.0)
+        
+        durations = trace.stage_durations()
+        
+        assert set(durations) == {"block_transform", "bigquery_insert"}
+        assert durations["bigquery_insert"] == 5.0
+        assert trace.spans[0][1] >= 0.0
+    
+    def test_timed_call(self):
+        """Test a timed call returns its result and records a span."""
+        trace = PipelineTrace(block_height=800000)
+        
+        result = trace.timed("rpc_fetch", dict, height=800000)
+        
+        assert result == {"height": 800000}
+        assert [stage for stage, _, _ in trace.spans] == ["rpc_fetch"]
+    
+    def test_propagation_context(self):
+        """Test fields carried to downstream services."""
+        trace = PipelineTrace(block_height=800000, correlation_id="corr-1")
+        
+        context = trace.propagation_context()
+        
+        assert context["correlation_id"] == "corr-1"
+        assert context["block_height"] == 800000
+        assert datetime.fromisoformat(context["pipeline_started_at"]) <= datetime.utcnow()
+
+
+class TestPipelineLatencyTracker:
+    """Test suite for PipelineLatencyTracker."""
+    
+    def test_finish_records_stages_and_total(self):
+        """Test every stage of a finished trace is recorded."""
+        tracker = PipelineLatencyTracker(recent_traces=2)
+        for height in range(3):
+            trace = PipelineTrace(block_height=height)
+            trace.record("rpc_fetch", 10.0)
+            trace.record("signal_generation", 50.0)
+            tracker.finish(trace)
+        
+        snapshot = tracker.snapshot()
+        
+        assert snapshot["traces_finished"] == 3
+        assert list(snapshot["stages"])[0] in ("signal_generation", "total")
+        assert snapshot["stages"]["rpc_fetch"]["count"] == 3
+        assert snapshot["stages"]["total"]["count"] == 3
+        assert [t["block_height"] for t in snapshot["recent_traces"]] == [1, 2]
+        assert "recent_traces" not in tracker.snapshot(include_traces=False)
+
+
+class SlowProcessor(SignalProcessor):
+    """Processor returning one signal."""
+    
+    async def process_block(self, block, context):
+        return [Signal(type=SignalType.MEMPOOL, strength=0.9, data={}, block_height=block.height)]
+
+
+class FailingProcessor(SignalProcessor):
+    """Processor that always raises."""
+    
+    async def process_block(self, block, context):
+        raise ValueError("boom")
+
+
+class TestOrchestratorTracing:
+    """Test per-stage timings recorded by PipelineOrchestrator."""
+    
+    @pytest.fixture
+    def block(self):
+        return BlockData(
+            block_hash="00" * 32,
+            height=800000,
+            timestamp=datetime.utcnow(),
+            size=1000,
+            tx_count=10,
+            fees_total=0.1
+        )
+    
+    @pytest.fixture
+    def persistence(self):
+        persistence = Mock()
+        persistence.persist_signals = AsyncMock(return_value=PersistenceResult(success=True, signal_count=1))
+        return persistence
+    
+    @pytest.mark.asyncio
+    async def test_upstream_trace_is_continued(self, block, persistence):
+        """Test the upstream trace's correlation ID and spans are kept."""
+        tracker = PipelineLatencyTracker()
+        config = ProcessorConfig()
+        orchestrator = PipelineOrchestrator(
+            signal_processors=[SlowProcessor(config), FailingProcessor(config)],
+            signal_persistence=persistence,
+            latency_tracker=tracker
+        )
+        trace = PipelineTrace(block_height=block.height)
+        trace.record("rpc_fetch", 1.0)
+        
+        result = await orchestrator.process_new_block(block, trace=trace)
+        
+        assert result.success
+        assert result.correlation_id == trace.correlation_id
+        assert set(trace.stage_durations()) == {
+            "rpc_fetch",
+            "processor.SlowProcessor",
+            "processor.FailingProcessor",
+            "signal_generation",
+            "signal_persistence",
+        }
+        assert persistence.persist_signals.call_args.kwargs["trace_context"] == trace.propagation_context()
+        assert tracker.snapshot()["stages"]["total"]["count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_trace_created_without_upstream(self, block, persistence):
+        """Test a trace is started when none is passed."""
+        orchestrator = PipelineOrchestrator(signal_processors=[], signal_persistence=persistence)
+        
+        result = await orchestrator.process_new_block(block)
+        
+        stages = orchestrator.latency_tracker.snapshot()["stages"]
+        assert result.success
+        assert stages["signal_persistence"]["count"] == 1
+
+
+class TestPersistedTraceContext:
+    """Test trace context handed to the insight-generator through BigQuery."""
+    
+    @pytest.mark.asyncio
+    async def test_persist_signals_with_trace_context(self):
+        """Test trace context is stored in signal metadata."""
+        client = Mock(spec=bigquery.Client)
+        client.insert_rows_json.return_value = []
+        persistence = SignalPersistenceModule(bigquery_client=client, project_id="test-project")
+        signal = PersistedSignal(
+            signal_id="test-signal-123",
+            signal_type="mempool",
+            block_height=800000,
+            confidence=0.85,
+            metadata={"tx_count": 15000},
+            created_at=datetime.utcnow()
+        )
+        trace_context = {
+            "correlation_id": "test-correlation-123",
+            "block_height": 800000,
+            "pipeline_started_at": "2024-01-01T12:00:00"
+        }
+        
+        result = await persistence.persist_signals(
+            signals=[signal],
+            correlation_id="test-correlation-123",
+            trace_context=trace_context
+        )
+        
+        assert result.success is True
+        rows = client.insert_rows_json.call_args[0][1]
+        assert rows[0]["metadata"]["trace"] == trace_context
+        assert rows[0]["metadata"]["tx_count"] == 15000
+        assert "trace" not in signal.metadata
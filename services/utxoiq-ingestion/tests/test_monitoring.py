@@ -3,7 +3,8 @@ Unit tests for MonitoringModule.
 
 Tests the emission of metrics to Cloud Monitoring for observability.
 Covers pipeline metrics, signal metrics, insight metrics, entity metrics,
-error metrics, AI provider metrics, and backfill metrics.
+error metrics, AI provider metrics, and backfill metrics. Metrics are
+aggregated in memory, so each test flushes before checking the API calls.
 
 Requirements: 12.1, 12.2, 12.3, 12.4, 12.5, 12.6, 12.7, 12.8
 """
@@ -34,6 +35,12 @@ def monitoring_module(mock_monitoring_client):
         return module
 
 
+def exported_series(mock_client):
+    """Time series written by the single batched create_time_series call."""
+    assert mock_client.create_time_series.call_count == 1
+    return mock_client.create_time_series.call_args.kwargs["time_series"]
+
+
 @pytest.fixture
 def monitoring_module_disabled():
     """Create a MonitoringModule instance with monitoring disabled."""
@@ -87,8 +94,13 @@ class TestPipelineMetrics:
             total_duration_ms=2000.0
         )
         
-        # Verify create_time_series was called for each metric
-        assert mock_monitoring_client.create_time_series.call_count == 4
+        # Nothing is written until the aggregator flushes
+        mock_monitoring_client.create_time_series.assert_not_called()
+        
+        monitoring_module.flush()
+        
+        # Three duration distributions and the signal counter in one request
+        assert len(exported_series(mock_monitoring_client)) == 4
 
 
 class TestSignalMetrics:
@@ -102,8 +114,10 @@ class TestSignalMetrics:
             confidence=0.9
         )
         
+        monitoring_module.flush()
+        
         # Verify metric was written
-        assert mock_monitoring_client.create_time_series.call_count == 1
+        assert len(exported_series(mock_monitoring_client)) == 1
 
 
 class TestInsightMetrics:
@@ -118,8 +132,10 @@ class TestInsightMetrics:
             generation_ms=3000.0
         )
         
+        monitoring_module.flush()
+        
         # Should emit 2 metrics: duration and count
-        assert mock_monitoring_client.create_time_series.call_count == 2
+        assert len(exported_series(mock_monitoring_client)) == 2
 
 
 class TestEntityMetrics:
@@ -133,7 +149,9 @@ class TestEntityMetrics:
             entity_type="exchange"
         )
         
-        assert mock_monitoring_client.create_time_series.call_count == 1
+        monitoring_module.flush()
+        
+        assert len(exported_series(mock_monitoring_client)) == 1
 
 
 class TestErrorMetrics:
@@ -147,7 +165,9 @@ class TestErrorMetrics:
             service_name="utxoiq-ingestion"
         )
         
-        assert mock_monitoring_client.create_time_series.call_count == 1
+        monitoring_module.flush()
+        
+        assert len(exported_series(mock_monitoring_client)) == 1
 
 
 class TestAIProviderMetrics:
@@ -162,7 +182,9 @@ class TestAIProviderMetrics:
             success=True
         )
         
-        assert mock_monitoring_client.create_time_series.call_count == 1
+        monitoring_module.flush()
+        
+        assert len(exported_series(mock_monitoring_client)) == 1
 
 
 class TestBackfillMetrics:
@@ -176,8 +198,10 @@ class TestBackfillMetrics:
             signals_generated=5000
         )
         
+        monitoring_module.flush()
+        
         # Should emit 2 metrics: blocks_processed and signals_generated
-        assert mock_monitoring_client.create_time_series.call_count == 2
+        assert len(exported_series(mock_monitoring_client)) == 2
 
 
 class TestCounterMetrics:
@@ -187,8 +211,13 @@ class TestCounterMetrics:
     async def test_increment_counter_default(self, monitoring_module, mock_monitoring_client):
         """Test incrementing counter with default value."""
         await monitoring_module.increment_counter("total_blocks_processed")
+        await monitoring_module.increment_counter("total_blocks_processed")
         
-        assert mock_monitoring_client.create_time_series.call_count == 1
+        monitoring_module.flush()
+        
+        series = exported_series(mock_monitoring_client)
+        assert len(series) == 1
+        assert series[0].points[0].value.double_value == 2
 
 
 class TestConfidenceBucket:
@@ -225,7 +254,9 @@ class TestWriteMetric:
             labels={"label1": "value1", "label2": "value2"}
         )
         
-        assert mock_monitoring_client.create_time_series.call_count == 1
+        monitoring_module.flush()
+        
+        assert len(exported_series(mock_monitoring_client)) == 1
     
     @pytest.mark.asyncio
     async def test_write_metric_disabled(self, monitoring_module_disabled):
@@ -235,3 +266,5 @@ class TestWriteMetric:
             "test_metric",
             75.0
         )
+        
+        assert monitoring_module_disabled.flush() == 0
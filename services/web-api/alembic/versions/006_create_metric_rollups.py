@@ -0,0 +1,45 @@
+"""create metric rollup tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-11-10 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+ROLLUP_TABLES = ['metric_rollups_1m', 'metric_rollups_1h', 'metric_rollups_1d']
+
+
+def upgrade() -> None:
+    """Create 1-minute, 1-hour and 1-day metric rollup tables."""
+    for table_name in ROLLUP_TABLES:
+        op.create_table(
+            table_name,
+            sa.Column('service_name', sa.String(length=100), nullable=False),
+            sa.Column('metric_type', sa.String(length=50), nullable=False),
+            sa.Column('bucket', sa.DateTime(), nullable=False),
+            sa.Column('value_count', sa.BigInteger(), nullable=False),
+            sa.Column('value_sum', sa.Float(), nullable=False),
+            sa.Column('value_min', sa.Float(), nullable=False),
+            sa.Column('value_max', sa.Float(), nullable=False),
+            sa.Column('sketch', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+            sa.PrimaryKeyConstraint('service_name', 'metric_type', 'bucket')
+        )
+
+    # Rollups for metrics recorded before this migration are built with
+    # DatabaseService.rebuild_metric_rollups(start_time, end_time)
+
+
+def downgrade() -> None:
+    """Drop metric rollup tables."""
+    for table_name in reversed(ROLLUP_TABLES):
+        op.drop_table(table_name)
@@ -0,0 +1,50 @@
+"""index system_metrics on (timestamp, id) for keyset archival
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-11-14 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the timestamp index with a (timestamp, id) index."""
+    # Serves the same timestamp range scans and lets archival page with
+    # WHERE (timestamp, id) > (:timestamp, :id) ORDER BY timestamp, id.
+    # Built concurrently so metric writes are not blocked on a large table;
+    # CONCURRENTLY cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_metrics_timestamp_id',
+            'system_metrics',
+            ['timestamp', 'id'],
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'idx_metrics_timestamp',
+            table_name='system_metrics',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Restore the timestamp-only index."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_metrics_timestamp',
+            'system_metrics',
+            ['timestamp'],
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'idx_metrics_timestamp_id',
+            table_name='system_metrics',
+            postgresql_concurrently=True
+        )
@@ -62,6 +62,34 @@ class Settings(BaseSettings):
     rate_limit_pro_tier: int = 1000
     rate_limit_power_tier: int = 10000
     rate_limit_window: int = 3600
+    rate_limit_engine: str = "gcra"  # "gcra" (single Lua round trip) or "fixed_window"
+    rate_limit_local_burst: int = 10  # Requests granted locally between Redis syncs
+    rate_limit_sync_interval: float = 1.0  # Max seconds between Redis syncs per identifier
+    rate_limit_local_max_entries: int = 50000
+    
+    # Continuous profiling
+    continuous_profiling_enabled: bool = False
+    continuous_profiling_rate_hz: float = 10.0  # Stack samples per second
+    continuous_profiling_window_seconds: int = 60
+    continuous_profiling_windows: int = 60  # Windows kept in memory and on disk
+    continuous_profiling_dir: str = "/tmp/utxoiq-profiles"
+    continuous_profiling_export_gcs: bool = False
+    
+    # Log and error statistics counters
+    log_statistics_enabled: bool = False
+    log_statistics_retention_days: int = 30
+    log_statistics_cache_ttl: float = 10.0  # Seconds a dashboard range result is reused
+    log_statistics_push_token: str = ""  # Shared token on the log sink push subscription URL
+    log_statistics_dedupe_seconds: int = 86400  # How long insertIds are remembered to drop Pub/Sub redeliveries
+    
+    # Retention archival
+    retention_archive_dir: str = ""  # Write metric archives to this directory instead of GCS
+    retention_archive_chunk_rows: int = 20000  # Rows read per keyset query
+    retention_archive_rows_per_file: int = 500000
+    
+    # Service dependency graph
+    dependency_graph_settle_seconds: int = 60  # Trace minutes younger than this are refetched, not stored
+    dependency_graph_health_ttl: int = 60  # Seconds a service health status is reused
     
     # CORS
     cors_origins: str = "http://localhost:3000"
@@ -69,6 +97,11 @@ class Settings(BaseSettings):
     # WebSocket
     ws_heartbeat_interval: int = 30
     ws_max_connections: int = 10000
+    ws_send_queue_size: int = 256  # Frames buffered per connection
+    ws_overflow_policy: str = "disconnect"  # "disconnect" or "drop"
+    ws_backplane_enabled: bool = False  # Cross-instance delivery via Redis stream
+    ws_backplane_stream: str = "ws:insights"
+    ws_backplane_max_length: int = 10000  # Entries retained for resume
     
     @property
     def cors_origins_list(self) -> List[str]:
@@ -48,9 +48,40 @@ async def lifespan(app: FastAPI):
     from .database import init_db
     await init_db()
     
+    # Cross-instance WebSocket delivery
+    if settings.ws_backplane_enabled:
+        from .websocket import connection_manager
+        await connection_manager.start_backplane()
+    
+    # Always-on sampling profiler
+    if settings.continuous_profiling_enabled:
+        from .services.profiling_service import get_profiling_service
+        get_profiling_service().start_continuous_profiling(
+            service_name="web-api",
+            sample_rate_hz=settings.continuous_profiling_rate_hz,
+            window_seconds=settings.continuous_profiling_window_seconds,
+            max_windows=settings.continuous_profiling_windows,
+            storage_dir=settings.continuous_profiling_dir,
+            export_to_storage=settings.continuous_profiling_export_gcs
+        )
+    
     yield
     
     # Cleanup
+    if settings.ws_backplane_enabled:
+        from .websocket import connection_manager
+        await connection_manager.stop_backplane()
+    
+    if settings.continuous_profiling_enabled:
+        from .services.profiling_service import get_profiling_service
+        get_profiling_service().stop_continuous_profiling()
+    
+    from .services.rate_limiter_service import flush_rate_limiter
+    await flush_rate_limiter()
+    
+    from .services.notification_dispatcher import close_notification_dispatcher
+    await close_notification_dispatcher()
+    
     from .database import close_db
     await close_db()
     logger.info("Shutting down utxoIQ Web API")
@@ -1,6 +1,6 @@
 """Pydantic schemas for database models."""
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from datetime import datetime
 from uuid import UUID
 
@@ -146,6 +146,77 @@ class MetricCreate(BaseModel):
     )
 
 
+class MetricColumnsCreate(BaseModel):
+    """
+    Columnar batch of metrics from one service for bulk ingest.
+    
+    Every list holds one entry per metric. ``metric_types`` and ``units``
+    may instead hold a single entry that applies to all metrics, and
+    ``timestamps`` defaults to the time of ingest.
+    """
+    service_name: str = Field(..., max_length=100)
+    metric_values: List[float] = Field(..., max_length=100000)
+    metric_types: List[str] = Field(..., min_length=1)
+    units: List[str] = Field(..., min_length=1)
+    timestamps: Optional[List[datetime]] = None
+    metric_metadata: Optional[List[Optional[Dict[str, Any]]]] = None
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "service_name": "insight-generator",
+                "metric_values": [182.0, 240.5, 199.1],
+                "metric_types": ["latency"],
+                "units": ["ms"],
+                "timestamps": [
+                    "2024-01-01T00:00:00Z",
+                    "2024-01-01T00:00:01Z",
+                    "2024-01-01T00:00:02Z"
+                ]
+            }
+        }
+    )
+    
+    @model_validator(mode="after")
+    def check_column_lengths(self) -> "MetricColumnsCreate":
+        """Ensure every column has one entry per metric (or one shared entry)."""
+        count = len(self.metric_values)
+        # Same limits as the system_metrics columns
+        for name, max_length in (("metric_types", 50), ("units", 20)):
+            column = getattr(self, name)
+            if len(column) not in (1, count):
+                raise ValueError(f"{name} must have 1 or {count} entries")
+            if any(len(item) > max_length for item in column):
+                raise ValueError(f"{name} entries must be at most {max_length} characters")
+        for name in ("timestamps", "metric_metadata"):
+            column = getattr(self, name)
+            if column is not None and len(column) != count:
+                raise ValueError(f"{name} must have {count} entries")
+        return self
+    
+    def rows(self, default_timestamp: datetime) -> Iterator[
+        Tuple[str, float, str, datetime, Optional[Dict[str, Any]]]
+    ]:
+        """
+        Expand the columns into (metric_type, value, unit, timestamp, metadata) rows.
+        
+        Args:
+            default_timestamp: Timestamp for metrics sent without one
+        """
+        count = len(self.metric_values)
+        metric_types = self.metric_types * count if len(self.metric_types) == 1 else self.metric_types
+        units = self.units * count if len(self.units) == 1 else self.units
+        timestamps = self.timestamps or [default_timestamp] * count
+        metadata = self.metric_metadata or [None] * count
+        return zip(metric_types, self.metric_values, units, timestamps, metadata)
+
+
+class MetricBulkResponse(BaseModel):
+    """Schema for bulk metric ingest response."""
+    service_name: str
+    recorded: int
+
+
 class MetricResponse(BaseModel):
     """Schema for metric response."""
     id: UUID
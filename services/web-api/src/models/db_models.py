@@ -1,6 +1,6 @@
 """SQLAlchemy database models for persistent storage."""
 from sqlalchemy import (
-    Column, String, Integer, Float, Text, DateTime, Index, 
+    Column, String, Integer, BigInteger, Float, Text, DateTime, Index, 
     UniqueConstraint, TIMESTAMP, Boolean, ForeignKey
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
@@ -147,13 +147,50 @@ class SystemMetric(Base):
     __table_args__ = (
         Index('idx_metrics_service_time', 'service_name', 'timestamp'),
         Index('idx_metrics_type_time', 'metric_type', 'timestamp'),
-        Index('idx_metrics_timestamp', 'timestamp'),
+        Index('idx_metrics_timestamp_id', 'timestamp', 'id'),  # Keyset archival order
     )
     
     def __repr__(self):
         return f"<SystemMetric(service={self.service_name}, type={self.metric_type}, value={self.metric_value})>"
 
 
+class MetricRollupMixin:
+    """Columns shared by the pre-aggregated metric rollup tables."""
+    
+    service_name = Column(String(100), primary_key=True)
+    metric_type = Column(String(50), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)  # Bucket start (UTC)
+    value_count = Column(BigInteger, nullable=False)
+    value_sum = Column(Float, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+    sketch = Column(JSONB, nullable=False)  # Mergeable percentile sketch bins
+    
+    def __repr__(self):
+        return (
+            f"<{type(self).__name__}(service={self.service_name}, type={self.metric_type}, "
+            f"bucket={self.bucket}, count={self.value_count})>"
+        )
+
+
+class MetricRollupMinute(MetricRollupMixin, Base):
+    """One-minute rollups of system metrics."""
+    
+    __tablename__ = "metric_rollups_1m"
+
+
+class MetricRollupHour(MetricRollupMixin, Base):
+    """One-hour rollups of system metrics."""
+    
+    __tablename__ = "metric_rollups_1h"
+
+
+class MetricRollupDay(MetricRollupMixin, Base):
+    """One-day rollups of system metrics."""
+    
+    __tablename__ = "metric_rollups_1d"
+
+
 class FilterPreset(Base):
     """User-saved filter presets for quick access to common filter combinations."""
     
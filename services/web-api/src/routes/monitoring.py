@@ -3,21 +3,26 @@ Monitoring and system status endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from enum import Enum
 from uuid import UUID
+import base64
+import json
 import logging
+import secrets
 
 from src.services.database_service import DatabaseService
 from src.services.cache_service import CacheService
 from src.services.retention_service import RetentionService
 from src.services.tracing_service import TracingService
 from src.services.log_aggregation_service import LogAggregationService
+from src.services.log_statistics_service import get_log_statistics_engine
 from src.models.database_schemas import (
     BackfillJobCreate, BackfillJobUpdate, BackfillJobResponse,
-    MetricCreate, MetricResponse
+    MetricCreate, MetricColumnsCreate, MetricBulkResponse, MetricResponse
 )
 from src.models.monitoring_schemas import (
     AlertConfigCreate,
@@ -402,6 +407,36 @@ async def record_metrics_batch(metrics_data: List[MetricCreate]):
         raise HTTPException(status_code=500, detail="Failed to record metrics batch")
 
 
+@router.post("/metrics/bulk", response_model=MetricBulkResponse)
+async def ingest_metrics_bulk(columns: MetricColumnsCreate):
+    """
+    Bulk-ingest a columnar batch of metrics.
+    
+    Intended for high-volume producers: the batch is written with COPY and
+    created rows are not returned. Batches containing metrics older than the
+    hot storage window are rejected, since archival has already passed them.
+    
+    Args:
+        columns: Columnar metrics payload
+    
+    Returns:
+        Number of metrics recorded
+    
+    Raises:
+        HTTPException: If ingest fails
+    """
+    try:
+        async with DatabaseService() as db:
+            recorded = await db.ingest_metrics_columns(columns)
+        return MetricBulkResponse(service_name=columns.service_name, recorded=recorded)
+    except ValidationError as e:
+        logger.error(f"Validation error bulk ingesting metrics: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except DatabaseError as e:
+        logger.error(f"Database error bulk ingesting metrics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to ingest metrics")
+
+
 @router.get("/metrics", response_model=List[MetricResponse])
 async def get_metrics(
     service_name: Optional[str] = Query(None),
@@ -1730,8 +1765,11 @@ async def get_log_statistics(
         HTTPException: If statistics calculation fails
     """
     try:
-        # Initialize log aggregation service
-        log_service = LogAggregationService(project_id=settings.gcp_project_id)
+        # Initialize log aggregation service (counters serve ranges they cover)
+        log_service = LogAggregationService(
+            project_id=settings.gcp_project_id,
+            statistics_engine=await get_log_statistics_engine()
+        )
         
         # Get statistics
         stats = await log_service.get_log_statistics(
@@ -1757,6 +1795,71 @@ async def get_log_statistics(
         raise HTTPException(status_code=500, detail=f"Failed to retrieve log statistics: {str(e)}")
 
 
+class LogIngestRequest(BaseModel):
+    """Pub/Sub push envelope from a log sink, or entries posted directly"""
+    message: Optional[Dict[str, Any]] = None
+    subscription: Optional[str] = None
+    entries: Optional[List[Dict[str, Any]]] = None
+
+
+class LogIngestResponse(BaseModel):
+    """Log ingestion result"""
+    ingested: int
+
+
+@router.post("/logs/ingest", response_model=LogIngestResponse)
+async def ingest_logs(
+    request: LogIngestRequest,
+    token: str = Query(..., description="Log sink push token")
+):
+    """
+    Count log entries into the statistics engine.
+    
+    A Cloud Logging sink exports to a Pub/Sub topic whose push subscription
+    targets this endpoint with ``?token=<LOG_STATISTICS_PUSH_TOKEN>``; each
+    push carries one base64-encoded LogEntry. Locally, entries can be posted
+    as ``{"entries": [...]}`` in place of the sink.
+    
+    The sink filter must exclude this endpoint's own request logs
+    (``NOT httpRequest.requestUrl:"/monitoring/logs/ingest"``), otherwise
+    every push exports a new entry; any that arrive are not counted.
+    
+    Args:
+        request: Push envelope or entry list
+        token: Shared push token
+    
+    Returns:
+        Number of entries counted
+    
+    Raises:
+        HTTPException: If the token is wrong, the engine is disabled or counting fails
+    """
+    if not settings.log_statistics_push_token or not secrets.compare_digest(
+        token, settings.log_statistics_push_token
+    ):
+        raise HTTPException(status_code=403, detail="Invalid push token")
+    
+    engine = await get_log_statistics_engine()
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Log statistics are disabled")
+    
+    entries = list(request.entries or [])
+    if request.message and request.message.get("data"):
+        try:
+            entries.append(json.loads(base64.b64decode(request.message["data"])))
+        except (ValueError, TypeError) as e:
+            # Acknowledge malformed messages so Pub/Sub does not redeliver them
+            logger.warning(f"Dropping malformed log sink message: {e}")
+    
+    try:
+        ingested = await engine.ingest_entries(entries)
+    except Exception as e:
+        logger.error(f"Error counting log entries: {e}")
+        raise HTTPException(status_code=503, detail="Failed to count log entries")
+    
+    return LogIngestResponse(ingested=ingested)
+
+
 # Error Tracking Endpoints
 
 class ErrorGroupResponse(BaseModel):
@@ -1807,6 +1910,74 @@ class ErrorStatisticsResponse(BaseModel):
     service_filter: Optional[str]
 
 
+@router.get("/errors/statistics", response_model=ErrorStatisticsResponse)
+async def get_error_statistics(
+    service: Optional[str] = Query(None, description="Filter by service name"),
+    start_time: Optional[datetime] = Query(None, description="Start of time range (defaults to 7 days ago)"),
+    end_time: Optional[datetime] = Query(None, description="End of time range (defaults to now)"),
+    user: User = Depends(require_role(Role.USER)),
+    _: None = Depends(rate_limit_dependency)
+):
+    """
+    Get error statistics and trends.
+    
+    Provides comprehensive error analytics including:
+    - Total error count
+    - Number of unique error groups
+    - Affected user count
+    - Error rate trends
+    - Top errors by frequency
+    
+    Args:
+        service: Filter by service name (optional)
+        start_time: Start of time range (optional, defaults to 7 days ago)
+        end_time: End of time range (optional, defaults to now)
+        user: Authenticated user
+    
+    Returns:
+        Error statistics and trends
+    
+    Raises:
+        HTTPException: If statistics calculation fails
+    """
+    try:
+        from src.services.error_tracking_service import ErrorTrackingService
+        
+        # Initialize error tracking service (counters serve ranges they cover)
+        async with ErrorTrackingService(
+            project_id=settings.gcp_project_id,
+            statistics_engine=await get_log_statistics_engine()
+        ) as error_service:
+            # Get error statistics
+            stats = await error_service.get_error_statistics(
+                service=service,
+                start_time=start_time,
+                end_time=end_time
+            )
+        
+        logger.info(
+            f"Retrieved error statistics for user {user.id}: "
+            f"{stats['total_errors']} total errors, "
+            f"{stats['unique_error_groups']} unique groups, "
+            f"{stats['affected_users']} affected users"
+        )
+        
+        # Format response
+        return ErrorStatisticsResponse(
+            period_start=stats["period_start"],
+            period_end=stats["period_end"],
+            total_errors=stats["total_errors"],
+            unique_error_groups=stats["unique_error_groups"],
+            affected_users=stats["affected_users"],
+            error_rate_trend=stats["error_rate_trend"],
+            top_errors=[ErrorGroupResponse(**error) for error in stats["top_errors"]],
+            service_filter=stats.get("service_filter")
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving error statistics: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve error statistics: {str(e)}")
+
+
 @router.get("/errors", response_model=ErrorGroupListResponse)
 async def list_errors(
     service: Optional[str] = Query(None, description="Filter by service name"),
@@ -1967,71 +2138,6 @@ async def list_error_events(
         raise HTTPException(status_code=500, detail=f"Failed to list error events: {str(e)}")
 
 
-@router.get("/errors/statistics", response_model=ErrorStatisticsResponse)
-async def get_error_statistics(
-    service: Optional[str] = Query(None, description="Filter by service name"),
-    start_time: Optional[datetime] = Query(None, description="Start of time range (defaults to 7 days ago)"),
-    end_time: Optional[datetime] = Query(None, description="End of time range (defaults to now)"),
-    user: User = Depends(require_role(Role.USER)),
-    _: None = Depends(rate_limit_dependency)
-):
-    """
-    Get error statistics and trends.
-    
-    Provides comprehensive error analytics including:
-    - Total error count
-    - Number of unique error groups
-    - Affected user count
-    - Error rate trends
-    - Top errors by frequency
-    
-    Args:
-        service: Filter by service name (optional)
-        start_time: Start of time range (optional, defaults to 7 days ago)
-        end_time: End of time range (optional, defaults to now)
-        user: Authenticated user
-    
-    Returns:
-        Error statistics and trends
-    
-    Raises:
-        HTTPException: If statistics calculation fails
-    """
-    try:
-        from src.services.error_tracking_service import ErrorTrackingService
-        
-        # Initialize error tracking service
-        async with ErrorTrackingService(project_id=settings.gcp_project_id) as error_service:
-            # Get error statistics
-            stats = await error_service.get_error_statistics(
-                service=service,
-                start_time=start_time,
-                end_time=end_time
-            )
-        
-        logger.info(
-            f"Retrieved error statistics for user {user.id}: "
-            f"{stats['total_errors']} total errors, "
-            f"{stats['unique_error_groups']} unique groups, "
-            f"{stats['affected_users']} affected users"
-        )
-        
-        # Format response
-        return ErrorStatisticsResponse(
-            period_start=stats["period_start"],
-            period_end=stats["period_end"],
-            total_errors=stats["total_errors"],
-            unique_error_groups=stats["unique_error_groups"],
-            affected_users=stats["affected_users"],
-            error_rate_trend=stats["error_rate_trend"],
-            top_errors=[ErrorGroupResponse(**error) for error in stats["top_errors"]],
-            service_filter=stats.get("service_filter")
-        )
-    except Exception as e:
-        logger.error(f"Error retrieving error statistics: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve error statistics: {str(e)}")
-
-
 # Service Dependency Visualization Endpoints
 
 class ServiceNodeResponse(BaseModel):
@@ -2059,6 +2165,7 @@ class DependencyGraphMetadata(BaseModel):
     start_time: str
     end_time: str
     traces_analyzed: int
+    traces_fetched: int = 0
     total_services: int
     total_dependencies: int
 
@@ -2084,7 +2191,7 @@ async def get_service_dependencies(
         1000,
         ge=100,
         le=5000,
-        description="Maximum number of traces to analyze"
+        description="Maximum number of traces fetched per window not yet aggregated"
     ),
     user: User = Depends(require_role(Role.USER)),
     _: None = Depends(rate_limit_dependency)
@@ -2099,7 +2206,8 @@ async def get_service_dependencies(
     - Failed dependencies highlighted
     - Call counts and average durations
     
-    The graph is built by analyzing trace data within the specified time range.
+    The graph is answered from per-minute aggregates of trace data; only trace
+    windows not aggregated by earlier requests are fetched from Cloud Trace.
     Services are represented as nodes, and service-to-service calls as edges.
     
     Health status is determined by recent error rates:
@@ -2111,7 +2219,7 @@ async def get_service_dependencies(
     Args:
         start_time: Start of time range (optional, defaults to 1 hour ago)
         end_time: End of time range (optional, defaults to now)
-        max_traces: Maximum number of traces to analyze (100-5000)
+        max_traces: Maximum number of traces fetched per missing window (100-5000)
         user: Authenticated user
     
     Returns:
@@ -2121,7 +2229,7 @@ async def get_service_dependencies(
         HTTPException: If graph construction fails
     """
     try:
-        from src.services.dependency_visualization_service import DependencyVisualizationService
+        from src.services.dependency_visualization_service import get_dependency_visualization_service
         
         # Default to last hour if not specified
         if not end_time:
@@ -2144,10 +2252,8 @@ async def get_service_dependencies(
                 detail="Time range cannot exceed 24 hours"
             )
         
-        # Initialize dependency visualization service
-        dep_service = DependencyVisualizationService(
-            project_id=settings.gcp_project_id
-        )
+        # Shared service keeps per-minute aggregates between requests
+        dep_service = get_dependency_visualization_service()
         
         # Build dependency graph
         graph = await dep_service.build_dependency_graph(
@@ -2284,6 +2390,114 @@ async def start_profiling_session(
         )
 
 
+def _continuous_profiler():
+    """Return the running continuous profiler or raise 404"""
+    from src.services.profiling_service import get_profiling_service
+    
+    profiler = get_profiling_service().continuous_profiler
+    if not profiler:
+        raise HTTPException(
+            status_code=404,
+            detail="Continuous profiling is not enabled"
+        )
+    return profiler
+
+
+@router.get("/profile/continuous")
+async def get_continuous_profiling_status(
+    user: User = Depends(require_role(Role.ADMIN)),
+    _: None = Depends(rate_limit_dependency)
+):
+    """
+    Get continuous profiler status and the windows kept in memory.
+    
+    Each window summarizes one rolling period (default 60 seconds) of
+    low-rate stack samples, including its sample count and measured
+    sampling overhead.
+    
+    Args:
+        user: Authenticated admin user
+    
+    Returns:
+        Profiler configuration and window summaries
+    
+    Raises:
+        HTTPException: If continuous profiling is not enabled
+    """
+    return _continuous_profiler().status()
+
+
+@router.get("/profile/continuous/collapsed", response_class=PlainTextResponse)
+async def get_continuous_profile(
+    start_time: Optional[datetime] = Query(None, description="Start of time range"),
+    end_time: Optional[datetime] = Query(None, description="End of time range"),
+    user: User = Depends(require_role(Role.ADMIN)),
+    _: None = Depends(rate_limit_dependency)
+):
+    """
+    Get merged continuous profiles in collapsed-stack format.
+    
+    The output ("frame;frame;frame count" per line) can be rendered with
+    flamegraph.pl or loaded into speedscope.app.
+    
+    Args:
+        start_time: Only include windows ending after this time (optional)
+        end_time: Only include windows starting before this time (optional)
+        user: Authenticated admin user
+    
+    Returns:
+        Collapsed stacks for all windows in the range
+    
+    Raises:
+        HTTPException: If continuous profiling is not enabled
+    """
+    return _continuous_profiler().collapsed(start_time, end_time)
+
+
+@router.get("/profile/continuous/diff")
+async def diff_continuous_profiles(
+    baseline_start: Optional[datetime] = Query(None, description="Start of baseline range"),
+    baseline_end: Optional[datetime] = Query(None, description="End of baseline range"),
+    comparison_start: Optional[datetime] = Query(None, description="Start of comparison range"),
+    comparison_end: Optional[datetime] = Query(None, description="End of comparison range"),
+    limit: int = Query(20, ge=1, le=200, description="Maximum number of frames"),
+    user: User = Depends(require_role(Role.ADMIN)),
+    _: None = Depends(rate_limit_dependency)
+):
+    """
+    Compare CPU share per frame between two time ranges.
+    
+    Useful for finding what changed during a latency spike. Without any
+    range parameters, the latest window is compared with the earlier ones.
+    Frames are ordered by the absolute change in inclusive CPU share.
+    
+    Args:
+        baseline_start: Start of baseline range (optional)
+        baseline_end: End of baseline range (optional)
+        comparison_start: Start of comparison range (optional)
+        comparison_end: End of comparison range (optional)
+        limit: Maximum number of frames (1-200)
+        user: Authenticated admin user
+    
+    Returns:
+        Range summaries and the frames with the largest change
+    
+    Raises:
+        HTTPException: If profiling is not enabled or a range has no samples
+    """
+    profiler = _continuous_profiler()
+    try:
+        return profiler.diff(
+            baseline_start=baseline_start,
+            baseline_end=baseline_end,
+            comparison_start=comparison_start,
+            comparison_end=comparison_end,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/profile/{session_id}", response_model=ProfilingSessionResponse)
 async def get_profiling_session(
     session_id: str,
@@ -3,7 +3,7 @@ import logging
 import uuid
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from typing import Optional
-from ..websocket import connection_manager
+from ..websocket import connection_manager, Subscription
 from ..websocket.monitoring import monitoring_websocket_handler
 from ..middleware.auth import get_optional_user
 
@@ -15,7 +15,10 @@ router = APIRouter()
 @router.websocket("/ws/insights")
 async def websocket_insights(
     websocket: WebSocket,
-    token: Optional[str] = Query(None)
+    token: Optional[str] = Query(None),
+    signal_types: Optional[str] = Query(None),
+    min_confidence: Optional[float] = Query(None),
+    last_id: Optional[str] = Query(None)
 ):
     """
     WebSocket endpoint for real-time insight streaming.
@@ -23,9 +26,17 @@ async def websocket_insights(
     Clients can optionally provide a Firebase Auth token for authenticated access.
     Unauthenticated connections are supported for Guest Mode.
     
+    Insights carry an ``offset``. Clients can filter by topic with
+    ``{"type": "subscribe", "signal_types": [...], "min_confidence": 0.7}``
+    and catch up after a reconnect with ``{"type": "resume", "last_id": ...}``
+    (or the equivalent query parameters).
+    
     Args:
         websocket: The WebSocket connection
         token: Optional Firebase Auth token for authentication
+        signal_types: Optional comma-separated signal types to receive
+        min_confidence: Optional minimum insight confidence
+        last_id: Optional last offset received, to replay missed insights
     """
     connection_id = str(uuid.uuid4())
     user_id = None
@@ -42,15 +53,21 @@ async def websocket_insights(
     
     try:
         # Accept and register connection
-        await connection_manager.connect(websocket, connection_id, user_id)
+        subscription = Subscription.from_params(signal_types, min_confidence)
+        await connection_manager.connect(websocket, connection_id, user_id, subscription)
         
-        # Send welcome message
-        await websocket.send_json({
+        # Send welcome message (through the send queue so all writes to the
+        # socket happen on the connection's writer task)
+        connection_manager.broadcaster.publish({
             "type": "connected",
             "connection_id": connection_id,
             "authenticated": user_id is not None,
-            "message": "Connected to utxoIQ real-time insight stream"
-        })
+            "message": "Connected to utxoIQ real-time insight stream",
+            "subscription": subscription.to_dict()
+        }, [connection_id])
+        
+        if last_id:
+            await connection_manager.replay(connection_id, last_id)
         
         # Keep connection alive and handle incoming messages
         while True:
@@ -60,10 +77,32 @@ async def websocket_insights(
                 
                 # Handle ping messages
                 if data.get("type") == "ping":
-                    await websocket.send_json({
+                    await connection_manager.send_personal_message({
                         "type": "pong",
                         "timestamp": data.get("timestamp")
-                    })
+                    }, connection_id)
+                
+                # Handle topic subscription changes
+                elif data.get("type") == "subscribe":
+                    subscription = Subscription.from_params(
+                        data.get("signal_types"),
+                        data.get("min_confidence")
+                    )
+                    connection_manager.set_subscription(connection_id, subscription)
+                    await connection_manager.send_personal_message({
+                        "type": "subscribed",
+                        "subscription": subscription.to_dict()
+                    }, connection_id)
+                
+                # Handle catch-up after reconnect
+                elif data.get("type") == "resume" and data.get("last_id"):
+                    replayed = await connection_manager.replay(
+                        connection_id, str(data["last_id"])
+                    )
+                    await connection_manager.send_personal_message({
+                        "type": "resumed",
+                        "replayed": replayed
+                    }, connection_id)
                 
             except WebSocketDisconnect:
                 logger.info(f"Client disconnected: {connection_id}")
@@ -96,9 +135,11 @@ async def websocket_stats():
     Get WebSocket connection statistics.
     
     Returns:
-        Connection statistics including total connections
+        Connection statistics including total connections and fan-out
+        delivery latency percentiles
     """
     return {
         "total_connections": connection_manager.get_connection_count(),
+        "fanout": connection_manager.get_fanout_stats(),
         "status": "operational"
     }
@@ -4,14 +4,17 @@ Alert evaluation engine for monitoring and alerting system.
 This service evaluates alert configurations against current metrics,
 triggers alerts when thresholds are exceeded, and handles alert resolution.
 """
+import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Union
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.monitoring import AlertConfiguration, AlertHistory
 from src.services.metrics_service import MetricsService
+from src.services.notification_dispatcher import get_notification_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +29,17 @@ class MetricNotFoundError(AlertEvaluationError):
     pass
 
 
+# (service_name, metric_type, evaluation_window_seconds)
+SeriesKey = Tuple[str, str, int]
+
+
 class AlertEvaluator:
     """
     Alert evaluation engine that checks alert configurations against current metrics.
     
     This class handles:
-    - Evaluating all enabled alerts
+    - Evaluating all enabled alerts, fetching each distinct metric series once
+      per cycle (concurrently, with a bound) and sharing it across alerts
     - Checking thresholds with various comparison operators
     - Triggering alerts when thresholds are exceeded
     - Resolving alerts when conditions clear
@@ -42,7 +50,10 @@ class AlertEvaluator:
         self,
         metrics_service: MetricsService,
         db: AsyncSession,
-        notification_service: Optional[Any] = None
+        notification_service: Optional[Any] = None,
+        max_concurrent_fetches: int = 8,
+        metric_writer: Optional[Any] = None,
+        notification_dispatcher: Optional[Any] = None
     ):
         """
         Initialize alert evaluator.
@@ -51,10 +62,22 @@ class AlertEvaluator:
             metrics_service: Service for querying metrics
             db: Database session
             notification_service: Optional service for sending notifications
+            max_concurrent_fetches: Max metric series fetched concurrently per cycle
+            metric_writer: Optional object with ``write_metric(metric_type, value, labels)``
+                used to emit per-cycle timing and API call counts
+            notification_dispatcher: Optional NotificationDispatcher; when set,
+                notifications are queued and coalesced instead of sent inline.
+                Defaults to the global dispatcher when no notification_service
+                is given.
         """
         self.metrics = metrics_service
         self.db = db
         self.notifications = notification_service
+        self.max_concurrent_fetches = max(1, max_concurrent_fetches)
+        self.metric_writer = metric_writer
+        if notification_dispatcher is None and notification_service is None:
+            notification_dispatcher = get_notification_dispatcher()
+        self.dispatcher = notification_dispatcher
         
         logger.info("AlertEvaluator initialized")
     
@@ -62,6 +85,12 @@ class AlertEvaluator:
         """
         Evaluate all enabled alert configurations.
         
+        Alerts are grouped by (service, metric, window) so each distinct
+        series is fetched once per cycle; fetches run concurrently up to
+        ``max_concurrent_fetches``. Threshold checks and database writes then
+        run sequentially against the shared results, since the session is
+        not safe for concurrent use.
+        
         Returns:
             Dictionary with evaluation summary:
             - total_evaluated: Number of alerts evaluated
@@ -69,15 +98,24 @@ class AlertEvaluator:
             - resolved: Number of alerts resolved
             - suppressed: Number of alerts suppressed
             - errors: Number of evaluation errors
+            - metric_fetches: Number of metric API queries made
+            - metric_fetch_errors: Number of metric queries that failed
+            - fetch_duration_seconds: Wall time spent fetching metrics
+            - duration_seconds: Wall time of the whole cycle
         """
         logger.info("Starting evaluation of all enabled alerts")
+        cycle_start = time.monotonic()
         
         summary = {
             "total_evaluated": 0,
             "triggered": 0,
             "resolved": 0,
             "suppressed": 0,
-            "errors": 0
+            "errors": 0,
+            "metric_fetches": 0,
+            "metric_fetch_errors": 0,
+            "fetch_duration_seconds": 0.0,
+            "duration_seconds": 0.0
         }
         
         # Get all enabled alerts
@@ -86,14 +124,36 @@ class AlertEvaluator:
         
         logger.info(f"Found {len(configs)} enabled alert configurations")
         
-        # Evaluate each alert
+        # Suppressed alerts need no metric data
+        to_evaluate = []
         for config in configs:
+            if self._is_suppressed(config):
+                summary["suppressed"] += 1
+                await self._log_suppressed_alert(config)
+            else:
+                to_evaluate.append(config)
+        
+        # Fetch each distinct series once
+        series_keys = {self._series_key(config) for config in to_evaluate}
+        fetch_start = time.monotonic()
+        metric_values = await self._fetch_metric_values(series_keys)
+        summary["fetch_duration_seconds"] = time.monotonic() - fetch_start
+        summary["metric_fetches"] = len(series_keys)
+        summary["metric_fetch_errors"] = sum(
+            1 for value in metric_values.values() if isinstance(value, Exception)
+        )
+        
+        # Evaluate each alert against the shared results
+        for config in to_evaluate:
             try:
-                result = await self.evaluate_alert(config)
+                metric_value = metric_values[self._series_key(config)]
+                if isinstance(metric_value, MetricNotFoundError):
+                    logger.warning(f"Metric not found for alert {config.id}: {metric_value}")
+                    continue
+                
+                result = await self._evaluate_metric_value(config, metric_value)
                 
-                if result["suppressed"]:
-                    summary["suppressed"] += 1
-                elif result["triggered"]:
+                if result["triggered"]:
                     summary["triggered"] += 1
                 elif result["resolved"]:
                     summary["resolved"] += 1
@@ -105,14 +165,80 @@ class AlertEvaluator:
                     exc_info=True
                 )
         
+        summary["duration_seconds"] = time.monotonic() - cycle_start
+        self._emit_cycle_metrics(summary)
+        
         logger.info(
             f"Alert evaluation complete: {summary['triggered']} triggered, "
             f"{summary['resolved']} resolved, {summary['suppressed']} suppressed, "
-            f"{summary['errors']} errors"
+            f"{summary['errors']} errors, {summary['metric_fetches']} metric fetches "
+            f"for {len(to_evaluate)} alerts in {summary['duration_seconds']:.2f}s"
         )
         
         return summary
     
+    @staticmethod
+    def _series_key(config: AlertConfiguration) -> SeriesKey:
+        """Key identifying the metric series an alert reads."""
+        return (
+            config.service_name,
+            config.metric_type,
+            config.evaluation_window_seconds
+        )
+    
+    async def _fetch_metric_values(
+        self,
+        series_keys: "set[SeriesKey]"
+    ) -> Dict[SeriesKey, Union[float, MetricNotFoundError]]:
+        """
+        Fetch the current value of each distinct series concurrently.
+        
+        Args:
+            series_keys: Distinct (service, metric, window) keys
+            
+        Returns:
+            Mapping of key to metric value, or to the MetricNotFoundError
+            raised for that series
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        
+        async def fetch(key: SeriesKey) -> Union[float, MetricNotFoundError]:
+            async with semaphore:
+                try:
+                    return await self._get_current_metric_value(*key)
+                except MetricNotFoundError as e:
+                    return e
+        
+        keys = list(series_keys)
+        values = await asyncio.gather(*(fetch(key) for key in keys))
+        return dict(zip(keys, values))
+    
+    def _emit_cycle_metrics(self, summary: Dict[str, Any]) -> None:
+        """
+        Emit per-cycle timing and API call counts.
+        
+        Args:
+            summary: Evaluation summary for the cycle
+        """
+        if self.metric_writer is None:
+            return
+        
+        labels = {"component": "alert_evaluator"}
+        for name in (
+            "duration_seconds",
+            "fetch_duration_seconds",
+            "metric_fetches",
+            "metric_fetch_errors",
+            "total_evaluated",
+            "errors",
+        ):
+            try:
+                self.metric_writer.write_metric(
+                    f"alert_evaluation_{name}", float(summary[name]), labels
+                )
+            except Exception as e:
+                logger.warning(f"Failed to emit alert evaluation metric {name}: {e}")
+    
     async def evaluate_alert(self, config: AlertConfiguration) -> Dict[str, Any]:
         """
         Evaluate a single alert configuration.
@@ -157,6 +283,31 @@ class AlertEvaluator:
             # If metric is not found, we can't evaluate, so skip
             return result
         
+        result.update(await self._evaluate_metric_value(config, metric_value))
+        return result
+    
+    async def _evaluate_metric_value(
+        self,
+        config: AlertConfiguration,
+        metric_value: float
+    ) -> Dict[str, Any]:
+        """
+        Evaluate an alert against an already fetched metric value.
+        
+        Args:
+            config: Alert configuration to evaluate
+            metric_value: Current metric value for the alert's series
+            
+        Returns:
+            Dictionary with evaluation result (same keys as evaluate_alert)
+        """
+        result = {
+            "suppressed": False,
+            "triggered": False,
+            "resolved": False,
+            "metric_value": metric_value
+        }
+        
         # Evaluate threshold
         triggered = self._evaluate_threshold(
             metric_value,
@@ -257,7 +408,7 @@ class AlertEvaluator:
         )
         
         # Send notifications
-        if self.notifications:
+        if self.notifications or self.dispatcher:
             await self._send_notifications(config, alert)
         else:
             logger.warning(
@@ -293,7 +444,7 @@ class AlertEvaluator:
         )
         
         # Send resolution notification
-        if self.notifications:
+        if self.notifications or self.dispatcher:
             await self._send_resolution_notification(config, active_alert)
         
         return True
@@ -483,6 +634,18 @@ class AlertEvaluator:
             logger.debug(f"No notification channels configured for alert {config.id}")
             return
         
+        if self.dispatcher:
+            # Queue and return; the dispatcher coalesces and delivers in the background
+            queued = [
+                channel for channel in config.notification_channels
+                if self.dispatcher.enqueue(channel, config, alert)
+            ]
+            if queued:
+                alert.notification_sent = True
+                await self.db.commit()
+                logger.info(f"Queued {', '.join(queued)} notifications for alert {config.id}")
+            return
+        
         notification_success = False
         
         for channel in config.notification_channels:
@@ -533,6 +696,11 @@ class AlertEvaluator:
         if not config.notification_channels:
             return
         
+        if self.dispatcher:
+            for channel in config.notification_channels:
+                self.dispatcher.enqueue(channel, config, alert, resolved=True)
+            return
+        
         for channel in config.notification_channels:
             try:
                 if channel == 'email':
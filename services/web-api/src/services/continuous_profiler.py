@@ -0,0 +1,470 @@
+"""
+Continuous in-process sampling profiler.
+
+Samples the Python stacks of every thread at a low rate (default 10 Hz)
+from a background thread using sys._current_frames(), so it runs all the
+time without py-spy or a subprocess. Samples are aggregated into rolling
+per-minute collapsed-stack profiles (the format read by flamegraph.pl and
+speedscope) kept in a bounded ring buffer. Closed windows are written to
+local storage and can optionally be exported (e.g. to Cloud Storage) by a
+separate writer thread, so slow I/O never delays sampling.
+"""
+
+import os
+import sys
+import queue
+import time
+import random
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from types import CodeType
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads that are blocked waiting rather than running.
+# Counted separately so idle workers and the event loop's select() do not
+# drown out the code that is actually using CPU.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("socket.py", "accept"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfileWindow(BaseModel):
+    """Aggregated stack samples for one profiling window"""
+    start: datetime
+    end: datetime
+    samples: int
+    idle_samples: int
+    stacks: Dict[str, int]  # collapsed stack -> sample count
+    sample_rate_hz: float
+    overhead_percent: float
+    
+    def to_collapsed(self) -> str:
+        """Render as collapsed-stack text, one 'frame;frame;... count' per line"""
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self.stacks.items()))
+
+
+def merge_windows(windows: Iterable[ProfileWindow]) -> Dict[str, int]:
+    """Sum stack counts of several windows"""
+    merged: Dict[str, int] = {}
+    for window in windows:
+        for stack, count in window.stacks.items():
+            merged[stack] = merged.get(stack, 0) + count
+    return merged
+
+
+def inclusive_shares(stacks: Dict[str, int]) -> Dict[str, float]:
+    """
+    Percentage of samples in which each frame appears anywhere on the stack.
+    
+    The thread name (first element of each stack) is not counted as a frame.
+    """
+    total = sum(stacks.values())
+    if not total:
+        return {}
+    
+    counts: Dict[str, int] = {}
+    for stack, count in stacks.items():
+        for frame in set(stack.split(";")[1:]):
+            counts[frame] = counts.get(frame, 0) + count
+    
+    return {frame: count * 100 / total for frame, count in counts.items()}
+
+
+class ContinuousProfiler:
+    """
+    Always-on sampling profiler for the current process.
+    
+    The sampler thread wakes at sample_rate_hz (with ±10% jitter so it does
+    not alias with periodic work), records the stack of every other thread
+    as a tuple of code objects and closes a window every window_seconds.
+    Labels are only built when a window closes, keeping each sample cheap.
+    Closed windows are handed to a writer thread through a bounded queue for
+    the disk write and export.
+    """
+    
+    def __init__(
+        self,
+        service_name: str,
+        sample_rate_hz: float = 10.0,
+        window_seconds: int = 60,
+        max_windows: int = 60,
+        storage_dir: Optional[str] = None,
+        exporter: Optional[Callable[[ProfileWindow, str], None]] = None,
+        max_depth: int = 64,
+        include_idle: bool = False,
+        max_pending_writes: int = 8
+    ):
+        """
+        Initialize continuous profiler.
+        
+        Args:
+            service_name: Service name used in file names
+            sample_rate_hz: Samples per second per thread (1-100)
+            window_seconds: Length of each aggregated profile window
+            max_windows: Windows kept in memory and on local storage
+            storage_dir: Directory for collapsed-stack files (None to disable)
+            exporter: Called with each closed window and its file name
+            max_depth: Maximum frames recorded per stack
+            include_idle: Keep stacks of threads blocked in wait/select
+            max_pending_writes: Closed windows waiting to be written before
+                new ones are kept in memory only
+        
+        Raises:
+            ValueError: If sample rate or window length is out of range
+        """
+        if not 1 <= sample_rate_hz <= 100:
+            raise ValueError("Sample rate must be between 1 and 100 Hz")
+        if window_seconds < 10:
+            raise ValueError("Window must be at least 10 seconds")
+        
+        self.service_name = service_name
+        self.sample_rate_hz = sample_rate_hz
+        self.window_seconds = window_seconds
+        self.max_windows = max_windows
+        self.storage_dir = Path(storage_dir) if storage_dir else None
+        self.exporter = exporter
+        self.max_depth = max_depth
+        self.include_idle = include_idle
+        
+        self.windows: deque = deque(maxlen=max_windows)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._writes: queue.Queue = queue.Queue(maxsize=max_pending_writes)
+        self._writer: Optional[threading.Thread] = None
+        self._labels: Dict[CodeType, str] = {}
+        self._reset_window(datetime.utcnow())
+    
+    @property
+    def running(self) -> bool:
+        """Whether the sampler thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        """Start the sampler thread"""
+        if self.running:
+            return
+        
+        if self.storage_dir:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._stop_event.clear()
+        self._reset_window(datetime.utcnow())
+        if self.storage_dir or self.exporter:
+            self._writer = threading.Thread(
+                target=self._write_loop,
+                name="continuous-profiler-writer",
+                daemon=True
+            )
+            self._writer.start()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="continuous-profiler",
+            daemon=True
+        )
+        self._thread.start()
+        
+        logger.info(
+            f"Continuous profiler started for {self.service_name} "
+            f"({self.sample_rate_hz} Hz, {self.window_seconds}s windows, "
+            f"{self.max_windows} kept)"
+        )
+    
+    def stop(self, flush: bool = True) -> None:
+        """
+        Stop the sampler thread.
+        
+        Args:
+            flush: Close the current partial window so its samples are kept
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        
+        if flush and self._samples:
+            self._close_window(datetime.utcnow())
+        
+        if self._writer:
+            # Sentinel after the last window; pending writes finish first
+            self._writes.put(None)
+            self._writer.join(timeout=30)
+            self._writer = None
+        
+        logger.info(f"Continuous profiler stopped for {self.service_name}")
+    
+    def _run(self) -> None:
+        interval = 1.0 / self.sample_rate_hz
+        own_ident = threading.get_ident()
+        
+        while not self._stop_event.wait(interval * random.uniform(0.9, 1.1)):
+            try:
+                self.sample(own_ident)
+                if time.monotonic() >= self._window_deadline:
+                    self._close_window(datetime.utcnow())
+            except Exception as e:
+                # Never let the profiler take the service down
+                logger.warning(f"Continuous profiler sample failed: {e}")
+    
+    def sample(self, own_ident: Optional[int] = None) -> None:
+        """Record one stack sample of every thread except the sampler"""
+        start = time.perf_counter()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        counts = self._counts
+        
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            
+            codes = []
+            while frame is not None and len(codes) < self.max_depth:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            
+            if not codes:
+                continue
+            
+            if not self.include_idle and self._is_idle(codes[0]):
+                self._idle_samples += 1
+                continue
+            
+            key = (thread_names.get(ident, f"thread-{ident}"), tuple(codes))
+            counts[key] = counts.get(key, 0) + 1
+            self._samples += 1
+        
+        self._sampling_seconds += time.perf_counter() - start
+    
+    @staticmethod
+    def _is_idle(code: CodeType) -> bool:
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+    
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+    
+    def _reset_window(self, now: datetime) -> None:
+        self._counts: Dict[Tuple[str, Tuple[CodeType, ...]], int] = {}
+        self._samples = 0
+        self._idle_samples = 0
+        self._sampling_seconds = 0.0
+        self._window_start = now
+        self._window_started = time.monotonic()
+        self._window_deadline = self._window_started + self.window_seconds
+    
+    def _close_window(self, now: datetime) -> ProfileWindow:
+        """Aggregate the current window, store it and start a new one"""
+        elapsed = max(time.monotonic() - self._window_started, 1e-9)
+        stacks: Dict[str, int] = {}
+        for (thread_name, codes), count in self._counts.items():
+            # Stacks are recorded leaf-first; collapsed format is root-first
+            stack = ";".join([thread_name] + [self._label(code) for code in reversed(codes)])
+            stacks[stack] = stacks.get(stack, 0) + count
+        
+        window = ProfileWindow(
+            start=self._window_start,
+            end=now,
+            samples=self._samples,
+            idle_samples=self._idle_samples,
+            stacks=stacks,
+            sample_rate_hz=self.sample_rate_hz,
+            overhead_percent=round(self._sampling_seconds / elapsed * 100, 3)
+        )
+        
+        with self._lock:
+            self.windows.append(window)
+        self._reset_window(now)
+        
+        # Code objects of unloaded modules would otherwise be kept forever
+        if len(self._labels) > 50000:
+            self._labels.clear()
+        
+        if self._writer is None:
+            self._persist(window)
+        else:
+            try:
+                self._writes.put_nowait(window)
+            except queue.Full:
+                logger.warning(
+                    f"Profile writer is behind, keeping window {self._file_name(window)} in memory only"
+                )
+        return window
+    
+    def _file_name(self, window: ProfileWindow) -> str:
+        return f"{self.service_name}-{window.start.strftime('%Y%m%dT%H%M%S')}.collapsed"
+    
+    def _write_loop(self) -> None:
+        """Persist closed windows until the stop sentinel arrives"""
+        while True:
+            window = self._writes.get()
+            if window is None:
+                return
+            self._persist(window)
+    
+    def _persist(self, window: ProfileWindow) -> None:
+        """Write a closed window to local storage and hand it to the exporter"""
+        file_name = self._file_name(window)
+        
+        if self.storage_dir:
+            try:
+                (self.storage_dir / file_name).write_text(window.to_collapsed())
+                self._prune_storage()
+            except OSError as e:
+                logger.warning(f"Could not write profile {file_name}: {e}")
+        
+        if self.exporter:
+            try:
+                self.exporter(window, file_name)
+            except Exception as e:
+                logger.warning(f"Could not export profile {file_name}: {e}")
+    
+    def _prune_storage(self) -> None:
+        """Keep only the newest max_windows files on local storage"""
+        files = sorted(self.storage_dir.glob(f"{self.service_name}-*.collapsed"))
+        for path in files[:-self.max_windows]:
+            path.unlink(missing_ok=True)
+    
+    def get_windows(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[ProfileWindow]:
+        """
+        Closed windows overlapping a time range.
+        
+        Args:
+            start: Range start (default: oldest window)
+            end: Range end (default: newest window)
+        
+        Returns:
+            Windows in chronological order
+        """
+        # Windows are stored in naive UTC; accept aware query bounds too
+        if start is not None and start.tzinfo is not None:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        if end is not None and end.tzinfo is not None:
+            end = end.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        with self._lock:
+            windows = list(self.windows)
+        
+        return [
+            window for window in windows
+            if (start is None or window.end > start) and (end is None or window.start < end)
+        ]
+    
+    def collapsed(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> str:
+        """Merged collapsed stacks of all windows in a time range"""
+        merged = merge_windows(self.get_windows(start, end))
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(merged.items()))
+    
+    def diff(
+        self,
+        baseline_start: Optional[datetime] = None,
+        baseline_end: Optional[datetime] = None,
+        comparison_start: Optional[datetime] = None,
+        comparison_end: Optional[datetime] = None,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Compare where time went in two ranges of windows.
+        
+        Frames are compared by inclusive share: the percentage of samples in
+        which the frame is on the stack. Without arguments the newest window
+        is compared with all earlier ones.
+        
+        Args:
+            baseline_start: Baseline range start
+            baseline_end: Baseline range end
+            comparison_start: Comparison range start
+            comparison_end: Comparison range end
+            limit: Number of frames returned, largest change first
+        
+        Returns:
+            Sample counts of both ranges and the frames whose share changed most
+        
+        Raises:
+            ValueError: If either range contains no samples
+        """
+        if comparison_start is None and comparison_end is None and baseline_start is None and baseline_end is None:
+            windows = self.get_windows()
+            baseline, comparison = windows[:-1], windows[-1:]
+        else:
+            baseline = self.get_windows(baseline_start, baseline_end)
+            comparison = self.get_windows(comparison_start, comparison_end)
+        
+        baseline_stacks = merge_windows(baseline)
+        comparison_stacks = merge_windows(comparison)
+        if not baseline_stacks or not comparison_stacks:
+            raise ValueError("Both ranges must contain profiling samples")
+        
+        baseline_shares = inclusive_shares(baseline_stacks)
+        comparison_shares = inclusive_shares(comparison_stacks)
+        frames = [
+            {
+                "frame": frame,
+                "baseline_percent": round(baseline_shares.get(frame, 0.0), 2),
+                "comparison_percent": round(comparison_shares.get(frame, 0.0), 2),
+                "delta_percent": round(comparison_shares.get(frame, 0.0) - baseline_shares.get(frame, 0.0), 2)
+            }
+            for frame in set(baseline_shares) | set(comparison_shares)
+        ]
+        frames.sort(key=lambda f: abs(f["delta_percent"]), reverse=True)
+        
+        return {
+            "baseline": {
+                "start": baseline[0].start,
+                "end": baseline[-1].end,
+                "windows": len(baseline),
+                "samples": sum(baseline_stacks.values())
+            },
+            "comparison": {
+                "start": comparison[0].start,
+                "end": comparison[-1].end,
+                "windows": len(comparison),
+                "samples": sum(comparison_stacks.values())
+            },
+            "frames": frames[:limit]
+        }
+    
+    def status(self) -> Dict:
+        """Current configuration and window summary"""
+        with self._lock:
+            windows = list(self.windows)
+        
+        return {
+            "running": self.running,
+            "service_name": self.service_name,
+            "sample_rate_hz": self.sample_rate_hz,
+            "window_seconds": self.window_seconds,
+            "max_windows": self.max_windows,
+            "storage_dir": str(self.storage_dir) if self.storage_dir else None,
+            "windows": [
+                {
+                    "start": window.start,
+                    "end": window.end,
+                    "samples": window.samples,
+                    "idle_samples": window.idle_samples,
+                    "overhead_percent": window.overhead_percent
+                }
+                for window in windows
+            ]
+        }
@@ -1,9 +1,11 @@
 """Database service layer for persistent storage operations."""
 from typing import Optional, List, Dict, Any, Tuple
-from datetime import datetime
-from uuid import UUID
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+import json
 import logging
-from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy import select, update, delete, func, and_, or_, literal, cast, null, union_all, BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError as SQLAlchemyIntegrityError
 from sqlalchemy.exc import OperationalError, DatabaseError as SQLAlchemyDatabaseError
@@ -12,16 +14,27 @@ from src.models.db_models import BackfillJob, InsightFeedback, SystemMetric
 from src.models.database_schemas import (
     BackfillJobCreate, BackfillJobUpdate, BackfillJobResponse,
     FeedbackCreate, FeedbackResponse, FeedbackStats,
-    MetricCreate, MetricResponse
+    MetricCreate, MetricColumnsCreate, MetricResponse
 )
 from src.database import AsyncSessionLocal
+from src.services.metric_rollups import (
+    RESOLUTIONS, RESOLUTIONS_BY_NAME, MetricSketch, RollupAccumulator,
+    accumulate, build_upserts, plan_segments, to_utc_naive
+)
 from src.services.database_exceptions import (
     DatabaseError, ConnectionError, QueryError, 
     IntegrityError, NotFoundError, ValidationError
 )
+from src.services.retention_service import RetentionConfig
 
 logger = logging.getLogger(__name__)
 
+# Column order for COPY into system_metrics
+METRIC_COPY_COLUMNS = [
+    "id", "service_name", "metric_type", "metric_value",
+    "unit", "timestamp", "metric_metadata"
+]
+
 
 class DatabaseService:
     """Service for database operations with connection pool management."""
@@ -563,6 +576,7 @@ class DatabaseService:
             self.session.add(metric)
             await self.session.flush()
             await self.session.refresh(metric)
+            await self._update_rollups([metric])
             
             logger.debug(f"Recorded metric {metric_data.metric_type} for {metric_data.service_name}")
             return MetricResponse.model_validate(metric)
@@ -602,9 +616,9 @@ class DatabaseService:
             self.session.add_all(metrics)
             await self.session.flush()
             
-            # Refresh all metrics
-            for metric in metrics:
-                await self.session.refresh(metric)
+            # id and timestamp defaults are applied client-side on flush, so
+            # the objects are complete without a refresh round trip per row
+            await self._update_rollups(metrics)
             
             logger.info(f"Recorded batch of {len(metrics)} metrics")
             return [MetricResponse.model_validate(m) for m in metrics]
@@ -612,6 +626,75 @@ class DatabaseService:
         except Exception as e:
             self._handle_db_error(e, "record_metrics_batch")
     
+    async def ingest_metrics_columns(self, columns: MetricColumnsCreate) -> int:
+        """
+        Bulk-insert a columnar metrics batch with COPY.
+        
+        Unlike ``record_metrics_batch`` this builds no ORM objects and returns
+        no rows: the batch is streamed into system_metrics with one COPY and
+        rollups are merged with one upsert per resolution, so the cost in
+        round trips does not grow with the batch size.
+        
+        Metrics older than the hot storage window are rejected: archival
+        has already moved its checkpoint past them, so they would never be
+        archived, and retention would delete them with the archived rows.
+        
+        Args:
+            columns: Columnar metrics payload
+        
+        Returns:
+            Number of metrics recorded
+        
+        Raises:
+            ValidationError: If a metric is older than the hot storage window
+            DatabaseError: If ingest fails
+        """
+        try:
+            now = datetime.utcnow()
+            archive_horizon = now - timedelta(days=RetentionConfig.METRICS_HOT_STORAGE_DAYS)
+            records = []
+            rollup_values = []
+            for metric_type, value, unit, timestamp, metadata in columns.rows(now):
+                timestamp = to_utc_naive(timestamp)
+                if timestamp < archive_horizon:
+                    raise ValidationError(
+                        f"Metric timestamp {timestamp.isoformat()} is older than the "
+                        f"{RetentionConfig.METRICS_HOT_STORAGE_DAYS}-day hot storage window"
+                    )
+                records.append((
+                    uuid4(),
+                    columns.service_name,
+                    metric_type,
+                    value,
+                    unit,
+                    timestamp,
+                    json.dumps(metadata) if metadata is not None else None
+                ))
+                rollup_values.append((columns.service_name, metric_type, timestamp, value))
+            
+            if not records:
+                return 0
+            
+            # Rollups first: the upsert opens the transaction on the driver
+            # connection, so the COPY below commits or rolls back with it
+            await self._update_rollup_values(rollup_values)
+            
+            connection = await self.session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                SystemMetric.__tablename__,
+                records=records,
+                columns=METRIC_COPY_COLUMNS
+            )
+            
+            logger.info(f"Bulk ingested {len(records)} metrics for {columns.service_name}")
+            return len(records)
+        
+        except ValidationError:
+            raise
+        except Exception as e:
+            self._handle_db_error(e, "ingest_metrics_columns")
+    
     async def get_metrics(
         self,
         service_name: Optional[str] = None,
@@ -669,6 +752,88 @@ class DatabaseService:
         except Exception as e:
             self._handle_db_error(e, "get_metrics")
     
+    async def _update_rollups(self, metrics: List[SystemMetric]) -> None:
+        """
+        Merge newly recorded metrics into the rollup tables.
+        
+        Runs in the same transaction as the raw insert, so rollups never
+        disagree with system_metrics.
+        
+        Args:
+            metrics: Flushed SystemMetric rows
+        """
+        await self._update_rollup_values([
+            (m.service_name, m.metric_type, m.timestamp, m.metric_value)
+            for m in metrics
+        ])
+    
+    async def _update_rollup_values(
+        self,
+        values: List[Tuple[str, str, datetime, float]]
+    ) -> None:
+        """Merge (service_name, metric_type, timestamp, value) tuples into the rollups."""
+        if not values:
+            return
+        
+        for resolution in RESOLUTIONS:
+            for stmt in build_upserts(resolution, accumulate(values, resolution)):
+                await self.session.execute(stmt)
+    
+    async def rebuild_metric_rollups(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        chunk_size: int = 10000
+    ) -> int:
+        """
+        Recompute rollups from raw metrics for whole days in a range.
+        
+        Used to backfill rollups for metrics recorded before the rollup
+        tables existed, or to repair them after manual edits.
+        
+        Args:
+            start_time: Range start (widened to the start of its day)
+            end_time: Range end (widened to the end of its day)
+            chunk_size: Raw rows aggregated per upsert
+        
+        Returns:
+            Number of raw metrics rolled up
+        
+        Raises:
+            DatabaseError: If rebuild fails
+        """
+        try:
+            day = RESOLUTIONS_BY_NAME["day"]
+            start = day.truncate(to_utc_naive(start_time))
+            end = day.truncate(to_utc_naive(end_time)) + day.width
+            
+            for resolution in RESOLUTIONS:
+                model = resolution.model
+                await self.session.execute(
+                    delete(model).where(and_(model.bucket >= start, model.bucket < end))
+                )
+            
+            query = select(
+                SystemMetric.service_name,
+                SystemMetric.metric_type,
+                SystemMetric.timestamp,
+                SystemMetric.metric_value
+            ).where(
+                and_(SystemMetric.timestamp >= start, SystemMetric.timestamp < end)
+            ).execution_options(yield_per=chunk_size)
+            
+            total = 0
+            result = await self.session.stream(query)
+            async for rows in result.partitions():
+                await self._update_rollup_values([tuple(row) for row in rows])
+                total += len(rows)
+            
+            logger.info(f"Rebuilt metric rollups from {total} raw metrics between {start} and {end}")
+            return total
+        
+        except Exception as e:
+            self._handle_db_error(e, "rebuild_metric_rollups")
+    
     async def aggregate_metrics(
         self,
         service_name: str,
@@ -680,6 +845,9 @@ class DatabaseService:
         """
         Aggregate metrics for hourly or daily rollups.
         
+        Reads the pre-aggregated rollup tables rather than scanning raw
+        metrics, so long ranges cost a few hundred rows.
+        
         Args:
             service_name: Service name to aggregate
             metric_type: Metric type to aggregate
@@ -688,7 +856,8 @@ class DatabaseService:
             interval: Aggregation interval ('hour' or 'day')
         
         Returns:
-            List of aggregated metric data points
+            List of aggregated metric data points with avg, min, max,
+            approximate p50/p95/p99 and count
         
         Raises:
             ValidationError: If interval is invalid
@@ -698,47 +867,83 @@ class DatabaseService:
             if interval not in ["hour", "day"]:
                 raise ValidationError("Interval must be 'hour' or 'day'")
             
-            # Determine the date truncation function
-            if interval == "hour":
-                time_bucket = func.date_trunc('hour', SystemMetric.timestamp)
-            else:  # day
-                time_bucket = func.date_trunc('day', SystemMetric.timestamp)
-            
-            # Build aggregation query
-            query = select(
-                time_bucket.label('time_bucket'),
-                func.avg(SystemMetric.metric_value).label('avg_value'),
-                func.min(SystemMetric.metric_value).label('min_value'),
-                func.max(SystemMetric.metric_value).label('max_value'),
-                func.count(SystemMetric.id).label('count')
-            ).where(
-                and_(
-                    SystemMetric.service_name == service_name,
-                    SystemMetric.metric_type == metric_type,
-                    SystemMetric.timestamp >= start_time,
-                    SystemMetric.timestamp <= end_time
-                )
-            ).group_by(
-                time_bucket
-            ).order_by(
-                time_bucket
-            )
-            
-            result = await self.session.execute(query)
-            rows = result.all()
-            
-            # Format results
-            aggregated_data = []
+            # Read whole buckets from the coarsest rollup no wider than the
+            # interval; only the partial minutes at either end hit raw rows
+            output = RESOLUTIONS_BY_NAME[interval]
+            usable = [r for r in RESOLUTIONS if r.width <= output.width]
+            start = to_utc_naive(start_time)
+            end = to_utc_naive(end_time) + timedelta(microseconds=1)  # end_time is inclusive
+            
+            selects = []
+            for resolution, segment_start, segment_end in plan_segments(start, end, usable):
+                if resolution is None:
+                    selects.append(select(
+                        SystemMetric.timestamp.label('bucket'),
+                        literal(1, BigInteger).label('value_count'),
+                        SystemMetric.metric_value.label('value_sum'),
+                        SystemMetric.metric_value.label('value_min'),
+                        SystemMetric.metric_value.label('value_max'),
+                        cast(null(), JSONB).label('sketch')
+                    ).where(
+                        and_(
+                            SystemMetric.service_name == service_name,
+                            SystemMetric.metric_type == metric_type,
+                            SystemMetric.timestamp >= segment_start,
+                            SystemMetric.timestamp < segment_end
+                        )
+                    ))
+                else:
+                    model = resolution.model
+                    selects.append(select(
+                        model.bucket,
+                        model.value_count,
+                        model.value_sum,
+                        model.value_min,
+                        model.value_max,
+                        model.sketch
+                    ).where(
+                        and_(
+                            model.service_name == service_name,
+                            model.metric_type == metric_type,
+                            model.bucket >= segment_start,
+                            model.bucket < segment_end
+                        )
+                    ))
+            
+            rows = []
+            if selects:
+                query = union_all(*selects) if len(selects) > 1 else selects[0]
+                result = await self.session.execute(query)
+                rows = result.all()
+            
+            # Merge rollup rows and raw edge values into output buckets
+            buckets: Dict[datetime, RollupAccumulator] = {}
             for row in rows:
-                aggregated_data.append({
-                    "timestamp": row.time_bucket,
-                    "avg_value": float(row.avg_value) if row.avg_value else 0.0,
-                    "min_value": float(row.min_value) if row.min_value else 0.0,
-                    "max_value": float(row.max_value) if row.max_value else 0.0,
-                    "count": row.count
-                })
-            
-            logger.info(f"Aggregated {len(aggregated_data)} {interval}ly data points for {service_name}/{metric_type}")
+                if row.sketch is None:
+                    sketch = MetricSketch()
+                    sketch.add(row.value_sum)
+                else:
+                    sketch = MetricSketch(row.sketch)
+                
+                bucket = output.truncate(row.bucket)
+                if bucket not in buckets:
+                    buckets[bucket] = RollupAccumulator()
+                buckets[bucket].merge(RollupAccumulator(
+                    count=row.value_count,
+                    sum=row.value_sum,
+                    min=row.value_min,
+                    max=row.value_max,
+                    sketch=sketch
+                ))
+            
+            aggregated_data = [
+                buckets[bucket].to_point(bucket) for bucket in sorted(buckets)
+            ]
+            
+            logger.info(
+                f"Aggregated {len(aggregated_data)} {interval}ly data points for "
+                f"{service_name}/{metric_type} from {len(rows)} rollup rows"
+            )
             return aggregated_data
         
         except ValidationError:
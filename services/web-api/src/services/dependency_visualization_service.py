@@ -5,29 +5,111 @@ This service provides service dependency graph visualization by analyzing
 distributed traces to understand service-to-service call patterns and health status.
 """
 
+import asyncio
 import logging
+import time
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
 
 from google.cloud import trace_v2
 from google.cloud import monitoring_v3
 
+from src.config import settings
+from src.services.metric_rollups import to_utc_naive, truncate_timestamp
+
 logger = logging.getLogger(__name__)
 
+MINUTE = timedelta(minutes=1)
+
+
+@dataclass
+class DependencyAggregate:
+    """Call count, error count and latency sum for a service or an edge."""
+    
+    call_count: int = 0
+    error_count: int = 0
+    total_duration_ms: float = 0.0
+    last_seen: Optional[datetime] = None
+    
+    def add(self, duration_ms: float, has_error: bool, seen: Optional[datetime] = None) -> None:
+        """Count one span."""
+        self.call_count += 1
+        self.total_duration_ms += duration_ms
+        if has_error:
+            self.error_count += 1
+        if seen and (self.last_seen is None or seen > self.last_seen):
+            self.last_seen = seen
+    
+    def merge(self, other: "DependencyAggregate") -> None:
+        """Add another aggregate's counts."""
+        self.call_count += other.call_count
+        self.error_count += other.error_count
+        self.total_duration_ms += other.total_duration_ms
+        if other.last_seen and (self.last_seen is None or other.last_seen > self.last_seen):
+            self.last_seen = other.last_seen
+    
+    @property
+    def avg_duration_ms(self) -> float:
+        """Mean span duration, rounded to 2 decimals."""
+        if not self.call_count:
+            return 0
+        return round(self.total_duration_ms / self.call_count, 2)
+
+
+@dataclass
+class GraphMinute:
+    """Node and edge aggregates for the spans that started in one minute."""
+    
+    traces: int = 0
+    nodes: Dict[str, DependencyAggregate] = field(default_factory=dict)
+    edges: Dict[Tuple[str, str], DependencyAggregate] = field(default_factory=dict)
+    sampled: bool = False  # Built from a fetch that hit max_traces
+    
+    def merge(self, other: "GraphMinute") -> None:
+        """Add another minute's aggregates."""
+        self.traces += other.traces
+        self.sampled = self.sampled or other.sampled
+        for service_name, aggregate in other.nodes.items():
+            self.nodes.setdefault(service_name, DependencyAggregate()).merge(aggregate)
+        for edge_key, aggregate in other.edges.items():
+            self.edges.setdefault(edge_key, DependencyAggregate()).merge(aggregate)
+
 
 class DependencyVisualizationService:
     """Service for visualizing service dependencies from traces"""
     
-    def __init__(self, project_id: str):
+    def __init__(
+        self,
+        project_id: str,
+        settle_seconds: Optional[int] = None,
+        health_cache_ttl: Optional[int] = None,
+        retention: timedelta = timedelta(hours=25),
+        max_window_splits: int = 16
+    ):
         """
         Initialize the dependency visualization service
         
         Args:
             project_id: GCP project ID
+            settle_seconds: Age at which trace minutes are final and stored
+                (defaults to settings.dependency_graph_settle_seconds)
+            health_cache_ttl: Seconds a service health status is reused
+                (defaults to settings.dependency_graph_health_ttl)
+            retention: How long per-minute aggregates are kept
+            max_window_splits: Times a build may halve a window that hit
+                ``max_traces`` before storing it as a sample
         """
         self.project_id = project_id
         self.project_name = f"projects/{project_id}"
+        self.settle = timedelta(seconds=(
+            settle_seconds if settle_seconds is not None else settings.dependency_graph_settle_seconds
+        ))
+        self.health_cache_ttl = (
+            health_cache_ttl if health_cache_ttl is not None else settings.dependency_graph_health_ttl
+        )
+        self.retention = retention
+        self.max_window_splits = max_window_splits
         
         # Initialize Cloud Trace client for reading traces
         self.trace_client = trace_v2.TraceServiceClient()
@@ -35,6 +117,13 @@ class DependencyVisualizationService:
         # Initialize Cloud Monitoring client for health status
         self.monitoring_client = monitoring_v3.MetricServiceClient()
         
+        # Per-minute aggregates for settled minutes in [covered_from, covered_until)
+        self._minutes: Dict[datetime, GraphMinute] = {}
+        self._covered_from: Optional[datetime] = None
+        self._covered_until: Optional[datetime] = None
+        self._build_lock = asyncio.Lock()
+        self._health_cache: Dict[str, Tuple[float, str]] = {}
+        
         logger.info(f"DependencyVisualizationService initialized for project {project_id}")
     
     async def build_dependency_graph(
@@ -46,23 +135,73 @@ class DependencyVisualizationService:
         """
         Build service dependency graph from trace data
         
-        Analyzes traces within the time range to identify service-to-service
-        call patterns and construct a dependency graph.
+        The graph is answered from per-minute node and edge aggregates. Only
+        trace windows not merged by earlier builds are fetched: the part of
+        the range outside the stored minutes, plus the last ``settle``
+        seconds, which are aggregated for this response but not stored
+        because Cloud Trace may still be receiving their spans. A window that
+        hits ``max_traces`` is halved (at most ``max_window_splits`` times per
+        build); one still full at a single minute or past the split budget is
+        stored as a sample and flagged ``sampled``. Failed windows are left
+        for the next build.
         
         Args:
             start_time: Start of time range to analyze
-            end_time: End of time range to analyze
-            max_traces: Maximum number of traces to analyze
+            end_time: End of time range to analyze (inclusive, to the minute)
+            max_traces: Maximum number of traces fetched per query
             
         Returns:
             Dictionary containing nodes (services) and edges (calls)
         """
         try:
-            # Query traces from Cloud Trace
-            traces = await self._query_traces(start_time, end_time, max_traces)
+            range_start = truncate_timestamp(to_utc_naive(start_time), MINUTE)
+            range_end = truncate_timestamp(to_utc_naive(end_time), MINUTE) + MINUTE
+            settled = truncate_timestamp(datetime.utcnow() - self.settle, MINUTE)
+            traces_fetched = 0
+            splits_left = self.max_window_splits
+            merged = GraphMinute()
             
-            # Extract service dependencies from traces
-            nodes, edges = self._extract_dependencies(traces)
+            async with self._build_lock:
+                self._prune(settled - self.retention)
+                for window_start, window_end in self._missing_windows(range_start, min(range_end, settled)):
+                    pieces, splits_left = await self._fetch_window(window_start, window_end, max_traces, splits_left)
+                    if window_end == self._covered_from:
+                        # Grow coverage leftwards from the stored minutes
+                        pieces.reverse()
+                    for piece_start, piece_end, traces, sampled in pieces:
+                        if traces is None:
+                            continue
+                        traces_fetched += len(traces)
+                        aggregates = self._aggregate_traces(traces, piece_start, piece_end)
+                        if sampled:
+                            minute = piece_start
+                            while minute < piece_end:
+                                aggregates.setdefault(minute, GraphMinute()).sampled = True
+                                minute += MINUTE
+                        if self._adjoins_coverage(piece_start, piece_end):
+                            for minute, minute_aggregates in aggregates.items():
+                                self._minutes.setdefault(minute, GraphMinute()).merge(minute_aggregates)
+                            self._extend_coverage(piece_start, piece_end)
+                        else:
+                            # Cut off by a failed piece; answered now, fetched again next build
+                            for minute_aggregates in aggregates.values():
+                                merged.merge(minute_aggregates)
+                
+                for minute, aggregates in self._minutes.items():
+                    if range_start <= minute < range_end:
+                        merged.merge(aggregates)
+            
+            # Unsettled tail, aggregated for this response only
+            if range_end > settled:
+                tail_start = max(range_start, settled)
+                traces = await self._query_traces(tail_start, to_utc_naive(end_time), max_traces) or []
+                traces_fetched += len(traces)
+                merged.sampled = merged.sampled or len(traces) >= max_traces
+                for minute, aggregates in self._aggregate_traces(traces, tail_start).items():
+                    if minute < range_end:
+                        merged.merge(aggregates)
+            
+            nodes, edges = merged.nodes, merged.edges
             
             # Get health status for each service
             health_status = await self._get_service_health_status(list(nodes.keys()))
@@ -72,11 +211,11 @@ class DependencyVisualizationService:
                 "nodes": [
                     {
                         "service_name": service_name,
-                        "call_count": node_data["call_count"],
-                        "error_count": node_data["error_count"],
-                        "avg_duration_ms": node_data["avg_duration_ms"],
+                        "call_count": node_data.call_count,
+                        "error_count": node_data.error_count,
+                        "avg_duration_ms": node_data.avg_duration_ms,
                         "health_status": health_status.get(service_name, "unknown"),
-                        "last_seen": node_data["last_seen"].isoformat() if node_data["last_seen"] else None
+                        "last_seen": node_data.last_seen.isoformat() if node_data.last_seen else None
                     }
                     for service_name, node_data in nodes.items()
                 ],
@@ -84,17 +223,19 @@ class DependencyVisualizationService:
                     {
                         "source": source,
                         "target": target,
-                        "call_count": edge_data["call_count"],
-                        "error_count": edge_data["error_count"],
-                        "avg_duration_ms": edge_data["avg_duration_ms"],
-                        "failed": edge_data["error_count"] > 0
+                        "call_count": edge_data.call_count,
+                        "error_count": edge_data.error_count,
+                        "avg_duration_ms": edge_data.avg_duration_ms,
+                        "failed": edge_data.error_count > 0
                     }
                     for (source, target), edge_data in edges.items()
                 ],
                 "metadata": {
                     "start_time": start_time.isoformat(),
                     "end_time": end_time.isoformat(),
-                    "traces_analyzed": len(traces),
+                    "traces_analyzed": merged.traces,
+                    "traces_fetched": traces_fetched,
+                    "sampled": merged.sampled,
                     "total_services": len(nodes),
                     "total_dependencies": len(edges)
                 }
@@ -102,7 +243,8 @@ class DependencyVisualizationService:
             
             logger.info(
                 f"Built dependency graph: {len(nodes)} services, "
-                f"{len(edges)} dependencies from {len(traces)} traces"
+                f"{len(edges)} dependencies from {graph['metadata']['traces_analyzed']} traces "
+                f"({traces_fetched} fetched)"
             )
             
             return graph
@@ -111,12 +253,91 @@ class DependencyVisualizationService:
             logger.error(f"Error building dependency graph: {e}")
             raise
     
+    def _missing_windows(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        Windows of ``[start, end)`` not yet merged into the stored minutes.
+        
+        Coverage is kept contiguous, so a window right of the stored minutes
+        always starts where they end (and vice versa on the left).
+        """
+        if start >= end:
+            return []
+        if self._covered_from is None:
+            return [(start, end)]
+        
+        windows = []
+        if start < self._covered_from:
+            windows.append((start, self._covered_from))
+        if end > self._covered_until:
+            windows.append((self._covered_until, end))
+        return windows
+    
+    async def _fetch_window(
+        self,
+        start: datetime,
+        end: datetime,
+        max_traces: int,
+        splits_left: int
+    ) -> Tuple[List[Tuple[datetime, datetime, Optional[List], bool]], int]:
+        """
+        Fetch traces for ``[start, end)``, halving windows that hit ``max_traces``.
+        
+        Returns:
+            ``(start, end, traces, sampled)`` pieces in time order, and the
+            splits left. ``traces`` is None if the query failed; ``sampled``
+            marks a piece that still hit the limit at a single minute or once
+            the splits ran out.
+        """
+        pieces = []
+        pending = [(start, end)]
+        while pending:
+            piece_start, piece_end = pending.pop()
+            traces = await self._query_traces(piece_start, piece_end, max_traces)
+            sampled = traces is not None and len(traces) >= max_traces
+            minutes = (piece_end - piece_start) // MINUTE
+            
+            if sampled and minutes > 1 and splits_left > 0:
+                splits_left -= 1
+                middle = piece_start + (minutes // 2) * MINUTE
+                pending.extend([(middle, piece_end), (piece_start, middle)])
+                continue
+            
+            if sampled:
+                logger.warning(
+                    f"Trace window {piece_start.isoformat()} - {piece_end.isoformat()} "
+                    f"has more than {max_traces} traces; storing a sample"
+                )
+            pieces.append((piece_start, piece_end, traces, sampled))
+        
+        return pieces, splits_left
+    
+    def _adjoins_coverage(self, start: datetime, end: datetime) -> bool:
+        """Whether storing ``[start, end)`` keeps coverage contiguous."""
+        return self._covered_from is None or end == self._covered_from or start == self._covered_until
+    
+    def _extend_coverage(self, start: datetime, end: datetime) -> None:
+        if self._covered_from is None:
+            self._covered_from, self._covered_until = start, end
+        else:
+            self._covered_from = min(self._covered_from, start)
+            self._covered_until = max(self._covered_until, end)
+    
+    def _prune(self, cutoff: datetime) -> None:
+        """Drop minutes older than ``cutoff``."""
+        for minute in [minute for minute in self._minutes if minute < cutoff]:
+            del self._minutes[minute]
+        if self._covered_from is not None and self._covered_from < cutoff:
+            if self._covered_until <= cutoff:
+                self._covered_from = self._covered_until = None
+            else:
+                self._covered_from = cutoff
+    
     async def _query_traces(
         self,
         start_time: datetime,
         end_time: datetime,
         max_traces: int
-    ) -> List:
+    ) -> Optional[List]:
         """
         Query traces from Cloud Trace
         
@@ -126,9 +347,9 @@ class DependencyVisualizationService:
             max_traces: Maximum number of traces to retrieve
             
         Returns:
-            List of trace data
+            List of trace data, or None if the query failed
         """
-        try:
+        def list_traces() -> List:
             request = trace_v2.ListTracesRequest(
                 parent=self.project_name,
                 start_time=start_time,
@@ -141,114 +362,94 @@ class DependencyVisualizationService:
                 traces.append(trace_data)
                 if len(traces) >= max_traces:
                     break
+            return traces
+        
+        try:
+            # The client pages synchronously; keep it off the event loop
+            traces = await asyncio.to_thread(list_traces)
             
             logger.debug(f"Retrieved {len(traces)} traces from Cloud Trace")
             return traces
             
         except Exception as e:
             logger.error(f"Error querying traces: {e}")
-            # Return empty list on error to allow graceful degradation
-            return []
+            # Degrade gracefully, but let callers tell a failure from an empty window
+            return None
     
-    def _extract_dependencies(
+    def _aggregate_traces(
         self,
-        traces: List
-    ) -> Tuple[Dict, Dict]:
+        traces: List,
+        window_start: datetime,
+        window_end: Optional[datetime] = None
+    ) -> Dict[datetime, GraphMinute]:
         """
-        Extract service dependencies from traces
+        Aggregate spans into per-minute node and edge counts
         
-        Analyzes span relationships to identify which services call which other services.
+        Only spans that started inside ``[window_start, window_end)`` are
+        counted, so a trace returned for two adjacent windows is never
+        counted twice. Edges run from the parent span's service to the
+        child's and are counted in the child's minute.
         
         Args:
             traces: List of trace data
+            window_start: Start of the fetched window
+            window_end: End of the fetched window (None for open-ended)
             
         Returns:
-            Tuple of (nodes dict, edges dict)
+            GraphMinute per minute
         """
-        nodes = defaultdict(lambda: {
-            "call_count": 0,
-            "error_count": 0,
-            "total_duration_ms": 0,
-            "avg_duration_ms": 0,
-            "last_seen": None
-        })
-        
-        edges = defaultdict(lambda: {
-            "call_count": 0,
-            "error_count": 0,
-            "total_duration_ms": 0,
-            "avg_duration_ms": 0
-        })
+        minutes: Dict[datetime, GraphMinute] = {}
+        
+        def in_window(timestamp: datetime) -> bool:
+            return timestamp >= window_start and (window_end is None or timestamp < window_end)
         
         for trace in traces:
             if not hasattr(trace, 'spans'):
                 continue
             
             # Build span lookup and parent-child relationships
-            spans_by_id = {}
-            for span in trace.spans:
-                span_id = span.span_id
-                spans_by_id[span_id] = span
+            spans_by_id = {span.span_id: span for span in trace.spans}
+            trace_start = None
             
-            # Process each span
             for span in trace.spans:
+                span_time = self._span_start_time(span)
+                timestamp = span_time or window_start
+                if trace_start is None or timestamp < trace_start:
+                    trace_start = timestamp
+                if not in_window(timestamp):
+                    continue
+            
                 # Extract service name from span
                 service_name = self._extract_service_name(span)
                 if not service_name:
                     continue
                 
-                # Calculate span duration
                 duration_ms = self._calculate_span_duration(span)
-                
-                # Check if span has error
                 has_error = self._span_has_error(span)
-                
-                # Update node data
-                nodes[service_name]["call_count"] += 1
-                nodes[service_name]["total_duration_ms"] += duration_ms
-                if has_error:
-                    nodes[service_name]["error_count"] += 1
-                
-                # Update last seen time
-                if hasattr(span, 'start_time') and span.start_time:
-                    span_time = span.start_time.ToDatetime() if hasattr(span.start_time, 'ToDatetime') else None
-                    if span_time:
-                        if not nodes[service_name]["last_seen"] or span_time > nodes[service_name]["last_seen"]:
-                            nodes[service_name]["last_seen"] = span_time
+                bucket = minutes.setdefault(truncate_timestamp(timestamp, MINUTE), GraphMinute())
+                bucket.nodes.setdefault(service_name, DependencyAggregate()).add(
+                    duration_ms, has_error, span_time
+                )
                 
                 # Process parent-child relationship for edges
                 if span.parent_span_id and span.parent_span_id in spans_by_id:
-                    parent_span = spans_by_id[span.parent_span_id]
-                    parent_service = self._extract_service_name(parent_span)
-                    
+                    parent_service = self._extract_service_name(spans_by_id[span.parent_span_id])
                     if parent_service and parent_service != service_name:
-                        # Create edge from parent to child
-                        edge_key = (parent_service, service_name)
-                        edges[edge_key]["call_count"] += 1
-                        edges[edge_key]["total_duration_ms"] += duration_ms
-                        if has_error:
-                            edges[edge_key]["error_count"] += 1
-        
-        # Calculate averages
-        for service_name, node_data in nodes.items():
-            if node_data["call_count"] > 0:
-                node_data["avg_duration_ms"] = round(
-                    node_data["total_duration_ms"] / node_data["call_count"],
-                    2
-                )
+                        bucket.edges.setdefault(
+                            (parent_service, service_name), DependencyAggregate()
+                        ).add(duration_ms, has_error)
+                    
+            if trace_start is not None and in_window(trace_start):
+                minutes.setdefault(truncate_timestamp(trace_start, MINUTE), GraphMinute()).traces += 1
         
-        for edge_key, edge_data in edges.items():
-            if edge_data["call_count"] > 0:
-                edge_data["avg_duration_ms"] = round(
-                    edge_data["total_duration_ms"] / edge_data["call_count"],
-                    2
-                )
+        return minutes
         
-        logger.debug(
-            f"Extracted {len(nodes)} services and {len(edges)} dependencies from traces"
-        )
-        
-        return dict(nodes), dict(edges)
+    def _span_start_time(self, span) -> Optional[datetime]:
+        """Span start as naive UTC, or None if the span has no start time."""
+        if not getattr(span, 'start_time', None):
+            return None
+        start = span.start_time.ToDatetime() if hasattr(span.start_time, 'ToDatetime') else span.start_time
+        return to_utc_naive(start) if isinstance(start, datetime) else None
     
     def _extract_service_name(self, span) -> Optional[str]:
         """
@@ -349,7 +550,9 @@ class DependencyVisualizationService:
         Get real-time health status for services
         
         Queries Cloud Monitoring for recent error rates and response times
-        to determine service health status.
+        to determine service health status. Statuses are cached for
+        ``health_cache_ttl`` seconds and stale services are queried
+        concurrently.
         
         Args:
             service_names: List of service names
@@ -362,8 +565,17 @@ class DependencyVisualizationService:
         # Get metrics for last 5 minutes
         end_time = datetime.utcnow()
         start_time = end_time - timedelta(minutes=5)
+        now = time.monotonic()
         
+        stale = []
         for service_name in service_names:
+            cached = self._health_cache.get(service_name)
+            if cached and cached[0] > now:
+                health_status[service_name] = cached[1]
+            else:
+                stale.append(service_name)
+        
+        async def query_health(service_name: str) -> None:
             try:
                 # Query error rate metric
                 error_rate = await self._get_service_error_rate(
@@ -374,18 +586,23 @@ class DependencyVisualizationService:
                 
                 # Determine health status based on error rate
                 if error_rate is None:
-                    health_status[service_name] = "unknown"
+                    status = "unknown"
                 elif error_rate > 0.1:  # >10% error rate
-                    health_status[service_name] = "unhealthy"
+                    status = "unhealthy"
                 elif error_rate > 0.05:  # >5% error rate
-                    health_status[service_name] = "degraded"
+                    status = "degraded"
                 else:
-                    health_status[service_name] = "healthy"
+                    status = "healthy"
+                
+                health_status[service_name] = status
+                self._health_cache[service_name] = (now + self.health_cache_ttl, status)
                     
             except Exception as e:
                 logger.debug(f"Error getting health status for {service_name}: {e}")
                 health_status[service_name] = "unknown"
         
+        await asyncio.gather(*(query_health(service_name) for service_name in stale))
+        
         return health_status
     
     async def _get_service_error_rate(
@@ -419,23 +636,27 @@ class DependencyVisualizationService:
                 "per_series_aligner": monitoring_v3.Aggregation.Aligner.ALIGN_MEAN,
             })
             
-            results = self.monitoring_client.list_time_series(
-                request={
-                    "name": self.project_name,
-                    "filter": f'metric.type = "{metric_type}"',
-                    "interval": interval,
-                    "aggregation": aggregation,
-                }
-            )
+            def read_error_rates() -> List[float]:
+                results = self.monitoring_client.list_time_series(
+                    request={
+                        "name": self.project_name,
+                        "filter": f'metric.type = "{metric_type}"',
+                        "interval": interval,
+                        "aggregation": aggregation,
+                    }
+                )
+                
+                error_rates = []
+                for result in results:
+                    for point in result.points:
+                        if hasattr(point.value, 'double_value'):
+                            error_rates.append(point.value.double_value)
+                        elif hasattr(point.value, 'int64_value'):
+                            error_rates.append(float(point.value.int64_value))
+                return error_rates
             
             # Calculate average error rate from results
-            error_rates = []
-            for result in results:
-                for point in result.points:
-                    if hasattr(point.value, 'double_value'):
-                        error_rates.append(point.value.double_value)
-                    elif hasattr(point.value, 'int64_value'):
-                        error_rates.append(float(point.value.int64_value))
+            error_rates = await asyncio.to_thread(read_error_rates)
             
             if error_rates:
                 return sum(error_rates) / len(error_rates)
@@ -445,3 +666,25 @@ class DependencyVisualizationService:
         except Exception as e:
             logger.debug(f"Error querying error rate for {service_name}: {e}")
             return None
+
+
+# Global dependency visualization service instance
+_dependency_service: Optional[DependencyVisualizationService] = None
+
+
+def get_dependency_visualization_service() -> DependencyVisualizationService:
+    """
+    Get or create the shared dependency visualization service.
+    
+    The instance is shared so per-minute aggregates and cached health
+    statuses survive between requests.
+    
+    Returns:
+        DependencyVisualizationService instance
+    """
+    global _dependency_service
+    
+    if _dependency_service is None:
+        _dependency_service = DependencyVisualizationService(project_id=settings.gcp_project_id)
+    
+    return _dependency_service
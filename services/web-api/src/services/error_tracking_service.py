@@ -6,26 +6,31 @@ Provides error analytics including frequency, affected users, and code commit li
 """
 
 import logging
-from typing import List, Dict, Optional, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Any
 from datetime import datetime, timedelta
 from google.cloud import errorreporting_v1beta1
 from google.cloud.errorreporting_v1beta1 import ErrorStatsServiceClient, ErrorGroupServiceClient
 from google.api_core.exceptions import GoogleAPIError
 
+if TYPE_CHECKING:
+    from src.services.log_statistics_service import LogStatisticsEngine
+
 logger = logging.getLogger(__name__)
 
 
 class ErrorTrackingService:
     """Service for error tracking and reporting using Cloud Error Reporting"""
     
-    def __init__(self, project_id: str):
+    def __init__(self, project_id: str, statistics_engine: Optional["LogStatisticsEngine"] = None):
         """
         Initialize error tracking service.
         
         Args:
             project_id: GCP project ID
+            statistics_engine: Pre-aggregated counters used for statistics (optional)
         """
         self.project_id = project_id
+        self.statistics_engine = statistics_engine
         self.project_name = f"projects/{project_id}"
         self.error_stats_client = ErrorStatsServiceClient()
         self.error_group_client = ErrorGroupServiceClient()
@@ -257,13 +262,24 @@ class ErrorTrackingService:
         Raises:
             GoogleAPIError: If API call fails
         """
+        # Default time range to last 7 days
+        if not end_time:
+            end_time = datetime.utcnow()
+        if not start_time:
+            start_time = end_time - timedelta(days=7)
+        
+        if self.statistics_engine is not None:
+            try:
+                if await self.statistics_engine.covers(start_time, end_time):
+                    return await self.statistics_engine.get_error_statistics(
+                        service=service,
+                        start_time=start_time,
+                        end_time=end_time
+                    )
+            except Exception as e:
+                logger.warning(f"Error statistics counters unavailable, using Error Reporting: {e}")
+        
         try:
-            # Default time range to last 7 days
-            if not end_time:
-                end_time = datetime.utcnow()
-            if not start_time:
-                start_time = end_time - timedelta(days=7)
-            
             # Get error groups
             error_groups_data = await self.list_error_groups(
                 service=service,
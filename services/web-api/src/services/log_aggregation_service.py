@@ -5,11 +5,14 @@ Provides centralized log collection and search across all services using Google
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from google.cloud import logging
 from google.cloud.logging_v2 import DESCENDING
 import logging as std_logging
 
+if TYPE_CHECKING:
+    from src.services.log_statistics_service import LogStatisticsEngine
+
 logger = std_logging.getLogger(__name__)
 
 
@@ -26,14 +29,16 @@ class LogSearchError(LogAggregationError):
 class LogAggregationService:
     """Service for aggregating and searching logs from Cloud Logging"""
     
-    def __init__(self, project_id: str):
+    def __init__(self, project_id: str, statistics_engine: Optional["LogStatisticsEngine"] = None):
         """
         Initialize the log aggregation service.
         
         Args:
             project_id: GCP project ID
+            statistics_engine: Pre-aggregated counters used for statistics (optional)
         """
         self.project_id = project_id
+        self.statistics_engine = statistics_engine
         self.client = logging.Client(project=project_id)
         logger.info(f"LogAggregationService initialized for project: {project_id}")
     
@@ -299,6 +304,9 @@ class LogAggregationService:
         """
         Get log statistics for a time range.
         
+        Served from the statistics engine's exact counters when they cover
+        the range; otherwise estimated from up to 1000 sampled entries.
+        
         Args:
             start_time: Start of time range
             end_time: End of time range
@@ -307,6 +315,17 @@ class LogAggregationService:
         Returns:
             Dictionary containing log statistics
         """
+        if self.statistics_engine is not None:
+            try:
+                if await self.statistics_engine.covers(start_time, end_time):
+                    return await self.statistics_engine.get_log_statistics(
+                        start_time=start_time,
+                        end_time=end_time,
+                        service=service
+                    )
+            except Exception as e:
+                logger.warning(f"Log statistics counters unavailable, sampling entries: {e}")
+        
         try:
             filter_parts = [
                 f'timestamp >= "{start_time.isoformat()}Z"',
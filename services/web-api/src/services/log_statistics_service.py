@@ -0,0 +1,702 @@
+"""
+Log Statistics Service
+
+Keeps exact per-service, per-severity and per-error-group counters in Redis,
+fed by a Cloud Logging sink (Pub/Sub push) or by entries posted locally.
+Counters are bucketed per minute and per hour so a dashboard range is
+answered from a few hundred hash reads instead of paging through entries.
+Entries are deduplicated on their insertId, since Pub/Sub push delivery is
+at-least-once.
+
+Each push is itself an HTTP request to the ingest endpoint, and its request
+log would be exported back through the sink, producing one more entry to
+count per push. The sink should exclude those logs with
+``NOT httpRequest.requestUrl:"/monitoring/logs/ingest"``; entries that still
+arrive are dropped by ``ingest_entries``.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from src.config import settings
+from src.services.metric_rollups import plan_segments, to_utc_naive, truncate_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+SEVERITIES = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Cloud Logging severities folded into the five reported levels
+SEVERITY_ALIASES = {
+    "DEFAULT": "INFO",
+    "NOTICE": "INFO",
+    "ALERT": "CRITICAL",
+    "EMERGENCY": "CRITICAL"
+}
+
+ERROR_SEVERITIES = frozenset({"ERROR", "CRITICAL"})
+
+# Path of the push endpoint; its own request logs are not counted
+INGEST_PATH = "/monitoring/logs/ingest"
+
+EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class CounterResolution:
+    """A counter bucket width."""
+    
+    name: str
+    width: timedelta
+
+
+MINUTE = CounterResolution("minute", timedelta(minutes=1))
+HOUR = CounterResolution("hour", timedelta(hours=1))
+
+# Coarsest first
+RESOLUTIONS: Tuple[CounterResolution, ...] = (HOUR, MINUTE)
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    """One log entry reduced to the fields the counters need."""
+    
+    timestamp: datetime
+    service: str
+    severity: str
+    group_id: Optional[str] = None
+    group_name: Optional[str] = None
+    message: Optional[str] = None
+    user: Optional[str] = None
+    insert_id: Optional[str] = None
+
+
+def normalize_severity(severity: Optional[str]) -> str:
+    """Map a Cloud Logging severity onto DEBUG/INFO/WARNING/ERROR/CRITICAL."""
+    severity = (severity or "DEFAULT").upper()
+    return SEVERITY_ALIASES.get(severity, severity if severity in SEVERITIES else "INFO")
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """
+    Parse an RFC 3339 log timestamp into naive UTC.
+    
+    Cloud Logging emits nanosecond fractions, which are truncated to
+    microseconds.
+    """
+    if isinstance(value, datetime):
+        return to_utc_naive(value)
+    if not value:
+        return datetime.utcnow()
+    
+    text = str(value).replace("Z", "+00:00")
+    text = re.sub(r"(\.\d{6})\d+", r"\1", text)
+    return to_utc_naive(datetime.fromisoformat(text))
+
+
+_VARIABLE_PARTS = re.compile(r"0x[0-9a-fA-F]+|[0-9a-fA-F]{8,}|\d+")
+
+
+def error_fingerprint(service: str, message: str) -> Tuple[str, str]:
+    """
+    Group an error message the way Error Reporting would.
+    
+    The first line with numbers and hex identifiers masked is the group
+    name; the group ID is a hash of it and the service.
+    
+    Returns:
+        Tuple of (group_id, group_name)
+    """
+    lines = (message or "").strip().splitlines()
+    first_line = lines[0] if lines else "Unknown error"
+    group_name = _VARIABLE_PARTS.sub("<n>", first_line)[:200]
+    digest = hashlib.sha1(f"{service}\n{group_name}".encode("utf-8")).hexdigest()[:16]
+    return digest, group_name
+
+
+def is_ingest_request_log(entry: Dict[str, Any]) -> bool:
+    """Whether an entry is the request log of a push to the ingest endpoint."""
+    request_url = (entry.get("httpRequest") or {}).get("requestUrl") or ""
+    if INGEST_PATH in request_url:
+        return True
+    # Access logs written by the server itself carry the path in the message
+    message = entry.get("textPayload") or (entry.get("jsonPayload") or {}).get("message") or ""
+    return isinstance(message, str) and INGEST_PATH in message
+
+
+def event_from_entry(entry: Dict[str, Any]) -> LogEvent:
+    """
+    Reduce a Cloud Logging LogEntry (as exported by a sink) to a LogEvent.
+    
+    Args:
+        entry: LogEntry JSON
+    
+    Returns:
+        LogEvent; errors get a group from ``error_fingerprint``
+    """
+    resource_labels = (entry.get("resource") or {}).get("labels") or {}
+    labels = entry.get("labels") or {}
+    payload = entry.get("jsonPayload") or {}
+    
+    service = (
+        resource_labels.get("service_name")
+        or labels.get("service")
+        or payload.get("service")
+        or "unknown"
+    )
+    severity = normalize_severity(entry.get("severity"))
+    message = entry.get("textPayload") or payload.get("message")
+    user = (
+        labels.get("user_id")
+        or payload.get("user_id")
+        or (payload.get("context") or {}).get("user")
+    )
+    
+    group_id = group_name = None
+    if severity in ERROR_SEVERITIES:
+        group_id, group_name = error_fingerprint(service, message or "")
+    
+    # insertId is only unique within a log
+    insert_id = entry.get("insertId")
+    if insert_id:
+        insert_id = f"{entry.get('logName', '')}/{insert_id}"
+    
+    return LogEvent(
+        timestamp=parse_timestamp(entry.get("timestamp") or entry.get("receiveTimestamp")),
+        service=service,
+        severity=severity,
+        group_id=group_id,
+        group_name=group_name,
+        message=message,
+        user=str(user) if user else None,
+        insert_id=insert_id
+    )
+
+
+def _epoch(timestamp: datetime) -> int:
+    return int((timestamp - EPOCH).total_seconds())
+
+
+def _from_epoch(seconds: int) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class LogStatisticsEngine:
+    """
+    Incremental log and error counters stored in Redis.
+    
+    Every ingested entry increments one field in the minute bucket and one
+    in the hour bucket for its timestamp. Fields are ``s|<service>|<severity>``
+    for log counts and ``e|<service>|<group_id>`` for error groups; affected
+    users per group and bucket are HyperLogLogs. A range query reads whole
+    hours from hour buckets and the ragged edges from minute buckets, so
+    counts are exact to the minute. Results are kept in memory for
+    ``cache_ttl`` seconds so repeated dashboard ranges skip Redis.
+    
+    Counters are only trusted from the first full minute after ingestion
+    started (``tracking_since``); earlier ranges fall back to the Cloud APIs.
+    
+    An entry whose insertId was seen within ``dedupe_seconds`` is not
+    counted again, and each batch is applied in one MULTI/EXEC so a failed
+    request leaves no partial counts behind for the redelivery to add to.
+    """
+    
+    KEY_PREFIX = "logstats"
+    
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        retention_days: int = 30,
+        cache_ttl: float = 10.0,
+        cache_max_entries: int = 512,
+        dedupe_seconds: int = 86400
+    ):
+        """
+        Initialize engine.
+        
+        Args:
+            redis_client: Async Redis client (decode_responses=True)
+            retention_days: Days counter buckets are kept
+            cache_ttl: Seconds a computed range result is reused (0 disables)
+            cache_max_entries: Maximum cached range results
+            dedupe_seconds: How long ingested insertIds are remembered
+        """
+        self.redis = redis_client
+        self.retention = timedelta(days=retention_days)
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.dedupe_seconds = dedupe_seconds
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._tracking_since: Optional[datetime] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.duplicates = 0
+    
+    # Keys
+    
+    def _bucket_key(self, resolution: CounterResolution, bucket: datetime) -> str:
+        return f"{self.KEY_PREFIX}:{resolution.name}:{_epoch(bucket)}"
+    
+    def _users_key(self, resolution: CounterResolution, bucket: datetime, service: str, group_id: str) -> str:
+        return f"{self.KEY_PREFIX}:users:{resolution.name}:{_epoch(bucket)}:{service}|{group_id}"
+    
+    def _seen_key(self, insert_id: str) -> str:
+        digest = hashlib.sha1(insert_id.encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}:seen:{digest}"
+    
+    @property
+    def _since_key(self) -> str:
+        return f"{self.KEY_PREFIX}:since"
+    
+    @property
+    def _groups_key(self) -> str:
+        return f"{self.KEY_PREFIX}:groups"
+    
+    @property
+    def _last_seen_key(self) -> str:
+        return f"{self.KEY_PREFIX}:groups:last_seen"
+    
+    def _expire_at(self, resolution: CounterResolution, bucket: datetime) -> int:
+        return _epoch(bucket + resolution.width + self.retention)
+    
+    # Ingestion
+    
+    async def ingest_entries(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Count raw LogEntry dicts from a log sink or a local feeder.
+        
+        Request logs of the ingest endpoint itself are skipped, so pushes
+        do not count themselves.
+        
+        Args:
+            entries: LogEntry JSON objects
+        
+        Returns:
+            Number of entries counted
+        """
+        events = []
+        for entry in entries:
+            if is_ingest_request_log(entry):
+                continue
+            try:
+                events.append(event_from_entry(entry))
+            except (TypeError, ValueError, AttributeError) as e:
+                logger.warning(f"Skipping unparseable log entry: {e}")
+        return await self.record(events)
+    
+    async def _claim(self, events: Iterable[LogEvent]) -> Tuple[List[LogEvent], List[str]]:
+        """
+        Drop events whose insertId was already counted.
+        
+        Returns:
+            Events to count, and the insertId keys claimed for them
+        """
+        fresh: List[LogEvent] = []
+        candidates: Dict[str, LogEvent] = {}
+        for event in events:
+            if event.insert_id is None:
+                fresh.append(event)
+            elif event.insert_id in candidates:
+                self.duplicates += 1
+            else:
+                candidates[event.insert_id] = event
+        
+        if not candidates:
+            return fresh, []
+        
+        keys = [self._seen_key(insert_id) for insert_id in candidates]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, 1, nx=True, ex=self.dedupe_seconds)
+            claims = await pipe.execute()
+        
+        claimed = []
+        for key, event, is_new in zip(keys, candidates.values(), claims):
+            if is_new:
+                fresh.append(event)
+                claimed.append(key)
+            else:
+                self.duplicates += 1
+        return fresh, claimed
+    
+    async def record(self, events: Iterable[LogEvent]) -> int:
+        """
+        Add events to the counters in one transaction.
+        
+        Events already counted (by insertId) are skipped. The rest are
+        aggregated locally first, so a batch touching the same bucket costs
+        one HINCRBY per distinct field.
+        
+        Args:
+            events: Events to count
+        
+        Returns:
+            Number of events counted
+        """
+        events, claimed = await self._claim(events)
+        counts: Counter = Counter()
+        users: Dict[str, set] = {}
+        expiries: Dict[str, int] = {}
+        groups: Dict[str, Dict[str, Any]] = {}
+        last_seen: Dict[str, datetime] = {}
+        recorded = 0
+        
+        for event in events:
+            recorded += 1
+            for resolution in RESOLUTIONS:
+                bucket = truncate_timestamp(event.timestamp, resolution.width)
+                key = self._bucket_key(resolution, bucket)
+                expiries[key] = self._expire_at(resolution, bucket)
+                counts[(key, f"s|{event.service}|{event.severity}")] += 1
+                
+                if event.group_id:
+                    counts[(key, f"e|{event.service}|{event.group_id}")] += 1
+                    if event.user:
+                        users_key = self._users_key(resolution, bucket, event.service, event.group_id)
+                        users.setdefault(users_key, set()).add(event.user)
+                        expiries[users_key] = self._expire_at(resolution, bucket)
+            
+            if event.group_id:
+                if event.group_id not in groups:
+                    groups[event.group_id] = {
+                        "group_name": event.group_name,
+                        "service": event.service,
+                        "first_seen_time": event.timestamp.isoformat(),
+                        "representative": {"message": event.message, "service": event.service}
+                    }
+                if event.timestamp > last_seen.get(event.group_id, EPOCH):
+                    last_seen[event.group_id] = event.timestamp
+        
+        if not recorded:
+            return 0
+        
+        try:
+            await self._apply(counts, users, expiries, groups, last_seen)
+        except Exception:
+            # Let the redelivery count these entries
+            if claimed:
+                await self.redis.delete(*claimed)
+            raise
+        
+        return recorded
+    
+    async def _apply(
+        self,
+        counts: Counter,
+        users: Dict[str, set],
+        expiries: Dict[str, int],
+        groups: Dict[str, Dict[str, Any]],
+        last_seen: Dict[str, datetime]
+    ) -> None:
+        """Write aggregated counters atomically."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            since = truncate_timestamp(datetime.utcnow(), MINUTE.width) + MINUTE.width
+            pipe.set(self._since_key, _epoch(since), nx=True)
+            for (key, field), count in counts.items():
+                pipe.hincrby(key, field, count)
+            for key, members in users.items():
+                pipe.pfadd(key, *members)
+            for key, expire_at in expiries.items():
+                pipe.expireat(key, expire_at)
+            for group_id, metadata in groups.items():
+                pipe.hsetnx(self._groups_key, group_id, json.dumps(metadata))
+            for group_id, timestamp in last_seen.items():
+                pipe.hset(self._last_seen_key, group_id, timestamp.isoformat())
+            if groups:
+                pipe.expire(self._groups_key, self.retention)
+                pipe.expire(self._last_seen_key, self.retention)
+            await pipe.execute()
+    
+    # Queries
+    
+    async def tracking_since(self) -> Optional[datetime]:
+        """First minute from which the counters are complete."""
+        if self._tracking_since is None:
+            value = await self.redis.get(self._since_key)
+            if value is not None:
+                self._tracking_since = _from_epoch(int(value))
+        return self._tracking_since
+    
+    async def covers(self, start_time: datetime, end_time: Optional[datetime] = None) -> bool:
+        """
+        Check whether the counters hold every entry in a range.
+        
+        Args:
+            start_time: Range start
+            end_time: Range end (unused; counters are always current)
+        
+        Returns:
+            True if the range starts after tracking began and within retention
+        """
+        since = await self.tracking_since()
+        if since is None:
+            return False
+        start_time = to_utc_naive(start_time)
+        return start_time >= since and start_time >= datetime.utcnow() - self.retention
+    
+    def _cached(self, key: Tuple) -> Optional[Dict]:
+        entry = self._cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._cache.pop(key, None)
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        return entry[1]
+    
+    def _store(self, key: Tuple, result: Dict) -> None:
+        if self.cache_ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+    
+    @staticmethod
+    def _minute_range(start_time: datetime, end_time: datetime) -> Tuple[datetime, datetime]:
+        """Whole minutes covering [start_time, end_time] as a half-open range."""
+        start = truncate_timestamp(to_utc_naive(start_time), MINUTE.width)
+        end = truncate_timestamp(to_utc_naive(end_time), MINUTE.width) + MINUTE.width
+        return start, end
+    
+    def _plan_buckets(self, start: datetime, end: datetime) -> List[Tuple[CounterResolution, datetime]]:
+        buckets = []
+        for resolution, segment_start, segment_end in plan_segments(start, end, RESOLUTIONS):
+            bucket = segment_start
+            while bucket < segment_end:
+                buckets.append((resolution, bucket))
+                bucket += resolution.width
+        return buckets
+    
+    async def _read_buckets(
+        self,
+        start: datetime,
+        end: datetime
+    ) -> List[Tuple[CounterResolution, datetime, Dict[str, str]]]:
+        buckets = self._plan_buckets(start, end)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for resolution, bucket in buckets:
+                pipe.hgetall(self._bucket_key(resolution, bucket))
+            hashes = await pipe.execute()
+        return [
+            (resolution, bucket, fields)
+            for (resolution, bucket), fields in zip(buckets, hashes)
+            if fields
+        ]
+    
+    async def get_log_statistics(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        service: Optional[str] = None
+    ) -> Dict:
+        """
+        Exact log counts per severity for a time range.
+        
+        Args:
+            start_time: Start of time range
+            end_time: End of time range (inclusive, to the minute)
+            service: Optional service name to filter by
+        
+        Returns:
+            Same shape as LogAggregationService.get_log_statistics
+        """
+        time_range = {
+            "start": start_time.isoformat(),
+            "end": end_time.isoformat()
+        }
+        start, end = self._minute_range(start_time, end_time)
+        cache_key = ("logs", start, end, service)
+        cached = self._cached(cache_key)
+        if cached is not None:
+            return dict(cached, time_range=time_range)
+        
+        severity_counts = {severity: 0 for severity in SEVERITIES}
+        for _, _, fields in await self._read_buckets(start, end):
+            for field, count in fields.items():
+                kind, field_service, severity = field.split("|", 2)
+                if kind != "s" or (service and field_service != service):
+                    continue
+                severity_counts[severity] = severity_counts.get(severity, 0) + int(count)
+        
+        result = {
+            "total_count": sum(severity_counts.values()),
+            "severity_counts": severity_counts,
+            "time_range": time_range,
+            "service": service
+        }
+        self._store(cache_key, result)
+        return result
+    
+    async def get_error_statistics(
+        self,
+        service: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        top_n: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Exact error counts per group for a time range.
+        
+        Affected users are HyperLogLog estimates (within about 1%).
+        
+        Args:
+            service: Filter by service name (optional)
+            start_time: Start of time range (optional, defaults to 7 days ago)
+            end_time: End of time range (optional, defaults to now)
+            top_n: Number of groups returned in top_errors
+        
+        Returns:
+            Same shape as ErrorTrackingService.get_error_statistics
+        """
+        if not end_time:
+            end_time = datetime.utcnow()
+        if not start_time:
+            start_time = end_time - timedelta(days=7)
+        
+        start, end = self._minute_range(start_time, end_time)
+        period = {
+            "period_start": start_time.isoformat(),
+            "period_end": end_time.isoformat()
+        }
+        cache_key = ("errors", start, end, service, top_n)
+        cached = self._cached(cache_key)
+        if cached is not None:
+            return dict(cached, **period)
+        
+        midpoint = start + (end - start) / 2
+        group_counts: Counter = Counter()
+        group_buckets: Dict[Tuple[str, str], List[Tuple[CounterResolution, datetime]]] = {}
+        halves = [0, 0]
+        
+        for resolution, bucket, fields in await self._read_buckets(start, end):
+            for field, count in fields.items():
+                kind, field_service, group_id = field.split("|", 2)
+                if kind != "e" or (service and field_service != service):
+                    continue
+                group_counts[(field_service, group_id)] += int(count)
+                group_buckets.setdefault((field_service, group_id), []).append((resolution, bucket))
+                halves[0 if bucket + resolution.width / 2 < midpoint else 1] += int(count)
+        
+        top_groups = group_counts.most_common(top_n)
+        top_errors = []
+        affected_users = 0
+        if group_counts:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # One count over the union, so a user hitting several groups counts once
+                pipe.pfcount(*[
+                    self._users_key(resolution, bucket, group_service, group_id)
+                    for (group_service, group_id), buckets in group_buckets.items()
+                    for resolution, bucket in buckets
+                ])
+                for group_service, group_id in group_counts:
+                    pipe.pfcount(*[
+                        self._users_key(resolution, bucket, group_service, group_id)
+                        for resolution, bucket in group_buckets[(group_service, group_id)]
+                    ])
+                for (_, group_id), _ in top_groups:
+                    pipe.hget(self._groups_key, group_id)
+                    pipe.hget(self._last_seen_key, group_id)
+                results = await pipe.execute()
+            
+            affected_users = results[0]
+            user_counts = dict(zip(group_counts, results[1:len(group_counts) + 1]))
+            metadata = results[len(group_counts) + 1:]
+            
+            for index, ((group_service, group_id), count) in enumerate(top_groups):
+                group = json.loads(metadata[2 * index] or "{}")
+                top_errors.append({
+                    "group_id": group_id,
+                    "group_name": group.get("group_name") or group_id,
+                    "count": count,
+                    "affected_users_count": user_counts[(group_service, group_id)],
+                    "first_seen_time": group.get("first_seen_time"),
+                    "last_seen_time": metadata[2 * index + 1],
+                    "representative": group.get("representative"),
+                    "num_affected_services": 1,
+                    "service_contexts": [{"service": group_service}]
+                })
+        
+        total_errors = sum(group_counts.values())
+        result = {
+            **period,
+            "total_errors": total_errors,
+            "unique_error_groups": len(group_counts),
+            "affected_users": affected_users,
+            "error_rate_trend": error_rate_trend(halves[0], halves[1]),
+            "top_errors": top_errors,
+            "service_filter": service
+        }
+        self._store(cache_key, result)
+        return result
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Cache statistics for monitoring."""
+        return {
+            "tracking_since": self._tracking_since.isoformat() if self._tracking_since else None,
+            "cache_entries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "duplicates": self.duplicates
+        }
+
+
+def error_rate_trend(first_half: int, second_half: int, threshold: float = 0.2) -> str:
+    """
+    Compare error counts in the two halves of a period.
+    
+    Returns:
+        "increasing", "decreasing" or "stable" (within ``threshold``)
+    """
+    if first_half == second_half:
+        return "stable"
+    if first_half == 0:
+        return "increasing"
+    change = (second_half - first_half) / first_half
+    if change > threshold:
+        return "increasing"
+    if change < -threshold:
+        return "decreasing"
+    return "stable"
+
+
+# Global statistics engine instance
+_statistics_engine: Optional[LogStatisticsEngine] = None
+
+
+async def get_log_statistics_engine() -> Optional[LogStatisticsEngine]:
+    """
+    Get or create the global statistics engine.
+    
+    Returns:
+        LogStatisticsEngine, or None when log statistics are disabled
+    """
+    global _statistics_engine
+    
+    if not settings.log_statistics_enabled:
+        return None
+    
+    if _statistics_engine is None:
+        redis_client = redis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            password=settings.redis_password if settings.redis_password else None,
+            decode_responses=True
+        )
+        _statistics_engine = LogStatisticsEngine(
+            redis_client,
+            retention_days=settings.log_statistics_retention_days,
+            cache_ttl=settings.log_statistics_cache_ttl,
+            dedupe_seconds=settings.log_statistics_dedupe_seconds
+        )
+        logger.info("Log statistics engine initialized")
+    
+    return _statistics_engine
@@ -0,0 +1,309 @@
+"""Pre-aggregated metric rollups with mergeable percentile sketches."""
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import math
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+
+from src.models.db_models import (
+    MetricRollupMixin, MetricRollupMinute, MetricRollupHour, MetricRollupDay
+)
+
+
+class MetricSketch:
+    """
+    Log-bucketed histogram for approximate percentiles (DDSketch style).
+    
+    Values are counted in buckets whose boundaries grow geometrically, so
+    every quantile estimate is within ``RELATIVE_ACCURACY`` of the true
+    value. Two sketches merge by adding bucket counts, which lets minute
+    rollups combine into hours and days without keeping raw values.
+    
+    Bins are keyed ``p<index>`` for positive values, ``n<index>`` for
+    negative values and ``z`` for zero, so they can be stored as JSONB.
+    """
+    
+    RELATIVE_ACCURACY = 0.01
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    LOG_GAMMA = math.log(GAMMA)
+    MIN_VALUE = 1e-9
+    
+    def __init__(self, bins: Optional[Dict[str, int]] = None):
+        """
+        Initialize sketch.
+        
+        Args:
+            bins: Bin counts from ``to_dict()`` (optional)
+        """
+        self.bins: Dict[str, int] = dict(bins or {})
+    
+    @classmethod
+    def _key(cls, value: float) -> str:
+        magnitude = abs(value)
+        if magnitude < cls.MIN_VALUE:
+            return "z"
+        index = math.ceil(math.log(magnitude) / cls.LOG_GAMMA)
+        return f"{'p' if value > 0 else 'n'}{index}"
+    
+    @classmethod
+    def _value(cls, key: str) -> float:
+        if key == "z":
+            return 0.0
+        index = int(key[1:])
+        magnitude = 2 * cls.GAMMA ** index / (cls.GAMMA + 1)
+        return magnitude if key[0] == "p" else -magnitude
+    
+    @property
+    def count(self) -> int:
+        """Number of values in the sketch."""
+        return sum(self.bins.values())
+    
+    def add(self, value: float, count: int = 1) -> None:
+        """Add a value to the sketch."""
+        key = self._key(value)
+        self.bins[key] = self.bins.get(key, 0) + count
+    
+    def merge(self, other: "MetricSketch") -> None:
+        """Add another sketch's counts to this one."""
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+        
+        Args:
+            q: Quantile between 0 and 1
+        
+        Returns:
+            Estimated value, or None for an empty sketch
+        """
+        total = self.count
+        if total == 0:
+            return None
+        
+        rank = q * (total - 1)
+        seen = 0
+        for key in sorted(self.bins, key=self._value):
+            seen += self.bins[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.bins, key=self._value))
+    
+    def to_dict(self) -> Dict[str, int]:
+        """Serialize bin counts."""
+        return dict(self.bins)
+
+
+@dataclass
+class RollupAccumulator:
+    """Count, sum, min, max and sketch for one rollup bucket."""
+    
+    count: int = 0
+    sum: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    sketch: MetricSketch = field(default_factory=MetricSketch)
+    
+    def add(self, value: float) -> None:
+        """Add a raw metric value."""
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.add(value)
+    
+    def merge(self, other: "RollupAccumulator") -> None:
+        """Add another bucket's aggregates."""
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+    
+    def to_point(self, timestamp: datetime) -> Dict:
+        """Format as an aggregate_metrics data point."""
+        return {
+            "timestamp": timestamp,
+            "avg_value": self.sum / self.count if self.count else 0.0,
+            "min_value": self.min if self.count else 0.0,
+            "max_value": self.max if self.count else 0.0,
+            "p50_value": self.sketch.quantile(0.5),
+            "p95_value": self.sketch.quantile(0.95),
+            "p99_value": self.sketch.quantile(0.99),
+            "count": self.count
+        }
+
+
+@dataclass(frozen=True)
+class RollupResolution:
+    """A rollup table and the bucket width it stores."""
+    
+    name: str
+    width: timedelta
+    model: Type[MetricRollupMixin]
+    
+    def truncate(self, timestamp: datetime) -> datetime:
+        """Start of the bucket containing a timestamp."""
+        return truncate_timestamp(timestamp, self.width)
+
+
+MINUTE = RollupResolution("minute", timedelta(minutes=1), MetricRollupMinute)
+HOUR = RollupResolution("hour", timedelta(hours=1), MetricRollupHour)
+DAY = RollupResolution("day", timedelta(days=1), MetricRollupDay)
+
+# Coarsest first
+RESOLUTIONS: Tuple[RollupResolution, ...] = (DAY, HOUR, MINUTE)
+RESOLUTIONS_BY_NAME = {resolution.name: resolution for resolution in RESOLUTIONS}
+
+RollupKey = Tuple[str, str, datetime]
+
+
+def to_utc_naive(timestamp: datetime) -> datetime:
+    """Convert to the naive UTC datetimes stored in the metrics tables."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def truncate_timestamp(timestamp: datetime, width: timedelta) -> datetime:
+    """Floor a naive UTC timestamp to a multiple of ``width`` since midnight."""
+    midnight = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight + ((timestamp - midnight) // width) * width
+
+
+def _ceil_timestamp(timestamp: datetime, width: timedelta) -> datetime:
+    floor = truncate_timestamp(timestamp, width)
+    return floor if floor == timestamp else floor + width
+
+
+def plan_segments(
+    start_time: datetime,
+    end_time: datetime,
+    resolutions: Iterable[RollupResolution] = RESOLUTIONS
+) -> List[Tuple[Optional[RollupResolution], datetime, datetime]]:
+    """
+    Cover ``[start_time, end_time)`` with as few rollup rows as possible.
+    
+    The coarsest resolution reads every bucket that lies fully inside the
+    range; the partial buckets at either end are covered by progressively
+    finer rollups and finally by raw metrics (resolution None).
+    
+    Args:
+        start_time: Range start (inclusive, naive UTC)
+        end_time: Range end (exclusive, naive UTC)
+        resolutions: Usable resolutions, coarsest first
+    
+    Returns:
+        List of (resolution, segment start, segment end) tuples
+    """
+    if start_time >= end_time:
+        return []
+    
+    resolutions = list(resolutions)
+    if not resolutions:
+        return [(None, start_time, end_time)]
+    
+    resolution, finer = resolutions[0], resolutions[1:]
+    aligned_start = _ceil_timestamp(start_time, resolution.width)
+    aligned_end = truncate_timestamp(end_time, resolution.width)
+    if aligned_start >= aligned_end:
+        return plan_segments(start_time, end_time, finer)
+    
+    return (
+        plan_segments(start_time, aligned_start, finer) +
+        [(resolution, aligned_start, aligned_end)] +
+        plan_segments(aligned_end, end_time, finer)
+    )
+
+
+def accumulate(
+    metrics: Iterable[Tuple[str, str, datetime, float]],
+    resolution: RollupResolution
+) -> Dict[RollupKey, RollupAccumulator]:
+    """
+    Aggregate raw metrics into buckets of one resolution.
+    
+    Args:
+        metrics: (service_name, metric_type, timestamp, value) tuples
+        resolution: Rollup resolution
+    
+    Returns:
+        Accumulators keyed by (service_name, metric_type, bucket)
+    """
+    buckets: Dict[RollupKey, RollupAccumulator] = {}
+    for service_name, metric_type, timestamp, value in metrics:
+        key = (service_name, metric_type, resolution.truncate(timestamp))
+        if key not in buckets:
+            buckets[key] = RollupAccumulator()
+        buckets[key].add(value)
+    return buckets
+
+
+# asyncpg accepts at most 32767 bind parameters per statement; each rollup
+# row binds 8, so 4000 rows leave room to spare
+MAX_UPSERT_ROWS = 4000
+
+
+def build_upserts(
+    resolution: RollupResolution,
+    buckets: Dict[RollupKey, RollupAccumulator],
+    max_rows: int = MAX_UPSERT_ROWS
+) -> List:
+    """
+    Build upserts that merge accumulators into a rollup table.
+    
+    Rows are sorted by key so concurrent writers lock them in the same
+    order and cannot deadlock. They are split into statements of at most
+    ``max_rows`` rows to stay under the driver's bind parameter limit.
+    
+    Args:
+        resolution: Rollup resolution
+        buckets: Accumulators from ``accumulate()``
+        max_rows: Rows per statement
+    
+    Returns:
+        PostgreSQL INSERT ... ON CONFLICT DO UPDATE statements, in key order
+    """
+    table = resolution.model.__table__
+    rows = [
+        {
+            "service_name": service_name,
+            "metric_type": metric_type,
+            "bucket": bucket,
+            "value_count": acc.count,
+            "value_sum": acc.sum,
+            "value_min": acc.min,
+            "value_max": acc.max,
+            "sketch": acc.sketch.to_dict()
+        }
+        for (service_name, metric_type, bucket), acc in sorted(buckets.items(), key=lambda item: item[0])
+    ]
+    return [
+        _build_upsert(table, rows[start:start + max_rows])
+        for start in range(0, len(rows), max_rows)
+    ]
+
+
+def _build_upsert(table, rows: List[dict]):
+    """Build one INSERT ... ON CONFLICT DO UPDATE for rollup rows."""
+    stmt = insert(table).values(rows)
+    merged_sketch = literal_column(
+        "(SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb) FROM ("
+        "SELECT key, SUM(value::bigint) AS total FROM ("
+        f"SELECT * FROM jsonb_each_text({table.name}.sketch) "
+        "UNION ALL SELECT * FROM jsonb_each_text(excluded.sketch)"
+        ") AS bins GROUP BY key) AS merged)"
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.service_name, table.c.metric_type, table.c.bucket],
+        set_={
+            "value_count": table.c.value_count + stmt.excluded.value_count,
+            "value_sum": table.c.value_sum + stmt.excluded.value_sum,
+            "value_min": func.least(table.c.value_min, stmt.excluded.value_min),
+            "value_max": func.greatest(table.c.value_max, stmt.excluded.value_max),
+            "sketch": merged_sketch
+        }
+    )
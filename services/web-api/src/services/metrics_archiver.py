@@ -0,0 +1,389 @@
+"""Streaming archival of system metrics to compressed NDJSON files."""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+from uuid import UUID
+import asyncio
+import gzip
+import json
+import logging
+import shutil
+import tempfile
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.db_models import SystemMetric
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Keyset position: (timestamp, id) of the last archived row
+ArchiveKey = Tuple[datetime, UUID]
+
+ARCHIVE_COLUMNS = (
+    SystemMetric.id,
+    SystemMetric.service_name,
+    SystemMetric.metric_type,
+    SystemMetric.metric_value,
+    SystemMetric.unit,
+    SystemMetric.timestamp,
+    SystemMetric.metric_metadata
+)
+
+
+class ArchiveSink:
+    """Destination for archive files and the archival checkpoint."""
+    
+    def upload(self, fileobj, name: str, content_type: str) -> str:
+        """Store a file and return its URI."""
+        raise NotImplementedError
+    
+    def read_checkpoint(self, name: str) -> Optional[Dict[str, Any]]:
+        """Read a JSON checkpoint, or None if there is none."""
+        raise NotImplementedError
+    
+    def write_checkpoint(self, name: str, checkpoint: Dict[str, Any]) -> None:
+        """Replace a JSON checkpoint."""
+        raise NotImplementedError
+
+
+class GCSArchiveSink(ArchiveSink):
+    """Archive files in a Cloud Storage bucket."""
+    
+    def __init__(self, bucket, bucket_name: str):
+        """
+        Initialize sink.
+        
+        Args:
+            bucket: google.cloud.storage Bucket
+            bucket_name: Bucket name used in returned URIs
+        """
+        self.bucket = bucket
+        self.bucket_name = bucket_name
+    
+    def upload(self, fileobj, name: str, content_type: str) -> str:
+        self.bucket.blob(name).upload_from_file(fileobj, content_type=content_type, rewind=True)
+        return f"gs://{self.bucket_name}/{name}"
+    
+    def read_checkpoint(self, name: str) -> Optional[Dict[str, Any]]:
+        from google.api_core.exceptions import NotFound
+        try:
+            return json.loads(self.bucket.blob(name).download_as_bytes())
+        except NotFound:
+            return None
+    
+    def write_checkpoint(self, name: str, checkpoint: Dict[str, Any]) -> None:
+        self.bucket.blob(name).upload_from_string(
+            json.dumps(checkpoint),
+            content_type='application/json'
+        )
+
+
+class LocalArchiveSink(ArchiveSink):
+    """Archive files in a local directory (development and tests)."""
+    
+    def __init__(self, root_dir: str):
+        """
+        Initialize sink.
+        
+        Args:
+            root_dir: Directory archive paths are created under
+        """
+        self.root = Path(root_dir)
+    
+    def upload(self, fileobj, name: str, content_type: str) -> str:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fileobj.seek(0)
+        with open(path, 'wb') as target:
+            shutil.copyfileobj(fileobj, target)
+        return path.as_uri()
+    
+    def read_checkpoint(self, name: str) -> Optional[Dict[str, Any]]:
+        path = self.root / name
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+    
+    def write_checkpoint(self, name: str, checkpoint: Dict[str, Any]) -> None:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a crash never leaves a truncated checkpoint
+        partial = path.with_suffix('.tmp')
+        partial.write_text(json.dumps(checkpoint))
+        partial.replace(path)
+
+
+class _ArchiveFile:
+    """Compressed NDJSON file spooled to disk once it outgrows memory."""
+    
+    def __init__(self, compression: str, spool_bytes: int):
+        self.compression = compression
+        self.spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        if compression == "zstd":
+            self.stream = zstandard.ZstdCompressor(level=3).stream_writer(self.spool, closefd=False)
+        else:
+            self.stream = gzip.GzipFile(fileobj=self.spool, mode='wb', compresslevel=6)
+        self.rows = 0
+        self.first_key: Optional[ArchiveKey] = None
+        self.last_key: Optional[ArchiveKey] = None
+    
+    def write(self, rows: List[Tuple]) -> None:
+        """Encode rows (in ARCHIVE_COLUMNS order) as JSON lines."""
+        lines = []
+        for id_, service_name, metric_type, metric_value, unit, timestamp, metadata in rows:
+            lines.append(json.dumps({
+                "id": str(id_),
+                "service_name": service_name,
+                "metric_type": metric_type,
+                "metric_value": metric_value,
+                "unit": unit,
+                "timestamp": timestamp.isoformat(),
+                "metadata": metadata
+            }, default=str, separators=(",", ":")))
+        self.stream.write(("\n".join(lines) + "\n").encode("utf-8"))
+        
+        if self.first_key is None:
+            self.first_key = (rows[0][5], rows[0][0])
+        self.last_key = (rows[-1][5], rows[-1][0])
+        self.rows += len(rows)
+    
+    def finish(self):
+        """Flush the compressor and return the spooled file."""
+        self.stream.close()
+        self.spool.seek(0)
+        return self.spool
+
+
+class MetricsArchiver:
+    """
+    Keyset-paged, streaming archival of ``system_metrics``.
+    
+    Rows older than the cutoff are read in ``(timestamp, id)`` order with
+    ``WHERE (timestamp, id) > (:last) LIMIT :chunk_rows`` so every chunk
+    costs the same regardless of how far archival has progressed. Chunks
+    are encoded as zstd (or gzip) NDJSON into files of ``rows_per_file``
+    rows; a finished file uploads in a worker thread while the next chunks
+    are read. After each upload the last archived key is saved as a
+    checkpoint next to the files, so later runs only archive new rows and
+    an interrupted run resumes where it stopped.
+    
+    The checkpoint only moves forward, so a row inserted with a timestamp
+    the checkpoint has already passed would never be archived, and
+    ``delete_before`` would remove it like any archived row. Bulk ingest
+    (the only path that accepts client timestamps) therefore rejects
+    metrics older than the archival cutoff.
+    
+    Memory is bounded by one chunk in flight, one file being written and
+    one file uploading; files spill to a temporary file past
+    ``spool_bytes``.
+    """
+    
+    CHECKPOINT_NAME = "_checkpoint.json"
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        sink: ArchiveSink,
+        archive_path: str = "metrics",
+        chunk_rows: int = 20000,
+        rows_per_file: int = 500000,
+        delete_batch_rows: int = 10000,
+        spool_bytes: int = 16 * 1024 * 1024,
+        compression: Optional[str] = None
+    ):
+        """
+        Initialize archiver.
+        
+        Args:
+            session_factory: Callable returning a new AsyncSession
+            sink: Where archive files and the checkpoint are written
+            archive_path: Path prefix inside the sink
+            chunk_rows: Rows read per keyset query
+            rows_per_file: Rows per archive file
+            delete_batch_rows: Rows deleted per transaction
+            spool_bytes: File size kept in memory before spilling to disk
+            compression: "zstd" or "gzip" (defaults to zstd when installed)
+        """
+        if compression is None:
+            compression = "zstd" if ZSTD_AVAILABLE else "gzip"
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression requires the zstandard package")
+        if compression not in ("zstd", "gzip"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        
+        self.session_factory = session_factory
+        self.sink = sink
+        self.archive_path = archive_path.rstrip("/")
+        self.chunk_rows = chunk_rows
+        self.rows_per_file = rows_per_file
+        self.delete_batch_rows = delete_batch_rows
+        self.spool_bytes = spool_bytes
+        self.compression = compression
+    
+    @property
+    def _checkpoint_name(self) -> str:
+        return f"{self.archive_path}/{self.CHECKPOINT_NAME}"
+    
+    @property
+    def _extension(self) -> str:
+        return "ndjson.zst" if self.compression == "zstd" else "ndjson.gz"
+    
+    def _file_name(self, first_key: ArchiveKey) -> str:
+        """Deterministic name so a re-run after a crash overwrites, not duplicates."""
+        timestamp, id_ = first_key
+        return (
+            f"{self.archive_path}/{timestamp:%Y/%m/%d}/"
+            f"metrics_{timestamp:%Y%m%dT%H%M%S%f}_{str(id_)[:8]}.{self._extension}"
+        )
+    
+    async def load_checkpoint(self) -> Optional[ArchiveKey]:
+        """Key of the last archived row, or None before the first run."""
+        checkpoint = await asyncio.to_thread(self.sink.read_checkpoint, self._checkpoint_name)
+        if not checkpoint:
+            return None
+        return (datetime.fromisoformat(checkpoint["timestamp"]), UUID(checkpoint["id"]))
+    
+    async def _fetch_chunk(self, cutoff: datetime, after: Optional[ArchiveKey]) -> List[Tuple]:
+        stmt = select(*ARCHIVE_COLUMNS).where(SystemMetric.timestamp < cutoff)
+        if after is not None:
+            stmt = stmt.where(tuple_(SystemMetric.timestamp, SystemMetric.id) > tuple_(*after))
+        stmt = stmt.order_by(SystemMetric.timestamp, SystemMetric.id).limit(self.chunk_rows)
+        
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            return [tuple(row) for row in result.all()]
+    
+    def _upload_file(self, archive_file: _ArchiveFile, archived_total: int) -> str:
+        """Upload a finished file, then advance the checkpoint (worker thread)."""
+        fileobj = archive_file.finish()
+        try:
+            uri = self.sink.upload(
+                fileobj,
+                self._file_name(archive_file.first_key),
+                "application/zstd" if self.compression == "zstd" else "application/gzip"
+            )
+        finally:
+            fileobj.close()
+        
+        timestamp, id_ = archive_file.last_key
+        self.sink.write_checkpoint(self._checkpoint_name, {
+            "timestamp": timestamp.isoformat(),
+            "id": str(id_),
+            "archived_count": archived_total,
+            "updated_at": datetime.utcnow().isoformat()
+        })
+        logger.info(f"Archived {archive_file.rows} metrics to {uri}")
+        return uri
+    
+    async def archive(self, cutoff: datetime) -> Dict[str, Any]:
+        """
+        Archive every metric older than ``cutoff`` not yet archived.
+        
+        Args:
+            cutoff: Rows with timestamp before this are archived
+        
+        Returns:
+            Dictionary with archived_count, archive_uris and the checkpoint
+        """
+        after = await self.load_checkpoint()
+        archive_uris: List[str] = []
+        archived_count = 0
+        archive_file: Optional[_ArchiveFile] = None
+        upload: Optional[asyncio.Future] = None
+        next_rows: Optional[asyncio.Future] = None
+        
+        try:
+            rows = await self._fetch_chunk(cutoff, after)
+            while rows:
+                # Read the next chunk while this one is encoded
+                last = (rows[-1][5], rows[-1][0])
+                next_rows = asyncio.ensure_future(self._fetch_chunk(cutoff, last))
+                
+                if archive_file is None:
+                    archive_file = _ArchiveFile(self.compression, self.spool_bytes)
+                await asyncio.to_thread(archive_file.write, rows)
+                archived_count += len(rows)
+                
+                if archive_file.rows >= self.rows_per_file:
+                    # At most one upload in flight keeps memory bounded and checkpoints ordered
+                    if upload is not None:
+                        archive_uris.append(await upload)
+                    upload = asyncio.ensure_future(
+                        asyncio.to_thread(self._upload_file, archive_file, archived_count)
+                    )
+                    archive_file = None
+                
+                rows = await next_rows
+            
+            if archive_file is not None:
+                if upload is not None:
+                    archive_uris.append(await upload)
+                upload = asyncio.ensure_future(
+                    asyncio.to_thread(self._upload_file, archive_file, archived_count)
+                )
+            if upload is not None:
+                archive_uris.append(await upload)
+        finally:
+            # On failure, stop the prefetch and let a running upload settle its checkpoint
+            if next_rows is not None and not next_rows.done():
+                next_rows.cancel()
+            pending = [task for task in (next_rows, upload) if task is not None]
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        checkpoint = await self.load_checkpoint() if archive_uris else after
+        return {
+            "archived_count": archived_count,
+            "archive_uris": archive_uris,
+            "checkpoint": {
+                "timestamp": checkpoint[0].isoformat(),
+                "id": str(checkpoint[1])
+            } if checkpoint else None
+        }
+    
+    async def delete_before(self, cutoff: datetime) -> int:
+        """
+        Delete archived metrics older than ``cutoff`` in bounded transactions.
+        
+        Only rows at or before the archive checkpoint are deleted, so rows a
+        failed or lagging archival has not reached are kept. Each transaction
+        deletes at most ``delete_batch_rows`` rows picked by keyset order, so
+        locks and WAL per commit stay small however large the backlog is.
+        
+        Args:
+            cutoff: Rows with timestamp before this are deleted
+        
+        Returns:
+            Number of rows deleted
+        """
+        checkpoint = await self.load_checkpoint()
+        if checkpoint is None:
+            logger.warning("No metrics archived yet; skipping deletion")
+            return 0
+        
+        deleted = 0
+        while True:
+            batch = select(SystemMetric.id).where(
+                SystemMetric.timestamp < cutoff,
+                tuple_(SystemMetric.timestamp, SystemMetric.id) <= tuple_(*checkpoint)
+            )
+            batch = batch.order_by(SystemMetric.timestamp, SystemMetric.id).limit(self.delete_batch_rows)
+            
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    delete(SystemMetric)
+                    .where(SystemMetric.id.in_(batch.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+            
+            deleted += result.rowcount
+            if result.rowcount < self.delete_batch_rows:
+                return deleted
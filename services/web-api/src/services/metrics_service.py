@@ -1,10 +1,12 @@
 """
 Cloud Monitoring metrics service for querying time series data and calculating baselines.
 """
+import asyncio
 import logging
 import statistics
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import numpy as np
 from google.cloud import monitoring_v3
 from google.api_core import retry
@@ -16,21 +18,41 @@ logger = logging.getLogger(__name__)
 
 
 class MetricsService:
-    """Service for querying Cloud Monitoring metrics and calculating baselines."""
+    """
+    Service for querying Cloud Monitoring metrics and calculating baselines.
+    
+    The Monitoring client is synchronous, so every ``list_time_series`` call
+    (including pager iteration) runs on a dedicated thread pool instead of
+    the event loop. Identical queries that are in flight at the same time
+    share a single API call.
+    """
     
-    def __init__(self, project_id: str, redis_client: Optional[redis.Redis] = None):
+    def __init__(
+        self,
+        project_id: str,
+        redis_client: Optional[redis.Redis] = None,
+        max_workers: int = 16
+    ):
         """
         Initialize metrics service.
         
         Args:
             project_id: GCP project ID
             redis_client: Optional Redis client for caching
+            max_workers: Max concurrent Monitoring API calls
         """
         self.project_id = project_id
         self.client = monitoring_v3.MetricServiceClient()
         self.query_client = monitoring_v3.QueryServiceClient()
         self.project_name = f"projects/{project_id}"
         self.redis_client = redis_client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="monitoring-query"
+        )
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.api_calls = 0
+        self.coalesced_requests = 0
         
         logger.info(f"MetricsService initialized for project {project_id}")
     
@@ -96,6 +118,21 @@ class MetricsService:
             'points': points
         }
     
+    def _list_time_series(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Run ``list_time_series`` and drain its pager.
+        
+        Blocking; always called on the service's thread pool.
+        
+        Args:
+            request: list_time_series request
+            
+        Returns:
+            List of formatted time series data
+        """
+        results = self.client.list_time_series(request=request)
+        return [self._format_time_series(ts) for ts in results]
+    
     @retry.Retry(predicate=retry.if_exception_type(Exception))
     async def get_time_series(
         self,
@@ -109,6 +146,9 @@ class MetricsService:
         """
         Query time series data from Cloud Monitoring.
         
+        The query runs on the service's thread pool. Concurrent calls with
+        the same parameters (to the second) are coalesced into one API call.
+        
         Args:
             metric_type: Metric type to query (e.g., 'custom.googleapis.com/api/response_time')
             start_time: Start of time range
@@ -121,6 +161,11 @@ class MetricsService:
             List of formatted time series data
         """
         try:
+            # Monitoring resolves intervals to the second; truncating lets
+            # requests issued within the same second coalesce
+            start_time = start_time.replace(microsecond=0)
+            end_time = end_time.replace(microsecond=0)
+            
             # Build time interval
             interval = monitoring_v3.TimeInterval({
                 "start_time": start_time,
@@ -142,18 +187,29 @@ class MetricsService:
                 for key, value in resource_labels.items():
                     filter_str += f' AND resource.labels.{key} = "{value}"'
             
-            # Query time series
-            results = self.client.list_time_series(
-                request={
-                    "name": self.project_name,
-                    "filter": filter_str,
-                    "interval": interval,
-                    "aggregation": aggregation_obj,
-                }
-            )
+            # Query time series, sharing any identical in-flight request
+            key = (filter_str, start_time, end_time, aggregation, interval_seconds)
+            future = self._inflight.get(key)
+            if future is None:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(
+                    self._executor,
+                    self._list_time_series,
+                    {
+                        "name": self.project_name,
+                        "filter": filter_str,
+                        "interval": interval,
+                        "aggregation": aggregation_obj,
+                    }
+                )
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+                self.api_calls += 1
+            else:
+                self.coalesced_requests += 1
             
-            # Format results
-            formatted_results = [self._format_time_series(ts) for ts in results]
+            # Shield so a cancelled caller does not cancel the shared query
+            formatted_results = list(await asyncio.shield(future))
             
             logger.debug(
                 f"Retrieved {len(formatted_results)} time series for {metric_type} "
@@ -177,6 +233,8 @@ class MetricsService:
         """
         Get multiple metrics for a service.
         
+        Metrics are queried concurrently.
+        
         Args:
             service_name: Service name (e.g., 'web-api', 'feature-engine')
             metrics: List of metric names (e.g., ['cpu_usage', 'memory_usage'])
@@ -203,12 +261,11 @@ class MetricsService:
         end_time = datetime.utcnow()
         start_time = end_time - self._parse_time_range(time_range)
         
-        # Query each metric
-        results = {}
-        for metric in metrics:
+        # Query all metrics concurrently
+        async def query(metric: str) -> List[Dict[str, Any]]:
             metric_type = f"custom.googleapis.com/{service_name}/{metric}"
             try:
-                results[metric] = await self.get_time_series(
+                return await self.get_time_series(
                     metric_type=metric_type,
                     start_time=start_time,
                     end_time=end_time,
@@ -218,7 +275,10 @@ class MetricsService:
                 )
             except Exception as e:
                 logger.error(f"Error querying metric {metric} for {service_name}: {e}")
-                results[metric] = []
+                return []
+        
+        series = await asyncio.gather(*(query(metric) for metric in metrics))
+        results = dict(zip(metrics, series))
         
         # Cache the results
         if self.redis_client:
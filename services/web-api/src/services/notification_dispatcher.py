@@ -0,0 +1,480 @@
+"""
+Queued, coalescing dispatcher for alert notifications.
+
+During an incident dozens of alerts can fire within seconds. Instead of
+sending each one inline, callers enqueue alerts and return immediately.
+A background worker groups alerts per (channel, recipient) for a short
+window and sends one digest per group, over a single pooled HTTP client
+with per-channel concurrency limits.
+
+All channels are delivered over HTTP:
+- Email: SendGrid v3 mail/send API
+- Slack: incoming webhook
+- SMS: Twilio Messages API (critical alerts only)
+
+Formatting of single alerts is shared with NotificationService.
+"""
+import asyncio
+import logging
+import os
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from src.models.monitoring import AlertConfiguration, AlertHistory
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_API_URL = "https://api.sendgrid.com/v3/mail/send"
+TWILIO_API_URL = "https://api.twilio.com/2010-04-01"
+
+CHANNELS = ("email", "slack", "sms")
+
+DEFAULT_CHANNEL_CONCURRENCY = {
+    "email": 4,
+    "slack": 2,
+    "sms": 2
+}
+
+SEVERITY_ORDER = {"info": 0, "warning": 1, "critical": 2}
+
+# Slack rejects messages with more than 100 attachments
+MAX_DIGEST_ATTACHMENTS = 20
+
+# (channel, recipient)
+DigestKey = Tuple[str, str]
+
+
+@dataclass
+class QueuedNotification:
+    """Alert (or resolution) waiting to be delivered on one channel."""
+    channel: str
+    config: AlertConfiguration
+    alert: AlertHistory
+    resolved: bool = False
+
+
+class NotificationDispatcher:
+    """
+    Non-blocking notification dispatcher.
+    
+    Features:
+    - Bounded queue; enqueue never waits on the network
+    - Coalescing of alerts per channel and recipient into digests
+    - One pooled httpx.AsyncClient for all channels
+    - Per-channel concurrency limits
+    - Retries with exponential backoff and jitter on 429/5xx and network errors
+    """
+    
+    def __init__(
+        self,
+        notification_service: Any,
+        coalesce_window_seconds: Optional[float] = None,
+        max_queue_size: int = 1000,
+        channel_concurrency: Optional[Dict[str, int]] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        sendgrid_api_url: str = SENDGRID_API_URL,
+        twilio_api_url: str = TWILIO_API_URL,
+        retry_base_delay: float = 1.0,
+        shutdown_timeout: float = 10.0
+    ):
+        """
+        Initialize notification dispatcher.
+        
+        Args:
+            notification_service: NotificationService providing credentials,
+                recipients and message formatting
+            coalesce_window_seconds: How long alerts for the same recipient are
+                collected before sending (default: NOTIFICATION_COALESCE_SECONDS or 10)
+            max_queue_size: Maximum queued notifications before new ones are dropped
+            channel_concurrency: Maximum concurrent sends per channel
+            http_client: Shared HTTP client (created with connection pooling if omitted)
+            sendgrid_api_url: SendGrid mail/send endpoint
+            twilio_api_url: Twilio API base URL
+            retry_base_delay: Base delay in seconds for retry backoff
+            shutdown_timeout: Seconds aclose() waits for in-flight deliveries
+                before cancelling them
+        """
+        self.service = notification_service
+        if coalesce_window_seconds is None:
+            coalesce_window_seconds = float(os.getenv('NOTIFICATION_COALESCE_SECONDS', '10'))
+        self.coalesce_window_seconds = coalesce_window_seconds
+        self.max_retries = getattr(notification_service, 'max_retries', 3)
+        self.retry_base_delay = retry_base_delay
+        self.shutdown_timeout = shutdown_timeout
+        self.sendgrid_api_url = sendgrid_api_url
+        self.twilio_api_url = twilio_api_url.rstrip('/')
+        
+        concurrency = {**DEFAULT_CHANNEL_CONCURRENCY, **(channel_concurrency or {})}
+        self._semaphores = {
+            channel: asyncio.Semaphore(max(1, limit))
+            for channel, limit in concurrency.items()
+        }
+        
+        self._client = http_client
+        self._owns_client = http_client is None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._pending: Dict[DigestKey, List[QueuedNotification]] = {}
+        self._flush_tasks: Dict[DigestKey, asyncio.Task] = {}
+        self._delivery_tasks: Set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        self.stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "sent": 0,
+            "failed": 0,
+            "coalesced": 0
+        }
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by all channels"""
+        if self._client is None:
+            if self._closed:
+                # A straggling retry must not open a client nobody will close
+                raise RuntimeError("Notification dispatcher is closed")
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+        return self._client
+    
+    def start(self) -> None:
+        """Start the background worker (called automatically on first enqueue)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+    
+    async def aclose(self) -> None:
+        """
+        Deliver queued and pending digests, then stop the worker.
+        
+        Deliveries still running after ``shutdown_timeout`` seconds are
+        cancelled, and no new notifications are accepted.
+        """
+        self._closed = True
+        
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        
+        while not self._queue.empty():
+            self._collect(self._queue.get_nowait(), schedule=False)
+        
+        # Digests still in their window are sent now rather than after it
+        for task in self._flush_tasks.values():
+            task.cancel()
+        self._flush_tasks.clear()
+        
+        pending, self._pending = self._pending, {}
+        for key, batch in pending.items():
+            self._track(self._deliver(key, batch))
+        
+        deliveries = set(self._delivery_tasks)
+        if deliveries:
+            _, unfinished = await asyncio.wait(deliveries, timeout=self.shutdown_timeout)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*deliveries, return_exceptions=True)
+            if unfinished:
+                logger.warning(f"Cancelled {len(unfinished)} notification deliveries on shutdown")
+        
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def enqueue(
+        self,
+        channel: str,
+        config: AlertConfiguration,
+        alert: AlertHistory,
+        resolved: bool = False
+    ) -> bool:
+        """
+        Queue an alert or resolution for delivery without waiting.
+        
+        SMS is only queued for critical alerts, and never for resolutions.
+        
+        Args:
+            channel: 'email', 'slack' or 'sms'
+            config: Alert configuration
+            alert: Alert history record
+            resolved: Whether this is a resolution notification
+        
+        Returns:
+            True if queued, False if the channel is unavailable or the queue is full
+        """
+        if self._closed:
+            logger.warning(f"Notification dispatcher closed, dropping {channel} notification for alert {config.id}")
+            return False
+        if channel not in CHANNELS or not self._recipients(channel):
+            logger.debug(f"Notification channel {channel} not configured, skipping alert {config.id}")
+            return False
+        if channel == 'sms' and (resolved or alert.severity != 'critical'):
+            return False
+        
+        try:
+            self._queue.put_nowait(QueuedNotification(channel, config, alert, resolved))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Notification queue full, dropping {channel} notification for alert {config.id}")
+            return False
+        
+        self.stats["enqueued"] += 1
+        self.start()
+        return True
+    
+    async def _run(self) -> None:
+        """Move queued notifications into per-recipient digests"""
+        while True:
+            item = await self._queue.get()
+            try:
+                self._collect(item)
+            except Exception as e:
+                logger.error(f"Failed to queue {item.channel} notification: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+    
+    def _track(self, coro) -> asyncio.Task:
+        """Run a flush or delivery as a task that aclose() waits for"""
+        task = asyncio.create_task(coro)
+        self._delivery_tasks.add(task)
+        task.add_done_callback(self._delivery_tasks.discard)
+        return task
+    
+    def _collect(self, item: QueuedNotification, schedule: bool = True) -> None:
+        """Add a notification to each recipient's digest, scheduling a flush"""
+        for recipient in self._recipients(item.channel):
+            key = (item.channel, recipient)
+            batch = self._pending.setdefault(key, [])
+            batch.append(item)
+            if len(batch) > 1:
+                self.stats["coalesced"] += 1
+            if schedule and key not in self._flush_tasks:
+                self._flush_tasks[key] = self._track(self._flush_later(key))
+    
+    async def _flush_later(self, key: DigestKey) -> None:
+        """Send a recipient's digest once the coalescing window has passed"""
+        await asyncio.sleep(self.coalesce_window_seconds)
+        self._flush_tasks.pop(key, None)
+        batch = self._pending.pop(key, [])
+        if batch:
+            await self._deliver(key, batch)
+    
+    def _recipients(self, channel: str) -> List[str]:
+        if channel == 'email':
+            return self.service.alert_email_recipients if self.service.sendgrid_api_key else []
+        if channel == 'slack':
+            return [self.service.slack_webhook_url] if self.service.slack_webhook_url else []
+        if channel == 'sms':
+            if not (self.service.twilio_account_sid and self.service.twilio_auth_token):
+                return []
+            return self.service.alert_sms_recipients
+        return []
+    
+    async def _deliver(self, key: DigestKey, batch: List[QueuedNotification]) -> bool:
+        """Send one message (single alert or digest) to one recipient"""
+        channel, recipient = key
+        
+        async with self._semaphores[channel]:
+            try:
+                if channel == 'email':
+                    delivered = await self._send_email(recipient, batch)
+                elif channel == 'slack':
+                    delivered = await self._send_slack(recipient, batch)
+                else:
+                    delivered = await self._send_sms(recipient, batch)
+            except Exception as e:
+                logger.error(f"Failed to deliver {channel} notification: {e}", exc_info=True)
+                delivered = False
+        
+        if delivered:
+            self.stats["sent"] += 1
+            logger.info(f"Delivered {channel} notification with {len(batch)} alert(s)")
+        else:
+            self.stats["failed"] += 1
+        return delivered
+    
+    async def _post(self, channel: str, url: str, **kwargs) -> bool:
+        """POST with retries on 429, 5xx and network errors"""
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.client.post(url, **kwargs)
+                if response.status_code < 300:
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    logger.error(
+                        f"{channel} notification rejected with status {response.status_code}: "
+                        f"{response.text[:200]}"
+                    )
+                    return False
+                logger.warning(
+                    f"{channel} notification returned status {response.status_code} "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+            except httpx.HTTPError as e:
+                logger.warning(
+                    f"{channel} notification failed (attempt {attempt + 1}/{self.max_retries}): {e}"
+                )
+            
+            if attempt < self.max_retries - 1:
+                # Exponential backoff with jitter so retries from a burst spread out
+                await asyncio.sleep(self.retry_base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
+        
+        return False
+    
+    async def _send_email(self, recipient: str, batch: List[QueuedNotification]) -> bool:
+        if len(batch) == 1:
+            item = batch[0]
+            if item.resolved:
+                subject = f"[RESOLVED] {item.config.name}"
+                html_content = self.service._format_resolution_email_body(item.config, item.alert)
+            else:
+                subject = f"[{item.alert.severity.upper()}] {item.config.name}"
+                html_content = self.service._format_email_body(item.config, item.alert)
+        else:
+            subject = f"[{self._highest_severity(batch).upper()}] {len(batch)} alert notifications"
+            html_content = self._format_email_digest(batch)
+        
+        payload = {
+            "personalizations": [{"to": [{"email": recipient}]}],
+            "from": {"email": "alerts@utxoiq.com", "name": "utxoIQ Monitoring"},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}]
+        }
+        return await self._post(
+            'email',
+            self.sendgrid_api_url,
+            json=payload,
+            headers={"Authorization": f"Bearer {self.service.sendgrid_api_key}"}
+        )
+    
+    async def _send_slack(self, webhook_url: str, batch: List[QueuedNotification]) -> bool:
+        if len(batch) == 1:
+            payload = self._slack_payload(batch[0])
+        else:
+            attachments = [
+                attachment
+                for item in batch[:MAX_DIGEST_ATTACHMENTS]
+                for attachment in self._slack_payload(item)["attachments"]
+            ]
+            text = f"{len(batch)} alert notifications in the last {self.coalesce_window_seconds:g}s"
+            if len(batch) > MAX_DIGEST_ATTACHMENTS:
+                text += f" (showing {MAX_DIGEST_ATTACHMENTS})"
+            payload = {"text": text, "attachments": attachments}
+        
+        return await self._post('slack', webhook_url, json=payload)
+    
+    async def _send_sms(self, phone: str, batch: List[QueuedNotification]) -> bool:
+        if len(batch) == 1:
+            body = self.service._format_sms_message(batch[0].config, batch[0].alert)
+        else:
+            body = self._format_sms_digest(batch)
+        
+        return await self._post(
+            'sms',
+            f"{self.twilio_api_url}/Accounts/{self.service.twilio_account_sid}/Messages.json",
+            data={"To": phone, "From": self.service.twilio_from_number, "Body": body},
+            auth=(self.service.twilio_account_sid, self.service.twilio_auth_token)
+        )
+    
+    def _slack_payload(self, item: QueuedNotification) -> Dict[str, Any]:
+        if item.resolved:
+            return self.service._build_slack_resolution_payload(item.config, item.alert)
+        return self.service._build_slack_alert_payload(item.config, item.alert)
+    
+    @staticmethod
+    def _highest_severity(batch: List[QueuedNotification]) -> str:
+        return max(
+            (item.alert.severity for item in batch if not item.resolved),
+            key=lambda severity: SEVERITY_ORDER.get(severity, 0),
+            default='resolved'
+        )
+    
+    def _format_email_digest(self, batch: List[QueuedNotification]) -> str:
+        """Format one HTML email listing every alert in the digest"""
+        rows = []
+        for item in batch:
+            status = 'RESOLVED' if item.resolved else item.alert.severity.upper()
+            triggered_time = item.alert.triggered_at.strftime('%Y-%m-%d %H:%M:%S UTC')
+            dashboard_url = f"{self.service.dashboard_base_url}/monitoring/alerts/{item.config.id}"
+            rows.append(f"""
+            <tr>
+                <td style="padding: 8px; border-bottom: 1px solid #ddd; font-weight: bold;">{status}</td>
+                <td style="padding: 8px; border-bottom: 1px solid #ddd;"><a href="{dashboard_url}">{item.config.name}</a></td>
+                <td style="padding: 8px; border-bottom: 1px solid #ddd;">{item.alert.message}</td>
+                <td style="padding: 8px; border-bottom: 1px solid #ddd;">{triggered_time}</td>
+            </tr>""")
+        
+        return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{len(batch)} alert notifications</title>
+</head>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; padding: 20px;">
+    <h1 style="font-size: 22px;">{len(batch)} alert notifications</h1>
+    <table style="width: 100%; border-collapse: collapse;">{''.join(rows)}
+    </table>
+    <p style="margin-top: 20px; font-size: 12px; color: #666;">
+        Alerts raised within {self.coalesce_window_seconds:g}s are grouped into one message.
+    </p>
+</body>
+</html>
+"""
+
+    def _format_sms_digest(self, batch: List[QueuedNotification]) -> str:
+        """Format a digest SMS within the 160 character limit"""
+        services = sorted({item.config.service_name for item in batch})
+        message = f"[CRITICAL] {len(batch)} alerts: {', '.join(services)}"
+        if len(message) > 160:
+            message = message[:157] + "..."
+        return message
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get dispatcher status.
+        
+        Returns:
+            Queue depth, pending digests and delivery counters
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "pending_digests": len(self._pending),
+            "coalesce_window_seconds": self.coalesce_window_seconds,
+            **self.stats
+        }
+
+
+# Global dispatcher instance
+_notification_dispatcher: Optional[NotificationDispatcher] = None
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """
+    Get or create the global notification dispatcher.
+    
+    Returns:
+        NotificationDispatcher backed by an environment-configured NotificationService
+    """
+    global _notification_dispatcher
+    
+    if _notification_dispatcher is None:
+        from src.services.notification_service import NotificationService
+        _notification_dispatcher = NotificationDispatcher(NotificationService())
+    
+    return _notification_dispatcher
+
+
+async def close_notification_dispatcher() -> None:
+    """Deliver pending digests and close the pooled client (called on shutdown)."""
+    global _notification_dispatcher
+    
+    if _notification_dispatcher is not None:
+        await _notification_dispatcher.aclose()
+        _notification_dispatcher = None
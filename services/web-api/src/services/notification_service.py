@@ -6,7 +6,9 @@ This service handles sending alert notifications via:
 - Slack (Webhook)
 - SMS (Twilio)
 
-Includes retry logic, HTML templates, and delivery tracking.
+Includes retry logic, HTML templates, and delivery tracking. For bursts of
+alerts, NotificationDispatcher (notification_dispatcher.py) queues, coalesces
+and delivers them over pooled HTTP connections instead.
 """
 import logging
 import os
@@ -210,7 +212,8 @@ class NotificationService:
         # Send with retry logic
         for attempt in range(self.max_retries):
             try:
-                response = self.sendgrid_client.send(message)
+                # SendGrid client is synchronous; keep it off the event loop
+                response = await asyncio.to_thread(self.sendgrid_client.send, message)
                 
                 if response.status_code in (200, 202):
                     logger.info(
@@ -365,7 +368,7 @@ class NotificationService:
         )
         
         try:
-            response = self.sendgrid_client.send(message)
+            response = await asyncio.to_thread(self.sendgrid_client.send, message)
             return response.status_code in (200, 202)
         except Exception as e:
             logger.error(f"Failed to send resolution email: {e}")
@@ -461,6 +464,49 @@ class NotificationService:
         
         logger.info(f"Sending Slack alert for {config.name}")
         
+        payload = self._build_slack_alert_payload(config, alert)
+        
+        # Send with retry logic
+        for attempt in range(self.max_retries):
+            try:
+                async with httpx.AsyncClient(timeout=10.0) as client:
+                    response = await client.post(
+                        self.slack_webhook_url,
+                        json=payload
+                    )
+                    
+                    if response.status_code == 200:
+                        logger.info(
+                            f"Slack alert sent successfully (attempt {attempt + 1})"
+                        )
+                        return True
+                    else:
+                        logger.warning(
+                            f"Slack send returned status {response.status_code} "
+                            f"(attempt {attempt + 1}): {response.text}"
+                        )
+            
+            except Exception as e:
+                logger.error(
+                    f"Slack send failed (attempt {attempt + 1}/{self.max_retries}): {e}"
+                )
+                
+                if attempt < self.max_retries - 1:
+                    # Exponential backoff
+                    await asyncio.sleep(2 ** attempt)
+                else:
+                    raise SlackNotificationError(
+                        f"Failed to send Slack notification after {self.max_retries} attempts"
+                    ) from e
+        
+        return False
+    
+    def _build_slack_alert_payload(
+        self,
+        config: AlertConfiguration,
+        alert: AlertHistory
+    ) -> Dict[str, Any]:
+        """Build the Slack webhook payload for an alert."""
         # Severity color mapping
         severity_colors = {
             'info': '#36a64f',
@@ -506,40 +552,7 @@ class NotificationService:
             }]
         }
         
-        # Send with retry logic
-        for attempt in range(self.max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.post(
-                        self.slack_webhook_url,
-                        json=payload
-                    )
-                    
-                    if response.status_code == 200:
-                        logger.info(
-                            f"Slack alert sent successfully (attempt {attempt + 1})"
-                        )
-                        return True
-                    else:
-                        logger.warning(
-                            f"Slack send returned status {response.status_code} "
-                            f"(attempt {attempt + 1}): {response.text}"
-                        )
-                        
-            except Exception as e:
-                logger.error(
-                    f"Slack send failed (attempt {attempt + 1}/{self.max_retries}): {e}"
-                )
-                
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff
-                    await asyncio.sleep(2 ** attempt)
-                else:
-                    raise SlackNotificationError(
-                        f"Failed to send Slack notification after {self.max_retries} attempts"
-                    ) from e
-        
-        return False
+        return payload
     
     async def send_slack_resolution(
         self,
@@ -561,6 +574,25 @@ class NotificationService:
         
         logger.info(f"Sending Slack resolution for {config.name}")
         
+        payload = self._build_slack_resolution_payload(config, alert)
+        
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.post(
+                    self.slack_webhook_url,
+                    json=payload
+                )
+                return response.status_code == 200
+        except Exception as e:
+            logger.error(f"Failed to send Slack resolution: {e}")
+            return False
+    
+    def _build_slack_resolution_payload(
+        self,
+        config: AlertConfiguration,
+        alert: AlertHistory
+    ) -> Dict[str, Any]:
+        """Build the Slack webhook payload for an alert resolution."""
         # Calculate duration
         if alert.resolved_at:
             duration = alert.resolved_at - alert.triggered_at
@@ -603,16 +635,7 @@ class NotificationService:
             }]
         }
         
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    self.slack_webhook_url,
-                    json=payload
-                )
-                return response.status_code == 200
-        except Exception as e:
-            logger.error(f"Failed to send Slack resolution: {e}")
-            return False
+        return payload
     
     async def send_sms_alert(
         self,
@@ -1,9 +1,13 @@
 """
-Performance profiling service for on-demand CPU profiling.
+Performance profiling service for on-demand and continuous CPU profiling.
 
 This service provides on-demand profiling capabilities using py-spy,
 a sampling profiler for Python programs. It captures CPU usage at 100 Hz
 during profiling sessions and generates flame graphs for visual analysis.
+
+It can also run an always-on, low-rate in-process sampler
+(ContinuousProfiler) that keeps rolling per-minute profiles, so short
+latency spikes are captured without anyone starting a session.
 """
 
 import asyncio
@@ -21,6 +25,7 @@ from google.cloud import storage
 from pydantic import BaseModel
 
 from src.config import settings
+from src.services.continuous_profiler import ContinuousProfiler, ProfileWindow
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +52,9 @@ class ProfilingService:
     
     Uses py-spy to sample CPU usage at 100 Hz during profiling sessions.
     Generates flame graphs and stores results in Cloud Storage.
+    
+    Optionally runs a ContinuousProfiler in-process; its windows are kept
+    locally and can be exported to the same bucket.
     """
     
     def __init__(self, project_id: str, bucket_name: Optional[str] = None):
@@ -59,11 +67,24 @@ class ProfilingService:
         """
         self.project_id = project_id
         self.bucket_name = bucket_name or f"{project_id}-profiling-results"
-        self.storage_client = storage.Client(project=project_id)
+        self._storage_client: Optional[storage.Client] = None
         self.active_sessions: Dict[str, ProfilingSession] = {}
+        self.continuous_profiler: Optional[ContinuousProfiler] = None
+        
+    @property
+    def storage_client(self) -> storage.Client:
+        """
+        Cloud Storage client, created on first use.
         
-        # Ensure bucket exists
-        self._ensure_bucket_exists()
+        Continuous profiling without export never touches Cloud Storage, so
+        the service can start where no GCP credentials are available.
+        """
+        if self._storage_client is None:
+            self._storage_client = storage.Client(project=self.project_id)
+            
+            # Ensure bucket exists
+            self._ensure_bucket_exists()
+        return self._storage_client
     
     def _ensure_bucket_exists(self):
         """Create Cloud Storage bucket if it doesn't exist"""
@@ -417,6 +438,63 @@ class ProfilingService:
         
         return sessions[:limit]
     
+    def start_continuous_profiling(
+        self,
+        service_name: str,
+        sample_rate_hz: float = 10.0,
+        window_seconds: int = 60,
+        max_windows: int = 60,
+        storage_dir: Optional[str] = None,
+        export_to_storage: bool = False
+    ) -> ContinuousProfiler:
+        """
+        Start always-on in-process profiling.
+        
+        Args:
+            service_name: Name of the profiled service
+            sample_rate_hz: Stack samples per second (1-100, default 10)
+            window_seconds: Length of each per-window profile (default 60s)
+            max_windows: Windows kept in the ring buffer and on disk
+            storage_dir: Local directory for collapsed-stack files
+            export_to_storage: Also upload each window to Cloud Storage
+        
+        Returns:
+            The running ContinuousProfiler
+        
+        Raises:
+            ValueError: If sample rate or window length is invalid
+        """
+        if self.continuous_profiler and self.continuous_profiler.running:
+            return self.continuous_profiler
+        
+        self.continuous_profiler = ContinuousProfiler(
+            service_name=service_name,
+            sample_rate_hz=sample_rate_hz,
+            window_seconds=window_seconds,
+            max_windows=max_windows,
+            storage_dir=storage_dir,
+            exporter=self._export_profile_window if export_to_storage else None
+        )
+        self.continuous_profiler.start()
+        return self.continuous_profiler
+    
+    def stop_continuous_profiling(self):
+        """Stop continuous profiling, keeping the collected windows"""
+        if self.continuous_profiler:
+            self.continuous_profiler.stop()
+    
+    def _export_profile_window(self, window: ProfileWindow, file_name: str):
+        """
+        Upload one continuous profiling window to Cloud Storage.
+        
+        Args:
+            window: Closed profile window
+            file_name: File name used on local storage
+        """
+        bucket = self.storage_client.bucket(self.bucket_name)
+        blob = bucket.blob(f"continuous/{self.continuous_profiler.service_name}/{file_name}")
+        blob.upload_from_string(window.to_collapsed(), content_type="text/plain")
+    
     async def cleanup_old_sessions(self, days: int = 7):
         """
         Clean up old profiling sessions from memory.
@@ -437,3 +515,17 @@ class ProfilingService:
         
         if sessions_to_remove:
             logger.info(f"Cleaned up {len(sessions_to_remove)} old profiling sessions")
+
+
+# Process-wide instance so continuous profiles outlive individual requests
+_profiling_service: Optional[ProfilingService] = None
+
+
+def get_profiling_service() -> ProfilingService:
+    """Get or create the process-wide profiling service"""
+    global _profiling_service
+    
+    if _profiling_service is None:
+        _profiling_service = ProfilingService(project_id=settings.gcp_project_id)
+    
+    return _profiling_service
@@ -1,7 +1,11 @@
 """Rate limiting service using Redis backend."""
+import asyncio
 import logging
+import math
 import time
-from typing import Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 from enum import Enum
 import redis.asyncio as redis
 
@@ -208,6 +212,368 @@ class RateLimiter:
             return False
 
 
+# GCRA check executed atomically inside Redis.
+#
+# The key stores the theoretical arrival time (TAT) in milliseconds. Hits that
+# were already served from a local bucket ("committed") are always recorded;
+# the "requested" hits are only recorded when they fit within the window.
+#
+# KEYS[1] - rate limit key
+# ARGV[1] - current time (ms)
+# ARGV[2] - emission interval (ms per request)
+# ARGV[3] - window length (ms)
+# ARGV[4] - committed hits
+# ARGV[5] - requested hits
+#
+# Returns {allowed, remaining, reset_ms, retry_after_ms}
+GCRA_LUA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local window = tonumber(ARGV[3])
+local committed = tonumber(ARGV[4])
+local requested = tonumber(ARGV[5])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+  tat = now
+end
+tat = tat + committed * interval
+
+local new_tat = tat + requested * interval
+local allowed = 1
+local retry_after = 0
+if new_tat - window > now then
+  allowed = 0
+  retry_after = new_tat - window - now
+  new_tat = tat
+end
+
+if new_tat > now then
+  redis.call('SET', KEYS[1], string.format('%.0f', new_tat), 'PX', math.ceil(new_tat - now))
+end
+
+local remaining = math.floor((now + window - new_tat) / interval)
+if remaining < 0 then
+  remaining = 0
+end
+
+return {allowed, remaining, math.ceil(new_tat - now), math.ceil(retry_after)}
+"""
+
+
+@dataclass
+class _LocalBucket:
+    """Per-identifier state for the in-process pre-check."""
+    limit: int = 0
+    window_seconds: int = 0
+    tokens: int = 0
+    pending: int = 0
+    remaining: int = 0
+    reset_at: float = 0.0
+    blocked_until: float = 0.0
+    synced_at: float = 0.0
+
+
+class GCRARateLimiter(RateLimiter):
+    """
+    Rate limiter that enforces a true sliding window with GCRA in one round trip.
+
+    Each check runs a single Lua script (EVALSHA) instead of the
+    INCR/EXPIRE/TTL sequence used by the fixed window limiter. In front of
+    Redis sits an in-process token bucket: after a sync, up to
+    ``local_burst`` requests per identifier are granted locally and pushed
+    to Redis as one batched increment on the next sync. With several
+    instances this makes enforcement approximate (each instance can
+    overshoot by at most ``local_burst`` per sync interval) but cheap.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        local_burst: Optional[int] = None,
+        sync_interval: Optional[float] = None,
+        max_local_entries: Optional[int] = None
+    ):
+        """
+        Initialize GCRA rate limiter.
+
+        Args:
+            redis_client: Async Redis client instance
+            local_burst: Requests granted locally between Redis syncs (0 disables)
+            sync_interval: Max seconds between Redis syncs per identifier
+            max_local_entries: Max identifiers kept in the local bucket table
+        """
+        super().__init__(redis_client)
+        self.local_burst = (
+            settings.rate_limit_local_burst if local_burst is None else local_burst
+        )
+        self.sync_interval = (
+            settings.rate_limit_sync_interval if sync_interval is None else sync_interval
+        )
+        self.max_local_entries = (
+            settings.rate_limit_local_max_entries
+            if max_local_entries is None else max_local_entries
+        )
+        self._script = redis_client.register_script(GCRA_LUA_SCRIPT)
+        self._buckets: "OrderedDict[str, _LocalBucket]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def _get_redis_key(self, identifier: str, window_seconds: Optional[int] = None) -> str:
+        """
+        Generate Redis key for rate limiting.
+
+        GCRA keys are not tied to a window index, so the key only depends on
+        the identifier and window length.
+
+        Args:
+            identifier: Unique identifier (user ID or IP address)
+            window_seconds: Window length in seconds
+
+        Returns:
+            Redis key string
+        """
+        window = window_seconds or self.window_seconds
+        return f"rate_limit:gcra:{identifier}:{window}"
+
+    def _get_bucket(self, key: str) -> _LocalBucket:
+        """Get or create the local bucket for a key, evicting the oldest entries."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _LocalBucket()
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_local_entries:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def _run_script(
+        self,
+        key: str,
+        limit: int,
+        window_seconds: int,
+        committed: int,
+        requested: int
+    ) -> Tuple[bool, int, int, int]:
+        """
+        Run the GCRA script for one key.
+
+        Returns:
+            Tuple of (allowed, remaining, reset_ms, retry_after_ms)
+        """
+        window_ms = window_seconds * 1000
+        interval_ms = window_ms / limit
+        now_ms = int(time.time() * 1000)
+        result = await self._script(
+            keys=[key],
+            args=[now_ms, interval_ms, window_ms, committed, requested]
+        )
+        allowed, remaining, reset_ms, retry_ms = (int(v) for v in result)
+        return bool(allowed), remaining, reset_ms, retry_ms
+
+    async def check_rate_limit(
+        self,
+        user_id: str,
+        tier: UserSubscriptionTier,
+        window_seconds: Optional[int] = None
+    ) -> Tuple[bool, int, int]:
+        """
+        Check if user is within rate limit.
+
+        Requests are served from the local bucket while it has tokens and
+        the last sync is recent; otherwise the pending local hits plus the
+        current request are sent to Redis in a single script call.
+
+        Args:
+            user_id: Unique user identifier
+            tier: User subscription tier
+            window_seconds: Optional custom window size (defaults to config)
+
+        Returns:
+            Tuple of (allowed, remaining, reset_time):
+                - allowed: True if request is within limit
+                - remaining: Number of requests remaining in window
+                - reset_time: Seconds until rate limit resets (or until the
+                  next request is allowed when denied)
+        """
+        if window_seconds is None:
+            window_seconds = self.window_seconds
+
+        limit = self._get_limit_for_tier(tier)
+        key = self._get_redis_key(user_id, window_seconds)
+        now = time.monotonic()
+
+        async with self._lock:
+            bucket = self._get_bucket(key)
+            bucket.limit = limit
+            bucket.window_seconds = window_seconds
+
+            if now < bucket.blocked_until:
+                return False, 0, max(1, math.ceil(bucket.blocked_until - now))
+
+            if bucket.tokens > 0 and now - bucket.synced_at < self.sync_interval:
+                bucket.tokens -= 1
+                bucket.pending += 1
+                remaining = max(0, bucket.remaining - bucket.pending)
+                return True, remaining, max(0, math.ceil(bucket.reset_at - now))
+
+            committed = bucket.pending
+            bucket.pending = 0
+            bucket.tokens = 0
+
+        try:
+            allowed, remaining, reset_ms, retry_ms = await self._run_script(
+                key, limit, window_seconds, committed, 1
+            )
+        except Exception as e:
+            logger.error(f"Rate limiting error for user {user_id}: {e}", exc_info=True)
+            # Fail open like the fixed window limiter; put the unsynced hits
+            # back so they are recorded on the next successful sync
+            async with self._lock:
+                self._get_bucket(key).pending += committed
+            return True, limit, window_seconds
+
+        now = time.monotonic()
+        async with self._lock:
+            bucket = self._get_bucket(key)
+            bucket.synced_at = now
+            bucket.remaining = remaining
+            bucket.reset_at = now + reset_ms / 1000
+            if allowed:
+                bucket.tokens = min(self.local_burst, remaining)
+                bucket.blocked_until = 0.0
+            else:
+                bucket.tokens = 0
+                bucket.blocked_until = now + retry_ms / 1000
+
+        logger.debug(
+            f"Rate limit check: user={user_id}, tier={tier.value}, "
+            f"committed={committed}, limit={limit}, remaining={remaining}, "
+            f"reset_in={reset_ms}ms, allowed={allowed}"
+        )
+
+        if not allowed:
+            return False, 0, max(1, math.ceil(retry_ms / 1000))
+        return True, remaining, math.ceil(reset_ms / 1000)
+
+    async def flush(self) -> int:
+        """
+        Push all pending local hits to Redis in one pipelined round trip.
+
+        Intended for shutdown or periodic background sync so that hits served
+        locally by idle identifiers are not lost.
+
+        Returns:
+            Number of identifiers flushed
+        """
+        async with self._lock:
+            batch: Dict[str, Tuple[int, int, int]] = {
+                key: (bucket.pending, bucket.limit, bucket.window_seconds)
+                for key, bucket in self._buckets.items()
+                if bucket.pending and bucket.limit
+            }
+            for key in batch:
+                self._buckets[key].pending = 0
+
+        if not batch:
+            return 0
+
+        now_ms = int(time.time() * 1000)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, (pending, limit, window_seconds) in batch.items():
+                    window_ms = window_seconds * 1000
+                    interval_ms = window_ms / limit
+                    await self._script(
+                        keys=[key],
+                        args=[now_ms, interval_ms, window_ms, pending, 0],
+                        client=pipe
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error flushing local rate limit counters: {e}")
+            async with self._lock:
+                for key, (pending, _, _) in batch.items():
+                    self._get_bucket(key).pending += pending
+            return 0
+
+        return len(batch)
+
+    async def get_rate_limit_info(
+        self,
+        user_id: str,
+        tier: UserSubscriptionTier
+    ) -> dict:
+        """
+        Get current rate limit information for a user.
+
+        Args:
+            user_id: Unique user identifier
+            tier: User subscription tier
+
+        Returns:
+            Dictionary with rate limit information
+        """
+        limit = self._get_limit_for_tier(tier)
+        key = self._get_redis_key(user_id)
+        window_ms = self.window_seconds * 1000
+        interval_ms = window_ms / limit
+
+        try:
+            tat = await self.redis.get(key)
+            now_ms = time.time() * 1000
+            backlog_ms = max(0.0, float(tat) - now_ms) if tat else 0.0
+            bucket = self._buckets.get(key)
+            pending = bucket.pending if bucket else 0
+
+            used = min(limit, math.ceil(backlog_ms / interval_ms) + pending)
+
+            return {
+                "limit": limit,
+                "remaining": max(0, limit - used),
+                "reset": math.ceil(backlog_ms / 1000) if backlog_ms else self.window_seconds,
+                "used": used,
+                "tier": tier.value,
+                "window_seconds": self.window_seconds
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting rate limit info for user {user_id}: {e}")
+            return {
+                "limit": limit,
+                "remaining": limit,
+                "reset": self.window_seconds,
+                "used": 0,
+                "tier": tier.value,
+                "window_seconds": self.window_seconds
+            }
+
+    async def reset_rate_limit(self, user_id: str) -> bool:
+        """
+        Reset rate limit for a user (admin function).
+
+        Only the local bucket of this instance is cleared; other instances
+        pick up the reset on their next sync.
+
+        Args:
+            user_id: Unique user identifier
+
+        Returns:
+            True if reset successful, False otherwise
+        """
+        key = self._get_redis_key(user_id)
+
+        try:
+            await self.redis.delete(key)
+            async with self._lock:
+                self._buckets.pop(key, None)
+            logger.info(f"Rate limit reset for user: {user_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error resetting rate limit for user {user_id}: {e}")
+            return False
+
+
 # Global rate limiter instance
 _rate_limiter: Optional[RateLimiter] = None
 
@@ -230,7 +596,18 @@ async def get_rate_limiter() -> RateLimiter:
             decode_responses=True
         )
         
-        _rate_limiter = RateLimiter(redis_client)
-        logger.info("Rate limiter initialized successfully")
+        if settings.rate_limit_engine == "fixed_window":
+            _rate_limiter = RateLimiter(redis_client)
+        else:
+            _rate_limiter = GCRARateLimiter(redis_client)
+        logger.info(
+            f"Rate limiter initialized successfully (engine={settings.rate_limit_engine})"
+        )
     
     return _rate_limiter
+
+
+async def flush_rate_limiter() -> None:
+    """Push locally served rate limit hits to Redis (called on shutdown)."""
+    if isinstance(_rate_limiter, GCRARateLimiter):
+        await _rate_limiter.flush()
@@ -7,9 +7,13 @@ from google.cloud import storage
 from sqlalchemy import select, delete, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models.db_models import BackfillJob, InsightFeedback, SystemMetric
+from src.config import settings
+from src.models.db_models import BackfillJob, InsightFeedback
 from src.database import AsyncSessionLocal
 from src.services.database_exceptions import DatabaseError, ValidationError
+from src.services.metrics_archiver import (
+    ArchiveSink, GCSArchiveSink, LocalArchiveSink, MetricsArchiver
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,16 +39,31 @@ class RetentionConfig:
 class RetentionService:
     """Service for implementing data retention policies."""
     
-    def __init__(self, gcp_project_id: str):
+    def __init__(self, gcp_project_id: str, archive_sink: Optional[ArchiveSink] = None):
         """
         Initialize retention service.
         
         Args:
             gcp_project_id: Google Cloud project ID
+            archive_sink: Destination for metric archives (defaults to a local
+                directory when RETENTION_ARCHIVE_DIR is set, else the archive bucket)
         """
         self.session_factory = AsyncSessionLocal
         self.storage_client = storage.Client(project=gcp_project_id)
         self.bucket = self.storage_client.bucket(RetentionConfig.ARCHIVE_BUCKET_NAME)
+        
+        if archive_sink is None:
+            if settings.retention_archive_dir:
+                archive_sink = LocalArchiveSink(settings.retention_archive_dir)
+            else:
+                archive_sink = GCSArchiveSink(self.bucket, RetentionConfig.ARCHIVE_BUCKET_NAME)
+        self.metrics_archiver = MetricsArchiver(
+            self.session_factory,
+            archive_sink,
+            archive_path=RetentionConfig.METRICS_ARCHIVE_PATH,
+            chunk_rows=settings.retention_archive_chunk_rows,
+            rows_per_file=settings.retention_archive_rows_per_file
+        )
         logger.info("RetentionService initialized")
     
     async def __aenter__(self):
@@ -290,6 +309,9 @@ class RetentionService:
         """
         Archive metrics older than 90 days to cold storage.
         
+        Rows are streamed in (timestamp, id) order into compressed NDJSON
+        files; only rows after the previous run's checkpoint are archived.
+        
         Returns:
             Dictionary with archival statistics
         
@@ -303,64 +325,20 @@ class RetentionService:
             
             logger.info(f"Starting metrics archival for records older than {cutoff_date}")
             
-            # Query old metrics (batch processing to avoid memory issues)
-            batch_size = 10000
-            offset = 0
-            total_archived = 0
-            archive_uris = []
-            
-            while True:
-                result = await self.session.execute(
-                    select(SystemMetric)
-                    .where(SystemMetric.timestamp < cutoff_date)
-                    .limit(batch_size)
-                    .offset(offset)
-                )
-                old_metrics = result.scalars().all()
-                
-                if not old_metrics:
-                    break
-                
-                # Convert metrics to dictionaries for archival
-                metrics_data = []
-                for metric in old_metrics:
-                    metrics_data.append({
-                        "id": str(metric.id),
-                        "service_name": metric.service_name,
-                        "metric_type": metric.metric_type,
-                        "metric_value": metric.metric_value,
-                        "unit": metric.unit,
-                        "timestamp": metric.timestamp.isoformat(),
-                        "metadata": metric.metric_metadata
-                    })
-                
-                # Archive batch to Cloud Storage
-                timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-                filename = f"metrics_{timestamp}_batch_{offset}.json"
-                archive_uri = self._upload_to_gcs(
-                    metrics_data,
-                    RetentionConfig.METRICS_ARCHIVE_PATH,
-                    filename
-                )
-                archive_uris.append(archive_uri)
-                
-                total_archived += len(metrics_data)
-                offset += batch_size
-                
-                logger.info(f"Archived batch of {len(metrics_data)} metrics (total: {total_archived})")
-            
-            if total_archived == 0:
-                logger.info("No metrics to archive")
-                return {
-                    "archived_count": 0,
-                    "archive_uris": []
-                }
+            result = await self.metrics_archiver.archive(cutoff_date)
             
-            logger.info(f"Archived {total_archived} metrics to {len(archive_uris)} files")
+            if result["archived_count"] == 0:
+                logger.info("No metrics to archive")
+            else:
+                logger.info(
+                    f"Archived {result['archived_count']} metrics to "
+                    f"{len(result['archive_uris'])} files"
+                )
             
             return {
-                "archived_count": total_archived,
-                "archive_uris": archive_uris,
+                "archived_count": result["archived_count"],
+                "archive_uris": result["archive_uris"],
+                "checkpoint": result["checkpoint"],
                 "cutoff_date": cutoff_date.isoformat()
             }
         
@@ -372,6 +350,8 @@ class RetentionService:
         """
         Delete metrics older than 1 year from database (after archival).
         
+        Rows past the archive checkpoint are kept until archived.
+        
         Returns:
             Dictionary with deletion statistics
         
@@ -385,14 +365,8 @@ class RetentionService:
             
             logger.info(f"Starting metrics deletion for records older than {cutoff_date}")
             
-            # Delete old metrics
-            delete_stmt = delete(SystemMetric).where(
-                SystemMetric.timestamp < cutoff_date
-            )
-            result = await self.session.execute(delete_stmt)
-            deleted_count = result.rowcount
-            
-            await self.session.commit()
+            # Delete old metrics in bounded batches
+            deleted_count = await self.metrics_archiver.delete_before(cutoff_date)
             
             logger.info(f"Deleted {deleted_count} metrics older than {cutoff_date}")
             
@@ -493,12 +467,16 @@ class RetentionService:
                 logger.error(f"Metrics archival failed: {e}")
                 results["metrics_archive"] = {"error": str(e)}
             
-            # Delete very old metrics
-            try:
-                results["metrics_delete"] = await self.delete_old_archived_metrics()
-            except Exception as e:
-                logger.error(f"Metrics deletion failed: {e}")
-                results["metrics_delete"] = {"error": str(e)}
+            # Delete very old metrics, unless they may not have been archived
+            if "error" in results["metrics_archive"]:
+                logger.warning("Skipping metrics deletion because archival failed")
+                results["metrics_delete"] = {"skipped": True, "reason": "Metrics archival failed"}
+            else:
+                try:
+                    results["metrics_delete"] = await self.delete_old_archived_metrics()
+                except Exception as e:
+                    logger.error(f"Metrics deletion failed: {e}")
+                    results["metrics_delete"] = {"error": str(e)}
             
             logger.info("Completed all retention policies")
             return results
@@ -1,4 +1,13 @@
 """WebSocket module for real-time streaming."""
 from .manager import ConnectionManager, connection_manager
+from .broadcaster import Broadcaster, OverflowPolicy
+from .backplane import RedisStreamBackplane, Subscription
 
-__all__ = ["ConnectionManager", "connection_manager"]
+__all__ = [
+    "ConnectionManager",
+    "connection_manager",
+    "Broadcaster",
+    "OverflowPolicy",
+    "RedisStreamBackplane",
+    "Subscription",
+]
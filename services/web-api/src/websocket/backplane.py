@@ -0,0 +1,245 @@
+"""Cross-instance WebSocket fan-out over a Redis stream.
+
+Every instance appends broadcast messages to one capped Redis stream and
+runs a reader task that delivers new entries to its own local sockets.
+Stream entry IDs double as client offsets: a reconnecting client sends the
+last ID it saw and the entries after it are replayed to that client only.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import redis.asyncio as redis
+
+from ..config import settings
+from .broadcaster import serialize_message
+
+if TYPE_CHECKING:
+    from .manager import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Server-side filter for the messages a connection receives."""
+    signal_types: Optional[frozenset] = None  # None means all signal types
+    min_confidence: float = 0.0
+
+    @classmethod
+    def from_params(
+        cls,
+        signal_types: Optional[Iterable[str]] = None,
+        min_confidence: Optional[float] = None
+    ) -> "Subscription":
+        """
+        Build a subscription from client-supplied values.
+
+        Args:
+            signal_types: Signal types to receive, as a list or comma-separated
+                string (empty or None for all)
+            min_confidence: Minimum insight confidence (0.0 - 1.0)
+
+        Returns:
+            Subscription instance
+        """
+        if isinstance(signal_types, str):
+            signal_types = signal_types.split(",")
+        types = frozenset(t.strip().lower() for t in signal_types or [] if t and t.strip())
+        return cls(
+            signal_types=types or None,
+            min_confidence=max(0.0, min(1.0, float(min_confidence or 0.0)))
+        )
+
+    def matches(self, signal_type: Optional[str], confidence: Optional[float]) -> bool:
+        """
+        Check whether a message passes this subscription.
+
+        Messages without a signal type (e.g. system notices) always match.
+        """
+        if signal_type is None:
+            return True
+        if self.signal_types is not None and signal_type not in self.signal_types:
+            return False
+        return (confidence or 0.0) >= self.min_confidence
+
+    def to_dict(self) -> dict:
+        """Serialize for acknowledgement messages."""
+        return {
+            "signal_types": sorted(self.signal_types) if self.signal_types else None,
+            "min_confidence": self.min_confidence
+        }
+
+
+class RedisStreamBackplane:
+    """
+    Redis stream backplane shared by all web-api instances.
+
+    Entries hold the serialized message plus the topic fields used for
+    server-side filtering (``signal_type`` and ``confidence``). Each instance
+    decodes an entry once to attach its offset, then fans the frame out to
+    every matching local connection.
+    """
+
+    def __init__(
+        self,
+        manager: "ConnectionManager",
+        redis_client: Optional[redis.Redis] = None,
+        stream_key: Optional[str] = None,
+        max_length: Optional[int] = None,
+        block_ms: int = 5000,
+        read_count: int = 100
+    ):
+        """
+        Initialize backplane.
+
+        Args:
+            manager: Local connection manager to deliver entries to
+            redis_client: Async Redis client (created from settings if omitted)
+            stream_key: Redis stream key
+            max_length: Approximate number of entries retained for resume
+            block_ms: XREAD block timeout in milliseconds
+            read_count: Max entries per XREAD call
+        """
+        self.manager = manager
+        self.redis = redis_client
+        self.stream_key = stream_key or settings.ws_backplane_stream
+        self.max_length = max_length or settings.ws_backplane_max_length
+        self.block_ms = block_ms
+        self.read_count = read_count
+        self.last_id = "0-0"
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the reader task is active."""
+        return self._reader_task is not None and not self._reader_task.done()
+
+    async def start(self) -> None:
+        """Connect to Redis and start reading new entries."""
+        if self.running:
+            return
+        if self.redis is None:
+            self.redis = redis.Redis(
+                host=settings.redis_host,
+                port=settings.redis_port,
+                password=settings.redis_password if settings.redis_password else None,
+                decode_responses=True
+            )
+        await self.redis.ping()
+        # Read from an explicit ID: "$" would skip entries added between reads
+        self.last_id = await self._latest_id()
+        self._reader_task = asyncio.create_task(self._read_loop())
+        logger.info(f"WebSocket backplane started on stream {self.stream_key}")
+
+    async def _latest_id(self) -> str:
+        """ID of the newest stream entry, or "0-0" if the stream is empty."""
+        entries = await self.redis.xrevrange(self.stream_key, max="+", min="-", count=1)
+        return entries[0][0] if entries else "0-0"
+
+    async def stop(self) -> None:
+        """Stop the reader task."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        logger.info("WebSocket backplane stopped")
+
+    async def publish(
+        self,
+        message: dict,
+        signal_type: Optional[str] = None,
+        confidence: Optional[float] = None
+    ) -> str:
+        """
+        Append a message to the stream for delivery on every instance.
+
+        Args:
+            message: Message to broadcast
+            signal_type: Topic used for subscription filtering
+            confidence: Confidence used for threshold filtering
+
+        Returns:
+            Stream entry ID (the client-visible offset)
+        """
+        fields = {"payload": serialize_message(message)}
+        if signal_type is not None:
+            fields["signal_type"] = signal_type
+        if confidence is not None:
+            fields["confidence"] = repr(float(confidence))
+
+        return await self.redis.xadd(
+            self.stream_key,
+            fields,
+            maxlen=self.max_length,
+            approximate=True
+        )
+
+    async def replay(
+        self,
+        connection_id: str,
+        last_id: str,
+        limit: int = 1000
+    ) -> int:
+        """
+        Deliver entries after ``last_id`` to a single connection.
+
+        Clients should de-duplicate by offset, as live entries may arrive
+        while the replay is being queued.
+
+        Args:
+            connection_id: Connection to replay to
+            last_id: Last stream ID the client received
+            limit: Max entries to replay
+
+        Returns:
+            Number of entries queued for the connection
+        """
+        entries = await self.redis.xrange(
+            self.stream_key, min=f"({last_id}", max="+", count=limit
+        )
+        return sum(
+            self._deliver(entry_id, fields, [connection_id])
+            for entry_id, fields in entries
+        )
+
+    def _deliver(
+        self,
+        entry_id: str,
+        fields: dict,
+        connection_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """Attach the offset to an entry and hand it to the local manager."""
+        message = json.loads(fields["payload"])
+        message["offset"] = entry_id
+        confidence = fields.get("confidence")
+        return self.manager.deliver_local(
+            serialize_message(message),
+            signal_type=fields.get("signal_type"),
+            confidence=float(confidence) if confidence is not None else None,
+            connection_ids=connection_ids
+        )
+
+    async def _read_loop(self) -> None:
+        """Read new stream entries and deliver them locally."""
+        while True:
+            try:
+                response = await self.redis.xread(
+                    {self.stream_key: self.last_id},
+                    count=self.read_count,
+                    block=self.block_ms
+                )
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        self.last_id = entry_id
+                        self._deliver(entry_id, fields)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket backplane read error: {e}")
+                await asyncio.sleep(1)
@@ -0,0 +1,259 @@
+"""Fan-out engine for WebSocket broadcasts.
+
+Each message is serialized once and the resulting frame is pushed onto a
+bounded per-connection queue. One writer task per connection drains its
+queue, so a slow client only delays itself instead of every subscriber.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from fastapi import WebSocket
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when a client's send queue is full."""
+    DROP = "drop"              # Drop the new frame for that client only
+    DISCONNECT = "disconnect"  # Close the slow client's connection
+
+
+def serialize_message(message: dict) -> str:
+    """
+    Serialize a message to a WebSocket text frame.
+
+    Uses the same encoding as ``WebSocket.send_json`` so clients see
+    identical payloads.
+
+    Args:
+        message: Message to serialize
+
+    Returns:
+        JSON text frame
+    """
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ClientSender:
+    """Bounded send queue and writer task for one WebSocket connection."""
+
+    def __init__(
+        self,
+        connection_id: str,
+        websocket: WebSocket,
+        max_queue_size: int,
+        on_sent: Callable[[float], None],
+        on_error: Callable[[str, Exception], None]
+    ):
+        """
+        Initialize sender and start its writer task.
+
+        Args:
+            connection_id: Connection identifier
+            websocket: The WebSocket connection
+            max_queue_size: Max frames buffered for this connection
+            on_sent: Called with enqueue-to-send latency (seconds) per frame
+            on_error: Called when a send fails
+        """
+        self.connection_id = connection_id
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[Tuple[str, float]]" = asyncio.Queue(maxsize=max_queue_size)
+        self._on_sent = on_sent
+        self._on_error = on_error
+        self._task = asyncio.create_task(self._run())
+
+    def offer(self, frame: str, enqueued_at: float) -> bool:
+        """
+        Queue a frame without blocking.
+
+        Returns:
+            True if queued, False if the queue is full
+        """
+        try:
+            self.queue.put_nowait((frame, enqueued_at))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _run(self) -> None:
+        """Drain the queue until cancelled or a send fails."""
+        while True:
+            frame, enqueued_at = await self.queue.get()
+            try:
+                await self.websocket.send_text(frame)
+            except Exception as e:
+                self._on_error(self.connection_id, e)
+                return
+            self._on_sent(time.perf_counter() - enqueued_at)
+
+    async def close(self) -> None:
+        """Stop the writer task, dropping any queued frames."""
+        if not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class Broadcaster:
+    """
+    Serialize-once fan-out with per-connection send queues.
+
+    ``publish`` never awaits a socket: it serializes the message, offers the
+    frame to every target queue and returns. Clients whose queues overflow
+    either miss the frame or are evicted, depending on the overflow policy.
+    Delivery latency (publish to socket write) is sampled for percentiles.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: Optional[int] = None,
+        overflow_policy: Optional[OverflowPolicy] = None,
+        on_evict: Optional[Callable[[str], Awaitable[None]]] = None,
+        latency_samples: int = 4096
+    ):
+        """
+        Initialize broadcaster.
+
+        Args:
+            max_queue_size: Frames buffered per connection (defaults to config)
+            overflow_policy: Overflow handling (defaults to config)
+            on_evict: Coroutine called with connection ID when a client is
+                evicted because of overflow or a failed send
+            latency_samples: Number of recent delivery latencies kept
+        """
+        self.max_queue_size = max_queue_size or settings.ws_send_queue_size
+        self.overflow_policy = OverflowPolicy(
+            overflow_policy or settings.ws_overflow_policy
+        )
+        self._on_evict = on_evict
+        self._senders: Dict[str, ClientSender] = {}
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+        self._evicting: set = set()
+        self.frames_published = 0
+        self.frames_dropped = 0
+        self.clients_evicted = 0
+
+    def register(self, connection_id: str, websocket: WebSocket) -> None:
+        """Create the send queue and writer task for a connection."""
+        self._senders[connection_id] = ClientSender(
+            connection_id,
+            websocket,
+            self.max_queue_size,
+            on_sent=self._latencies.append,
+            on_error=self._handle_send_error
+        )
+
+    async def unregister(self, connection_id: str) -> None:
+        """Stop the writer task for a connection."""
+        sender = self._senders.pop(connection_id, None)
+        self._evicting.discard(connection_id)
+        if sender:
+            await sender.close()
+
+    def publish(
+        self,
+        message: dict,
+        connection_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Queue a message for delivery.
+
+        Args:
+            message: Message to send
+            connection_ids: Target connections (defaults to all)
+
+        Returns:
+            Number of connections the frame was queued for
+        """
+        frame = serialize_message(message)
+        return self.publish_frame(frame, connection_ids)
+
+    def publish_frame(
+        self,
+        frame: str,
+        connection_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Queue an already serialized frame for delivery.
+
+        Args:
+            frame: Serialized text frame
+            connection_ids: Target connections (defaults to all)
+
+        Returns:
+            Number of connections the frame was queued for
+        """
+        if connection_ids is None:
+            targets = list(self._senders.items())
+        else:
+            targets = [
+                (cid, self._senders[cid]) for cid in connection_ids if cid in self._senders
+            ]
+
+        enqueued_at = time.perf_counter()
+        queued = 0
+        for connection_id, sender in targets:
+            if sender.offer(frame, enqueued_at):
+                queued += 1
+                continue
+
+            self.frames_dropped += 1
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                logger.warning(
+                    f"Send queue overflow for {connection_id} "
+                    f"({self.max_queue_size} frames), disconnecting"
+                )
+                self._evict(connection_id)
+
+        self.frames_published += 1
+        return queued
+
+    def _handle_send_error(self, connection_id: str, error: Exception) -> None:
+        """Evict a connection whose socket write failed."""
+        logger.error(f"Error sending to {connection_id}: {error}")
+        self._evict(connection_id)
+
+    def _evict(self, connection_id: str) -> None:
+        """Schedule removal of a connection (at most once)."""
+        if connection_id in self._evicting:
+            return
+        self._evicting.add(connection_id)
+        self.clients_evicted += 1
+        if self._on_evict is not None:
+            asyncio.create_task(self._on_evict(connection_id))
+
+    def get_stats(self) -> dict:
+        """
+        Get fan-out statistics.
+
+        Returns:
+            Dictionary with queue depth, drop counts and delivery latency
+            percentiles in milliseconds
+        """
+        latencies = np.array(self._latencies) * 1000 if self._latencies else None
+        queue_depths = [sender.queue.qsize() for sender in self._senders.values()]
+
+        return {
+            "connections": len(self._senders),
+            "frames_published": self.frames_published,
+            "frames_dropped": self.frames_dropped,
+            "clients_evicted": self.clients_evicted,
+            "max_queue_depth": max(queue_depths, default=0),
+            "latency_ms": {
+                "samples": len(self._latencies),
+                "p50": float(np.percentile(latencies, 50)) if latencies is not None else 0.0,
+                "p95": float(np.percentile(latencies, 95)) if latencies is not None else 0.0,
+                "p99": float(np.percentile(latencies, 99)) if latencies is not None else 0.0,
+                "max": float(latencies.max()) if latencies is not None else 0.0,
+            }
+        }
@@ -2,10 +2,12 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Set, Optional
+from typing import Dict, Iterable, Set, Optional
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect
 from ..models.insights import Insight
+from .broadcaster import Broadcaster, serialize_message
+from .backplane import RedisStreamBackplane, Subscription
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +21,15 @@ class ConnectionManager:
         self.user_connections: Dict[str, Set[str]] = {}  # user_id -> set of connection_ids
         self.connection_metadata: Dict[str, dict] = {}
         self._heartbeat_task: Optional[asyncio.Task] = None
+        self.broadcaster = Broadcaster(on_evict=self._evict_connection)
+        self.backplane: Optional[RedisStreamBackplane] = None
         
     async def connect(
         self,
         websocket: WebSocket,
         connection_id: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        subscription: Optional[Subscription] = None
     ) -> None:
         """
         Accept and register a new WebSocket connection.
@@ -33,13 +38,15 @@ class ConnectionManager:
             websocket: The WebSocket connection
             connection_id: Unique identifier for this connection
             user_id: Optional authenticated user ID
+            subscription: Optional topic filter (defaults to all insights)
         """
         await websocket.accept()
         self.active_connections[connection_id] = websocket
         self.connection_metadata[connection_id] = {
             "user_id": user_id,
             "connected_at": datetime.utcnow(),
-            "last_heartbeat": datetime.utcnow()
+            "last_heartbeat": datetime.utcnow(),
+            "subscription": subscription or Subscription()
         }
         
         if user_id:
@@ -47,6 +54,8 @@ class ConnectionManager:
                 self.user_connections[user_id] = set()
             self.user_connections[user_id].add(connection_id)
         
+        self.broadcaster.register(connection_id, websocket)
+        
         logger.info(
             f"WebSocket connected: {connection_id} "
             f"(user: {user_id}, total: {len(self.active_connections)})"
@@ -76,6 +85,7 @@ class ConnectionManager:
             # Remove connection
             del self.active_connections[connection_id]
             del self.connection_metadata[connection_id]
+            await self.broadcaster.unregister(connection_id)
             
             logger.info(
                 f"WebSocket disconnected: {connection_id} "
@@ -88,24 +98,17 @@ class ConnectionManager:
         connection_id: str
     ) -> bool:
         """
-        Send a message to a specific connection.
+        Queue a message for a specific connection.
         
         Args:
             message: The message to send
             connection_id: The target connection ID
             
         Returns:
-            True if sent successfully, False otherwise
+            True if queued successfully, False otherwise
         """
         if connection_id in self.active_connections:
-            try:
-                websocket = self.active_connections[connection_id]
-                await websocket.send_json(message)
-                return True
-            except Exception as e:
-                logger.error(f"Error sending to {connection_id}: {e}")
-                await self.disconnect(connection_id)
-                return False
+            return self.broadcaster.publish(message, [connection_id]) > 0
         return False
     
     async def send_to_user(self, message: dict, user_id: str) -> int:
@@ -117,59 +120,152 @@ class ConnectionManager:
             user_id: The target user ID
             
         Returns:
-            Number of connections successfully sent to
+            Number of connections the message was queued for
         """
         if user_id not in self.user_connections:
             return 0
         
-        connection_ids = list(self.user_connections[user_id])
-        sent_count = 0
-        
-        for connection_id in connection_ids:
-            if await self.send_personal_message(message, connection_id):
-                sent_count += 1
-        
-        return sent_count
+        return self.broadcaster.publish(message, list(self.user_connections[user_id]))
     
     async def broadcast(self, message: dict) -> int:
         """
         Broadcast a message to all connected clients.
         
+        The message is serialized once and queued per connection; delivery
+        happens on each connection's writer task.
+        
         Args:
             message: The message to broadcast
             
         Returns:
-            Number of connections successfully sent to
+            Number of connections the message was queued for
         """
-        connection_ids = list(self.active_connections.keys())
-        sent_count = 0
+        return self.broadcaster.publish(message)
+    
+    def set_subscription(self, connection_id: str, subscription: Subscription) -> bool:
+        """
+        Replace the topic filter for a connection.
         
-        for connection_id in connection_ids:
-            if await self.send_personal_message(message, connection_id):
-                sent_count += 1
+        Args:
+            connection_id: The connection ID
+            subscription: New topic filter
+            
+        Returns:
+            True if the connection exists, False otherwise
+        """
+        metadata = self.connection_metadata.get(connection_id)
+        if metadata is None:
+            return False
+        metadata["subscription"] = subscription
+        return True
+    
+    def deliver_local(
+        self,
+        frame: str,
+        signal_type: Optional[str] = None,
+        confidence: Optional[float] = None,
+        connection_ids: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Queue a serialized frame for local connections whose subscription matches.
         
-        return sent_count
+        Args:
+            frame: Serialized message
+            signal_type: Topic of the message
+            confidence: Confidence of the message
+            connection_ids: Restrict delivery to these connections
+            
+        Returns:
+            Number of connections the frame was queued for
+        """
+        candidates = (
+            self.connection_metadata.keys() if connection_ids is None else connection_ids
+        )
+        targets = [
+            connection_id for connection_id in candidates
+            if connection_id in self.connection_metadata
+            and self.connection_metadata[connection_id]["subscription"].matches(
+                signal_type, confidence
+            )
+        ]
+        return self.broadcaster.publish_frame(frame, targets)
     
     async def broadcast_insight(self, insight: Insight) -> int:
         """
-        Broadcast a new insight to all connected clients.
+        Broadcast a new insight to all subscribed clients.
+        
+        When the Redis backplane is running the insight is appended to the
+        shared stream and every instance (including this one) delivers it to
+        its own sockets from the stream reader.
         
         Args:
             insight: The insight to broadcast
             
         Returns:
-            Number of connections successfully sent to
+            Number of local connections the insight was queued for
+            (0 when published through the backplane)
         """
         message = {
             "type": "insight",
             "data": insight.model_dump(mode="json"),
             "timestamp": datetime.utcnow().isoformat()
         }
+        signal_type = insight.signal_type.value
+        
+        if self.backplane is not None and self.backplane.running:
+            try:
+                offset = await self.backplane.publish(message, signal_type, insight.confidence)
+                logger.info(f"Published insight {insight.id} to backplane at {offset}")
+                return 0
+            except Exception as e:
+                logger.error(f"Backplane publish failed, delivering locally: {e}")
         
-        sent_count = await self.broadcast(message)
+        sent_count = self.deliver_local(
+            serialize_message(message), signal_type, insight.confidence
+        )
         logger.info(f"Broadcasted insight {insight.id} to {sent_count} connections")
         return sent_count
     
+    async def replay(self, connection_id: str, last_id: str) -> int:
+        """
+        Replay backplane messages a reconnecting client missed.
+        
+        Args:
+            connection_id: The connection ID
+            last_id: Last offset the client received
+            
+        Returns:
+            Number of messages queued for the connection
+        """
+        if self.backplane is None or not self.backplane.running:
+            return 0
+        try:
+            return await self.backplane.replay(connection_id, last_id)
+        except Exception as e:
+            logger.warning(f"Replay from {last_id} failed for {connection_id}: {e}")
+            return 0
+    
+    async def start_backplane(self) -> bool:
+        """
+        Start cross-instance delivery through the Redis stream backplane.
+        
+        Returns:
+            True if started, False if Redis is unavailable (local delivery only)
+        """
+        if self.backplane is None:
+            self.backplane = RedisStreamBackplane(self)
+        try:
+            await self.backplane.start()
+            return True
+        except Exception as e:
+            logger.warning(f"WebSocket backplane unavailable, using local delivery: {e}")
+            return False
+    
+    async def stop_backplane(self) -> None:
+        """Stop the Redis stream backplane."""
+        if self.backplane is not None:
+            await self.backplane.stop()
+    
     async def _heartbeat_loop(self) -> None:
         """Send periodic heartbeat messages to maintain connections."""
         while self.active_connections:
@@ -181,19 +277,31 @@ class ConnectionManager:
                     "timestamp": datetime.utcnow().isoformat()
                 }
                 
-                connection_ids = list(self.active_connections.keys())
-                for connection_id in connection_ids:
-                    try:
-                        websocket = self.active_connections[connection_id]
-                        await websocket.send_json(heartbeat_message)
-                        self.connection_metadata[connection_id]["last_heartbeat"] = datetime.utcnow()
-                    except Exception as e:
-                        logger.warning(f"Heartbeat failed for {connection_id}: {e}")
-                        await self.disconnect(connection_id)
+                # Failed sends are evicted by the broadcaster's writer tasks
+                self.broadcaster.publish(heartbeat_message)
+                now = datetime.utcnow()
+                for metadata in self.connection_metadata.values():
+                    metadata["last_heartbeat"] = now
                 
             except Exception as e:
                 logger.error(f"Error in heartbeat loop: {e}")
     
+    async def _evict_connection(self, connection_id: str) -> None:
+        """
+        Close and unregister a connection that overflowed or failed a send.
+        
+        Args:
+            connection_id: The connection ID to evict
+        """
+        websocket = self.active_connections.get(connection_id)
+        if websocket is not None:
+            try:
+                # 1013: try again later
+                await websocket.close(code=1013)
+            except Exception:
+                pass
+        await self.disconnect(connection_id)
+    
     def get_connection_count(self) -> int:
         """Get the total number of active connections."""
         return len(self.active_connections)
@@ -201,6 +309,10 @@ class ConnectionManager:
     def get_user_connection_count(self, user_id: str) -> int:
         """Get the number of connections for a specific user."""
         return len(self.user_connections.get(user_id, set()))
+    
+    def get_fanout_stats(self) -> dict:
+        """Get broadcast queue and delivery latency statistics."""
+        return self.broadcaster.get_stats()
 
 
 # Global connection manager instance
@@ -579,3 +579,177 @@ class TestSMSNotifications:
         
         # Verify SMS was not sent
         mock_notification_service.send_sms_alert.assert_not_called()
+
+
+def _make_config(service_name="web-api", metric_type="cpu_usage", window=300, threshold=80.0):
+    """Create an enabled alert configuration."""
+    return AlertConfiguration(
+        id=uuid4(),
+        name=f"{service_name} {metric_type} > {threshold}",
+        service_name=service_name,
+        metric_type=metric_type,
+        threshold_type="absolute",
+        threshold_value=threshold,
+        comparison_operator=">",
+        severity="warning",
+        evaluation_window_seconds=window,
+        notification_channels=[],
+        suppression_enabled=False,
+        created_by=uuid4(),
+        enabled=True
+    )
+
+
+class TestBatchedEvaluation:
+    """Test shared, concurrent metric fetching in evaluate_all_alerts."""
+    
+    @pytest.fixture
+    def configs(self):
+        """Four alerts over two distinct series."""
+        return [
+            _make_config(threshold=50.0),
+            _make_config(threshold=80.0),
+            _make_config(threshold=95.0),
+            _make_config(metric_type="memory_usage", threshold=10.0),
+        ]
+    
+    def _mock_db(self, mock_db_session, configs):
+        mock_result_configs = MagicMock()
+        mock_result_configs.scalars().all.return_value = configs
+        mock_result_active = MagicMock()
+        mock_result_active.scalars().first.return_value = None
+        mock_db_session.execute.side_effect = (
+            [mock_result_configs] + [mock_result_active] * len(configs)
+        )
+    
+    @pytest.mark.asyncio
+    async def test_fetches_each_series_once(
+        self,
+        alert_evaluator,
+        configs,
+        mock_db_session,
+        mock_metrics_service
+    ):
+        """Test alerts on the same series share one metric query."""
+        self._mock_db(mock_db_session, configs)
+        mock_metrics_service.get_time_series.return_value = [{
+            'points': [{'value': 85.0, 'timestamp': datetime.utcnow().isoformat()}]
+        }]
+        
+        summary = await alert_evaluator.evaluate_all_alerts()
+        
+        assert mock_metrics_service.get_time_series.call_count == 2
+        assert summary['metric_fetches'] == 2
+        assert summary['total_evaluated'] == 4
+        # 85 > 50, 85 > 80 and 85 > 10 trigger; 85 > 95 does not
+        assert summary['triggered'] == 3
+        assert summary['errors'] == 0
+        assert summary['duration_seconds'] >= summary['fetch_duration_seconds']
+    
+    @pytest.mark.asyncio
+    async def test_different_windows_fetched_separately(
+        self,
+        alert_evaluator,
+        mock_db_session,
+        mock_metrics_service
+    ):
+        """Test the evaluation window is part of the series key."""
+        configs = [_make_config(window=300), _make_config(window=3600)]
+        self._mock_db(mock_db_session, configs)
+        mock_metrics_service.get_time_series.return_value = [{
+            'points': [{'value': 85.0, 'timestamp': datetime.utcnow().isoformat()}]
+        }]
+        
+        await alert_evaluator.evaluate_all_alerts()
+        
+        windows = sorted(
+            call.kwargs['interval_seconds']
+            for call in mock_metrics_service.get_time_series.call_args_list
+        )
+        assert windows == [300, 3600]
+    
+    @pytest.mark.asyncio
+    async def test_fetch_concurrency_is_bounded(
+        self,
+        mock_metrics_service,
+        mock_db_session
+    ):
+        """Test distinct fetches run concurrently up to the bound."""
+        import asyncio
+        
+        configs = [_make_config(metric_type=f"metric_{i}") for i in range(6)]
+        self._mock_db(mock_db_session, configs)
+        in_flight = 0
+        peak = 0
+        
+        async def get_time_series(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [{'points': [{'value': 1.0, 'timestamp': ''}]}]
+        
+        mock_metrics_service.get_time_series.side_effect = get_time_series
+        evaluator = AlertEvaluator(
+            metrics_service=mock_metrics_service,
+            db=mock_db_session,
+            max_concurrent_fetches=3
+        )
+        
+        summary = await evaluator.evaluate_all_alerts()
+        
+        assert summary['metric_fetches'] == 6
+        assert peak == 3
+    
+    @pytest.mark.asyncio
+    async def test_missing_series_skips_its_alerts(
+        self,
+        alert_evaluator,
+        configs,
+        mock_db_session,
+        mock_metrics_service
+    ):
+        """Test a failed fetch skips only the alerts that read that series."""
+        self._mock_db(mock_db_session, configs)
+        
+        async def get_time_series(metric_type, **kwargs):
+            if metric_type.endswith("memory_usage"):
+                return []
+            return [{'points': [{'value': 85.0, 'timestamp': ''}]}]
+        
+        mock_metrics_service.get_time_series.side_effect = get_time_series
+        
+        summary = await alert_evaluator.evaluate_all_alerts()
+        
+        assert summary['metric_fetch_errors'] == 1
+        assert summary['triggered'] == 2
+        assert summary['errors'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_cycle_metrics_emitted(
+        self,
+        mock_metrics_service,
+        mock_db_session,
+        configs
+    ):
+        """Test per-cycle timing and fetch counts are written as metrics."""
+        self._mock_db(mock_db_session, configs)
+        mock_metrics_service.get_time_series.return_value = [{
+            'points': [{'value': 1.0, 'timestamp': ''}]
+        }]
+        metric_writer = MagicMock()
+        evaluator = AlertEvaluator(
+            metrics_service=mock_metrics_service,
+            db=mock_db_session,
+            metric_writer=metric_writer
+        )
+        
+        await evaluator.evaluate_all_alerts()
+        
+        written = {
+            call.args[0]: call.args[1]
+            for call in metric_writer.write_metric.call_args_list
+        }
+        assert written["alert_evaluation_metric_fetches"] == 2.0
+        assert "alert_evaluation_duration_seconds" in written
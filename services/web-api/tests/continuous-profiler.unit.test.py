@@ -0,0 +1,311 @@
+"""
+Tests for the continuous sampling profiler.
+
+Tests cover:
+- Sampling busy threads and skipping idle ones
+- Window rotation and the bounded ring buffer
+- Local storage pruning and export
+- Diffs between windows
+- Integration with ProfilingService
+"""
+
+import pytest
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from src.services.continuous_profiler import (
+    ContinuousProfiler,
+    ProfileWindow,
+    inclusive_shares,
+    merge_windows
+)
+from src.services.profiling_service import ProfilingService
+
+
+def busy_loop(stop_event):
+    """Spin until stopped so the thread is always on-CPU."""
+    while not stop_event.is_set():
+        sum(range(100))
+
+
+@pytest.fixture
+def busy_thread():
+    """Run busy_loop in a named background thread."""
+    stop_event = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop_event,), name="busy-worker")
+    thread.start()
+    yield thread
+    stop_event.set()
+    thread.join()
+
+
+def make_window(start, stacks):
+    """Build a closed window with the given stacks."""
+    return ProfileWindow(
+        start=start,
+        end=start + timedelta(minutes=1),
+        samples=sum(stacks.values()),
+        idle_samples=0,
+        stacks=stacks,
+        sample_rate_hz=10.0,
+        overhead_percent=0.1
+    )
+
+
+class TestContinuousProfilerValidation:
+    """Tests for configuration validation."""
+    
+    @pytest.mark.parametrize("rate", [0.5, 101])
+    def test_invalid_sample_rate(self, rate):
+        """Test sample rate outside 1-100 Hz is rejected."""
+        with pytest.raises(ValueError, match="Sample rate"):
+            ContinuousProfiler(service_name="web-api", sample_rate_hz=rate)
+    
+    def test_invalid_window(self):
+        """Test windows shorter than 10 seconds are rejected."""
+        with pytest.raises(ValueError, match="Window"):
+            ContinuousProfiler(service_name="web-api", window_seconds=5)
+
+
+class TestContinuousProfilerSampling:
+    """Tests for stack sampling and window aggregation."""
+    
+    def test_samples_busy_thread(self, busy_thread):
+        """Test busy thread stacks are recorded root-first."""
+        profiler = ContinuousProfiler(service_name="web-api")
+        for _ in range(5):
+            profiler.sample()
+        
+        window = profiler._close_window(datetime.utcnow())
+        busy_stacks = [stack for stack in window.stacks if stack.startswith("busy-worker;")]
+        
+        assert busy_stacks
+        assert all("busy_loop" in stack for stack in busy_stacks)
+        assert sum(window.stacks[stack] for stack in busy_stacks) == 5
+        assert window.overhead_percent >= 0
+    
+    def test_idle_threads_counted_separately(self):
+        """Test threads blocked in Event.wait are not in the stacks."""
+        stop_event = threading.Event()
+        thread = threading.Thread(target=stop_event.wait, name="idle-worker")
+        thread.start()
+        try:
+            time.sleep(0.05)
+            profiler = ContinuousProfiler(service_name="web-api")
+            profiler.sample()
+            window = profiler._close_window(datetime.utcnow())
+        finally:
+            stop_event.set()
+            thread.join()
+        
+        assert window.idle_samples >= 1
+        assert not any(stack.startswith("idle-worker;") for stack in window.stacks)
+    
+    def test_ring_buffer_is_bounded(self):
+        """Test only the newest max_windows windows are kept."""
+        profiler = ContinuousProfiler(service_name="web-api", max_windows=3)
+        start = datetime.utcnow()
+        for minute in range(5):
+            profiler.sample()
+            profiler._close_window(start + timedelta(minutes=minute))
+        
+        windows = profiler.get_windows()
+        
+        assert len(windows) == 3
+        assert windows[-1].end == start + timedelta(minutes=4)
+    
+    def test_start_and_stop_flushes_window(self, busy_thread):
+        """Test the sampler thread collects samples and stop keeps them."""
+        profiler = ContinuousProfiler(service_name="web-api", sample_rate_hz=100)
+        profiler.start()
+        assert profiler.running
+        
+        time.sleep(0.2)
+        profiler.stop()
+        
+        assert not profiler.running
+        assert len(profiler.windows) == 1
+        assert profiler.windows[0].samples > 0
+    
+    def test_get_windows_accepts_aware_bounds(self):
+        """Test timezone-aware range bounds are compared as UTC."""
+        profiler = ContinuousProfiler(service_name="web-api")
+        start = datetime(2025, 1, 1, 12)
+        profiler.windows.append(make_window(start, {"main;a": 1}))
+        profiler.windows.append(make_window(start + timedelta(minutes=1), {"main;b": 1}))
+        
+        windows = profiler.get_windows(
+            start=datetime(2025, 1, 1, 12, 1, 30, tzinfo=timezone.utc)
+        )
+        
+        assert [window.stacks for window in windows] == [{"main;b": 1}]
+
+
+class TestContinuousProfilerStorage:
+    """Tests for local storage and export."""
+    
+    def test_local_files_are_pruned(self, tmp_path):
+        """Test local storage keeps max_windows files."""
+        profiler = ContinuousProfiler(service_name="web-api", max_windows=2, storage_dir=str(tmp_path))
+        start = datetime(2025, 1, 1, 12)
+        for minute in range(4):
+            profiler._reset_window(start + timedelta(minutes=minute))
+            profiler.sample()
+            profiler._close_window(start + timedelta(minutes=minute + 1))
+        
+        files = sorted(path.name for path in tmp_path.iterdir())
+        
+        assert files == ["web-api-20250101T120200.collapsed", "web-api-20250101T120300.collapsed"]
+        assert (tmp_path / files[-1]).read_text() == profiler.windows[-1].to_collapsed()
+    
+    def test_exporter_receives_window(self):
+        """Test each closed window is passed to the exporter."""
+        exporter = MagicMock()
+        profiler = ContinuousProfiler(service_name="web-api", exporter=exporter)
+        profiler.sample()
+        
+        window = profiler._close_window(datetime.utcnow())
+        
+        exporter.assert_called_once_with(window, profiler._file_name(window))
+    
+    def test_exporter_failure_is_logged(self):
+        """Test export errors do not lose the window."""
+        profiler = ContinuousProfiler(
+            service_name="web-api",
+            exporter=MagicMock(side_effect=RuntimeError("bucket unavailable"))
+        )
+        
+        profiler._close_window(datetime.utcnow())
+        
+        assert len(profiler.windows) == 1
+    
+    def test_running_profiler_persists_on_writer_thread(self, busy_thread, tmp_path):
+        """Test disk writes and export run off the sampler thread, and stop drains them."""
+        threads = []
+        exporter = MagicMock(side_effect=lambda window, name: threads.append(threading.current_thread().name))
+        profiler = ContinuousProfiler(
+            service_name="web-api",
+            sample_rate_hz=100,
+            storage_dir=str(tmp_path),
+            exporter=exporter
+        )
+        profiler.start()
+        time.sleep(0.1)
+        
+        profiler.stop()
+        
+        assert threads == ["continuous-profiler-writer"]
+        assert len(list(tmp_path.iterdir())) == 1
+
+
+class TestContinuousProfilerDiff:
+    """Tests for comparing windows."""
+    
+    def test_inclusive_shares(self):
+        """Test frames count once per sample and thread names are skipped."""
+        shares = inclusive_shares({"main;a;b;a": 3, "main;a;c": 1})
+        
+        assert shares == {"a": 100.0, "b": 75.0, "c": 25.0}
+    
+    def test_merge_windows(self):
+        """Test stack counts are summed."""
+        start = datetime(2025, 1, 1, 12)
+        merged = merge_windows([
+            make_window(start, {"main;a": 1, "main;b": 2}),
+            make_window(start, {"main;a": 3})
+        ])
+        
+        assert merged == {"main;a": 4, "main;b": 2}
+    
+    def test_latest_window_against_earlier(self):
+        """Test default diff compares the newest window with earlier ones."""
+        profiler = ContinuousProfiler(service_name="web-api")
+        start = datetime(2025, 1, 1, 12)
+        profiler.windows.append(make_window(start, {"main;handler;db": 9, "main;handler;json": 1}))
+        profiler.windows.append(make_window(start + timedelta(minutes=1), {"main;handler;db": 2, "main;handler;json": 8}))
+        
+        diff = profiler.diff()
+        frames = {frame["frame"]: frame for frame in diff["frames"]}
+        
+        assert diff["baseline"]["windows"] == 1
+        assert diff["comparison"]["samples"] == 10
+        assert frames["json"]["delta_percent"] == 70.0
+        assert frames["db"]["delta_percent"] == -70.0
+        assert frames["handler"]["delta_percent"] == 0.0
+        assert diff["frames"][-1]["frame"] == "handler"
+    
+    def test_explicit_ranges(self):
+        """Test diff between explicit time ranges."""
+        profiler = ContinuousProfiler(service_name="web-api")
+        start = datetime(2025, 1, 1, 12)
+        for minute in range(3):
+            profiler.windows.append(make_window(start + timedelta(minutes=minute), {"main;a": minute + 1}))
+        
+        diff = profiler.diff(
+            baseline_end=start + timedelta(minutes=2),
+            comparison_start=start + timedelta(minutes=2),
+            limit=1
+        )
+        
+        assert diff["baseline"]["samples"] == 3
+        assert diff["comparison"]["samples"] == 3
+        assert len(diff["frames"]) == 1
+    
+    def test_empty_range_raises(self):
+        """Test diff without enough windows raises ValueError."""
+        profiler = ContinuousProfiler(service_name="web-api")
+        profiler.windows.append(make_window(datetime(2025, 1, 1, 12), {"main;a": 1}))
+        
+        with pytest.raises(ValueError, match="samples"):
+            profiler.diff()
+
+
+class TestProfilingServiceContinuous:
+    """Tests for continuous profiling in ProfilingService."""
+    
+    @pytest.fixture
+    def profiling_service(self):
+        """Create profiling service with mocked storage."""
+        with patch('src.services.profiling_service.storage.Client'):
+            yield ProfilingService(project_id="test-project", bucket_name="test-profiling-bucket")
+    
+    def test_storage_client_created_on_first_use(self):
+        """Test the service starts without Cloud Storage until it is needed."""
+        with patch('src.services.profiling_service.storage.Client') as mock_client:
+            service = ProfilingService(project_id="test-project")
+            service.start_continuous_profiling(service_name="web-api")
+            service.stop_continuous_profiling()
+            mock_client.assert_not_called()
+            
+            service.storage_client
+            mock_client.assert_called_once_with(project="test-project")
+    
+    def test_start_and_stop(self, profiling_service, tmp_path):
+        """Test continuous profiler lifecycle."""
+        profiler = profiling_service.start_continuous_profiling(
+            service_name="web-api",
+            storage_dir=str(tmp_path)
+        )
+        
+        assert profiler.running
+        assert profiling_service.start_continuous_profiling(service_name="web-api") is profiler
+        
+        profiling_service.stop_continuous_profiling()
+        assert not profiler.running
+    
+    def test_export_to_storage(self, profiling_service):
+        """Test windows are uploaded under continuous/<service>/."""
+        profiler = profiling_service.start_continuous_profiling(
+            service_name="web-api",
+            export_to_storage=True
+        )
+        profiling_service.stop_continuous_profiling()
+        window = make_window(datetime(2025, 1, 1, 12), {"main;a": 1})
+        
+        profiler.exporter(window, "web-api-20250101T120000.collapsed")
+        
+        bucket = profiling_service.storage_client.bucket.return_value
+        bucket.blob.assert_called_with("continuous/web-api/web-api-20250101T120000.collapsed")
+        bucket.blob.return_value.upload_from_string.assert_called_with("main;a 1", content_type="text/plain")
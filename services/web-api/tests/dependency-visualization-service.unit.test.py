@@ -459,3 +459,180 @@ class TestDependencyGraphMetrics:
         # Verify last seen timestamps
         for node in graph['nodes']:
             assert node['last_seen'] is not None
+
+
+def make_trace(start, services, error_service=None):
+    """Build a trace whose spans form a call chain through ``services``."""
+    spans = []
+    for index, service in enumerate(services):
+        spans.append(Mock(
+            span_id=f'span{index}',
+            parent_span_id=f'span{index - 1}' if index else None,
+            attributes=Mock(attribute_map={'service': Mock(string_value=Mock(value=service))}),
+            start_time=start + timedelta(seconds=index),
+            end_time=start + timedelta(seconds=index, milliseconds=100),
+            status=Mock(code=2 if service == error_service else 0)
+        ))
+    return Mock(spans=spans)
+
+
+class TestIncrementalGraph:
+    """Test per-minute aggregates and incremental trace fetching"""
+    
+    @pytest.fixture
+    def traces(self):
+        """Traces keyed by minute, served by a fake _query_traces."""
+        now = datetime.utcnow().replace(second=0, microsecond=0)
+        return [
+            make_trace(now - timedelta(minutes=50), ['web-api', 'feature-engine']),
+            make_trace(now - timedelta(minutes=20, seconds=-59), ['web-api', 'feature-engine', 'database'], 'database'),
+            make_trace(now - timedelta(minutes=10), ['web-api', 'insight-generator'])
+        ]
+    
+    @pytest.fixture
+    def incremental_service(self, dependency_service, traces):
+        windows = []
+        
+        async def query_traces(start_time, end_time, max_traces):
+            windows.append((start_time, end_time))
+            return [
+                trace for trace in traces
+                if trace.spans[-1].start_time >= start_time and trace.spans[0].start_time < end_time
+            ]
+        
+        dependency_service._query_traces = query_traces
+        dependency_service._get_service_health_status = AsyncMock(return_value={})
+        dependency_service.windows = windows
+        return dependency_service
+    
+    @pytest.mark.asyncio
+    async def test_second_build_only_fetches_new_windows(self, incremental_service):
+        """Test stored minutes are not refetched"""
+        end_time = datetime.utcnow()
+        
+        first = await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time)
+        fetched_windows = len(incremental_service.windows)
+        second = await incremental_service.build_dependency_graph(end_time - timedelta(minutes=30), end_time)
+        
+        assert first['metadata']['traces_analyzed'] == 3
+        assert second['metadata']['traces_analyzed'] == 2
+        # Only the unsettled tail is fetched again
+        assert len(incremental_service.windows) == fetched_windows + 1
+        assert incremental_service.windows[-1][0] >= end_time - timedelta(minutes=2)
+    
+    @pytest.mark.asyncio
+    async def test_trace_across_windows_counted_once(self, incremental_service):
+        """Test spans are only counted in the window they started in"""
+        end_time = datetime.utcnow()
+        
+        await incremental_service.build_dependency_graph(end_time - timedelta(minutes=21), end_time - timedelta(minutes=20))
+        graph = await incremental_service.build_dependency_graph(end_time - timedelta(minutes=30), end_time)
+        
+        edges = {(edge['source'], edge['target']): edge for edge in graph['edges']}
+        assert edges[('web-api', 'feature-engine')]['call_count'] == 1
+        assert edges[('feature-engine', 'database')]['failed'] is True
+        assert graph['metadata']['traces_analyzed'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_range_answered_from_aggregates(self, incremental_service):
+        """Test a narrower range is summed from stored minutes"""
+        end_time = datetime.utcnow()
+        await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time)
+        
+        graph = await incremental_service.build_dependency_graph(
+            end_time - timedelta(minutes=55), end_time - timedelta(minutes=45)
+        )
+        
+        assert {node['service_name'] for node in graph['nodes']} == {'web-api', 'feature-engine'}
+        assert graph['metadata']['traces_fetched'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_old_minutes_are_pruned(self, incremental_service):
+        """Test aggregates older than the retention are dropped"""
+        incremental_service.retention = timedelta(minutes=30)
+        end_time = datetime.utcnow()
+        await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time)
+        await incremental_service.build_dependency_graph(end_time - timedelta(minutes=5), end_time)
+        
+        assert min(incremental_service._minutes) >= end_time - timedelta(minutes=32)
+        assert incremental_service._covered_from >= end_time - timedelta(minutes=32)
+    
+    @pytest.mark.asyncio
+    async def test_failed_window_is_refetched(self, incremental_service):
+        """Test a window whose query failed is not marked covered"""
+        query_traces = incremental_service._query_traces
+        incremental_service._query_traces = AsyncMock(return_value=None)
+        end_time = datetime.utcnow()
+        
+        failed = await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time)
+        incremental_service._query_traces = query_traces
+        graph = await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time)
+        
+        assert failed['metadata']['traces_analyzed'] == 0
+        assert incremental_service._covered_from is not None
+        assert graph['metadata']['traces_analyzed'] == 3
+        assert incremental_service.windows[0][0] <= end_time - timedelta(hours=1)
+    
+    @pytest.mark.asyncio
+    async def test_truncated_window_is_split(self, incremental_service):
+        """Test a window hitting max_traces is split until each piece is complete"""
+        end_time = datetime.utcnow()
+        
+        graph = await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time, max_traces=2)
+        
+        assert graph['metadata']['traces_analyzed'] == 3
+        assert graph['metadata']['sampled'] is False
+        assert len(incremental_service.windows) > 2
+        assert incremental_service._covered_from <= end_time - timedelta(hours=1)
+        
+        fetched_windows = len(incremental_service.windows)
+        await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time, max_traces=2)
+        assert len(incremental_service.windows) == fetched_windows + 1
+    
+    @pytest.mark.asyncio
+    async def test_saturated_minute_is_stored_sampled(self, incremental_service, traces):
+        """Test a single minute still at max_traces is stored as a sample"""
+        traces.append(make_trace(traces[0].spans[0].start_time + timedelta(seconds=5), ['web-api', 'database']))
+        end_time = datetime.utcnow()
+        
+        first = await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time, max_traces=2)
+        fetched_windows = len(incremental_service.windows)
+        second = await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time, max_traces=2)
+        narrow = await incremental_service.build_dependency_graph(
+            end_time - timedelta(minutes=30), end_time, max_traces=2
+        )
+        
+        assert first['metadata']['sampled'] is True
+        assert first['metadata']['traces_analyzed'] == second['metadata']['traces_analyzed'] == 4
+        assert len(incremental_service.windows) == fetched_windows + 2
+        assert narrow['metadata']['sampled'] is False
+    
+    @pytest.mark.asyncio
+    async def test_window_splits_are_capped(self, incremental_service):
+        """Test a build stops halving windows once its split budget is spent"""
+        incremental_service.max_window_splits = 1
+        end_time = datetime.utcnow()
+        
+        graph = await incremental_service.build_dependency_graph(end_time - timedelta(hours=1), end_time, max_traces=1)
+        
+        # One full window, its two halves and the unsettled tail
+        assert len(incremental_service.windows) == 4
+        assert graph['metadata']['sampled'] is True
+        assert incremental_service._covered_from <= end_time - timedelta(hours=1)
+
+
+class TestHealthStatusCache:
+    """Test health status caching"""
+    
+    @pytest.mark.asyncio
+    async def test_health_status_is_cached(self, dependency_service):
+        """Test fresh statuses are reused and failures are not cached"""
+        dependency_service._get_service_error_rate = AsyncMock(side_effect=[0.02, Exception("API error")])
+        
+        first = await dependency_service._get_service_health_status(['web-api', 'database'])
+        dependency_service._get_service_error_rate = AsyncMock(return_value=0.5)
+        second = await dependency_service._get_service_health_status(['web-api', 'database'])
+        
+        assert first == {'web-api': 'healthy', 'database': 'unknown'}
+        assert second == {'web-api': 'healthy', 'database': 'unhealthy'}
+        dependency_service._get_service_error_rate.assert_awaited_once()
@@ -0,0 +1,342 @@
+"""
+Tests for pre-aggregated log and error statistics.
+
+Tests cover:
+- Parsing sink LogEntry JSON and grouping errors
+- Exact counts across minute and hour buckets
+- Dropping redelivered entries by insertId
+- Error groups, affected users and trend
+- TTL caching of repeated ranges
+- Coverage checks and fallback in the Cloud services
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fakeredis.aioredis
+
+from src.services.error_tracking_service import ErrorTrackingService
+from src.services.log_aggregation_service import LogAggregationService
+from src.services.log_statistics_service import (
+    LogEvent,
+    LogStatisticsEngine,
+    error_fingerprint,
+    error_rate_trend,
+    event_from_entry
+)
+
+
+def log_entry(timestamp, severity="INFO", service="web-api", message="ok", user=None, insert_id=None):
+    entry = {
+        "timestamp": timestamp,
+        "severity": severity,
+        "resource": {"type": "cloud_run_revision", "labels": {"service_name": service}},
+        "textPayload": message
+    }
+    if user:
+        entry["labels"] = {"user_id": user}
+    if insert_id:
+        entry["insertId"] = insert_id
+    return entry
+
+
+@pytest.fixture
+async def engine():
+    """Engine backed by an in-memory Redis."""
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    engine = LogStatisticsEngine(client, retention_days=30, cache_ttl=60)
+    yield engine
+    await client.aclose()
+
+
+def recent_hour():
+    """Start of the hour two hours ago, inside tracking and retention."""
+    now = datetime.utcnow()
+    return now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+
+
+class TestEntryParsing:
+    """Test reducing LogEntry JSON to events."""
+    
+    def test_sink_entry(self):
+        """Test service, severity, nanosecond timestamps and users are read."""
+        event = event_from_entry(log_entry(
+            "2025-01-01T12:00:30.123456789Z",
+            severity="EMERGENCY",
+            message="ValueError: bad block 812345\nTraceback...",
+            user="user-1"
+        ))
+        
+        assert event.timestamp == datetime(2025, 1, 1, 12, 0, 30, 123456)
+        assert event.service == "web-api"
+        assert event.severity == "CRITICAL"
+        assert event.group_name == "ValueError: bad block <n>"
+        assert event.user == "user-1"
+    
+    def test_non_errors_have_no_group(self):
+        """Test DEFAULT and NOTICE count as INFO without a group."""
+        event = event_from_entry(log_entry("2025-01-01T12:00:00Z", severity="NOTICE"))
+        
+        assert event.severity == "INFO"
+        assert event.group_id is None
+    
+    def test_fingerprint_masks_variable_parts(self):
+        """Test messages differing only in IDs share a group per service."""
+        first = error_fingerprint("web-api", "Timeout after 30s for tx 0xdeadbeef")
+        second = error_fingerprint("web-api", "Timeout after 45s for tx 0xcafebabe")
+        other_service = error_fingerprint("ingestion", "Timeout after 30s for tx 0xdeadbeef")
+        
+        assert first == second
+        assert first[0] != other_service[0]
+
+
+class TestLogStatistics:
+    """Test exact severity counts."""
+    
+    @pytest.mark.asyncio
+    async def test_counts_across_hour_and_minute_buckets(self, engine):
+        """Test ragged ends use minute buckets and the middle hour buckets."""
+        hour = recent_hour()
+        timestamps = [
+            hour - timedelta(minutes=1),                # before the range
+            hour + timedelta(seconds=10),               # first minute
+            hour + timedelta(minutes=30),
+            hour + timedelta(minutes=59, seconds=59),
+            hour + timedelta(minutes=60, seconds=5),    # last minute
+            hour + timedelta(minutes=61)                # after the range
+        ]
+        await engine.record([LogEvent(timestamp, "web-api", "INFO") for timestamp in timestamps])
+        await engine.record([LogEvent(hour + timedelta(minutes=5), "ingestion", "WARNING")])
+        
+        stats = await engine.get_log_statistics(hour, hour + timedelta(minutes=60, seconds=30))
+        
+        assert stats["total_count"] == 5
+        assert stats["severity_counts"] == {
+            "DEBUG": 0, "INFO": 4, "WARNING": 1, "ERROR": 0, "CRITICAL": 0
+        }
+        
+        buckets = engine._plan_buckets(*engine._minute_range(hour - timedelta(minutes=2), hour + timedelta(hours=2)))
+        assert [resolution.name for resolution, _ in buckets].count("hour") == 2
+    
+    @pytest.mark.asyncio
+    async def test_service_filter(self, engine):
+        """Test counts are limited to one service."""
+        hour = recent_hour()
+        await engine.ingest_entries([
+            log_entry((hour + timedelta(minutes=1)).isoformat() + "Z", service="web-api"),
+            log_entry((hour + timedelta(minutes=1)).isoformat() + "Z", service="ingestion", severity="ERROR")
+        ])
+        
+        stats = await engine.get_log_statistics(hour, hour + timedelta(hours=1), service="ingestion")
+        
+        assert stats["total_count"] == 1
+        assert stats["severity_counts"]["ERROR"] == 1
+        assert stats["service"] == "ingestion"
+    
+    @pytest.mark.asyncio
+    async def test_repeated_range_is_cached(self, engine):
+        """Test a repeated range within the TTL does not hit Redis."""
+        hour = recent_hour()
+        await engine.record([LogEvent(hour, "web-api", "INFO")])
+        
+        first = await engine.get_log_statistics(hour, hour + timedelta(hours=1))
+        await engine.record([LogEvent(hour, "web-api", "INFO")])
+        second = await engine.get_log_statistics(hour, hour + timedelta(hours=1))
+        
+        assert first["total_count"] == second["total_count"] == 1
+        assert engine.get_status()["cache_hits"] == 1
+        
+        engine.cache_ttl = 0
+        engine._cache.clear()
+        assert (await engine.get_log_statistics(hour, hour + timedelta(hours=1)))["total_count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_aware_bounds(self, engine):
+        """Test timezone-aware bounds are converted to UTC."""
+        hour = recent_hour()
+        await engine.record([LogEvent(hour + timedelta(minutes=1), "web-api", "DEBUG")])
+        
+        aware_start = (hour + timedelta(hours=2)).replace(tzinfo=timezone(timedelta(hours=2)))
+        stats = await engine.get_log_statistics(aware_start, aware_start + timedelta(minutes=5))
+        
+        assert stats["severity_counts"]["DEBUG"] == 1
+
+
+class TestDeduplication:
+    """Test redelivered entries are counted once."""
+    
+    @pytest.mark.asyncio
+    async def test_redelivery_not_counted_twice(self, engine):
+        """Test entries are skipped when their insertId was already ingested."""
+        timestamp = (recent_hour() + timedelta(minutes=1)).isoformat() + "Z"
+        entries = [
+            log_entry(timestamp, insert_id="a1"),
+            log_entry(timestamp, insert_id="a1"),
+            log_entry(timestamp, insert_id="a2"),
+            log_entry(timestamp)
+        ]
+        
+        assert await engine.ingest_entries(entries) == 3
+        assert await engine.ingest_entries(entries[:3]) == 0
+        
+        stats = await engine.get_log_statistics(recent_hour(), recent_hour() + timedelta(hours=1))
+        assert stats["total_count"] == 3
+        assert engine.get_status()["duplicates"] == 4
+        assert 0 < await engine.redis.ttl(engine._seen_key("/a1")) <= engine.dedupe_seconds
+    
+    @pytest.mark.asyncio
+    async def test_failed_batch_can_be_redelivered(self, engine):
+        """Test a batch whose counters were not written releases its insertIds."""
+        timestamp = (recent_hour() + timedelta(minutes=1)).isoformat() + "Z"
+        entries = [log_entry(timestamp, insert_id="a1"), log_entry(timestamp, insert_id="a2")]
+        
+        with patch.object(engine, "_apply", AsyncMock(side_effect=ConnectionError("down"))):
+            with pytest.raises(ConnectionError):
+                await engine.ingest_entries(entries)
+        
+        assert await engine.ingest_entries(entries) == 2
+    
+    @pytest.mark.asyncio
+    async def test_ingest_request_logs_not_counted(self, engine):
+        """Test pushes to the ingest endpoint do not count themselves."""
+        timestamp = (recent_hour() + timedelta(minutes=1)).isoformat() + "Z"
+        request_log = log_entry(timestamp, insert_id="push-1")
+        request_log["httpRequest"] = {
+            "requestMethod": "POST",
+            "requestUrl": "https://api.utxoiq.com/api/v1/monitoring/logs/ingest?token=x"
+        }
+        access_log = log_entry(
+            timestamp,
+            message='"POST /api/v1/monitoring/logs/ingest?token=x HTTP/1.1" 200'
+        )
+        
+        assert await engine.ingest_entries([request_log, access_log, log_entry(timestamp)]) == 1
+
+
+class TestErrorStatistics:
+    """Test error group counters."""
+    
+    @pytest.mark.asyncio
+    async def test_groups_users_and_trend(self, engine):
+        """Test groups are counted, users estimated and the trend computed."""
+        hour = recent_hour()
+        entries = [
+            log_entry((hour + timedelta(minutes=10)).isoformat() + "Z", "ERROR", message="DB timeout 1", user="a"),
+            log_entry((hour + timedelta(minutes=70)).isoformat() + "Z", "ERROR", message="DB timeout 2", user="b"),
+            log_entry((hour + timedelta(minutes=80)).isoformat() + "Z", "ERROR", message="DB timeout 3", user="a"),
+            log_entry((hour + timedelta(minutes=90)).isoformat() + "Z", "CRITICAL", message="Out of memory", user="c"),
+            log_entry((hour + timedelta(minutes=90)).isoformat() + "Z", "INFO")
+        ]
+        await engine.ingest_entries(entries)
+        
+        stats = await engine.get_error_statistics(start_time=hour, end_time=hour + timedelta(hours=2))
+        top = stats["top_errors"][0]
+        
+        assert stats["total_errors"] == 4
+        assert stats["unique_error_groups"] == 2
+        assert stats["affected_users"] == 3
+        assert stats["error_rate_trend"] == "increasing"
+        assert top["group_name"] == "DB timeout <n>"
+        assert top["count"] == 3
+        assert top["affected_users_count"] == 2
+        assert top["first_seen_time"] == (hour + timedelta(minutes=10)).isoformat()
+        assert top["last_seen_time"] == (hour + timedelta(minutes=80)).isoformat()
+        assert top["service_contexts"] == [{"service": "web-api"}]
+    
+    @pytest.mark.asyncio
+    async def test_user_in_several_groups_counted_once(self, engine):
+        """Test affected users are counted over the union of groups."""
+        hour = recent_hour()
+        await engine.ingest_entries([
+            log_entry((hour + timedelta(minutes=10)).isoformat() + "Z", "ERROR", message="DB timeout 1", user="a"),
+            log_entry((hour + timedelta(minutes=70)).isoformat() + "Z", "ERROR", message="Out of memory", user="a"),
+            log_entry((hour + timedelta(minutes=80)).isoformat() + "Z", "ERROR", message="Disk full", user="b")
+        ])
+        
+        stats = await engine.get_error_statistics(start_time=hour, end_time=hour + timedelta(hours=2))
+        
+        assert stats["unique_error_groups"] == 3
+        assert stats["affected_users"] == 2
+    
+    def test_error_rate_trend(self):
+        """Test trend thresholds."""
+        assert error_rate_trend(0, 0) == "stable"
+        assert error_rate_trend(0, 3) == "increasing"
+        assert error_rate_trend(10, 11) == "stable"
+        assert error_rate_trend(10, 5) == "decreasing"
+
+
+class TestCoverage:
+    """Test when counters are trusted."""
+    
+    @pytest.mark.asyncio
+    async def test_not_covered_before_ingestion(self, engine):
+        """Test nothing is covered until entries have been recorded."""
+        assert await engine.covers(datetime.utcnow()) is False
+    
+    @pytest.mark.asyncio
+    async def test_covered_from_next_minute(self, engine):
+        """Test coverage starts at the first full minute after ingestion began."""
+        await engine.record([LogEvent(datetime.utcnow(), "web-api", "INFO")])
+        since = await engine.tracking_since()
+        
+        assert await engine.covers(since) is True
+        assert await engine.covers(since - timedelta(seconds=1)) is False
+
+
+class TestServiceIntegration:
+    """Test the Cloud services prefer the counters."""
+    
+    @pytest.fixture
+    def statistics_engine(self):
+        engine = MagicMock()
+        engine.covers = AsyncMock(return_value=True)
+        engine.get_log_statistics = AsyncMock(return_value={"total_count": 7})
+        engine.get_error_statistics = AsyncMock(return_value={"total_errors": 3})
+        return engine
+    
+    @pytest.mark.asyncio
+    async def test_log_statistics_from_counters(self, statistics_engine):
+        """Test covered ranges skip Cloud Logging."""
+        with patch('src.services.log_aggregation_service.logging.Client') as client:
+            service = LogAggregationService("test-project", statistics_engine=statistics_engine)
+            stats = await service.get_log_statistics(datetime(2025, 1, 1), datetime(2025, 1, 2))
+        
+        assert stats == {"total_count": 7}
+        client.return_value.list_entries.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_log_statistics_fallback(self, statistics_engine):
+        """Test uncovered ranges are sampled from Cloud Logging."""
+        statistics_engine.covers.return_value = False
+        with patch('src.services.log_aggregation_service.logging.Client') as client:
+            client.return_value.list_entries.return_value = [MagicMock(severity="ERROR")]
+            service = LogAggregationService("test-project", statistics_engine=statistics_engine)
+            stats = await service.get_log_statistics(datetime(2025, 1, 1), datetime(2025, 1, 2))
+        
+        assert stats["total_count"] == 1
+        statistics_engine.get_log_statistics.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_error_statistics_fallback_on_redis_error(self, statistics_engine):
+        """Test counter failures fall back to Error Reporting."""
+        statistics_engine.covers.side_effect = ConnectionError("redis down")
+        with patch('src.services.error_tracking_service.ErrorStatsServiceClient'), \
+             patch('src.services.error_tracking_service.ErrorGroupServiceClient'):
+            service = ErrorTrackingService("test-project", statistics_engine=statistics_engine)
+            service.list_error_groups = AsyncMock(return_value={"error_groups": []})
+            stats = await service.get_error_statistics()
+        
+        assert stats["total_errors"] == 0
+        service.list_error_groups.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_error_statistics_from_counters(self, statistics_engine):
+        """Test covered ranges skip Error Reporting."""
+        with patch('src.services.error_tracking_service.ErrorStatsServiceClient'), \
+             patch('src.services.error_tracking_service.ErrorGroupServiceClient'):
+            service = ErrorTrackingService("test-project", statistics_engine=statistics_engine)
+            stats = await service.get_error_statistics(service="web-api")
+        
+        assert stats == {"total_errors": 3}
+        assert statistics_engine.get_error_statistics.call_args.kwargs["service"] == "web-api"
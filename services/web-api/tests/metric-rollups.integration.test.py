@@ -0,0 +1,130 @@
+"""Integration tests for metric rollups against PostgreSQL.
+
+These tests require the test database to be running:
+    docker-compose -f docker-compose.test.yml up -d test-db
+
+Run tests with:
+    pytest tests/metric-rollups.integration.test.py -v
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+
+from src.models.db_models import SystemMetric, MetricRollupMinute, MetricRollupHour, MetricRollupDay
+from src.models.database_schemas import MetricCreate, MetricColumnsCreate
+from src.services.database_service import DatabaseService
+
+
+SERVICE = "web-api"
+METRIC = "latency"
+
+
+async def insert_raw_metrics(points):
+    """Insert raw metrics with explicit timestamps, bypassing rollup maintenance."""
+    async with DatabaseService() as db:
+        db.session.add_all([
+            SystemMetric(
+                service_name=SERVICE,
+                metric_type=METRIC,
+                metric_value=value,
+                unit="ms",
+                timestamp=timestamp
+            )
+            for timestamp, value in points
+        ])
+
+
+@pytest.mark.asyncio
+class TestMetricRollups:
+    """Test rollup maintenance and rollup-backed aggregation."""
+    
+    async def test_recorded_metrics_update_all_rollups(self, clean_database):
+        """Test every recorded metric is merged into minute, hour and day rollups."""
+        async with DatabaseService() as db:
+            await db.record_metrics_batch([
+                MetricCreate(service_name=SERVICE, metric_type=METRIC, metric_value=v, unit="ms")
+                for v in (10.0, 20.0, 30.0)
+            ])
+        async with DatabaseService() as db:
+            await db.record_metric(
+                MetricCreate(service_name=SERVICE, metric_type=METRIC, metric_value=40.0, unit="ms")
+            )
+        
+        async with DatabaseService() as db:
+            for model in (MetricRollupMinute, MetricRollupHour, MetricRollupDay):
+                result = await db.session.execute(
+                    select(func.sum(model.value_count), func.sum(model.value_sum), func.max(model.value_max))
+                )
+                count, total, maximum = result.one()
+                assert (count, total, maximum) == (4, 100.0, 40.0)
+            
+            day = (await db.session.execute(select(MetricRollupDay))).scalars().one()
+            assert sum(day.sketch.values()) == 4
+    
+    async def test_aggregate_matches_raw_scan(self, clean_database):
+        """Test rollup-backed aggregation returns the same buckets as raw data."""
+        start = datetime(2025, 1, 1, 22, 30)
+        points = [(start + timedelta(minutes=7 * i), float(i % 50)) for i in range(600)]
+        await insert_raw_metrics(points)
+        
+        async with DatabaseService() as db:
+            assert await db.rebuild_metric_rollups(points[0][0], points[-1][0]) == 600
+        
+        query_start = datetime(2025, 1, 1, 23, 10, 30)
+        query_end = datetime(2025, 1, 3, 5, 20)
+        async with DatabaseService() as db:
+            hourly = await db.aggregate_metrics(SERVICE, METRIC, query_start, query_end, "hour")
+            daily = await db.aggregate_metrics(SERVICE, METRIC, query_start, query_end, "day")
+        
+        selected = [(ts, v) for ts, v in points if query_start <= ts <= query_end]
+        assert sum(point["count"] for point in hourly) == len(selected)
+        assert sum(point["count"] for point in daily) == len(selected)
+        
+        first_day = [v for ts, v in selected if ts.date() == query_start.date()]
+        assert daily[0]["timestamp"] == datetime(2025, 1, 1)
+        assert daily[0]["count"] == len(first_day)
+        assert daily[0]["avg_value"] == pytest.approx(sum(first_day) / len(first_day))
+        assert daily[0]["max_value"] == max(first_day)
+        
+        values = sorted(v for _, v in selected)
+        assert daily[1]["p50_value"] is not None
+        assert min(p["min_value"] for p in daily) == values[0]
+    
+    async def test_rebuild_is_idempotent(self, clean_database):
+        """Test rebuilding the same range twice does not double count."""
+        await insert_raw_metrics([(datetime(2025, 2, 1, 12, 0, s), 5.0) for s in range(10)])
+        
+        async with DatabaseService() as db:
+            await db.rebuild_metric_rollups(datetime(2025, 2, 1), datetime(2025, 2, 1))
+        async with DatabaseService() as db:
+            await db.rebuild_metric_rollups(datetime(2025, 2, 1), datetime(2025, 2, 1))
+        
+        async with DatabaseService() as db:
+            result = await db.session.execute(select(MetricRollupHour.value_count))
+            assert result.scalars().all() == [10]
+    
+    async def test_bulk_ingest_copies_rows_and_rollups(self, clean_database):
+        """Test COPY ingest writes raw rows and rollups in one transaction."""
+        # Bulk ingest rejects metrics older than the hot storage window
+        day = (datetime.utcnow() - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        columns = MetricColumnsCreate(
+            service_name=SERVICE,
+            metric_values=[float(i) for i in range(500)],
+            metric_types=[METRIC],
+            units=["ms"],
+            timestamps=[day + timedelta(hours=8, seconds=15 * i) for i in range(500)],
+            metric_metadata=[{"batch": 1}] * 500
+        )
+        
+        async with DatabaseService() as db:
+            assert await db.ingest_metrics_columns(columns) == 500
+        
+        async with DatabaseService() as db:
+            metrics = await db.get_metrics(service_name=SERVICE, limit=1000)
+            assert len(metrics) == 500
+            assert metrics[0].metric_metadata == {"batch": 1}
+            
+            hourly = await db.aggregate_metrics(
+                SERVICE, METRIC, day, day + timedelta(days=1), "hour"
+            )
+            assert [point["count"] for point in hourly] == [240, 240, 20]
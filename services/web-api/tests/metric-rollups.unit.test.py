@@ -0,0 +1,149 @@
+"""Unit tests for metric rollup sketches and query planning."""
+import random
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from src.services.metric_rollups import (
+    MetricSketch, RollupAccumulator, MINUTE, HOUR, DAY,
+    MAX_UPSERT_ROWS, accumulate, build_upserts, plan_segments, to_utc_naive, truncate_timestamp
+)
+
+
+class TestMetricSketch:
+    """Test cases for the mergeable percentile sketch."""
+    
+    def test_quantiles_within_relative_accuracy(self):
+        """Test estimates stay within the configured relative error."""
+        rng = random.Random(42)
+        values = sorted(rng.lognormvariate(3, 1) for _ in range(5000))
+        sketch = MetricSketch()
+        for value in values:
+            sketch.add(value)
+        
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=MetricSketch.RELATIVE_ACCURACY * 2)
+    
+    def test_merge_matches_single_sketch(self):
+        """Test merging partial sketches gives the same bins as one sketch."""
+        values = [float(v) for v in range(1, 1001)]
+        whole = MetricSketch()
+        parts = [MetricSketch(), MetricSketch()]
+        for i, value in enumerate(values):
+            whole.add(value)
+            parts[i % 2].add(value)
+        
+        merged = MetricSketch(parts[0].to_dict())
+        merged.merge(parts[1])
+        
+        assert merged.to_dict() == whole.to_dict()
+        assert merged.count == 1000
+    
+    def test_zero_and_negative_values(self):
+        """Test zero and negative values sort before positive ones."""
+        sketch = MetricSketch()
+        for value in (-10.0, 0.0, 0.0, 5.0):
+            sketch.add(value)
+        
+        assert sketch.quantile(0) == pytest.approx(-10.0, rel=0.02)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1) == pytest.approx(5.0, rel=0.02)
+    
+    def test_empty_sketch(self):
+        """Test an empty sketch has no quantiles."""
+        assert MetricSketch().quantile(0.5) is None
+
+
+class TestRollupAccumulation:
+    """Test cases for bucketing raw metrics."""
+    
+    def test_accumulate_by_resolution(self):
+        """Test raw values land in the bucket of each resolution."""
+        base = datetime(2025, 1, 1, 10, 5, 30)
+        values = [
+            ("web-api", "latency", base, 100.0),
+            ("web-api", "latency", base + timedelta(seconds=20), 300.0),
+            ("web-api", "latency", base + timedelta(minutes=1), 200.0),
+        ]
+        
+        minutes = accumulate(values, MINUTE)
+        hours = accumulate(values, HOUR)
+        
+        assert len(minutes) == 2
+        first = minutes[("web-api", "latency", datetime(2025, 1, 1, 10, 5))]
+        assert (first.count, first.sum, first.min, first.max) == (2, 400.0, 100.0, 300.0)
+        
+        hour = hours[("web-api", "latency", datetime(2025, 1, 1, 10))]
+        assert hour.count == 3
+        assert hour.to_point(datetime(2025, 1, 1, 10))["avg_value"] == 200.0
+    
+    def test_merged_accumulators(self):
+        """Test merging accumulators combines every aggregate."""
+        first = RollupAccumulator()
+        second = RollupAccumulator()
+        first.add(1.0)
+        second.add(5.0)
+        second.add(3.0)
+        
+        first.merge(second)
+        
+        assert (first.count, first.sum, first.min, first.max) == (3, 9.0, 1.0, 5.0)
+        assert first.sketch.count == 3
+    
+    def test_upserts_stay_under_bind_parameter_limit(self):
+        """Test large rebuilds are split so no statement exceeds asyncpg's limit."""
+        from sqlalchemy.dialects import postgresql
+        
+        base = datetime(2025, 1, 1)
+        values = [("web-api", "latency", base + timedelta(minutes=i), float(i)) for i in range(10000)]
+        
+        statements = build_upserts(MINUTE, accumulate(values, MINUTE))
+        
+        params = [len(stmt.compile(dialect=postgresql.dialect()).params) for stmt in statements]
+        assert len(statements) == 3
+        assert max(params) == MAX_UPSERT_ROWS * 8
+        assert all(count <= 32767 for count in params)
+        assert sum(params) == 10000 * 8
+
+
+class TestSegmentPlanning:
+    """Test cases for choosing rollup tables for a time range."""
+    
+    def test_long_range_uses_day_rollups(self):
+        """Test whole days come from the day table and edges from finer ones."""
+        segments = plan_segments(
+            datetime(2025, 1, 1, 10, 5, 3),
+            datetime(2025, 3, 1, 2, 0)
+        )
+        
+        names = [resolution.name if resolution else "raw" for resolution, _, _ in segments]
+        assert names == ["raw", "minute", "hour", "day", "hour"]
+        assert segments[3][1:] == (datetime(2025, 1, 2), datetime(2025, 3, 1))
+    
+    def test_segments_cover_range_without_gaps(self):
+        """Test planned segments tile the requested range exactly."""
+        start = datetime(2025, 1, 1, 23, 59, 59, 500000)
+        end = datetime(2025, 1, 5, 0, 0, 0, 1)
+        
+        segments = plan_segments(start, end)
+        
+        assert segments[0][1] == start
+        assert segments[-1][2] == end
+        for previous, current in zip(segments, segments[1:]):
+            assert previous[2] == current[1]
+    
+    def test_hourly_output_never_reads_day_rollups(self):
+        """Test resolutions wider than the output interval are excluded."""
+        segments = plan_segments(datetime(2025, 1, 1), datetime(2025, 1, 10), [HOUR, MINUTE])
+        
+        assert [(r.name, s, e) for r, s, e in segments] == [
+            ("hour", datetime(2025, 1, 1), datetime(2025, 1, 10))
+        ]
+    
+    def test_timestamp_helpers(self):
+        """Test truncation and timezone normalization."""
+        aware = datetime(2025, 1, 1, 12, 30, tzinfo=timezone(timedelta(hours=2)))
+        
+        assert to_utc_naive(aware) == datetime(2025, 1, 1, 10, 30)
+        assert truncate_timestamp(datetime(2025, 1, 1, 10, 59, 59), HOUR.width) == datetime(2025, 1, 1, 10)
+        assert DAY.truncate(datetime(2025, 1, 1, 10, 59)) == datetime(2025, 1, 1)
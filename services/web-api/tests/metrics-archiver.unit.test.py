@@ -0,0 +1,235 @@
+"""
+Tests for streaming metrics archival.
+
+Tests cover:
+- Compressed NDJSON encoding and deterministic file names
+- Local filesystem sink and checkpoints
+- Keyset archival against Postgres, resuming from the checkpoint
+- Bounded batch deletion of archived rows only
+- Cleanup of the prefetched chunk when an upload fails
+"""
+import asyncio
+import gzip
+import json
+import pytest
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from src.models.db_models import SystemMetric
+from src.services.metrics_archiver import LocalArchiveSink, MetricsArchiver, _ArchiveFile
+
+
+def metric_row(timestamp, value=1.0, metadata=None):
+    """Row in ARCHIVE_COLUMNS order."""
+    return (uuid4(), "web-api", "cpu", value, "percent", timestamp, metadata)
+
+
+def read_archive(path):
+    with gzip.open(path, "rt") as archive:
+        return [json.loads(line) for line in archive]
+
+
+class TestArchiveFile:
+    """Tests for archive file encoding."""
+    
+    def test_gzip_ndjson_roundtrip(self):
+        """Test rows are written as JSON lines and keys tracked."""
+        start = datetime(2025, 1, 1, 12)
+        rows = [metric_row(start + timedelta(seconds=i), value=i, metadata={"host": "a"}) for i in range(3)]
+        archive_file = _ArchiveFile("gzip", spool_bytes=1024)
+        
+        archive_file.write(rows[:2])
+        archive_file.write(rows[2:])
+        lines = gzip.decompress(archive_file.finish().read()).decode().splitlines()
+        
+        assert archive_file.rows == 3
+        assert archive_file.first_key == (rows[0][5], rows[0][0])
+        assert archive_file.last_key == (rows[2][5], rows[2][0])
+        assert json.loads(lines[1]) == {
+            "id": str(rows[1][0]),
+            "service_name": "web-api",
+            "metric_type": "cpu",
+            "metric_value": 1,
+            "unit": "percent",
+            "timestamp": "2025-01-01T12:00:01",
+            "metadata": {"host": "a"}
+        }
+    
+    def test_file_name_is_deterministic(self, tmp_path):
+        """Test names derive from the first key and are partitioned by day."""
+        archiver = MetricsArchiver(None, LocalArchiveSink(str(tmp_path)), compression="gzip")
+        key = (datetime(2025, 1, 2, 3, 4, 5, 6), UUID("12345678-1234-5678-1234-567812345678"))
+        
+        assert archiver._file_name(key) == "metrics/2025/01/02/metrics_20250102T030405000006_12345678.ndjson.gz"
+    
+    def test_unknown_compression_rejected(self, tmp_path):
+        """Test only zstd and gzip are accepted."""
+        with pytest.raises(ValueError, match="compression"):
+            MetricsArchiver(None, LocalArchiveSink(str(tmp_path)), compression="bz2")
+
+
+class TestLocalArchiveSink:
+    """Tests for the filesystem sink."""
+    
+    def test_checkpoint_roundtrip(self, tmp_path):
+        """Test checkpoints are written atomically and read back."""
+        sink = LocalArchiveSink(str(tmp_path))
+        
+        assert sink.read_checkpoint("metrics/_checkpoint.json") is None
+        sink.write_checkpoint("metrics/_checkpoint.json", {"id": "abc"})
+        
+        assert sink.read_checkpoint("metrics/_checkpoint.json") == {"id": "abc"}
+        assert not (tmp_path / "metrics" / "_checkpoint.tmp").exists()
+    
+    @pytest.mark.asyncio
+    async def test_checkpoint_parsed_as_key(self, tmp_path):
+        """Test the stored checkpoint becomes a keyset position."""
+        archiver = MetricsArchiver(None, LocalArchiveSink(str(tmp_path)), compression="gzip")
+        metric_id = uuid4()
+        archiver.sink.write_checkpoint("metrics/_checkpoint.json", {
+            "timestamp": "2025-01-01T12:00:00",
+            "id": str(metric_id)
+        })
+        
+        assert await archiver.load_checkpoint() == (datetime(2025, 1, 1, 12), metric_id)
+
+
+class FailingSink(LocalArchiveSink):
+    """Sink whose uploads fail."""
+    
+    def upload(self, fileobj, name, content_type):
+        raise OSError("upload failed")
+
+
+class TestArchiveFailure:
+    """Tests for archival errors."""
+    
+    @pytest.mark.asyncio
+    async def test_upload_failure_cancels_prefetch(self, tmp_path):
+        """Test a failed upload does not leave the next chunk read running."""
+        start = datetime(2025, 1, 1, 12)
+        chunks = [[metric_row(start)], [metric_row(start + timedelta(seconds=1))]]
+        blocked = asyncio.Event()
+        cancelled = []
+        
+        async def fetch_chunk(cutoff, after):
+            if chunks:
+                return chunks.pop(0)
+            try:
+                await blocked.wait()
+            except asyncio.CancelledError:
+                cancelled.append(after)
+                raise
+            return []
+        
+        archiver = MetricsArchiver(None, FailingSink(str(tmp_path)), rows_per_file=1, compression="gzip")
+        archiver._fetch_chunk = fetch_chunk
+        
+        with pytest.raises(OSError, match="upload failed"):
+            await archiver.archive(datetime(2025, 2, 1))
+        
+        assert len(cancelled) == 1
+        assert await archiver.load_checkpoint() is None
+
+
+@pytest.fixture
+async def backlog(clean_database):
+    """Insert 25 old metrics sharing timestamps in pairs, plus 2 recent ones."""
+    from src.database import AsyncSessionLocal
+    
+    start = datetime.utcnow() - timedelta(days=120)
+    async with AsyncSessionLocal() as session:
+        for i in range(25):
+            session.add(SystemMetric(
+                id=uuid4(),
+                service_name="web-api",
+                metric_type="cpu",
+                metric_value=float(i),
+                unit="percent",
+                timestamp=start + timedelta(minutes=i // 2)
+            ))
+        for i in range(2):
+            session.add(SystemMetric(
+                id=uuid4(),
+                service_name="web-api",
+                metric_type="cpu",
+                metric_value=100.0 + i,
+                unit="percent",
+                timestamp=datetime.utcnow() - timedelta(days=1)
+            ))
+        await session.commit()
+    return start
+
+
+@pytest.fixture
+def archiver(tmp_path):
+    """Archiver with small chunks writing to a local directory."""
+    from src.database import AsyncSessionLocal
+    
+    return MetricsArchiver(
+        AsyncSessionLocal,
+        LocalArchiveSink(str(tmp_path)),
+        chunk_rows=4,
+        rows_per_file=10,
+        delete_batch_rows=3,
+        compression="gzip"
+    )
+
+
+class TestMetricsArchiver:
+    """Tests for keyset archival against Postgres."""
+    
+    @pytest.mark.asyncio
+    async def test_archives_every_row_once(self, archiver, backlog, tmp_path):
+        """Test rows with equal timestamps are neither skipped nor repeated."""
+        cutoff = datetime.utcnow() - timedelta(days=90)
+        
+        result = await archiver.archive(cutoff)
+        
+        files = sorted(tmp_path.glob("metrics/**/*.ndjson.gz"))
+        archived = [row for path in files for row in read_archive(path)]
+        assert result["archived_count"] == 25
+        assert len(result["archive_uris"]) == 3
+        assert len(files) == 3
+        assert len({row["id"] for row in archived}) == 25
+        assert [row["timestamp"] for row in archived] == sorted(row["timestamp"] for row in archived)
+    
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint(self, archiver, backlog):
+        """Test a second run only archives rows newer than the checkpoint."""
+        cutoff = datetime.utcnow() - timedelta(days=90)
+        first = await archiver.archive(cutoff)
+        
+        second = await archiver.archive(cutoff)
+        later = await archiver.archive(datetime.utcnow())
+        
+        assert second["archived_count"] == 0
+        assert second["checkpoint"] == first["checkpoint"]
+        assert later["archived_count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_delete_in_batches(self, archiver, backlog):
+        """Test deletion removes every old row across several transactions."""
+        from src.database import AsyncSessionLocal
+        from sqlalchemy import func, select
+        
+        cutoff = datetime.utcnow() - timedelta(days=90)
+        await archiver.archive(cutoff)
+        
+        deleted = await archiver.delete_before(cutoff)
+        
+        async with AsyncSessionLocal() as session:
+            remaining = await session.scalar(select(func.count()).select_from(SystemMetric))
+        assert deleted == 25
+        assert remaining == 2
+    
+    @pytest.mark.asyncio
+    async def test_delete_stops_at_checkpoint(self, archiver, backlog):
+        """Test rows not yet archived are kept."""
+        assert await archiver.delete_before(datetime.utcnow()) == 0
+        
+        await archiver.archive(backlog + timedelta(minutes=5))
+        deleted = await archiver.delete_before(datetime.utcnow())
+        
+        assert deleted == 10
+        assert (await archiver.archive(datetime.utcnow()))["archived_count"] == 17
@@ -0,0 +1,164 @@
+"""Unit tests for COPY-based bulk metrics ingest."""
+import json
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from pydantic import ValidationError as PydanticValidationError
+
+from src.models.database_schemas import MetricColumnsCreate
+from src.services.database_exceptions import ValidationError
+from src.services.database_service import DatabaseService, METRIC_COPY_COLUMNS
+
+
+@pytest.fixture
+def db_service():
+    """Database service over a mocked session and asyncpg connection."""
+    service = DatabaseService()
+    service.session = MagicMock()
+    service.session.execute = AsyncMock()
+    
+    driver_connection = MagicMock()
+    driver_connection.copy_records_to_table = AsyncMock()
+    raw_connection = MagicMock(driver_connection=driver_connection)
+    connection = MagicMock()
+    connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+    service.session.connection = AsyncMock(return_value=connection)
+    
+    service.copy = driver_connection.copy_records_to_table
+    return service
+
+
+class TestMetricColumns:
+    """Test cases for the columnar payload schema."""
+    
+    def test_shared_type_and_unit_are_broadcast(self):
+        """Test single metric_types/units entries apply to every value."""
+        columns = MetricColumnsCreate(
+            service_name="web-api",
+            metric_values=[1.0, 2.0, 3.0],
+            metric_types=["latency"],
+            units=["ms"]
+        )
+        now = datetime(2025, 1, 1, 12)
+        
+        rows = list(columns.rows(now))
+        
+        assert rows == [
+            ("latency", 1.0, "ms", now, None),
+            ("latency", 2.0, "ms", now, None),
+            ("latency", 3.0, "ms", now, None),
+        ]
+    
+    def test_per_metric_columns(self):
+        """Test full-length columns are zipped row by row."""
+        timestamps = [datetime(2025, 1, 1, 12), datetime(2025, 1, 1, 13)]
+        columns = MetricColumnsCreate(
+            service_name="web-api",
+            metric_values=[45.5, 2048.0],
+            metric_types=["cpu", "memory"],
+            units=["percent", "MB"],
+            timestamps=timestamps,
+            metric_metadata=[{"host": "a"}, None]
+        )
+        
+        rows = list(columns.rows(datetime(2030, 1, 1)))
+        
+        assert rows[1] == ("memory", 2048.0, "MB", timestamps[1], None)
+        assert rows[0][4] == {"host": "a"}
+    
+    @pytest.mark.parametrize("overrides", [
+        {"metric_types": ["cpu", "memory"]},
+        {"units": ["ms", "ms"]},
+        {"timestamps": [datetime(2025, 1, 1)]},
+        {"metric_types": ["x" * 51]},
+    ])
+    def test_mismatched_columns_rejected(self, overrides):
+        """Test columns with the wrong length or oversized entries are rejected."""
+        payload = {
+            "service_name": "web-api",
+            "metric_values": [1.0, 2.0, 3.0],
+            "metric_types": ["latency"],
+            "units": ["ms"],
+        }
+        payload.update(overrides)
+        
+        with pytest.raises(PydanticValidationError):
+            MetricColumnsCreate(**payload)
+
+
+class TestBulkIngest:
+    """Test cases for DatabaseService.ingest_metrics_columns."""
+    
+    @pytest.mark.asyncio
+    async def test_single_copy_for_batch(self, db_service):
+        """Test a batch is written with one COPY and one upsert per rollup table."""
+        start = datetime.utcnow().replace(microsecond=0) - timedelta(hours=1)
+        columns = MetricColumnsCreate(
+            service_name="web-api",
+            metric_values=[float(i) for i in range(1000)],
+            metric_types=["latency"],
+            units=["ms"],
+            timestamps=[start + timedelta(seconds=i) for i in range(1000)]
+        )
+        
+        recorded = await db_service.ingest_metrics_columns(columns)
+        
+        assert recorded == 1000
+        db_service.copy.assert_awaited_once()
+        args, kwargs = db_service.copy.call_args
+        assert args[0] == "system_metrics"
+        assert kwargs["columns"] == METRIC_COPY_COLUMNS
+        assert len(kwargs["records"]) == 1000
+        assert kwargs["records"][5][1:6] == ("web-api", "latency", 5.0, "ms", start + timedelta(seconds=5))
+        
+        # Minute, hour and day rollups
+        assert db_service.session.execute.await_count == 3
+        db_service.session.add.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_metadata_serialized_for_copy(self, db_service):
+        """Test metadata is passed to COPY as JSON text."""
+        columns = MetricColumnsCreate(
+            service_name="web-api",
+            metric_values=[1.0, 2.0],
+            metric_types=["cpu"],
+            units=["percent"],
+            metric_metadata=[{"host": "server-01"}, None]
+        )
+        
+        await db_service.ingest_metrics_columns(columns)
+        
+        records = db_service.copy.call_args.kwargs["records"]
+        assert json.loads(records[0][6]) == {"host": "server-01"}
+        assert records[1][6] is None
+    
+    @pytest.mark.asyncio
+    async def test_empty_batch_skips_database(self, db_service):
+        """Test an empty payload does not touch the database."""
+        columns = MetricColumnsCreate(
+            service_name="web-api",
+            metric_values=[],
+            metric_types=["cpu"],
+            units=["percent"]
+        )
+        
+        assert await db_service.ingest_metrics_columns(columns) == 0
+        db_service.copy.assert_not_called()
+        db_service.session.execute.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_metrics_older_than_hot_storage_rejected(self, db_service):
+        """Test metrics archival has already passed are rejected, not silently lost."""
+        now = datetime.utcnow()
+        columns = MetricColumnsCreate(
+            service_name="web-api",
+            metric_values=[1.0, 2.0],
+            metric_types=["cpu"],
+            units=["percent"],
+            timestamps=[now, now - timedelta(days=120)]
+        )
+        
+        with pytest.raises(ValidationError):
+            await db_service.ingest_metrics_columns(columns)
+        db_service.copy.assert_not_called()
+        db_service.session.execute.assert_not_called()
@@ -458,6 +458,84 @@ class TestCachingBehavior:
         assert "cpu" in result
 
 
+class TestNonBlockingQueries:
+    """Test executor offload, concurrency and request coalescing."""
+    
+    @pytest.mark.asyncio
+    async def test_query_runs_off_event_loop(self, metrics_service):
+        """Test list_time_series is not called on the event loop thread."""
+        import threading
+        
+        loop_thread = threading.get_ident()
+        call_threads = []
+        
+        def list_time_series(request):
+            call_threads.append(threading.get_ident())
+            return []
+        
+        metrics_service.client.list_time_series = Mock(side_effect=list_time_series)
+        
+        await metrics_service.get_time_series(
+            metric_type="custom.googleapis.com/api/response_time",
+            start_time=datetime(2024, 1, 1, 0, 0, 0),
+            end_time=datetime(2024, 1, 1, 1, 0, 0)
+        )
+        
+        assert call_threads and call_threads[0] != loop_thread
+    
+    @pytest.mark.asyncio
+    async def test_identical_inflight_queries_coalesce(self, metrics_service):
+        """Test concurrent identical queries share one API call."""
+        import asyncio
+        import threading
+        
+        release = threading.Event()
+        
+        def list_time_series(request):
+            release.wait(timeout=5)
+            return []
+        
+        metrics_service.client.list_time_series = Mock(side_effect=list_time_series)
+        kwargs = dict(
+            metric_type="custom.googleapis.com/api/response_time",
+            start_time=datetime(2024, 1, 1, 0, 0, 0, 1000),
+            end_time=datetime(2024, 1, 1, 1, 0, 0, 2000)
+        )
+        
+        tasks = [asyncio.create_task(metrics_service.get_time_series(**kwargs)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        
+        assert metrics_service.client.list_time_series.call_count == 1
+        assert metrics_service.coalesced_requests == 4
+        assert all(result == [] for result in results)
+        assert metrics_service._inflight == {}
+    
+    @pytest.mark.asyncio
+    async def test_service_metrics_fetched_concurrently(self, metrics_service, mock_redis_client):
+        """Test get_service_metrics queries metrics in parallel."""
+        import time
+        
+        def list_time_series(request):
+            time.sleep(0.2)
+            return []
+        
+        metrics_service.client.list_time_series = Mock(side_effect=list_time_series)
+        
+        started = time.monotonic()
+        result = await metrics_service.get_service_metrics(
+            service_name="web-api",
+            metrics=["cpu", "memory", "latency", "errors"],
+            time_range="1h"
+        )
+        elapsed = time.monotonic() - started
+        
+        assert set(result) == {"cpu", "memory", "latency", "errors"}
+        assert metrics_service.client.list_time_series.call_count == 4
+        assert elapsed < 0.6
+
+
 class TestGlobalInstance:
     """Test global metrics service instance."""
     
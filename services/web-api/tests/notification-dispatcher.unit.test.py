@@ -0,0 +1,389 @@
+"""
+Tests for the coalescing notification dispatcher.
+
+Tests cover:
+- Enqueue returns without sending
+- Coalescing alerts into digests per recipient and channel
+- Email, Slack and SMS requests against local HTTP stubs
+- Per-channel concurrency limits
+- Retries and queue overflow
+- AlertEvaluator integration
+"""
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from urllib.parse import parse_qs
+from uuid import uuid4
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+
+from src.services.alert_evaluator_service import AlertEvaluator
+from src.services.notification_dispatcher import NotificationDispatcher
+from src.services.notification_service import NotificationService
+from src.models.monitoring import AlertConfiguration, AlertHistory
+
+
+SLACK_URL = "https://hooks.slack.test/services/test"
+SENDGRID_URL = "https://sendgrid.test/v3/mail/send"
+TWILIO_URL = "https://twilio.test/2010-04-01"
+
+
+class HTTPStub:
+    """Local HTTP stub recording requests and returning queued status codes."""
+    
+    def __init__(self, statuses=None, delay=0.0):
+        self.requests = []
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self.requests.append(request)
+            status = self.statuses.pop(0) if self.statuses else 200
+            return httpx.Response(status, json={})
+        finally:
+            self.in_flight -= 1
+    
+    def to(self, url_prefix):
+        return [request for request in self.requests if str(request.url).startswith(url_prefix)]
+
+
+def make_config(name="High CPU Alert", severity="warning", channels=("email", "slack")):
+    return AlertConfiguration(
+        id=uuid4(),
+        name=name,
+        service_name="web-api",
+        metric_type="cpu_usage",
+        threshold_type="absolute",
+        threshold_value=80.0,
+        comparison_operator=">",
+        severity=severity,
+        evaluation_window_seconds=300,
+        notification_channels=list(channels),
+        suppression_enabled=False,
+        created_by=uuid4(),
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow(),
+        enabled=True
+    )
+
+
+def make_alert(config):
+    return AlertHistory(
+        id=uuid4(),
+        alert_config_id=config.id,
+        triggered_at=datetime.utcnow(),
+        severity=config.severity,
+        metric_value=85.5,
+        threshold_value=80.0,
+        message=f"{config.service_name} - cpu_usage: 85.50 > 80.00",
+        notification_sent=False,
+        notification_channels=config.notification_channels
+    )
+
+
+@pytest.fixture
+def notification_service():
+    """Create notification service with test credentials."""
+    return NotificationService(
+        sendgrid_api_key="test_sendgrid_key",
+        slack_webhook_url=SLACK_URL,
+        twilio_account_sid="test_account_sid",
+        twilio_auth_token="test_auth_token",
+        twilio_from_number="+15555551234",
+        alert_email_recipients=["ops@utxoiq.com", "alerts@utxoiq.com"],
+        alert_sms_recipients=["+15555555555"],
+        max_retries=3
+    )
+
+
+@pytest.fixture
+def stub():
+    return HTTPStub()
+
+
+@pytest.fixture
+async def dispatcher(notification_service, stub):
+    """Dispatcher with a short window, sending to the local stub."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+    dispatcher = NotificationDispatcher(
+        notification_service,
+        coalesce_window_seconds=0.05,
+        http_client=client,
+        sendgrid_api_url=SENDGRID_URL,
+        twilio_api_url=TWILIO_URL,
+        retry_base_delay=0.001
+    )
+    yield dispatcher
+    await dispatcher.aclose()
+    await client.aclose()
+
+
+async def wait_for_delivery(dispatcher, seconds=0.2):
+    await asyncio.sleep(seconds)
+
+
+class TestEnqueue:
+    """Test queueing behaviour."""
+    
+    @pytest.mark.asyncio
+    async def test_enqueue_returns_before_sending(self, dispatcher, stub):
+        """Test enqueue does not wait for delivery."""
+        config = make_config()
+        
+        assert dispatcher.enqueue("slack", config, make_alert(config)) is True
+        assert stub.requests == []
+        
+        await wait_for_delivery(dispatcher)
+        assert len(stub.to(SLACK_URL)) == 1
+    
+    @pytest.mark.asyncio
+    async def test_unconfigured_channel_is_skipped(self, notification_service, dispatcher):
+        """Test channels without credentials are not queued."""
+        notification_service.slack_webhook_url = None
+        config = make_config()
+        
+        assert dispatcher.enqueue("slack", config, make_alert(config)) is False
+        assert dispatcher.enqueue("pager", config, make_alert(config)) is False
+    
+    @pytest.mark.asyncio
+    async def test_sms_only_for_critical_alerts(self, dispatcher):
+        """Test SMS is skipped for warnings and resolutions."""
+        warning = make_config()
+        critical = make_config(severity="critical")
+        
+        assert dispatcher.enqueue("sms", warning, make_alert(warning)) is False
+        assert dispatcher.enqueue("sms", critical, make_alert(critical), resolved=True) is False
+        assert dispatcher.enqueue("sms", critical, make_alert(critical)) is True
+    
+    @pytest.mark.asyncio
+    async def test_queue_full_drops(self, notification_service, stub):
+        """Test notifications are dropped when the queue is full."""
+        dispatcher = NotificationDispatcher(
+            notification_service,
+            coalesce_window_seconds=0.01,
+            max_queue_size=1,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(stub))
+        )
+        config = make_config()
+        
+        assert dispatcher.enqueue("slack", config, make_alert(config)) is True
+        assert dispatcher.enqueue("slack", config, make_alert(config)) is False
+        assert dispatcher.get_status()["dropped"] == 1
+        
+        await dispatcher.aclose()
+
+
+class TestCoalescing:
+    """Test digest delivery."""
+    
+    @pytest.mark.asyncio
+    async def test_single_alert_uses_standard_format(self, dispatcher, stub):
+        """Test a lone alert is sent as a normal email per recipient."""
+        config = make_config()
+        dispatcher.enqueue("email", config, make_alert(config))
+        
+        await wait_for_delivery(dispatcher)
+        
+        requests = stub.to(SENDGRID_URL)
+        recipients = sorted(json.loads(r.content)["personalizations"][0]["to"][0]["email"] for r in requests)
+        assert recipients == ["alerts@utxoiq.com", "ops@utxoiq.com"]
+        assert json.loads(requests[0].content)["subject"] == "[WARNING] High CPU Alert"
+        assert requests[0].headers["Authorization"] == "Bearer test_sendgrid_key"
+    
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced_per_recipient(self, dispatcher, stub):
+        """Test alerts within the window become one digest per recipient and channel."""
+        configs = [make_config(name=f"Alert {i}") for i in range(4)]
+        configs.append(make_config(name="Disk Full", severity="critical"))
+        for config in configs:
+            dispatcher.enqueue("email", config, make_alert(config))
+            dispatcher.enqueue("slack", config, make_alert(config))
+        
+        await wait_for_delivery(dispatcher)
+        
+        emails = stub.to(SENDGRID_URL)
+        slack = stub.to(SLACK_URL)
+        assert len(emails) == 2
+        assert len(slack) == 1
+        assert json.loads(emails[0].content)["subject"] == "[CRITICAL] 5 alert notifications"
+        assert "Disk Full" in json.loads(emails[0].content)["content"][0]["value"]
+        slack_payload = json.loads(slack[0].content)
+        assert slack_payload["text"].startswith("5 alert notifications")
+        assert len(slack_payload["attachments"]) == 5
+        assert dispatcher.get_status()["sent"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_resolution_payload(self, dispatcher, stub):
+        """Test resolutions reuse the resolution formatting."""
+        config = make_config()
+        alert = make_alert(config)
+        alert.resolved_at = datetime.utcnow()
+        alert.resolution_method = "auto"
+        
+        dispatcher.enqueue("slack", config, alert, resolved=True)
+        await wait_for_delivery(dispatcher)
+        
+        payload = json.loads(stub.to(SLACK_URL)[0].content)
+        assert payload["attachments"][0]["title"] == "✓ RESOLVED: High CPU Alert"
+    
+    @pytest.mark.asyncio
+    async def test_sms_digest(self, dispatcher, stub):
+        """Test SMS digests use Twilio's form API and stay within 160 characters."""
+        for _ in range(3):
+            config = make_config(severity="critical", channels=("sms",))
+            dispatcher.enqueue("sms", config, make_alert(config))
+        
+        await wait_for_delivery(dispatcher)
+        
+        requests = stub.to(TWILIO_URL)
+        assert len(requests) == 1
+        assert str(requests[0].url) == f"{TWILIO_URL}/Accounts/test_account_sid/Messages.json"
+        form = parse_qs(requests[0].content.decode())
+        assert form["To"] == ["+15555555555"]
+        assert form["Body"] == ["[CRITICAL] 3 alerts: web-api"]
+    
+    @pytest.mark.asyncio
+    async def test_aclose_flushes_pending(self, notification_service, stub):
+        """Test pending digests are delivered on shutdown."""
+        dispatcher = NotificationDispatcher(
+            notification_service,
+            coalesce_window_seconds=60,
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(stub))
+        )
+        config = make_config()
+        dispatcher.enqueue("slack", config, make_alert(config))
+        
+        await dispatcher.aclose()
+        
+        assert len(stub.to(SLACK_URL)) == 1
+    
+    @pytest.mark.asyncio
+    async def test_aclose_cancels_stuck_deliveries(self, notification_service):
+        """Test shutdown stops in-flight retries and never reopens the client."""
+        stub = HTTPStub(statuses=[500] * 10)
+        dispatcher = NotificationDispatcher(
+            notification_service,
+            coalesce_window_seconds=0.01,
+            sendgrid_api_url=SENDGRID_URL,
+            retry_base_delay=0.05,
+            shutdown_timeout=0.05
+        )
+        dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+        config = make_config(channels=("slack",))
+        dispatcher.enqueue("slack", config, make_alert(config))
+        await asyncio.sleep(0.03)
+        
+        await dispatcher.aclose()
+        requests_at_close = len(stub.requests)
+        await asyncio.sleep(0.2)
+        
+        assert requests_at_close < 3
+        assert len(stub.requests) == requests_at_close
+        assert dispatcher._client is None
+        assert not dispatcher._delivery_tasks
+        with pytest.raises(RuntimeError):
+            dispatcher.client
+    
+    @pytest.mark.asyncio
+    async def test_enqueue_after_close_is_refused(self, dispatcher):
+        """Test nothing is queued once the dispatcher is closed."""
+        await dispatcher.aclose()
+        config = make_config()
+        
+        assert dispatcher.enqueue("slack", config, make_alert(config)) is False
+
+
+class TestDelivery:
+    """Test transport behaviour."""
+    
+    @pytest.mark.asyncio
+    async def test_channel_concurrency_limit(self, notification_service):
+        """Test no more than the channel limit is in flight at once."""
+        stub = HTTPStub(delay=0.02)
+        notification_service.alert_email_recipients = [f"user{i}@utxoiq.com" for i in range(6)]
+        dispatcher = NotificationDispatcher(
+            notification_service,
+            coalesce_window_seconds=0.01,
+            channel_concurrency={"email": 2},
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(stub)),
+            sendgrid_api_url=SENDGRID_URL
+        )
+        config = make_config()
+        dispatcher.enqueue("email", config, make_alert(config))
+        
+        await asyncio.sleep(0.2)
+        await dispatcher.aclose()
+        
+        assert len(stub.requests) == 6
+        assert stub.max_in_flight == 2
+    
+    @pytest.mark.asyncio
+    async def test_retry_on_server_error(self, dispatcher, stub):
+        """Test 5xx and 429 responses are retried."""
+        stub.statuses = [500, 429, 200]
+        config = make_config()
+        
+        dispatcher.enqueue("slack", config, make_alert(config))
+        await wait_for_delivery(dispatcher)
+        
+        assert len(stub.requests) == 3
+        assert dispatcher.get_status()["sent"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_client_error_not_retried(self, dispatcher, stub):
+        """Test 4xx responses fail without retrying."""
+        stub.statuses = [400]
+        config = make_config()
+        
+        dispatcher.enqueue("slack", config, make_alert(config))
+        await wait_for_delivery(dispatcher)
+        
+        assert len(stub.requests) == 1
+        assert dispatcher.get_status()["failed"] == 1
+
+
+class TestAlertEvaluatorIntegration:
+    """Test AlertEvaluator queues through the dispatcher."""
+    
+    @pytest.mark.asyncio
+    async def test_notifications_are_enqueued(self):
+        """Test triggered alerts are queued instead of sent inline."""
+        dispatcher = MagicMock()
+        dispatcher.enqueue.side_effect = lambda channel, config, alert, resolved=False: channel != "sms"
+        db = MagicMock()
+        db.commit = AsyncMock()
+        evaluator = AlertEvaluator(
+            metrics_service=MagicMock(),
+            db=db,
+            notification_dispatcher=dispatcher
+        )
+        config = make_config(channels=("email", "slack", "sms"))
+        alert = make_alert(config)
+        
+        await evaluator._send_notifications(config, alert)
+        
+        assert [call.args[0] for call in dispatcher.enqueue.call_args_list] == ["email", "slack", "sms"]
+        assert alert.notification_sent is True
+        db.commit.assert_awaited_once()
+    
+    def test_global_dispatcher_is_default(self, monkeypatch):
+        """Test an evaluator without a notification service uses the global dispatcher."""
+        dispatcher = MagicMock()
+        monkeypatch.setattr(
+            "src.services.alert_evaluator_service.get_notification_dispatcher",
+            lambda: dispatcher
+        )
+        
+        assert AlertEvaluator(metrics_service=MagicMock(), db=MagicMock()).dispatcher is dispatcher
+        assert AlertEvaluator(
+            metrics_service=MagicMock(), db=MagicMock(), notification_service=MagicMock()
+        ).dispatcher is None
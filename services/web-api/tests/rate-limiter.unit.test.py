@@ -3,7 +3,7 @@ import pytest
 from unittest.mock import AsyncMock
 import redis.asyncio as redis
 
-from src.services.rate_limiter_service import RateLimiter
+from src.services.rate_limiter_service import RateLimiter, GCRARateLimiter
 from src.models.auth import UserSubscriptionTier
 
 
@@ -189,5 +189,120 @@ class TestRateLimiterService:
             assert remaining == 100 - (i + 1)
 
 
+class TestGCRARateLimiter:
+    """Test single round-trip GCRA rate limiter."""
+    
+    def _make_limiter(self, script_results, **kwargs):
+        mock_redis = AsyncMock(spec=redis.Redis)
+        script = AsyncMock(side_effect=script_results)
+        mock_redis.register_script.return_value = script
+        return GCRARateLimiter(mock_redis, **kwargs), mock_redis, script
+    
+    @pytest.mark.asyncio
+    async def test_single_script_call_per_check(self):
+        """Test each check is one script call and no INCR/EXPIRE/TTL."""
+        rate_limiter, mock_redis, script = self._make_limiter(
+            [[1, 99, 36000, 0]], local_burst=0
+        )
+        
+        allowed, remaining, reset_time = await rate_limiter.check_rate_limit(
+            user_id="test_user",
+            tier=UserSubscriptionTier.FREE
+        )
+        
+        assert allowed is True
+        assert remaining == 99
+        assert reset_time == 36
+        script.assert_called_once()
+        mock_redis.incr.assert_not_called()
+        mock_redis.expire.assert_not_called()
+        mock_redis.ttl.assert_not_called()
+        
+        args = script.call_args.kwargs["args"]
+        assert args[1] == 36000  # 3600s / 100 requests in ms
+        assert args[3:] == [0, 1]  # nothing committed, one requested
+    
+    @pytest.mark.asyncio
+    async def test_denied_returns_retry_after(self):
+        """Test denied check reports time until next allowed request."""
+        rate_limiter, _, _ = self._make_limiter([[0, 0, 3600000, 12500]], local_burst=0)
+        
+        allowed, remaining, reset_time = await rate_limiter.check_rate_limit(
+            user_id="test_user",
+            tier=UserSubscriptionTier.FREE
+        )
+        
+        assert allowed is False
+        assert remaining == 0
+        assert reset_time == 13
+    
+    @pytest.mark.asyncio
+    async def test_blocked_identifier_skips_redis(self):
+        """Test requests during retry-after are denied locally."""
+        rate_limiter, _, script = self._make_limiter([[0, 0, 3600000, 30000]], local_burst=0)
+        
+        await rate_limiter.check_rate_limit("test_user", UserSubscriptionTier.FREE)
+        allowed, remaining, _ = await rate_limiter.check_rate_limit(
+            "test_user", UserSubscriptionTier.FREE
+        )
+        
+        assert allowed is False
+        assert remaining == 0
+        script.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_local_burst_absorbs_requests(self):
+        """Test local bucket serves requests and batches them into next sync."""
+        rate_limiter, _, script = self._make_limiter(
+            [[1, 90, 360000, 0], [1, 85, 540000, 0]],
+            local_burst=3,
+            sync_interval=60
+        )
+        
+        results = [
+            await rate_limiter.check_rate_limit("test_user", UserSubscriptionTier.FREE)
+            for _ in range(5)
+        ]
+        
+        assert all(allowed for allowed, _, _ in results)
+        assert [remaining for _, remaining, _ in results[:4]] == [90, 89, 88, 87]
+        assert script.call_count == 2
+        # Second sync commits the three locally served hits plus the new one
+        assert script.call_args.kwargs["args"][3:] == [3, 1]
+    
+    @pytest.mark.asyncio
+    async def test_flush_pushes_pending_hits(self):
+        """Test flush sends locally served hits in one pipeline."""
+        rate_limiter, mock_redis, script = self._make_limiter(
+            [[1, 90, 360000, 0], None], local_burst=5, sync_interval=60
+        )
+        pipe = AsyncMock()
+        mock_redis.pipeline.return_value.__aenter__.return_value = pipe
+        
+        for _ in range(3):
+            await rate_limiter.check_rate_limit("test_user", UserSubscriptionTier.FREE)
+        
+        flushed = await rate_limiter.flush()
+        
+        assert flushed == 1
+        assert script.call_args.kwargs["args"][3:] == [2, 0]
+        assert script.call_args.kwargs["client"] is pipe
+        pipe.execute.assert_called_once()
+        assert await rate_limiter.flush() == 0
+    
+    @pytest.mark.asyncio
+    async def test_redis_error_fails_open(self):
+        """Test graceful handling of Redis errors."""
+        rate_limiter, _, _ = self._make_limiter(Exception("Redis connection error"))
+        
+        allowed, remaining, reset_time = await rate_limiter.check_rate_limit(
+            user_id="test_user",
+            tier=UserSubscriptionTier.FREE
+        )
+        
+        assert allowed is True
+        assert remaining == 100
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
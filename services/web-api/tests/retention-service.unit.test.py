@@ -4,6 +4,9 @@ from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, MagicMock
 from uuid import uuid4
 
+from google.api_core.exceptions import NotFound
+
+from src.services.metrics_archiver import LocalArchiveSink
 from src.services.retention_service import RetentionService, RetentionConfig
 from src.models.db_models import BackfillJob, InsightFeedback, SystemMetric
 from src.services.database_exceptions import DatabaseError
@@ -16,14 +19,15 @@ def mock_gcs_client():
         mock_bucket = MagicMock()
         mock_blob = MagicMock()
         mock_bucket.blob.return_value = mock_blob
+        mock_blob.download_as_bytes.side_effect = NotFound("no archive checkpoint")
         mock_client.return_value.bucket.return_value = mock_bucket
         yield mock_client
 
 
 @pytest.fixture
-async def retention_service(mock_gcs_client):
-    """Create retention service instance with mocked GCS."""
-    service = RetentionService(gcp_project_id="test-project")
+async def retention_service(mock_gcs_client, tmp_path):
+    """Create retention service instance with mocked GCS and local metric archives."""
+    service = RetentionService(gcp_project_id="test-project", archive_sink=LocalArchiveSink(str(tmp_path)))
     async with service:
         yield service
 
@@ -290,7 +294,8 @@ class TestMetricsRetention:
         from src.database import AsyncSessionLocal
         from sqlalchemy import select
         
-        # Run deletion
+        # Run deletion after archival
+        await retention_service.archive_old_metrics()
         result = await retention_service.delete_old_archived_metrics()
         
         # Verify results
@@ -302,6 +307,13 @@ class TestMetricsRetention:
             remaining_metrics = remaining_metrics.scalars().all()
             assert len(remaining_metrics) == 7  # Old + recent metrics remain
     
+    @pytest.mark.asyncio
+    async def test_unarchived_metrics_are_not_deleted(self, retention_service, old_metrics):
+        """Test deletion waits for metrics to be archived."""
+        result = await retention_service.delete_old_archived_metrics()
+        
+        assert result["deleted_count"] == 0
+    
     @pytest.mark.asyncio
     async def test_archive_no_old_metrics(self, retention_service, clean_database):
         """Test archival when no old metrics exist."""
@@ -351,6 +363,17 @@ class TestRetentionPolicyExecution:
             # Verify other policies still ran
             assert result["feedback"]["archived_count"] == 0  # No data to archive
             assert result["metrics_archive"]["archived_count"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_failed_archival_skips_deletion(self, retention_service, old_metrics):
+        """Test metrics are not deleted when archival failed."""
+        with patch.object(retention_service, 'archive_old_metrics', side_effect=DatabaseError("Test error")), \
+             patch.object(retention_service, 'delete_old_archived_metrics') as delete_metrics:
+            result = await retention_service.run_all_retention_policies()
+        
+        assert "error" in result["metrics_archive"]
+        assert result["metrics_delete"]["skipped"] is True
+        delete_metrics.assert_not_called()
 
 
 class TestRetentionConfiguration:
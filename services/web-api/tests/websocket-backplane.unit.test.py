@@ -0,0 +1,247 @@
+"""
+Tests for cross-instance WebSocket backplane and topic subscriptions.
+
+Tests cover:
+- Subscription filtering by signal type and confidence
+- Local delivery honouring subscriptions
+- Publishing insights to the Redis stream
+- Stream reader delivery and resume-from-offset replay
+- Reading from the stream's last ID at start so no entry is skipped
+"""
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import fakeredis.aioredis
+
+from src.models.insights import Insight, SignalType
+from src.websocket.backplane import RedisStreamBackplane, Subscription
+from src.websocket.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in recording sent frames."""
+
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame: str):
+        self.frames.append(json.loads(frame))
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def _drain():
+    """Let writer tasks run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _insight(signal_type: SignalType, confidence: float) -> Insight:
+    return Insight(
+        id=f"insight_{signal_type.value}",
+        signal_type=signal_type,
+        headline="Headline",
+        summary="Summary",
+        confidence=confidence,
+        timestamp=datetime(2025, 11, 7, 10, 30),
+        block_height=820000,
+        evidence=[]
+    )
+
+
+@pytest.fixture
+async def manager():
+    """Connection manager with a whale-only and an unfiltered client."""
+    manager = ConnectionManager()
+    sockets = {"whale": FakeWebSocket(), "all": FakeWebSocket()}
+    await manager.connect(
+        sockets["whale"], "whale",
+        subscription=Subscription.from_params("whale,exchange", 0.7)
+    )
+    await manager.connect(sockets["all"], "all")
+    manager.sockets = sockets
+    yield manager
+    for connection_id in list(manager.active_connections):
+        await manager.disconnect(connection_id)
+    manager._heartbeat_task.cancel()
+
+
+class TestSubscription:
+    """Test subscription filter."""
+
+    def test_from_params_normalizes(self):
+        """Test signal types are parsed and confidence clamped."""
+        subscription = Subscription.from_params(" Whale, exchange ,", 1.5)
+
+        assert subscription.signal_types == frozenset({"whale", "exchange"})
+        assert subscription.min_confidence == 1.0
+
+    def test_default_matches_everything(self):
+        """Test default subscription receives all insights."""
+        subscription = Subscription()
+
+        assert subscription.matches("mempool", 0.1)
+        assert subscription.matches(None, None)
+
+    def test_matches_type_and_confidence(self):
+        """Test filtering by signal type and threshold."""
+        subscription = Subscription.from_params(["whale"], 0.7)
+
+        assert subscription.matches("whale", 0.8)
+        assert not subscription.matches("whale", 0.6)
+        assert not subscription.matches("mempool", 0.9)
+
+
+class TestLocalDelivery:
+    """Test subscription-aware delivery without a backplane."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_insight_filters_by_subscription(self, manager):
+        """Test insights only reach matching subscribers."""
+        await manager.broadcast_insight(_insight(SignalType.MEMPOOL, 0.9))
+        await manager.broadcast_insight(_insight(SignalType.WHALE, 0.8))
+        await _drain()
+
+        whale_frames = manager.sockets["whale"].frames
+        all_frames = manager.sockets["all"].frames
+        assert [f["data"]["signal_type"] for f in whale_frames] == ["whale"]
+        assert [f["data"]["signal_type"] for f in all_frames] == ["mempool", "whale"]
+
+    @pytest.mark.asyncio
+    async def test_set_subscription(self, manager):
+        """Test changing subscription affects later deliveries."""
+        manager.set_subscription("all", Subscription.from_params(["miner"]))
+        await manager.broadcast_insight(_insight(SignalType.WHALE, 0.8))
+        await _drain()
+
+        assert manager.sockets["all"].frames == []
+
+    @pytest.mark.asyncio
+    async def test_replay_without_backplane(self, manager):
+        """Test resume is a no-op when running locally."""
+        assert await manager.replay("all", "1-0") == 0
+
+
+class TestRedisStreamBackplane:
+    """Test Redis stream backplane."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_insight_publishes_to_stream(self, manager):
+        """Test insights go to the stream instead of local sockets."""
+        redis_client = AsyncMock()
+        redis_client.xrevrange = AsyncMock(return_value=[])
+        redis_client.xadd = AsyncMock(return_value="1700000000000-0")
+        redis_client.xread = AsyncMock(side_effect=lambda *a, **k: asyncio.sleep(10))
+        manager.backplane = RedisStreamBackplane(manager, redis_client, stream_key="ws:test")
+        await manager.start_backplane()
+
+        sent = await manager.broadcast_insight(_insight(SignalType.WHALE, 0.8))
+        await _drain()
+
+        assert sent == 0
+        assert manager.sockets["all"].frames == []
+        stream_key, fields = redis_client.xadd.call_args.args
+        assert stream_key == "ws:test"
+        assert fields["signal_type"] == "whale"
+        assert float(fields["confidence"]) == 0.8
+        assert json.loads(fields["payload"])["type"] == "insight"
+        assert redis_client.xadd.call_args.kwargs["approximate"] is True
+
+        await manager.stop_backplane()
+
+    @pytest.mark.asyncio
+    async def test_reader_delivers_with_offset(self, manager):
+        """Test stream entries reach matching local sockets with offsets."""
+        entries = [
+            ("1-0", {"payload": '{"type":"insight","data":{"id":"a"}}',
+                     "signal_type": "mempool", "confidence": "0.9"}),
+            ("2-0", {"payload": '{"type":"insight","data":{"id":"b"}}',
+                     "signal_type": "whale", "confidence": "0.95"}),
+        ]
+        responses = [[("ws:test", entries)]]
+
+        async def xread(streams, count, block):
+            if responses:
+                return responses.pop()
+            await asyncio.sleep(10)
+
+        redis_client = AsyncMock()
+        redis_client.xrevrange = AsyncMock(return_value=[])
+        redis_client.xread = AsyncMock(side_effect=xread)
+        manager.backplane = RedisStreamBackplane(manager, redis_client, stream_key="ws:test")
+        await manager.start_backplane()
+        await _drain()
+
+        assert [f["offset"] for f in manager.sockets["all"].frames] == ["1-0", "2-0"]
+        assert [f["offset"] for f in manager.sockets["whale"].frames] == ["2-0"]
+        assert manager.backplane.last_id == "2-0"
+        assert redis_client.xread.call_args_list[0].args[0] == {"ws:test": "0-0"}
+
+        await manager.stop_backplane()
+
+    @pytest.mark.asyncio
+    async def test_replay_targets_single_connection(self, manager):
+        """Test resume replays entries after the offset to one client."""
+        redis_client = AsyncMock()
+        redis_client.xrevrange = AsyncMock(return_value=[])
+        redis_client.xread = AsyncMock(side_effect=lambda *a, **k: asyncio.sleep(10))
+        redis_client.xrange = AsyncMock(return_value=[
+            ("5-0", {"payload": '{"type":"insight"}', "signal_type": "whale",
+                     "confidence": "0.9"}),
+            ("6-0", {"payload": '{"type":"insight"}', "signal_type": "whale",
+                     "confidence": "0.5"}),
+        ])
+        manager.backplane = RedisStreamBackplane(manager, redis_client, stream_key="ws:test")
+        await manager.start_backplane()
+
+        replayed = await manager.replay("whale", "4-0")
+        await _drain()
+
+        assert replayed == 1
+        assert redis_client.xrange.call_args.kwargs["min"] == "(4-0"
+        assert [f["offset"] for f in manager.sockets["whale"].frames] == ["5-0"]
+        assert manager.sockets["all"].frames == []
+
+        await manager.stop_backplane()
+
+    @pytest.mark.asyncio
+    async def test_entries_published_before_first_read_are_delivered(self, manager):
+        """Test the reader starts after the stream's last entry, not at "$"."""
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        await redis_client.xadd("ws:test", {"payload": '{"type":"insight"}'})
+        manager.backplane = RedisStreamBackplane(manager, redis_client, stream_key="ws:test", block_ms=50)
+        await manager.start_backplane()
+
+        offset = await manager.backplane.publish({"type": "insight"})
+        for _ in range(20):
+            if manager.sockets["all"].frames:
+                break
+            await asyncio.sleep(0.05)
+
+        assert [f["offset"] for f in manager.sockets["all"].frames] == [offset]
+
+        await manager.stop_backplane()
+        await redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_start_falls_back_when_redis_unavailable(self, manager):
+        """Test manager keeps local delivery when Redis is down."""
+        redis_client = AsyncMock()
+        redis_client.ping = AsyncMock(side_effect=ConnectionError("refused"))
+        manager.backplane = RedisStreamBackplane(manager, redis_client)
+
+        assert await manager.start_backplane() is False
+
+        sent = await manager.broadcast_insight(_insight(SignalType.WHALE, 0.8))
+        assert sent == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,194 @@
+"""
+Tests for WebSocket fan-out broadcaster.
+
+Tests cover:
+- Serialize-once fan-out to per-connection queues
+- Slow clients not blocking fast clients
+- Overflow handling (drop and disconnect policies)
+- Delivery latency statistics
+"""
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.websocket.broadcaster import Broadcaster, OverflowPolicy
+from src.websocket.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in recording sent frames."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.frames = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame: str):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(frame)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+async def _drain():
+    """Let writer tasks run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestBroadcaster:
+    """Test Broadcaster fan-out behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_publish_serializes_once(self):
+        """Test message is serialized once for all connections."""
+        broadcaster = Broadcaster(max_queue_size=10)
+        sockets = [FakeWebSocket() for _ in range(3)]
+        for i, ws in enumerate(sockets):
+            broadcaster.register(f"c{i}", ws)
+
+        with patch(
+            "src.websocket.broadcaster.serialize_message",
+            wraps=json.dumps
+        ) as serialize:
+            queued = broadcaster.publish({"type": "insight", "id": 1})
+        await _drain()
+
+        assert queued == 3
+        serialize.assert_called_once()
+        assert all(json.loads(ws.frames[0])["id"] == 1 for ws in sockets)
+
+        for i in range(3):
+            await broadcaster.unregister(f"c{i}")
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_block_others(self):
+        """Test fast clients receive frames while a slow client is stuck."""
+        broadcaster = Broadcaster(max_queue_size=10)
+        slow = FakeWebSocket(delay=10)
+        fast = FakeWebSocket()
+        broadcaster.register("slow", slow)
+        broadcaster.register("fast", fast)
+
+        broadcaster.publish({"type": "insight"})
+        await _drain()
+
+        assert len(fast.frames) == 1
+        assert slow.frames == []
+
+        await broadcaster.unregister("slow")
+        await broadcaster.unregister("fast")
+
+    @pytest.mark.asyncio
+    async def test_overflow_drop_policy(self):
+        """Test frames are dropped for a client with a full queue."""
+        broadcaster = Broadcaster(max_queue_size=2, overflow_policy=OverflowPolicy.DROP)
+        broadcaster.register("slow", FakeWebSocket(delay=10))
+        await _drain()
+
+        results = [broadcaster.publish({"n": n}) for n in range(5)]
+
+        # Publishing never yields, so only the queue capacity is available
+        assert results == [1, 1, 0, 0, 0]
+        assert broadcaster.frames_dropped == 3
+        assert broadcaster.clients_evicted == 0
+
+        await broadcaster.unregister("slow")
+
+    @pytest.mark.asyncio
+    async def test_overflow_disconnect_policy(self):
+        """Test a client with a full queue is evicted once."""
+        on_evict = AsyncMock()
+        broadcaster = Broadcaster(
+            max_queue_size=1,
+            overflow_policy=OverflowPolicy.DISCONNECT,
+            on_evict=on_evict
+        )
+        broadcaster.register("slow", FakeWebSocket(delay=10))
+        await _drain()
+
+        for n in range(5):
+            broadcaster.publish({"n": n})
+        await _drain()
+
+        on_evict.assert_awaited_once_with("slow")
+        assert broadcaster.clients_evicted == 1
+
+        await broadcaster.unregister("slow")
+
+    @pytest.mark.asyncio
+    async def test_send_error_evicts_client(self):
+        """Test failed socket write evicts the connection."""
+        on_evict = AsyncMock()
+        broadcaster = Broadcaster(max_queue_size=10, on_evict=on_evict)
+        broadcaster.register("broken", FakeWebSocket(fail=True))
+
+        broadcaster.publish({"type": "heartbeat"})
+        await _drain()
+
+        on_evict.assert_awaited_once_with("broken")
+
+        await broadcaster.unregister("broken")
+
+    @pytest.mark.asyncio
+    async def test_latency_stats(self):
+        """Test delivery latency percentiles are reported."""
+        broadcaster = Broadcaster(max_queue_size=10)
+        broadcaster.register("c0", FakeWebSocket())
+
+        empty = broadcaster.get_stats()
+        assert empty["latency_ms"]["samples"] == 0
+        assert empty["latency_ms"]["p99"] == 0.0
+
+        for n in range(3):
+            broadcaster.publish({"n": n})
+        await _drain()
+
+        stats = broadcaster.get_stats()
+        assert stats["connections"] == 1
+        assert stats["frames_published"] == 3
+        assert stats["latency_ms"]["samples"] == 3
+        assert stats["latency_ms"]["p50"] <= stats["latency_ms"]["p99"]
+
+        await broadcaster.unregister("c0")
+
+
+class TestConnectionManagerFanout:
+    """Test ConnectionManager delivery through the broadcaster."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_and_overflow_eviction(self):
+        """Test broadcast reaches clients and slow clients are disconnected."""
+        manager = ConnectionManager()
+        manager.broadcaster.max_queue_size = 1
+        fast = FakeWebSocket()
+        slow = FakeWebSocket(delay=10)
+        await manager.connect(fast, "fast")
+        await manager.connect(slow, "slow", user_id="user-1")
+        await _drain()
+
+        # The slow client's writer holds frame 0, queues frame 1, overflows on 2
+        for n in range(3):
+            await manager.broadcast({"n": n})
+            await _drain()
+
+        assert [json.loads(f)["n"] for f in fast.frames] == [0, 1, 2]
+        assert slow.closed_with == 1013
+        assert manager.get_connection_count() == 1
+        assert manager.get_user_connection_count("user-1") == 0
+
+        await manager.disconnect("fast")
+        manager._heartbeat_task.cancel()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
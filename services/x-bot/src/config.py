@@ -32,6 +32,7 @@ class Settings(BaseSettings):
     duplicate_prevention_window: int = 900  # 15 minutes in seconds
     daily_brief_time: str = "07:00"
     hourly_check_enabled: bool = True
+    x_api_concurrency: int = 4  # Concurrent media uploads/tweets within the X API rate budget
     
     # Environment
     environment: str = "development"
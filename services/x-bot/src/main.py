@@ -30,6 +30,7 @@ async def lifespan(app: FastAPI):
     logger.info("X Bot service starting up")
     yield
     logger.info("X Bot service shutting down")
+    await posting_service.async_redis_client.close()
 
 
 # Create FastAPI app
@@ -1,9 +1,11 @@
 """Service for composing and posting tweets."""
+import asyncio
 import logging
+import time
 from typing import Optional, List
 from .models import Insight, TweetData, PostResult
 from .x_client import XClient
-from .redis_client import RedisClient
+from .redis_client import RedisClient, AsyncRedisClient
 from .api_client import APIClient
 from .config import settings
 
@@ -17,7 +19,11 @@ class PostingService:
         """Initialize posting service."""
         self.x_client = XClient()
         self.redis_client = RedisClient()
+        self.async_redis_client = AsyncRedisClient()
         self.api_client = APIClient()
+        
+        # Bounds concurrent X API calls (media uploads and tweets)
+        self._x_api_slots = asyncio.Semaphore(settings.x_api_concurrency)
         logger.info("Posting service initialized")
     
     def compose_tweet(self, insight: Insight) -> str:
@@ -100,6 +106,30 @@ class PostingService:
                 insight_id=insight.id
             )
         
+        result = await self.publish_insight(insight)
+        
+        if result.success:
+            # Mark as posted in Redis
+            self.redis_client.mark_insight_posted(
+                insight.id,
+                insight.signal_type.value
+            )
+        
+        return result
+    
+    async def publish_insight(self, insight: Insight) -> PostResult:
+        """
+        Upload an insight's chart and post the tweet, without duplicate checks.
+        
+        Blocking X API calls run in worker threads, at most
+        ``x_api_concurrency`` at a time across concurrent publishes.
+        
+        Args:
+            insight: Insight object
+            
+        Returns:
+            PostResult object
+        """
         # Compose tweet text
         tweet_text = self.compose_tweet(insight)
         
@@ -108,7 +138,8 @@ class PostingService:
         if insight.chart_url:
             chart_bytes = await self.api_client.download_chart_image(insight.chart_url)
             if chart_bytes:
-                media_id = self.x_client.upload_media(chart_bytes)
+                async with self._x_api_slots:
+                    media_id = await asyncio.to_thread(self.x_client.upload_media, chart_bytes)
                 if media_id:
                     media_ids.append(media_id)
                 else:
@@ -117,18 +148,14 @@ class PostingService:
                 logger.warning(f"Failed to download chart for insight {insight.id}")
         
         # Post tweet
-        tweet_id = self.x_client.post_tweet(
-            text=tweet_text,
-            media_ids=media_ids if media_ids else None
-        )
+        async with self._x_api_slots:
+            tweet_id = await asyncio.to_thread(
+                self.x_client.post_tweet,
+                text=tweet_text,
+                media_ids=media_ids if media_ids else None
+            )
         
         if tweet_id:
-            # Mark as posted in Redis
-            self.redis_client.mark_insight_posted(
-                insight.id,
-                insight.signal_type.value
-            )
-            
             logger.info(f"Successfully posted insight {insight.id} as tweet {tweet_id}")
             return PostResult(
                 success=True,
@@ -143,6 +170,42 @@ class PostingService:
                 insight_id=insight.id
             )
     
+    async def select_insights(self, insights: List[Insight]) -> List[tuple[bool, str]]:
+        """
+        Apply posting rules to a batch of candidates with one Redis round trip.
+        
+        Candidates are taken in order; at most one insight per signal type is
+        selected, matching what serial posting would allow inside the
+        duplicate prevention window.
+        
+        Args:
+            insights: Candidate insights
+            
+        Returns:
+            List of (should_post, reason) tuples, one per insight
+        """
+        confident = [i for i in insights if i.confidence >= settings.confidence_threshold]
+        posted_insights, recent_signals = await self.async_redis_client.get_posted_state(
+            [i.id for i in confident],
+            list(dict.fromkeys(i.signal_type.value for i in confident))
+        )
+        
+        decisions = []
+        claimed_signals = set(recent_signals)
+        for insight in insights:
+            signal_type = insight.signal_type.value
+            if insight.confidence < settings.confidence_threshold:
+                decisions.append((False, f"Confidence {insight.confidence} below threshold {settings.confidence_threshold}"))
+            elif insight.id in posted_insights:
+                decisions.append((False, f"Insight {insight.id} already posted"))
+            elif signal_type in claimed_signals:
+                decisions.append((False, f"Signal type {signal_type} posted within duplicate prevention window"))
+            else:
+                claimed_signals.add(signal_type)
+                decisions.append((True, "Ready to post"))
+        
+        return decisions
+    
     async def process_hourly_insights(self) -> List[PostResult]:
         """
         Process and post insights from hourly check.
@@ -159,10 +222,27 @@ class PostingService:
             logger.info("No publishable insights found")
             return []
         
-        # Post each insight
+        start = time.perf_counter()
+        
+        # Check every candidate against Redis at once
+        decisions = await self.select_insights(insights)
+        
+        # Publish the selected insights concurrently
+        selected = [i for i, (should_post, _) in zip(insights, decisions) if should_post]
+        published = await asyncio.gather(*(self.publish_insight(i) for i in selected))
+        published_by_id = {insight.id: result for insight, result in zip(selected, published)}
+        
+        # Mark everything that went out in one pipelined write
+        await self.async_redis_client.mark_insights_posted([
+            (insight.id, insight.signal_type.value)
+            for insight, result in zip(selected, published) if result.success
+        ])
+        
         results = []
-        for insight in insights:
-            result = await self.post_insight(insight)
+        for insight, (should_post, reason) in zip(insights, decisions):
+            result = published_by_id.get(insight.id) if should_post else None
+            if result is None:
+                result = PostResult(success=False, error=reason, insight_id=insight.id)
             results.append(result)
             
             # Log result
@@ -173,6 +253,9 @@ class PostingService:
         
         # Summary
         successful = sum(1 for r in results if r.success)
-        logger.info(f"Hourly processing complete: {successful}/{len(results)} insights posted")
+        logger.info(
+            f"Hourly processing complete: {successful}/{len(results)} insights posted "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
         
         return results
@@ -1,7 +1,8 @@
 """Redis client for duplicate prevention and caching."""
 import redis
+import redis.asyncio
 import logging
-from typing import Optional
+from typing import List, Optional, Set, Tuple
 from .config import settings
 
 logger = logging.getLogger(__name__)
@@ -116,3 +117,93 @@ class RedisClient:
         except Exception as e:
             logger.error(f"Failed to set last daily brief date: {e}")
             return False
+
+
+class AsyncRedisClient:
+    """Asyncio Redis client for batched duplicate checks."""
+    
+    def __init__(self):
+        """Initialize async Redis connection pool."""
+        self.client = redis.asyncio.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            password=settings.redis_password,
+            db=settings.redis_db,
+            decode_responses=True
+        )
+        logger.info("Async Redis client initialized")
+    
+    async def get_posted_state(
+        self,
+        insight_ids: List[str],
+        signal_types: List[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """
+        Check posted insights and recently posted signal types in one round trip.
+        
+        Args:
+            insight_ids: Candidate insight identifiers
+            signal_types: Candidate signal categories
+            
+        Returns:
+            Tuple of (posted insight IDs, recently posted signal types)
+        """
+        if not insight_ids and not signal_types:
+            return set(), set()
+        
+        insight_keys = [f"posted:insight:{insight_id}" for insight_id in insight_ids]
+        signal_keys = [f"posted:signal:{signal_type}" for signal_type in signal_types]
+        
+        try:
+            values = await self.client.mget(insight_keys + signal_keys)
+        except Exception as e:
+            logger.error(f"Failed to check posted state: {e}")
+            return set(), set()
+        
+        posted_insights = {
+            insight_id for insight_id, value in zip(insight_ids, values) if value is not None
+        }
+        recent_signals = {
+            signal_type for signal_type, value in zip(signal_types, values[len(insight_keys):])
+            if value is not None
+        }
+        return posted_insights, recent_signals
+    
+    async def mark_insights_posted(
+        self,
+        posted: List[Tuple[str, str]],
+        ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Mark several insights as posted in one pipelined round trip.
+        
+        Args:
+            posted: List of (insight_id, signal_type) pairs
+            ttl: Time to live in seconds (default: duplicate_prevention_window)
+            
+        Returns:
+            True if marked successfully, False otherwise
+        """
+        if not posted:
+            return True
+        
+        if ttl is None:
+            ttl = settings.duplicate_prevention_window
+        
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for insight_id, signal_type in posted:
+                    pipe.setex(f"posted:insight:{insight_id}", ttl, "1")
+                    pipe.setex(f"posted:signal:{signal_type}", ttl, insight_id)
+                await pipe.execute()
+            
+            logger.info(f"Marked {len(posted)} insights as posted (TTL: {ttl}s)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to mark insights as posted: {e}")
+            return False
+    
+    async def close(self):
+        """Close pooled connections."""
+        await self.client.aclose()
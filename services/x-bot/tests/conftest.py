@@ -95,6 +95,16 @@ def mock_redis_client():
     return client
 
 
+@pytest.fixture
+def mock_async_redis_client():
+    """Create a mock async Redis client."""
+    client = Mock()
+    client.get_posted_state = AsyncMock(return_value=(set(), set()))
+    client.mark_insights_posted = AsyncMock(return_value=True)
+    client.close = AsyncMock()
+    return client
+
+
 @pytest.fixture
 def mock_api_client(mock_insights, mock_daily_brief):
     """Create a mock API client."""
@@ -0,0 +1,172 @@
+"""Tests for the concurrent hourly posting pipeline."""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.posting_service import PostingService
+from src.redis_client import AsyncRedisClient
+from src.models import SignalType
+
+
+class TestPostingPipeline:
+    """Test cases for batched checks and concurrent publishing."""
+    
+    @pytest.fixture
+    def posting_service(self, mock_x_client, mock_redis_client, mock_async_redis_client, mock_api_client):
+        """Create posting service with mocked dependencies."""
+        with patch('src.posting_service.XClient', return_value=mock_x_client), \
+             patch('src.posting_service.RedisClient', return_value=mock_redis_client), \
+             patch('src.posting_service.AsyncRedisClient', return_value=mock_async_redis_client), \
+             patch('src.posting_service.APIClient', return_value=mock_api_client):
+            service = PostingService()
+            return service
+    
+    @pytest.fixture
+    def distinct_insights(self, mock_insights):
+        """Insights with one signal type each."""
+        signal_types = list(SignalType)
+        for insight, signal_type in zip(mock_insights, signal_types):
+            insight.signal_type = signal_type
+            insight.confidence = 0.9
+        return mock_insights[:len(signal_types)]
+    
+    @pytest.mark.asyncio
+    async def test_single_redis_round_trip(self, posting_service, mock_insights, mock_redis_client, mock_async_redis_client):
+        """Test the hourly run checks all candidates with one call and never uses the sync client."""
+        await posting_service.process_hourly_insights()
+        
+        mock_async_redis_client.get_posted_state.assert_awaited_once()
+        insight_ids, signal_types = mock_async_redis_client.get_posted_state.call_args[0]
+        assert set(insight_ids) == {i.id for i in mock_insights if i.confidence >= 0.7}
+        assert signal_types == ["mempool", "exchange"]
+        
+        mock_async_redis_client.mark_insights_posted.assert_awaited_once()
+        mock_redis_client.is_insight_posted.assert_not_called()
+        mock_redis_client.is_signal_recently_posted.assert_not_called()
+        mock_redis_client.mark_insight_posted.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_one_post_per_signal_type(self, posting_service, mock_insights, mock_async_redis_client):
+        """Test only the first candidate of each signal type is posted."""
+        results = await posting_service.process_hourly_insights()
+        
+        posted = [r.insight_id for r in results if r.success]
+        assert posted == ["insight-0", "insight-1"]
+        assert "duplicate prevention window" in results[2].error
+        
+        marked = mock_async_redis_client.mark_insights_posted.call_args[0][0]
+        assert marked == [("insight-0", "mempool"), ("insight-1", "exchange")]
+    
+    @pytest.mark.asyncio
+    async def test_recent_signal_falls_through_to_next_type(self, posting_service, mock_insights, mock_async_redis_client):
+        """Test a signal type posted in a previous run blocks every candidate of that type."""
+        mock_async_redis_client.get_posted_state.return_value = (set(), {"mempool"})
+        
+        results = await posting_service.process_hourly_insights()
+        
+        assert [r.insight_id for r in results if r.success] == ["insight-1"]
+    
+    @pytest.mark.asyncio
+    async def test_failed_posts_are_not_marked(self, posting_service, distinct_insights, mock_api_client, mock_x_client, mock_async_redis_client):
+        """Test only successful tweets are marked as posted."""
+        mock_api_client.get_publishable_insights.return_value = distinct_insights[:2]
+        mock_x_client.post_tweet.side_effect = lambda text, media_ids=None: (
+            None if distinct_insights[0].id in text else "tweet-1"
+        )
+        
+        results = await posting_service.process_hourly_insights()
+        
+        assert [r.success for r in results] == [False, True]
+        assert results[0].error == "Failed to post tweet"
+        marked = mock_async_redis_client.mark_insights_posted.call_args[0][0]
+        assert marked == [(distinct_insights[1].id, distinct_insights[1].signal_type.value)]
+    
+    @pytest.mark.asyncio
+    async def test_posts_run_concurrently(self, posting_service, distinct_insights, mock_api_client, mock_x_client):
+        """Test wall time tracks the slowest post, not the sum of posts."""
+        mock_api_client.get_publishable_insights.return_value = distinct_insights
+        
+        def slow_upload(chart_bytes):
+            time.sleep(0.1)
+            return "media-1"
+        
+        mock_x_client.upload_media.side_effect = slow_upload
+        
+        start = time.perf_counter()
+        results = await posting_service.process_hourly_insights()
+        elapsed = time.perf_counter() - start
+        
+        assert all(r.success for r in results)
+        assert elapsed < 0.1 * len(distinct_insights) * 0.8
+    
+    @pytest.mark.asyncio
+    async def test_x_api_concurrency_is_bounded(self, posting_service, distinct_insights, mock_api_client, mock_x_client):
+        """Test concurrent media uploads never exceed the configured limit."""
+        posting_service._x_api_slots = asyncio.Semaphore(2)
+        mock_api_client.get_publishable_insights.return_value = distinct_insights
+        
+        in_flight = 0
+        peak = 0
+        
+        def tracked_upload(chart_bytes):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            time.sleep(0.05)
+            in_flight -= 1
+            return "media-1"
+        
+        mock_x_client.upload_media.side_effect = tracked_upload
+        
+        await posting_service.process_hourly_insights()
+        
+        assert peak == 2
+
+
+class TestAsyncRedisClient:
+    """Test cases for the async Redis client."""
+    
+    @pytest.fixture
+    def redis_client(self):
+        """Create async Redis client over a mocked connection."""
+        with patch('src.redis_client.redis.asyncio.Redis') as redis_cls:
+            client = AsyncRedisClient()
+        client.client = redis_cls.return_value
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_get_posted_state_uses_one_mget(self, redis_client):
+        """Test insight and signal keys are fetched in a single MGET."""
+        redis_client.client.mget = AsyncMock(return_value=["1", None, None, "insight-9"])
+        
+        posted, recent = await redis_client.get_posted_state(["a", "b"], ["mempool", "whale"])
+        
+        redis_client.client.mget.assert_awaited_once_with([
+            "posted:insight:a", "posted:insight:b", "posted:signal:mempool", "posted:signal:whale"
+        ])
+        assert posted == {"a"}
+        assert recent == {"whale"}
+    
+    @pytest.mark.asyncio
+    async def test_get_posted_state_fails_open(self, redis_client):
+        """Test Redis errors are treated as nothing posted, like the sync client."""
+        redis_client.client.mget = AsyncMock(side_effect=ConnectionError("refused"))
+        
+        assert await redis_client.get_posted_state(["a"], ["mempool"]) == (set(), set())
+    
+    @pytest.mark.asyncio
+    async def test_mark_insights_posted_pipelines_writes(self, redis_client):
+        """Test all marks are sent in one pipeline execution."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True] * 4)
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=False)
+        redis_client.client.pipeline = MagicMock(return_value=pipe)
+        
+        ok = await redis_client.mark_insights_posted([("a", "mempool"), ("b", "whale")], ttl=60)
+        
+        assert ok is True
+        redis_client.client.pipeline.assert_called_once_with(transaction=False)
+        pipe.setex.assert_any_call("posted:insight:b", 60, "1")
+        pipe.setex.assert_any_call("posted:signal:whale", 60, "b")
+        pipe.execute.assert_awaited_once()
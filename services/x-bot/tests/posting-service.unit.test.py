@@ -9,10 +9,11 @@ class TestPostingService:
     """Test cases for PostingService."""
     
     @pytest.fixture
-    def posting_service(self, mock_x_client, mock_redis_client, mock_api_client):
+    def posting_service(self, mock_x_client, mock_redis_client, mock_async_redis_client, mock_api_client):
         """Create posting service with mocked dependencies."""
         with patch('src.posting_service.XClient', return_value=mock_x_client), \
              patch('src.posting_service.RedisClient', return_value=mock_redis_client), \
+             patch('src.posting_service.AsyncRedisClient', return_value=mock_async_redis_client), \
              patch('src.posting_service.APIClient', return_value=mock_api_client):
             service = PostingService()
             return service
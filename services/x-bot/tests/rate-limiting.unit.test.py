@@ -10,10 +10,11 @@ class TestRateLimiting:
     """Test cases for rate limiting and duplicate prevention."""
     
     @pytest.fixture
-    def posting_service(self, mock_x_client, mock_redis_client, mock_api_client):
+    def posting_service(self, mock_x_client, mock_redis_client, mock_async_redis_client, mock_api_client):
         """Create posting service with mocked dependencies."""
         with patch('src.posting_service.XClient', return_value=mock_x_client), \
              patch('src.posting_service.RedisClient', return_value=mock_redis_client), \
+             patch('src.posting_service.AsyncRedisClient', return_value=mock_async_redis_client), \
              patch('src.posting_service.APIClient', return_value=mock_api_client):
             service = PostingService()
             return service
@@ -104,11 +105,11 @@ class TestRateLimiting:
         assert "below threshold" in reason
     
     @pytest.mark.asyncio
-    async def test_hourly_processing_respects_filters(self, posting_service, mock_insights, mock_redis_client):
+    async def test_hourly_processing_respects_filters(self, posting_service, mock_insights, mock_async_redis_client):
         """Test that hourly processing respects all filters."""
         # Set up Redis to block some insights
         posted_ids = {mock_insights[0].id, mock_insights[2].id}
-        mock_redis_client.is_insight_posted.side_effect = lambda id: id in posted_ids
+        mock_async_redis_client.get_posted_state.return_value = (posted_ids, set())
         
         results = await posting_service.process_hourly_insights()
         
@@ -0,0 +1,149 @@
+"""
+Tests for the benchmark harness: synthetic data, fakes and baseline comparison
+"""
+
+import asyncio
+import pytest
+
+from tests.performance.fakes import FakeBigQueryClient, FakeBitcoinRPC, FakeRedis
+from tests.performance.runner import StageTimer, compare, baseline_entry, percentile, result_key
+from tests.performance.synthetic import ChainGenerator
+
+
+class TestChainGenerator:
+    """Test synthetic chain data"""
+
+    def test_blocks_are_deterministic(self):
+        """Same seed and height give the same block in any order"""
+        first = ChainGenerator(seed=7)
+        second = ChainGenerator(seed=7)
+
+        later = first.block(800_010, 50)
+        first.block(800_000, 50)
+
+        assert second.block(800_010, 50) == later
+        assert ChainGenerator(seed=8).block(800_010, 50) != later
+
+    @pytest.mark.parametrize('tx_count', [1, 100, 10_000])
+    def test_block_shape(self, tx_count):
+        """Blocks carry the requested transactions with a coinbase first"""
+        block = ChainGenerator().block(800_000, tx_count)
+
+        assert block['nTx'] == len(block['tx']) == tx_count
+        assert 'coinbase' in block['tx'][0]['vin'][0]
+        for tx in block['tx'][1:]:
+            assert all('prevout' in vin for vin in tx['vin'])
+            assert sum(vout['value'] for vout in tx['vout']) <= sum(vin['prevout']['value'] for vin in tx['vin'])
+
+    def test_tx_count_bounds(self):
+        """Blocks outside 1..10k transactions are rejected"""
+        with pytest.raises(ValueError):
+            ChainGenerator().block(800_000, 10_001)
+
+    def test_context_contains_processor_inputs(self):
+        """Context has every key the signal processors read"""
+        generator = ChainGenerator()
+        context = generator.context(generator.block(800_000, 10), history=10)
+
+        assert len(context['historical_mempool']) == 10
+        assert {f['entity_id'] for f in context['exchange_flows']} <= {e['entity_id'] for e in generator.entities}
+        assert context['transactions'] is context['raw_block']['tx']
+
+
+class TestFakes:
+    """Test in-process fakes"""
+
+    def test_rpc_serves_generated_blocks(self):
+        """getblock decodes a fresh copy of the generated block"""
+        generator = ChainGenerator()
+        rpc = FakeBitcoinRPC(generator, tx_count=5, tip_height=800_001)
+
+        block_hash = rpc.getblockhash(800_001)
+        block = rpc.getblock(block_hash, 2)
+        block['tx'].clear()
+
+        assert rpc.getblock(block_hash, 3) == generator.block(800_001, 5)
+        assert 'prevout' not in rpc.getblock(block_hash, 2)['tx'][1]['vin'][0]
+        assert rpc.calls['getblock'] == 3
+        with pytest.raises(ValueError):
+            rpc.getblockhash(800_002)
+
+    def test_bigquery_routes_queries_and_counts_inserts(self):
+        """Queries match registered patterns and inserts are counted per table"""
+        client = FakeBigQueryClient()
+        client.add_query_result(r'known_entities', [{'entity_id': 'a'}])
+
+        assert client.query('SELECT * FROM btc.known_entities').result() == [{'entity_id': 'a'}]
+        assert client.query('SELECT 1').result() == []
+        assert client.insert_rows_json('p.btc.blocks', [{'n': 1}, {'n': 2}]) == []
+        assert client.inserted_rows == {'p.btc.blocks': 2}
+        assert client.inserted_bytes > 0
+
+    def test_redis_commands_and_scripts(self):
+        """Basic commands, expiry and registered scripts work"""
+        redis = FakeRedis()
+        FakeRedis.define_script('return 1', lambda r, keys, args: r._get(keys[0]))
+
+        async def run():
+            assert await redis.incr('hits') == 1
+            await redis.set('tmp', 'x', px=1)
+            await asyncio.sleep(0.01)
+            assert await redis.get('tmp') is None
+            assert await redis.ttl('hits') == -1
+            async with redis.pipeline() as pipe:
+                pipe.incr('hits')
+                pipe.get('hits')
+                assert await pipe.execute() == [2, '2']
+            return await redis.register_script('return 1')(keys=['hits'])
+
+        assert asyncio.run(run()) == '2'
+
+
+class TestBaselineComparison:
+    """Test regression detection"""
+
+    def _result(self, p50, throughput, rss=100.0):
+        return {
+            'scenario': 'pipeline',
+            'params': {'tx_count': 1000, 'iterations': 20},
+            'stages': {'transform': {'p50_ms': p50, 'p95_ms': p50 * 1.2, 'p99_ms': p50 * 1.5, 'count': 20}},
+            'throughput': throughput,
+            'unit': 'blocks',
+            'peak_rss_mb': rss,
+        }
+
+    def test_within_tolerance(self):
+        """Small changes are not regressions"""
+        baseline = baseline_entry(self._result(10.0, 100.0))
+
+        assert compare(self._result(11.0, 95.0, 110.0), baseline, 0.25) == []
+
+    def test_slower_stage_and_lower_throughput(self):
+        """Slower stages, lower throughput and higher memory are reported"""
+        baseline = baseline_entry(self._result(10.0, 100.0))
+
+        regressions = compare(self._result(20.0, 50.0, 200.0), baseline, 0.25)
+
+        assert {r.metric for r in regressions} == {
+            'transform.p50_ms', 'transform.p95_ms', 'throughput', 'peak_rss_mb'
+        }
+        assert regressions[0].key == 'pipeline[tx_count=1000]'
+
+    def test_noise_floor(self):
+        """Sub-noise differences on tiny stages are ignored"""
+        baseline = baseline_entry(self._result(0.01, 100.0))
+
+        assert compare(self._result(0.03, 100.0), baseline, 0.25) == []
+
+    def test_helpers(self):
+        """Percentiles interpolate and keys ignore the iteration count"""
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([], 95) == 0.0
+        assert result_key('pipeline', {'tx_count': 1, 'iterations': 5}) == 'pipeline[tx_count=1]'
+
+        timer = StageTimer()
+        with timer.run():
+            with timer.stage('work'):
+                pass
+        assert timer.summary()['work']['count'] == 1
+        assert timer.elapsed > 0
@@ -0,0 +1,381 @@
+"""
+In-process fakes for benchmarks
+
+Stand-ins for the BigQuery client, Bitcoin Core RPC and async Redis that
+keep benchmarks free of network I/O. Each fake can add a fixed latency per
+call to model a round trip, and does the serialization work the real
+client would do (JSON encode for BigQuery inserts, JSON decode for RPC
+responses) so that cost stays in the measurement.
+"""
+
+import re
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from tests.performance.synthetic import ChainGenerator
+
+
+class FakeQueryJob:
+    """Completed query job"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self._rows = rows
+        self.total_rows = len(rows)
+
+    def result(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._rows
+
+
+class FakeTable:
+    """Table metadata returned by get_table"""
+
+    def __init__(self, table_id: str):
+        self.table_id = table_id
+        self.num_rows = 0
+        self.schema = []
+
+
+class FakeBigQueryClient:
+    """
+    In-memory BigQuery client.
+
+    Inserted rows are JSON encoded like the real client and counted per
+    table. Queries are answered from results registered with
+    ``add_query_result``: the first pattern that matches the SQL wins.
+    """
+
+    def __init__(self, project: Optional[str] = None, latency: float = 0.0, keep_rows: bool = False, **kwargs):
+        """
+        Args:
+            project: GCP project (ignored)
+            latency: Seconds to sleep per API call
+            keep_rows: Keep inserted rows in ``rows`` (off to bound memory)
+        """
+        self.project = project or 'utxoiq-bench'
+        self.latency = latency
+        self.keep_rows = keep_rows
+        self.rows: Dict[str, List[Dict[str, Any]]] = {}
+        self.inserted_rows: Dict[str, int] = {}
+        self.inserted_bytes = 0
+        self.insert_calls = 0
+        self.query_calls = 0
+        self._query_results: List[Tuple[re.Pattern, Union[List, Callable]]] = []
+
+    def add_query_result(self, pattern: str, rows: Union[List[Dict[str, Any]], Callable[[str], List]]) -> None:
+        """
+        Answer queries matching ``pattern``.
+
+        Args:
+            pattern: Regular expression searched in the SQL
+            rows: Rows to return, or a callable taking the SQL and returning rows
+        """
+        self._query_results.append((re.compile(pattern, re.S | re.I), rows))
+
+    def _wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def insert_rows_json(self, table: Any, json_rows: List[Dict[str, Any]], **kwargs) -> List:
+        self._wait()
+        table_id = str(table)
+        self.inserted_bytes += len(json.dumps(json_rows, default=str))
+        self.insert_calls += 1
+        self.inserted_rows[table_id] = self.inserted_rows.get(table_id, 0) + len(json_rows)
+        if self.keep_rows:
+            self.rows.setdefault(table_id, []).extend(json_rows)
+        return []
+
+    def query(self, query: str, job_config: Any = None, **kwargs) -> FakeQueryJob:
+        self._wait()
+        self.query_calls += 1
+        for pattern, rows in self._query_results:
+            if pattern.search(query):
+                return FakeQueryJob(rows(query) if callable(rows) else rows)
+        return FakeQueryJob([])
+
+    def get_table(self, table: Any) -> FakeTable:
+        self._wait()
+        return FakeTable(str(table))
+
+
+class FakeBitcoinRPC:
+    """
+    Bitcoin Core RPC backed by a ChainGenerator.
+
+    Blocks are generated once and kept as JSON; every getblock call decodes
+    the JSON again, which is the work AuthServiceProxy does on a real
+    response.
+    """
+
+    def __init__(
+        self,
+        generator: ChainGenerator,
+        tx_count: int = 3000,
+        tip_height: Optional[int] = None,
+        mempool_size: int = 5000,
+        latency: float = 0.0
+    ):
+        """
+        Args:
+            generator: Synthetic chain generator
+            tx_count: Transactions per generated block
+            tip_height: Current chain tip (default: generator start height)
+            mempool_size: Entries returned by getrawmempool
+            latency: Seconds to sleep per call (Tor round trips are ~0.5s)
+        """
+        self.generator = generator
+        self.tx_count = tx_count
+        self.tip_height = tip_height if tip_height is not None else generator.start_height
+        self.mempool_size = mempool_size
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        self._blocks: Dict[str, str] = {}
+        self._heights: Dict[str, int] = {}
+
+    def _call(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _encoded_block(self, block_hash: str) -> str:
+        if block_hash not in self._blocks:
+            height = self._heights[block_hash]
+            self._blocks[block_hash] = json.dumps(self.generator.block(height, self.tx_count))
+        return self._blocks[block_hash]
+
+    def preload(self, heights) -> None:
+        """Generate and encode blocks ahead of time so generation is not measured"""
+        for height in heights:
+            self._encoded_block(self.getblockhash(height))
+
+    def advance(self, blocks: int = 1) -> int:
+        """Move the chain tip forward"""
+        self.tip_height += blocks
+        return self.tip_height
+
+    def getblockcount(self) -> int:
+        self._call('getblockcount')
+        return self.tip_height
+
+    def getbestblockhash(self) -> str:
+        self._call('getbestblockhash')
+        return self.generator.block_hash(self.tip_height)
+
+    def getblockhash(self, height: int) -> str:
+        self._call('getblockhash')
+        if height > self.tip_height:
+            raise ValueError('Block height out of range')
+        block_hash = self.generator.block_hash(height)
+        self._heights[block_hash] = height
+        return block_hash
+
+    def getblock(self, block_hash: str, verbosity: int = 1) -> Dict[str, Any]:
+        self._call('getblock')
+        if block_hash not in self._heights:
+            raise ValueError('Block not found')
+        block = json.loads(self._encoded_block(block_hash))
+        if verbosity == 1:
+            block['tx'] = [tx['txid'] for tx in block['tx']]
+        elif verbosity == 2:
+            for tx in block['tx']:
+                for vin in tx['vin']:
+                    vin.pop('prevout', None)
+        return block
+
+    def getrawmempool(self, verbose: bool = False):
+        self._call('getrawmempool')
+        entries = self.generator.mempool(self.tip_height, self.mempool_size)
+        return entries if verbose else list(entries)
+
+    def getmempoolinfo(self) -> Dict[str, Any]:
+        self._call('getmempoolinfo')
+        return {
+            'loaded': True,
+            'size': self.mempool_size,
+            'bytes': self.mempool_size * 300,
+            'usage': self.mempool_size * 1100,
+            'mempoolminfee': 0.00001,
+        }
+
+    def getblockchaininfo(self) -> Dict[str, Any]:
+        self._call('getblockchaininfo')
+        return {
+            'chain': 'main',
+            'blocks': self.tip_height,
+            'headers': self.tip_height,
+            'bestblockhash': self.generator.block_hash(self.tip_height),
+            'verificationprogress': 1.0,
+        }
+
+
+class FakePipeline:
+    """Queued commands executed together by FakeRedis"""
+
+    def __init__(self, redis: 'FakeRedis'):
+        self._redis = redis
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if not hasattr(self._redis, name):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        await self._redis._wait()
+        commands, self._commands = self._commands, []
+        results = []
+        for name, args, kwargs in commands:
+            results.append(await getattr(self._redis, name)(*args, _pipelined=True, **kwargs))
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._commands = []
+
+
+class FakeScript:
+    """Registered Lua script backed by a Python implementation"""
+
+    def __init__(self, redis: 'FakeRedis', script: str):
+        self.redis = redis
+        self.sha = hashlib.sha1(script.encode()).hexdigest()
+
+    async def __call__(self, keys=None, args=None, client=None):
+        handler = FakeRedis.script_handlers.get(self.sha)
+        if handler is None:
+            raise NotImplementedError(f'No Python implementation registered for script {self.sha}')
+        if isinstance(client, FakePipeline):
+            client._commands.append(('_run_script', (handler, keys or [], args or []), {}))
+            return client
+        await self.redis._wait()
+        return handler(self.redis, keys or [], args or [])
+
+
+class FakeRedis:
+    """
+    Async Redis with string values and expiry (decode_responses=True).
+
+    Lua scripts are not interpreted: register a Python equivalent with
+    ``FakeRedis.define_script(script, handler)`` where the handler takes
+    (redis, keys, args) and may use the synchronous ``_get``/``_set``
+    helpers.
+    """
+
+    script_handlers: Dict[str, Callable] = {}
+
+    def __init__(self, latency: float = 0.0, **kwargs):
+        """
+        Args:
+            latency: Seconds to sleep per command (or per pipeline)
+        """
+        self.latency = latency
+        self.commands = 0
+        self._data: Dict[str, str] = {}
+        self._expires: Dict[str, float] = {}
+
+    @classmethod
+    def define_script(cls, script: str, handler: Callable) -> None:
+        """Register the Python implementation of a Lua script"""
+        cls.script_handlers[hashlib.sha1(script.encode()).hexdigest()] = handler
+
+    async def _wait(self, pipelined: bool = False) -> None:
+        self.commands += 1
+        if self.latency and not pipelined:
+            await asyncio.sleep(self.latency)
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def _get(self, key: str) -> Optional[str]:
+        return self._data[key] if self._alive(key) else None
+
+    def _set(self, key: str, value: Any, px: Optional[float] = None) -> None:
+        self._data[key] = str(value)
+        if px is not None:
+            self._expires[key] = time.monotonic() + px / 1000
+        else:
+            self._expires.pop(key, None)
+
+    async def ping(self, _pipelined: bool = False) -> bool:
+        await self._wait(_pipelined)
+        return True
+
+    async def get(self, key: str, _pipelined: bool = False) -> Optional[str]:
+        await self._wait(_pipelined)
+        return self._get(key)
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None, px: Optional[int] = None,
+                  nx: bool = False, _pipelined: bool = False) -> Optional[bool]:
+        await self._wait(_pipelined)
+        if nx and self._alive(key):
+            return None
+        self._set(key, value, px if px is not None else (ex * 1000 if ex is not None else None))
+        return True
+
+    async def setex(self, key: str, seconds: int, value: Any, _pipelined: bool = False) -> bool:
+        return await self.set(key, value, ex=seconds, _pipelined=_pipelined)
+
+    async def incrby(self, key: str, amount: int = 1, _pipelined: bool = False) -> int:
+        await self._wait(_pipelined)
+        value = int(self._get(key) or 0) + amount
+        self._data[key] = str(value)
+        return value
+
+    async def incr(self, key: str, amount: int = 1, _pipelined: bool = False) -> int:
+        return await self.incrby(key, amount, _pipelined=_pipelined)
+
+    async def expire(self, key: str, seconds: int, _pipelined: bool = False) -> bool:
+        await self._wait(_pipelined)
+        if not self._alive(key):
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+    async def ttl(self, key: str, _pipelined: bool = False) -> int:
+        await self._wait(_pipelined)
+        if not self._alive(key):
+            return -2
+        expires = self._expires.get(key)
+        return -1 if expires is None else max(0, round(expires - time.monotonic()))
+
+    async def delete(self, *keys: str, _pipelined: bool = False) -> int:
+        await self._wait(_pipelined)
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    async def exists(self, *keys: str, _pipelined: bool = False) -> int:
+        await self._wait(_pipelined)
+        return sum(1 for key in keys if self._alive(key))
+
+    async def _run_script(self, handler: Callable, keys: List, args: List, _pipelined: bool = False) -> Any:
+        return handler(self, keys, args)
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    def register_script(self, script: str) -> FakeScript:
+        return FakeScript(self, script)
+
+    async def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
@@ -0,0 +1,250 @@
+"""
+Benchmarks for the utxoiq-ingestion block pipeline
+
+Scenarios:
+    block_processor     BitcoinBlockProcessor block and transaction transforms
+    signal_processors   Each signal processor on a block with full context
+    pipeline            RPC fetch -> transform -> BigQuery insert ->
+                        PipelineOrchestrator.process_new_block
+
+Usage:
+    python -m tests.performance.ingestion_suite --list
+    python -m tests.performance.ingestion_suite --scenario pipeline --param tx_count=3000
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+from pathlib import Path
+from unittest.mock import patch
+
+SERVICE_DIR = Path(__file__).resolve().parents[2] / 'services' / 'utxoiq-ingestion'
+
+from tests.performance.fakes import FakeBigQueryClient, FakeBitcoinRPC
+from tests.performance.runner import StageTimer, suite_main
+from tests.performance.synthetic import ChainGenerator
+
+
+# PipelineResult.timing_metrics keys -> stage names
+PIPELINE_STAGES = {
+    'signal_generation_ms': 'signal_generation',
+    'signal_persistence_ms': 'signal_persistence',
+    'total_duration_ms': 'orchestrator_total',
+}
+
+
+def setup():
+    """Make the service importable and quiet"""
+    sys.path.insert(0, str(SERVICE_DIR))
+    os.environ.setdefault('GCP_PROJECT_ID', 'utxoiq-bench')
+    logging.disable(logging.WARNING)
+
+
+def _iterations(params, default_budget: int = 20_000) -> int:
+    tx_count = params.get('tx_count', 1000)
+    return params.get('iterations', max(5, min(100, default_budget // tx_count)))
+
+
+def _models_context(context):
+    """Convert generator snapshots into the pydantic models processors expect"""
+    from src.models import MempoolData, ExchangeFlowData, MinerTreasuryData, WhaleActivityData
+
+    converted = dict(context)
+    converted['mempool_data'] = MempoolData(**context['mempool_data'])
+    converted['historical_mempool'] = [MempoolData(**m) for m in context['historical_mempool']]
+    converted['exchange_flows'] = [ExchangeFlowData(**f) for f in context['exchange_flows']]
+    converted['current_exchange_flow'] = ExchangeFlowData(**context['current_exchange_flow'])
+    converted['historical_exchange_flows'] = [
+        ExchangeFlowData(**f) for f in context['historical_exchange_flows']
+    ]
+    converted['miner_data'] = [MinerTreasuryData(**m) for m in context['miner_data']]
+    converted['historical_miner'] = [MinerTreasuryData(**m) for m in context['historical_miner']]
+    converted['whale_data'] = [WhaleActivityData(**w) for w in context['whale_data']]
+    converted['historical_whale'] = [WhaleActivityData(**w) for w in context['historical_whale']]
+    return converted
+
+
+def _block_data(processed):
+    from src.models import BlockData
+
+    return BlockData(
+        block_hash=processed['hash'],
+        height=processed['number'],
+        timestamp=processed['timestamp'],
+        size=processed.get('size', 0),
+        tx_count=processed['transaction_count'],
+        fees_total=processed.get('fees_total', 0.0)
+    )
+
+
+def _entity_client(generator, **kwargs):
+    client = FakeBigQueryClient(**kwargs)
+    client.add_query_result(r'known_entities', generator.entities)
+    return client
+
+
+def _processors(entity_module):
+    from src.processors import _get_processors
+    from src.processors.base_processor import ProcessorConfig
+
+    # Same configuration as src/main.py
+    config = ProcessorConfig(enabled=True, confidence_threshold=0.5, time_window='24h')
+    processors = [cls(config) for cls in _get_processors().values()]
+    for processor in processors:
+        if hasattr(processor, 'set_entity_module'):
+            processor.set_entity_module(entity_module)
+    return processors
+
+
+def block_processor(timer: StageTimer, params):
+    """BitcoinBlockProcessor.process_block and process_transaction for every transaction"""
+    from src.processors.bitcoin_block_processor import BitcoinBlockProcessor
+
+    tx_count = params.get('tx_count', 1000)
+    iterations = _iterations(params)
+    generator = ChainGenerator(seed=params.get('seed', 0))
+    blocks = [generator.block(generator.start_height + i, tx_count) for i in range(min(iterations, 5))]
+    processor = BitcoinBlockProcessor()
+
+    def transform(block):
+        with timer.stage('transform_block'):
+            processed = processor.process_block(block)
+        with timer.stage('transform_transactions'):
+            for tx in block['tx']:
+                processor.process_transaction(tx, processed['hash'], processed['number'], processed['timestamp'])
+
+    transform(blocks[0])
+    with timer.run():
+        for i in range(iterations):
+            transform(blocks[i % len(blocks)])
+
+    return iterations * tx_count, 'tx', {'iterations': iterations}
+
+
+def signal_processors(timer: StageTimer, params):
+    """Each signal processor's process_block with mempool, flow, miner and whale context"""
+    from src.entity_identification import EntityIdentificationModule
+    from src.processors.base_processor import ProcessingContext
+    from src.processors.bitcoin_block_processor import BitcoinBlockProcessor
+
+    tx_count = params.get('tx_count', 1000)
+    iterations = params.get('iterations', 50)
+    generator = ChainGenerator(seed=params.get('seed', 0))
+    block = generator.block(generator.start_height, tx_count)
+    block_data = _block_data(BitcoinBlockProcessor.process_block(block))
+    context = ProcessingContext(block=block_data, historical_data=_models_context(generator.context(block)))
+
+    entity_module = EntityIdentificationModule(bigquery_client=_entity_client(generator))
+    processors = _processors(entity_module)
+    signal_counts = {}
+
+    async def run_once():
+        for processor in processors:
+            name = processor.__class__.__name__
+            with timer.stage(name):
+                signals = await processor.process_block(block_data, context)
+            signal_counts[name] = len(signals)
+
+    async def run():
+        await entity_module.load_known_entities()
+        await run_once()
+        with timer.run():
+            for _ in range(iterations):
+                await run_once()
+
+    asyncio.run(run())
+    return iterations, 'blocks', {'signals': signal_counts}
+
+
+def pipeline(timer: StageTimer, params):
+    """Block path from RPC fetch through BigQuery insert and the pipeline orchestrator"""
+    from src.metric_aggregator import InMemoryMetricExporter
+    from src.monitoring import MonitoringModule
+    from src.pipeline_orchestrator import PipelineOrchestrator
+    from src.signal_persistence import SignalPersistenceModule
+    from src.entity_identification import EntityIdentificationModule
+    from src.processors.bitcoin_block_processor import BitcoinBlockProcessor
+    from src.monitor.block_monitor import BlockMonitor
+
+    tx_count = params.get('tx_count', 1000)
+    iterations = _iterations(params)
+    latency = params.get('rpc_latency', 0.0)
+    bq_latency = params.get('bigquery_latency', 0.0)
+
+    # Recent base time so BigQueryAdapter.should_ingest_block accepts the blocks
+    generator = ChainGenerator(
+        seed=params.get('seed', 0),
+        base_time=int(time.time()) - 600 * (iterations + 1)
+    )
+    rpc = FakeBitcoinRPC(generator, tx_count=tx_count, latency=latency)
+    rpc.advance(iterations)
+    heights = range(generator.start_height, generator.start_height + iterations + 1)
+    rpc.preload(heights)
+
+    bq_client = _entity_client(generator, latency=bq_latency)
+    with patch('src.adapters.bigquery_adapter.bigquery.Client', FakeBigQueryClient):
+        from src.adapters.bigquery_adapter import BigQueryAdapter
+        adapter = BigQueryAdapter(project_id='utxoiq-bench', realtime_hours=24)
+    adapter.client = bq_client
+
+    block_processor = BitcoinBlockProcessor()
+    monitor = BlockMonitor(rpc_client=rpc, block_processor=block_processor, bigquery_adapter=adapter)
+    entity_module = EntityIdentificationModule(bigquery_client=bq_client)
+    orchestrator = PipelineOrchestrator(
+        signal_processors=_processors(entity_module),
+        signal_persistence=SignalPersistenceModule(bigquery_client=bq_client, project_id='utxoiq-bench'),
+        monitoring_module=MonitoringModule(project_id='utxoiq-bench', exporter=InMemoryMetricExporter())
+    )
+    signals = []
+
+    async def process(height):
+        with timer.stage('block_total'):
+            with timer.stage('rpc_fetch'):
+                raw = monitor.get_block_data(height)
+            with timer.stage('transform'):
+                processed = block_processor.process_block(raw)
+                transactions = [
+                    block_processor.process_transaction(
+                        tx, processed['hash'], processed['number'], processed['timestamp']
+                    )
+                    for tx in raw['tx']
+                ]
+            with timer.stage('bigquery_insert'):
+                adapter.insert_block(processed)
+                adapter.insert_transactions(transactions)
+            # Same context the block monitor passes to the orchestrator
+            result = await orchestrator.process_new_block(
+                _block_data(processed),
+                historical_data={'raw_block': raw, 'transactions': raw.get('tx', [])}
+            )
+        for stage, duration in result.timing_metrics.items():
+            timer.record(PIPELINE_STAGES.get(stage, stage), duration)
+        signals.append(len(result.signals))
+
+    async def run():
+        await entity_module.load_known_entities()
+        await process(heights[0])
+        with timer.run():
+            for height in heights[1:]:
+                await process(height)
+
+    asyncio.run(run())
+    return iterations, 'blocks', {
+        'iterations': iterations,
+        'signals_per_block': sum(signals) / len(signals),
+        'bigquery_bytes': bq_client.inserted_bytes,
+        'rpc_calls': rpc.calls,
+    }
+
+
+SCENARIOS = {
+    'block_processor': block_processor,
+    'signal_processors': signal_processors,
+    'pipeline': pipeline,
+}
+
+
+if __name__ == '__main__':
+    sys.exit(suite_main('ingestion', SCENARIOS, setup))
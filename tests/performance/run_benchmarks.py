@@ -0,0 +1,153 @@
+"""
+Run the benchmark suites and compare them with stored baselines
+
+Every scenario runs in a fresh interpreter so peak RSS is per scenario and
+the two services' ``src`` packages never share a process.
+
+Usage (from the repository root):
+    python -m tests.performance.run_benchmarks
+    python -m tests.performance.run_benchmarks --suite ingestion --quick
+    python -m tests.performance.run_benchmarks --update-baselines
+    python -m tests.performance.run_benchmarks --tolerance 0.15 --output results.json
+
+Exits with status 1 when any result regresses beyond the tolerance.
+"""
+
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from tests.performance.runner import baseline_entry, compare, result_key
+
+ROOT = Path(__file__).resolve().parents[2]
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+
+SUITES = {
+    'ingestion': 'tests.performance.ingestion_suite',
+    'web-api': 'tests.performance.web_api_suite',
+}
+
+TX_COUNTS = (1, 100, 1000, 10_000)
+
+# (suite, scenario, params) run by default
+MATRIX: List[Tuple[str, str, Dict[str, Any]]] = (
+    [('ingestion', 'block_processor', {'tx_count': n}) for n in TX_COUNTS] +
+    [('ingestion', 'signal_processors', {'tx_count': 1000})] +
+    [('ingestion', 'pipeline', {'tx_count': n}) for n in TX_COUNTS] +
+    [
+        ('web-api', 'insights_latest', {'requests': 1000}),
+        ('web-api', 'insights_public', {'requests': 1000}),
+        ('web-api', 'rate_limit_check', {'requests': 20_000}),
+    ]
+)
+
+
+def quick(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Smaller variant of a matrix entry (None to skip it)"""
+    if params.get('tx_count', 0) > 1000:
+        return None
+    if 'requests' in params:
+        return {**params, 'requests': max(100, params['requests'] // 5)}
+    return params
+
+
+def run_scenario(suite: str, scenario: str, params: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+    """Run one scenario in a subprocess and return its result"""
+    command = [sys.executable, '-W', 'ignore', '-m', SUITES[suite], '--scenario', scenario]
+    for key, value in params.items():
+        command += ['--param', f'{key}={value}']
+
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(
+            f'{suite}/{scenario} failed (exit {completed.returncode}):\n{completed.stderr[-2000:]}'
+        )
+    return json.loads(lines[-1])
+
+
+def load_baselines(suite: str) -> Dict[str, Any]:
+    path = BASELINE_DIR / f'{suite}.json'
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_baselines(suite: str, results: List[Dict[str, Any]]) -> Path:
+    """Merge results into the suite's baseline file"""
+    baselines = load_baselines(suite)
+    for result in results:
+        baselines[result_key(result['scenario'], result['params'])] = baseline_entry(result)
+    BASELINE_DIR.mkdir(exist_ok=True)
+    path = BASELINE_DIR / f'{suite}.json'
+    path.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + '\n')
+    return path
+
+
+def report(result: Dict[str, Any]) -> None:
+    key = result_key(result['scenario'], result['params'])
+    print(f"{key:<40} {result['throughput']:>12,.1f} {result['unit']}/s  "
+          f"peak RSS {result['peak_rss_mb']:7.1f} MB")
+    for stage, stats in result['stages'].items():
+        print(f"    {stage:<34} p50 {stats['p50_ms']:10.3f} ms  p95 {stats['p95_ms']:10.3f} ms  "
+              f"p99 {stats['p99_ms']:10.3f} ms  (n={stats['count']})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='utxoIQ benchmark runner')
+    parser.add_argument('--suite', choices=sorted(SUITES), action='append', help='Suites to run (default: all)')
+    parser.add_argument('--scenario', action='append', help='Only run these scenarios')
+    parser.add_argument('--quick', action='store_true', help='Skip 10k-transaction blocks and shorten runs')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative change (default 0.25)')
+    parser.add_argument('--update-baselines', action='store_true', help='Store results as the new baselines')
+    parser.add_argument('--output', help='Write all results to this JSON file')
+    parser.add_argument('--timeout', type=int, default=900, help='Seconds per scenario')
+    args = parser.parse_args()
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    regressions = []
+    failures = 0
+
+    for suite, scenario, params in MATRIX:
+        if args.suite and suite not in args.suite:
+            continue
+        if args.scenario and scenario not in args.scenario:
+            continue
+        if args.quick:
+            params = quick(params)
+            if params is None:
+                continue
+
+        try:
+            result = run_scenario(suite, scenario, params, args.timeout)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f'FAILED {suite}/{scenario} {params}: {e}', file=sys.stderr)
+            failures += 1
+            continue
+
+        report(result)
+        results.setdefault(suite, []).append(result)
+
+        baseline = load_baselines(suite).get(result_key(scenario, params))
+        if baseline and not args.update_baselines:
+            found = compare(result, baseline, args.tolerance)
+            for regression in found:
+                print(f'    REGRESSION {regression}')
+            regressions.extend(found)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, default=str) + '\n')
+
+    if args.update_baselines:
+        for suite, suite_results in results.items():
+            print(f'Updated {save_baselines(suite, suite_results)}')
+
+    print('-' * 72)
+    print(f'{sum(len(r) for r in results.values())} scenarios, '
+          f'{len(regressions)} regressions, {failures} failed')
+    return 1 if regressions or failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Benchmark measurement and baseline comparison
+
+Scenarios record per-stage latencies with a StageTimer. Each scenario runs
+in its own process (see run_benchmarks.py) so the reported peak RSS belongs
+to that scenario alone. Results are compared with the stored baselines and
+any stage, throughput or memory figure outside the tolerance is reported as
+a regression.
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+# Differences below these are treated as noise regardless of tolerance
+NOISE_FLOOR_MS = 0.05
+NOISE_FLOOR_RSS_MB = 5.0
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentile with linear interpolation (q between 0 and 100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary for one stage (milliseconds)"""
+    return {
+        'count': len(samples),
+        'mean_ms': round(sum(samples) / len(samples), 4) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50), 4),
+        'p95_ms': round(percentile(samples, 95), 4),
+        'p99_ms': round(percentile(samples, 99), 4),
+        'max_ms': round(max(samples), 4) if samples else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class StageTimer:
+    """Collect latency samples per named stage"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.elapsed = 0.0
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one sample of ``name``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    @contextmanager
+    def run(self):
+        """Time the measured part of a scenario (excludes setup and warmup)"""
+        self.samples.clear()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    def record(self, name: str, duration_ms: float) -> None:
+        self.samples.setdefault(name, []).append(duration_ms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: summarize(samples) for name, samples in self.samples.items()}
+
+
+@dataclass
+class ScenarioResult:
+    """Outcome of one scenario run"""
+
+    suite: str
+    scenario: str
+    params: Dict[str, Any]
+    units: int
+    unit: str
+    elapsed_s: float
+    stages: Dict[str, Dict[str, float]]
+    peak_rss_mb: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return result_key(self.scenario, self.params)
+
+    @property
+    def throughput(self) -> float:
+        return round(self.units / self.elapsed_s, 2) if self.elapsed_s else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['throughput'] = self.throughput
+        return data
+
+
+def result_key(scenario: str, params: Dict[str, Any]) -> str:
+    """Baseline key: scenario name plus its sorted parameters"""
+    args = ','.join(f'{k}={params[k]}' for k in sorted(params) if k != 'iterations')
+    return f'{scenario}[{args}]' if args else scenario
+
+
+@dataclass
+class Regression:
+    """One figure that moved beyond the tolerance"""
+
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else float('inf')
+
+    def __str__(self) -> str:
+        return f'{self.key} {self.metric}: {self.baseline:g} -> {self.current:g} ({self.change:+.0%})'
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Regression]:
+    """
+    Compare a result with its baseline entry.
+
+    A stage regresses when its p50 or p95 grows by more than ``tolerance``
+    (and by more than the noise floor); throughput regresses when it drops
+    by more than ``tolerance``; memory when peak RSS grows by more than
+    ``tolerance`` and the noise floor.
+
+    Args:
+        result: ScenarioResult.to_dict() of the current run
+        baseline: Stored entry for the same key
+        tolerance: Allowed relative change (0.25 = 25%)
+
+    Returns:
+        Regressions found (empty if within tolerance)
+    """
+    key = result_key(result['scenario'], result['params'])
+    regressions = []
+
+    for stage, stats in result['stages'].items():
+        base_stats = baseline.get('stages', {}).get(stage)
+        if not base_stats:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            base, current = base_stats[metric], stats[metric]
+            if current > base * (1 + tolerance) and current - base > NOISE_FLOOR_MS:
+                regressions.append(Regression(key, f'{stage}.{metric}', base, current))
+
+    base_throughput = baseline.get('throughput')
+    if base_throughput and result['throughput'] < base_throughput * (1 - tolerance):
+        regressions.append(Regression(key, 'throughput', base_throughput, result['throughput']))
+
+    base_rss = baseline.get('peak_rss_mb')
+    rss = result['peak_rss_mb']
+    if base_rss and rss > base_rss * (1 + tolerance) and rss - base_rss > NOISE_FLOOR_RSS_MB:
+        regressions.append(Regression(key, 'peak_rss_mb', base_rss, rss))
+
+    return regressions
+
+
+def baseline_entry(result: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a result stored as baseline"""
+    return {
+        'stages': {
+            stage: {'p50_ms': stats['p50_ms'], 'p95_ms': stats['p95_ms']}
+            for stage, stats in result['stages'].items()
+        },
+        'throughput': result['throughput'],
+        'unit': result['unit'],
+        'peak_rss_mb': result['peak_rss_mb'],
+    }
+
+
+def parse_params(pairs: List[str]) -> Dict[str, Any]:
+    """Parse key=value pairs, converting numbers"""
+    params = {}
+    for pair in pairs:
+        key, _, value = pair.partition('=')
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                continue
+        params[key] = value
+    return params
+
+
+def suite_main(suite: str, scenarios: Dict[str, Callable[[StageTimer, Dict[str, Any]], Any]],
+               setup: Optional[Callable[[], None]] = None) -> int:
+    """
+    Command line entry point shared by the benchmark suites.
+
+    Each scenario is called as ``func(timer, params)`` and returns
+    ``(units, unit, extra)``; it must wrap its measured loop in
+    ``timer.run()``.
+
+    Usage:
+        python -m tests.performance.<suite> --list
+        python -m tests.performance.<suite> --scenario NAME --param tx_count=1000
+    """
+    parser = argparse.ArgumentParser(description=f'{suite} benchmarks')
+    parser.add_argument('--list', action='store_true', help='List scenarios')
+    parser.add_argument('--scenario', help='Scenario to run')
+    parser.add_argument('--param', action='append', default=[], help='Scenario parameter key=value')
+    args = parser.parse_args()
+
+    if args.list or not args.scenario:
+        for name, func in scenarios.items():
+            print(f'{name:<24} {(func.__doc__ or "").strip().splitlines()[0]}')
+        return 0
+
+    if args.scenario not in scenarios:
+        print(f'Unknown scenario: {args.scenario}', file=sys.stderr)
+        return 2
+
+    if setup:
+        setup()
+
+    params = parse_params(args.param)
+    timer = StageTimer()
+    units, unit, extra = scenarios[args.scenario](timer, params)
+    result = ScenarioResult(
+        suite=suite,
+        scenario=args.scenario,
+        params=params,
+        units=units,
+        unit=unit,
+        elapsed_s=round(timer.elapsed, 6),
+        stages=timer.summary(),
+        peak_rss_mb=peak_rss_mb(),
+        extra=extra or {},
+    )
+    print(json.dumps(result.to_dict(), default=str))
+    return 0
@@ -0,0 +1,359 @@
+"""
+Deterministic synthetic chain data for benchmarks
+
+Generates Bitcoin Core shaped blocks (getblock verbosity 3, i.e. with
+prevouts), mempool contents and the per-block context consumed by the
+signal processors. Every block is derived from (seed, height) only, so the
+same height always produces the same block regardless of generation order.
+"""
+
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+SATOSHI = 100_000_000
+BLOCK_INTERVAL = 600
+
+SCRIPT_TYPES = [
+    ('witness_v0_keyhash', 0.55, 141),
+    ('witness_v1_taproot', 0.25, 111),
+    ('pubkeyhash', 0.12, 226),
+    ('scripthash', 0.08, 166),
+]
+
+EXCHANGES = ['Coinbase', 'Binance', 'Kraken', 'Bitfinex', 'OKX']
+MINING_POOLS = ['Foundry USA', 'AntPool', 'F2Pool', 'ViaBTC']
+TREASURIES = [('MicroStrategy', 'MSTR', 152800), ('Tesla', 'TSLA', 10500)]
+
+
+class ChainGenerator:
+    """Generate reproducible blocks, mempools and processor context"""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        start_height: int = 800_000,
+        base_time: Optional[int] = None,
+        entity_share: float = 0.05,
+        addresses_per_entity: int = 20
+    ):
+        """
+        Args:
+            seed: Seed for all generated data
+            start_height: Height of the first block
+            base_time: Unix time of the first block (default: fixed 2024-01-01)
+            entity_share: Fraction of outputs paying a known entity address
+            addresses_per_entity: Addresses generated for each known entity
+        """
+        self.seed = seed
+        self.start_height = start_height
+        self.base_time = base_time if base_time is not None else 1_704_067_200
+        self.entity_share = entity_share
+
+        rng = random.Random(f'{seed}:entities')
+        self.entities = []
+        for entity_type, names in (
+            ('exchange', [(name, None, 0) for name in EXCHANGES]),
+            ('mining_pool', [(name, None, 0) for name in MINING_POOLS]),
+            ('treasury', TREASURIES),
+        ):
+            for name, ticker, holdings in names:
+                metadata = {'ticker': ticker, 'known_holdings_btc': holdings} if ticker else {}
+                self.entities.append({
+                    'entity_id': name.lower().replace(' ', '_'),
+                    'entity_name': name,
+                    'entity_type': entity_type,
+                    'addresses': [self._address(rng) for _ in range(addresses_per_entity)],
+                    'metadata': metadata,
+                })
+        self._entity_addresses = [a for e in self.entities for a in e['addresses']]
+
+    @staticmethod
+    def _hex(rng: random.Random, length: int = 64) -> str:
+        return f'{rng.getrandbits(length * 4):0{length}x}'
+
+    @classmethod
+    def _address(cls, rng: random.Random) -> str:
+        return 'bc1q' + cls._hex(rng, 38)
+
+    def _rng(self, kind: str, height: int) -> random.Random:
+        return random.Random(f'{self.seed}:{kind}:{height}')
+
+    def block_time(self, height: int) -> int:
+        """Unix timestamp of a block"""
+        return self.base_time + (height - self.start_height) * BLOCK_INTERVAL
+
+    def block_hash(self, height: int) -> str:
+        """Hash of the block at a height"""
+        return '00000000' + self._hex(self._rng('hash', height), 56)
+
+    def _script_pub_key(self, rng: random.Random, address: str) -> Dict[str, Any]:
+        roll = rng.random()
+        for script_type, share, _ in SCRIPT_TYPES:
+            roll -= share
+            if roll <= 0:
+                break
+        program = self._hex(rng, 40)
+        return {
+            'asm': f'0 {program}',
+            'desc': f'addr({address})',
+            'hex': f'0014{program}',
+            'address': address,
+            'type': script_type,
+        }
+
+    def _output_address(self, rng: random.Random) -> str:
+        if self._entity_addresses and rng.random() < self.entity_share:
+            return rng.choice(self._entity_addresses)
+        return self._address(rng)
+
+    def transaction(self, rng: random.Random, height: int) -> Dict[str, Any]:
+        """One non-coinbase transaction with prevouts"""
+        input_count = rng.choices([1, 2, 3, 5], weights=[60, 25, 10, 5])[0]
+        output_count = rng.choices([1, 2, 3, 10], weights=[20, 65, 10, 5])[0]
+
+        vin = []
+        input_value = 0.0
+        for _ in range(input_count):
+            value = round(min(rng.lognormvariate(-3, 2.5), 5000.0), 8)
+            input_value += value
+            vin.append({
+                'txid': self._hex(rng),
+                'vout': rng.randrange(4),
+                'scriptSig': {'asm': '', 'hex': ''},
+                'txinwitness': [self._hex(rng, 142), self._hex(rng, 66)],
+                'prevout': {
+                    'generated': False,
+                    'height': height - rng.randrange(1, 50_000),
+                    'value': value,
+                    'scriptPubKey': self._script_pub_key(rng, self._output_address(rng)),
+                },
+                'sequence': 4294967293,
+            })
+
+        vsize = 11 + 68 * input_count + 31 * output_count
+        fee = round(vsize * rng.lognormvariate(2.5, 0.8) / SATOSHI, 8)
+        remaining = max(input_value - fee, 0.0)
+        splits = sorted(rng.random() for _ in range(output_count - 1))
+        shares = [b - a for a, b in zip([0.0] + splits, splits + [1.0])]
+
+        vout = [
+            {
+                'value': round(remaining * share, 8),
+                'n': n,
+                'scriptPubKey': self._script_pub_key(rng, self._output_address(rng)),
+            }
+            for n, share in enumerate(shares)
+        ]
+
+        size = vsize + 27 * input_count
+        return {
+            'txid': self._hex(rng),
+            'hash': self._hex(rng),
+            'version': 2,
+            'size': size,
+            'vsize': vsize,
+            'weight': vsize * 4 - 3,
+            'locktime': 0,
+            'vin': vin,
+            'vout': vout,
+            'fee': fee,
+            'hex': '02' * size,
+        }
+
+    def coinbase(self, rng: random.Random, height: int, fees: float) -> Dict[str, Any]:
+        """Coinbase transaction tagged with a mining pool"""
+        pool = rng.choice(MINING_POOLS)
+        pool_entity = next(e for e in self.entities if e['entity_name'] == pool)
+        tag = pool.lower().replace(' ', '').encode().hex()
+        reward = 6.25 + fees
+        return {
+            'txid': self._hex(rng),
+            'hash': self._hex(rng),
+            'version': 2,
+            'size': 250,
+            'vsize': 223,
+            'weight': 892,
+            'locktime': 0,
+            'vin': [{'coinbase': f'03{height:06x}{tag}', 'sequence': 4294967295}],
+            'vout': [{
+                'value': round(reward, 8),
+                'n': 0,
+                'scriptPubKey': self._script_pub_key(rng, rng.choice(pool_entity['addresses'])),
+            }],
+            'hex': '01' * 250,
+        }
+
+    def block(self, height: int, tx_count: int) -> Dict[str, Any]:
+        """
+        Block with ``tx_count`` transactions including the coinbase.
+
+        Args:
+            height: Block height
+            tx_count: Transactions in the block (1 to 10k)
+
+        Returns:
+            Block dict as returned by getblock(hash, 3)
+        """
+        if not 1 <= tx_count <= 10_000:
+            raise ValueError(f'tx_count must be between 1 and 10000, got {tx_count}')
+
+        rng = self._rng('block', height)
+        transactions = [self.transaction(rng, height) for _ in range(tx_count - 1)]
+        fees = sum(tx['fee'] for tx in transactions)
+        transactions.insert(0, self.coinbase(rng, height, fees))
+
+        size = 80 + sum(tx['size'] for tx in transactions)
+        return {
+            'hash': self.block_hash(height),
+            'confirmations': 1,
+            'height': height,
+            'version': 536870912,
+            'versionHex': '20000000',
+            'merkleroot': self._hex(rng),
+            'time': self.block_time(height),
+            'mediantime': self.block_time(height) - 3000,
+            'nonce': rng.getrandbits(32),
+            'bits': '17053894',
+            'difficulty': 67305906902031.39,
+            'chainwork': self._hex(rng),
+            'nTx': tx_count,
+            'previousblockhash': self.block_hash(height - 1),
+            'strippedsize': int(size * 0.7),
+            'size': size,
+            'weight': sum(tx['weight'] for tx in transactions),
+            'tx': transactions,
+        }
+
+    def mempool(self, height: int, tx_count: int) -> Dict[str, Dict[str, Any]]:
+        """Mempool entries as returned by getrawmempool(true)"""
+        rng = self._rng('mempool', height)
+        entries = {}
+        for _ in range(tx_count):
+            vsize = rng.choice([110, 141, 209, 250, 400, 1200])
+            fee = round(vsize * rng.lognormvariate(2.5, 0.9) / SATOSHI, 8)
+            entries[self._hex(rng)] = {
+                'vsize': vsize,
+                'weight': vsize * 4,
+                'time': self.block_time(height) - rng.randrange(3600),
+                'height': height,
+                'descendantcount': 1,
+                'ancestorcount': 1,
+                'fees': {'base': fee, 'modified': fee, 'ancestor': fee, 'descendant': fee},
+                'depends': [],
+                'bip125-replaceable': False,
+            }
+        return entries
+
+    def mempool_snapshot(self, height: int, tx_count: int = 50_000) -> Dict[str, Any]:
+        """Summary of the mempool at a height (fields of MempoolData)"""
+        rng = self._rng('snapshot', height)
+        # Fee pressure drifts over time with occasional spikes
+        level = 12 + 8 * math.sin(height / 40) + (60 if rng.random() < 0.05 else 0)
+        quantiles = {
+            'p10': round(level * 0.4, 2),
+            'p25': round(level * 0.7, 2),
+            'p50': round(level, 2),
+            'p75': round(level * 1.6, 2),
+            'p90': round(level * 2.8, 2),
+        }
+        count = int(tx_count * rng.uniform(0.8, 1.2))
+        return {
+            'block_height': height,
+            'timestamp': datetime.utcfromtimestamp(self.block_time(height)),
+            'transaction_count': count,
+            'total_fees': round(count * level * 180 / SATOSHI, 8),
+            'fee_quantiles': quantiles,
+            'avg_fee_rate': round(level * 1.2, 2),
+            'mempool_size_bytes': count * 300,
+        }
+
+    def exchange_flows(self, height: int) -> List[Dict[str, Any]]:
+        """Per-exchange flows for a block (fields of ExchangeFlowData)"""
+        rng = self._rng('exchange', height)
+        flows = []
+        for entity in self.entities:
+            if entity['entity_type'] != 'exchange':
+                continue
+            inflow = round(rng.lognormvariate(4, 1.2), 8)
+            outflow = round(rng.lognormvariate(4, 1.2), 8)
+            tx_count = rng.randrange(1, 40)
+            flows.append({
+                'block_height': height,
+                'timestamp': datetime.utcfromtimestamp(self.block_time(height)),
+                'entity_id': entity['entity_id'],
+                'entity_name': entity['entity_name'],
+                'inflow_btc': inflow,
+                'outflow_btc': outflow,
+                'net_flow_btc': round(inflow - outflow, 8),
+                'transaction_count': tx_count,
+                'transaction_ids': [self._hex(rng) for _ in range(min(tx_count, 5))],
+            })
+        return flows
+
+    def miner_data(self, height: int, day: int = 0) -> List[Dict[str, Any]]:
+        """Per-pool treasury data (fields of MinerTreasuryData)"""
+        rng = self._rng(f'miner{day}', height)
+        return [
+            {
+                'block_height': height,
+                'timestamp': datetime.utcfromtimestamp(self.block_time(height)) - timedelta(days=day),
+                'entity_id': entity['entity_id'],
+                'entity_name': entity['entity_name'],
+                'balance_btc': round(rng.uniform(500, 20_000), 8),
+                'daily_change_btc': round(rng.gauss(0, 80), 8),
+                'mining_rewards_btc': round(rng.uniform(50, 300), 8),
+                'transaction_ids': [self._hex(rng) for _ in range(3)],
+            }
+            for entity in self.entities if entity['entity_type'] == 'mining_pool'
+        ]
+
+    def whale_data(self, height: int, count: int = 20) -> List[Dict[str, Any]]:
+        """Large holder activity (fields of WhaleActivityData)"""
+        rng = self._rng('whale', height)
+        return [
+            {
+                'block_height': height,
+                'timestamp': datetime.utcfromtimestamp(self.block_time(height)),
+                'address': self._address(random.Random(f'{self.seed}:whale-address:{i}')),
+                'balance_btc': round(rng.uniform(1_000, 100_000), 8),
+                'seven_day_change_btc': round(rng.gauss(0, 800), 8),
+                'accumulation_streak_days': rng.randrange(0, 30),
+                'transaction_ids': [self._hex(rng) for _ in range(3)],
+            }
+            for i in range(count)
+        ]
+
+    def context(self, block: Dict[str, Any], history: int = 30) -> Dict[str, Any]:
+        """
+        Processor context for a block.
+
+        Contains the keys the block monitor passes (``raw_block`` and
+        ``transactions``) plus the snapshots and histories read by the
+        mempool, exchange, miner, whale and predictive processors, as
+        plain dicts.
+
+        Args:
+            block: Block from ``block()``
+            history: Number of previous blocks/days in each history
+
+        Returns:
+            historical_data dict
+        """
+        height = block['height']
+        previous = range(height - history, height)
+        flows = self.exchange_flows(height)
+        return {
+            'raw_block': block,
+            'transactions': block['tx'],
+            'mempool_data': self.mempool_snapshot(height),
+            'historical_mempool': [self.mempool_snapshot(h) for h in previous],
+            'exchange_flows': flows,
+            'current_exchange_flow': flows[0],
+            'historical_exchange_flows': [f for h in previous for f in self.exchange_flows(h)],
+            'miner_data': self.miner_data(height),
+            'historical_miner': [m for day in range(history, 0, -1) for m in self.miner_data(height, day)],
+            'whale_data': self.whale_data(height),
+            'historical_whale': [w for h in previous[-7:] for w in self.whale_data(h)],
+        }
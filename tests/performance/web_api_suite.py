@@ -0,0 +1,178 @@
+"""
+Benchmarks for web-api hot endpoints
+
+Requests go through the full FastAPI app in-process (httpx ASGI transport)
+with BigQuery replaced by FakeBigQueryClient and the rate limiter backed by
+FakeRedis, so routing, dependencies, rate limiting, serialization and
+middleware are measured without any network I/O.
+
+Scenarios:
+    insights_latest     GET /insights/latest (count + page queries)
+    insights_public     GET /insights/public (guest mode)
+    rate_limit_check    GCRARateLimiter.check_rate_limit alone
+
+Usage:
+    python -m tests.performance.web_api_suite --list
+    python -m tests.performance.web_api_suite --scenario insights_latest --param requests=2000
+"""
+
+import os
+import sys
+import math
+import random
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+SERVICE_DIR = Path(__file__).resolve().parents[2] / 'services' / 'web-api'
+
+from tests.performance.fakes import FakeBigQueryClient, FakeRedis
+from tests.performance.runner import StageTimer, suite_main
+
+SIGNAL_TYPES = ['mempool', 'exchange', 'miner', 'whale']
+
+
+def setup():
+    """Make the service importable and quiet"""
+    sys.path.insert(0, str(SERVICE_DIR))
+    os.environ.setdefault('GCP_PROJECT_ID', 'utxoiq-bench')
+    logging.disable(logging.WARNING)
+
+
+def gcra_script(redis, keys, args):
+    """Python equivalent of GCRA_LUA_SCRIPT for FakeRedis"""
+    now, interval, window, committed, requested = (float(a) for a in args)
+    tat = redis._get(keys[0])
+    tat = max(float(tat), now) if tat is not None else now
+    tat += committed * interval
+
+    new_tat = tat + requested * interval
+    allowed, retry_after = 1, 0
+    if new_tat - window > now:
+        allowed, retry_after = 0, new_tat - window - now
+        new_tat = tat
+
+    if new_tat > now:
+        redis._set(keys[0], f'{new_tat:.0f}', px=math.ceil(new_tat - now))
+
+    remaining = max(0, math.floor((now + window - new_tat) / interval))
+    return [allowed, remaining, math.ceil(new_tat - now), math.ceil(retry_after)]
+
+
+def insight_rows(count: int, seed: int = 0):
+    """Deterministic rows of the intel.insights table"""
+    rng = random.Random(f'{seed}:insights')
+    created = datetime(2025, 1, 1, 12)
+    return [
+        {
+            'insight_id': f'insight_{i}',
+            'signal_type': SIGNAL_TYPES[i % len(SIGNAL_TYPES)],
+            'headline': f'Synthetic insight {i} headline',
+            'summary': 'Synthetic insight used for endpoint benchmarking. ' * 3,
+            'confidence': round(rng.uniform(0.5, 1.0), 3),
+            'created_at': created - timedelta(minutes=10 * i),
+            'block_height': 800_000 - i,
+            'evidence_blocks': [800_000 - i],
+            'evidence_txids': [f'{rng.getrandbits(256):064x}' for _ in range(4)],
+            'chart_url': None,
+            'tags': ['synthetic'],
+            'confidence_factors': {'signal_strength': 0.8, 'data_quality': 0.9},
+            'confidence_explanation': 'Synthetic explanation',
+            'supporting_evidence': ['Synthetic evidence'],
+            'accuracy_rating': None,
+            'is_predictive': False,
+        }
+        for i in range(count)
+    ]
+
+
+def _install_fakes(params):
+    """Swap BigQuery and Redis for fakes; returns the BigQuery client"""
+    from src.config import settings
+    from src.services import rate_limiter_service
+
+    rows = insight_rows(params.get('rows', 200))
+    client = FakeBigQueryClient(latency=params.get('bigquery_latency', 0.0))
+    client.add_query_result(r'COUNT\(\*\)', [{'total': len(rows)}])
+    client.add_query_result(r'insights', lambda sql: rows[:100])
+
+    # Requests all come from one client; keep the limiter working but never denying
+    settings.rate_limit_free_tier = 10 ** 9
+    FakeRedis.define_script(rate_limiter_service.GCRA_LUA_SCRIPT, gcra_script)
+    redis = FakeRedis(latency=params.get('redis_latency', 0.0))
+    rate_limiter_service._rate_limiter = rate_limiter_service.GCRARateLimiter(redis)
+    return client
+
+
+def _endpoint(path: str):
+    def scenario(timer: StageTimer, params):
+        import httpx
+        from src.main import app
+        from src.database import get_db
+
+        requests = params.get('requests', 1000)
+        concurrency = params.get('concurrency', 1)
+        client = _install_fakes(params)
+
+        async def no_db():
+            yield None
+
+        app.dependency_overrides[get_db] = no_db
+        statuses = {}
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://bench') as http:
+                async def worker(count):
+                    for _ in range(count):
+                        with timer.stage('request'):
+                            response = await http.get(path)
+                        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+                await worker(min(50, requests))
+                statuses.clear()
+                with timer.run():
+                    share, extra = divmod(requests, concurrency)
+                    await asyncio.gather(*(worker(share + (i < extra)) for i in range(concurrency)))
+
+        with patch('src.services.insights_service.bigquery.Client', lambda *a, **k: client):
+            asyncio.run(run())
+        return requests, 'requests', {'statuses': statuses, 'bigquery_queries': client.query_calls}
+
+    scenario.__doc__ = f'GET {path} through the full app'
+    return scenario
+
+
+def rate_limit_check(timer: StageTimer, params):
+    """GCRARateLimiter.check_rate_limit across many identifiers"""
+    from src.models.auth import UserSubscriptionTier
+    from src.services import rate_limiter_service
+
+    checks = params.get('requests', 20_000)
+    identifiers = params.get('identifiers', 1000)
+    _install_fakes(params)
+    limiter = rate_limiter_service._rate_limiter
+
+    async def run():
+        for i in range(identifiers):
+            await limiter.check_rate_limit(f'ip:{i}', UserSubscriptionTier.FREE)
+        with timer.run():
+            for i in range(checks):
+                with timer.stage('check'):
+                    await limiter.check_rate_limit(f'ip:{i % identifiers}', UserSubscriptionTier.FREE)
+
+    asyncio.run(run())
+    return checks, 'checks', {'redis_commands': limiter.redis.commands}
+
+
+SCENARIOS = {
+    'insights_latest': _endpoint('/insights/latest?limit=20'),
+    'insights_public': _endpoint('/insights/public'),
+    'rate_limit_check': rate_limit_check,
+}
+
+
+if __name__ == '__main__':
+    sys.exit(suite_main('web-api', SCENARIOS, setup))